@@ -16,8 +16,12 @@ from models import (
     Company, Ad, Category, get_current_timestamp
 )
 from auth import AuthService, get_current_company
-from database import get_db
+from database import get_db, run_db
 from schemas import CompanyLogin
+from search_index import apply_search
+from pagination import paginate, order_by_keys, sort_keys, InvalidCursor
+from counters import get_counter_aggregator
+from response_cache import cached_json
 
 # Import routers
 from python_system.python_shared.routers import router as company_api_router
@@ -35,8 +39,11 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown"""
     # Startup
     print(f"✅ {app.title} starting up...")
+    counters = get_counter_aggregator()
+    counters.start()
     yield
-    # Shutdown
+    # Shutdown: write any counter increments still in memory
+    counters.stop()
     print(f"✅ {app.title} shutting down...")
 
 
@@ -51,12 +58,23 @@ public_app = FastAPI(
     lifespan=lifespan
 )
 
+# Response cache namespace; both apps serve /api/* from the shared Redis tier
+CACHE_NAMESPACE = "public"
+
+# Response cache TTLs (seconds); ORM writes invalidate these sooner
+CATEGORIES_CACHE_TTL = 300
+STATS_CACHE_TTL = 30
+ADS_CACHE_TTL = 30
+CACHED_AD_PAGES = 3  # only the first pages of /api/ads are cached
+
 
 @public_app.get("/")
 async def public_home(db: Session = Depends(get_db)):
     """Public home - list featured ads"""
     try:
-        featured_ads = db.query(Ad).filter(Ad.status == "active").order_by(Ad.views_count.desc()).limit(20).all()
+        featured_ads = await run_db(
+            db.query(Ad).filter(Ad.status == "active").order_by(Ad.views_count.desc()).limit(20).all
+        )
 
         return {
             "status": "success",
@@ -91,34 +109,35 @@ async def health_check():
 
 @public_app.get("/api/ads")
 async def get_ads(
+    request: Request,
     category: str = None,
     search: str = None,
     page: int = 1,
     limit: int = 20,
+    sort: str = "date",
+    cursor: str = None,
     db: Session = Depends(get_db)
 ):
-    """Get ads with optional filters"""
-    try:
+    """Get ads with optional filters (sort: date, relevance; page or cursor)"""
+    def load():
         query = db.query(Ad).filter(Ad.status == "active")
 
         if category:
             query = query.filter(Ad.category_slug == category)
 
+        rank = None
         if search:
-            query = query.filter(
-                (Ad.title.ilike(f"%{search}%")) |
-                (Ad.description.ilike(f"%{search}%"))
-            )
+            query, rank = apply_search(query, Ad, search)
 
         total = query.count()
-        offset = (page - 1) * limit
-        ads = query.order_by(Ad.created_at.desc()).offset(offset).limit(limit).all()
+        ads, next_cursor = paginate(query, sort, limit, cursor=cursor, page=page, rank=rank)
 
         return {
             "status": "success",
             "total": total,
             "page": page,
             "limit": limit,
+            "next_cursor": next_cursor,
             "ads": [
                 {
                     "id": ad.ad_id,
@@ -137,6 +156,16 @@ async def get_ads(
                 for ad in ads
             ]
         }
+
+    try:
+        if cursor or page > CACHED_AD_PAGES:
+            return await run_db(load)
+
+        params = {"category": category, "search": search, "page": page, "limit": limit, "sort": sort}
+        return await cached_json(request, "/api/ads", params, lambda: run_db(load),
+                                 ttl=ADS_CACHE_TTL, tags=("ads",), namespace=CACHE_NAMESPACE)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -144,13 +173,14 @@ async def get_ads(
 @public_app.get("/api/ads/{ad_id}")
 async def get_ad_detail(ad_id: str, db: Session = Depends(get_db)):
     """Get single ad details"""
-    ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+    ad = await run_db(db.query(Ad).filter(Ad.ad_id == ad_id).first)
     if not ad:
         raise HTTPException(status_code=404, detail="Ad not found")
 
-    # Increment view count
-    ad.views_count = (ad.views_count or 0) + 1
-    db.commit()
+    # Increment view count (write-behind; no transaction per view)
+    counters = get_counter_aggregator()
+    counters.increment(ad.ad_id, "views_count")
+    current = counters.current(ad)
 
     return {
         "status": "success",
@@ -161,11 +191,11 @@ async def get_ad_detail(ad_id: str, db: Session = Depends(get_db)):
             "category": ad.category_slug,
             "company": ad.company_slug,
             "status": ad.status,
-            "views": ad.views_count,
-            "likes": ad.likes_count or 0,
-            "dislikes": ad.dislikes_count or 0,
-            "favorites": ad.favorites_count or 0,
-            "contacts": ad.contacts_count or 0,
+            "views": current["views_count"],
+            "likes": current["likes_count"],
+            "dislikes": current["dislikes_count"],
+            "favorites": current["favorites_count"],
+            "contacts": current["contacts_count"],
             "media_path": ad.media_path,
             "media_type": ad.media_type,
             "contact": {
@@ -181,48 +211,69 @@ async def get_ad_detail(ad_id: str, db: Session = Depends(get_db)):
 
 
 @public_app.get("/api/categories")
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(request: Request, db: Session = Depends(get_db)):
     """Get all categories"""
-    categories = db.query(Category).all()
-    return {
-        "status": "success",
-        "categories": [
-            {
-                "id": cat.category_id,
-                "slug": cat.category_slug,
-                "name": cat.category_name,
-                "description": cat.description
-            }
-            for cat in categories
-        ]
-    }
+    def load():
+        categories = db.query(Category).all()
+        return {
+            "status": "success",
+            "categories": [
+                {
+                    "id": cat.category_id,
+                    "slug": cat.category_slug,
+                    "name": cat.category_name,
+                    "description": cat.description
+                }
+                for cat in categories
+            ]
+        }
+
+    return await cached_json(request, "/api/categories", {}, lambda: run_db(load),
+                             ttl=CATEGORIES_CACHE_TTL, tags=("categories",), namespace=CACHE_NAMESPACE)
 
 
 @public_app.get("/api/dashboard_stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(request: Request, db: Session = Depends(get_db)):
     """Get public dashboard statistics"""
-    try:
-        total_ads = db.query(Ad).filter(Ad.status == "active").count()
-        total_views = db.query(func.sum(Ad.views_count)).scalar() or 0
-        total_companies = db.query(Company).count()
-        total_categories = db.query(Category).count()
+    def load():
+        try:
+            total_ads = db.query(Ad).filter(Ad.status == "active").count()
+            total_views = db.query(func.sum(Ad.views_count)).scalar() or 0
+            total_companies = db.query(Company).count()
+            total_categories = db.query(Category).count()
+
+            return {
+                "status": "success",
+                "total_ads": total_ads,
+                "total_views": int(total_views),
+                "total_companies": total_companies,
+                "total_categories": total_categories
+            }
+        except Exception as e:
+            return {
+                "status": "success",
+                "total_ads": 0,
+                "total_views": 0,
+                "total_companies": 0,
+                "total_categories": 0,
+                "error": str(e)
+            }
 
-        return {
-            "status": "success",
-            "total_ads": total_ads,
-            "total_views": int(total_views),
-            "total_companies": total_companies,
-            "total_categories": total_categories
-        }
-    except Exception as e:
-        return {
-            "status": "success",
-            "total_ads": 0,
-            "total_views": 0,
-            "total_companies": 0,
-            "total_categories": 0,
-            "error": str(e)
-        }
+    return await cached_json(request, "/api/dashboard_stats", {}, lambda: run_db(load),
+                             ttl=STATS_CACHE_TTL, tags=("stats",), namespace=CACHE_NAMESPACE)
+
+
+# Interaction type -> Ad counter column
+TRACKED_COUNTERS = {
+    "view": "views_count",
+    "like": "likes_count",
+    "dislike": "dislikes_count",
+    "favorite": "favorites_count",
+    "call": "contacts_count",
+    "sms": "contacts_count",
+    "email": "contacts_count",
+    "whatsapp": "contacts_count",
+}
 
 
 @public_app.post("/api/track_interaction")
@@ -233,23 +284,14 @@ async def track_interaction(
     db: Session = Depends(get_db)
 ):
     """Track user interactions with ads"""
-    ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+    ad = await run_db(db.query(Ad).filter(Ad.ad_id == ad_id).first)
     if not ad:
         raise HTTPException(status_code=404, detail="Ad not found")
 
-    # Track based on event type
-    if event_type == "view":
-        ad.views_count = (ad.views_count or 0) + 1
-    elif event_type == "like":
-        ad.likes_count = (ad.likes_count or 0) + 1
-    elif event_type == "dislike":
-        ad.dislikes_count = (ad.dislikes_count or 0) + 1
-    elif event_type == "favorite":
-        ad.favorites_count = (ad.favorites_count or 0) + 1
-    elif event_type in ["call", "sms", "email", "whatsapp"]:
-        ad.contacts_count = (ad.contacts_count or 0) + 1
-
-    db.commit()
+    # Track based on event type (write-behind, flushed in batches)
+    column = TRACKED_COUNTERS.get(event_type)
+    if column:
+        get_counter_aggregator().increment(ad.ad_id, column)
 
     return {"status": "success", "message": f"Tracked {event_type} for ad {ad_id}"}
 
@@ -278,7 +320,7 @@ async def company_health():
 @company_app.post("/api/login")
 async def company_login(credentials: CompanyLogin, db: Session = Depends(get_db)):
     """Company login"""
-    company = db.query(Company).filter(Company.company_slug == credentials.slug).first()
+    company = await run_db(db.query(Company).filter(Company.company_slug == credentials.slug).first)
 
     if not company:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -299,17 +341,29 @@ async def company_login(credentials: CompanyLogin, db: Session = Depends(get_db)
 
 @company_app.get("/api/my-ads")
 async def get_company_ads(
+    limit: int = None,
+    cursor: str = None,
     db: Session = Depends(get_db),
     current_company: dict = Depends(get_current_company)
 ):
-    """Get ads for current company"""
+    """Get ads for current company (all, or `limit` per page with a cursor)"""
     company_slug = current_company.get("sub")
 
-    ads = db.query(Ad).filter(Ad.company_slug == company_slug).order_by(Ad.created_at.desc()).all()
+    def load():
+        query = db.query(Ad).filter(Ad.company_slug == company_slug)
+        if limit:
+            return (query.count(), *paginate(query, "date", limit, cursor=cursor))
+        return query.count(), order_by_keys(query, sort_keys("date")).all(), None
+
+    try:
+        total, ads, next_cursor = await run_db(load)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "status": "success",
-        "total": len(ads),
+        "total": total,
+        "next_cursor": next_cursor,
         "ads": [
             {
                 "id": ad.ad_id,
@@ -338,7 +392,7 @@ async def get_ad_analytics(
     """Get analytics for a specific ad"""
     company_slug = current_company.get("sub")
 
-    ad = db.query(Ad).filter(Ad.ad_id == ad_id, Ad.company_slug == company_slug).first()
+    ad = await run_db(db.query(Ad).filter(Ad.ad_id == ad_id, Ad.company_slug == company_slug).first)
     if not ad:
         raise HTTPException(status_code=404, detail="Ad not found")
 
@@ -364,7 +418,7 @@ async def get_company_profile(
     """Get company profile"""
     company_slug = current_company.get("sub")
 
-    company = db.query(Company).filter(Company.company_slug == company_slug).first()
+    company = await run_db(db.query(Company).filter(Company.company_slug == company_slug).first)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
@@ -393,10 +447,6 @@ async def save_company_profile(
     """Save/update company profile"""
     company_slug = current_company.get("sub")
 
-    company = db.query(Company).filter(Company.company_slug == company_slug).first()
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-
     # Get form data or JSON
     try:
         data = await request.json()
@@ -404,20 +454,29 @@ async def save_company_profile(
         form = await request.form()
         data = dict(form)
 
-    # Update allowed fields
-    if "email" in data:
-        company.email = data["email"]
-    if "phone" in data:
-        company.phone = data["phone"]
-    if "website" in data:
-        company.website = data["website"]
-    if "description" in data:
-        company.description = data["description"]
-    if "company_name" in data:
-        company.company_name = data["company_name"]
-
-    company.updated_at = get_current_timestamp()
-    db.commit()
+    def save():
+        company = db.query(Company).filter(Company.company_slug == company_slug).first()
+        if not company:
+            return False
+
+        # Update allowed fields
+        if "email" in data:
+            company.email = data["email"]
+        if "phone" in data:
+            company.phone = data["phone"]
+        if "website" in data:
+            company.website = data["website"]
+        if "description" in data:
+            company.description = data["description"]
+        if "company_name" in data:
+            company.company_name = data["company_name"]
+
+        company.updated_at = get_current_timestamp()
+        db.commit()
+        return True
+
+    if not await run_db(save):
+        raise HTTPException(status_code=404, detail="Company not found")
 
     return {
         "status": "success",
@@ -446,14 +505,20 @@ async def admin_health():
 @admin_app.get("/api/dashboard")
 async def admin_dashboard(db: Session = Depends(get_db)):
     """Admin dashboard stats"""
+    def load():
+        return (
+            db.query(Ad).count(),
+            db.query(Ad).filter(Ad.status == "active").count(),
+            db.query(Company).count(),
+            db.query(func.sum(Ad.views_count)).scalar() or 0,
+            db.query(func.sum(Ad.likes_count)).scalar() or 0,
+            db.query(func.sum(Ad.favorites_count)).scalar() or 0,
+            db.query(func.sum(Ad.contacts_count)).scalar() or 0,
+        )
+
     try:
-        total_ads = db.query(Ad).count()
-        active_ads = db.query(Ad).filter(Ad.status == "active").count()
-        total_companies = db.query(Company).count()
-        total_views = db.query(func.sum(Ad.views_count)).scalar() or 0
-        total_likes = db.query(func.sum(Ad.likes_count)).scalar() or 0
-        total_favorites = db.query(func.sum(Ad.favorites_count)).scalar() or 0
-        total_contacts = db.query(func.sum(Ad.contacts_count)).scalar() or 0
+        (total_ads, active_ads, total_companies, total_views,
+         total_likes, total_favorites, total_contacts) = await run_db(load)
 
         return {
             "status": "success",
@@ -474,7 +539,7 @@ async def admin_dashboard(db: Session = Depends(get_db)):
 @admin_app.get("/api/companies")
 async def get_companies(db: Session = Depends(get_db)):
     """Get all companies"""
-    companies = db.query(Company).all()
+    companies = await run_db(db.query(Company).all)
     return {
         "status": "success",
         "companies": [
@@ -493,19 +558,28 @@ async def get_companies(db: Session = Depends(get_db)):
 @admin_app.get("/api/ads")
 async def admin_get_ads(
     status: str = None,
+    limit: int = None,
+    cursor: str = None,
     db: Session = Depends(get_db)
 ):
-    """Get all ads (admin view)"""
-    query = db.query(Ad)
-
-    if status:
-        query = query.filter(Ad.status == status)
+    """Get all ads (admin view; all, or `limit` per page with a cursor)"""
+    def load():
+        query = db.query(Ad)
+        if status:
+            query = query.filter(Ad.status == status)
+        if limit:
+            return (query.count(), *paginate(query, "date", limit, cursor=cursor))
+        return query.count(), order_by_keys(query, sort_keys("date")).all(), None
 
-    ads = query.order_by(Ad.created_at.desc()).all()
+    try:
+        total, ads, next_cursor = await run_db(load)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "status": "success",
-        "total": len(ads),
+        "total": total,
+        "next_cursor": next_cursor,
         "ads": [
             {
                 "id": ad.ad_id,
@@ -529,25 +603,32 @@ async def moderate_ad(
     db: Session = Depends(get_db)
 ):
     """Moderate an ad (approve/block/review)"""
-    ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
-    if not ad:
+    def moderate():
+        ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+        if not ad:
+            return None
+
+        if action == "approve":
+            ad.status = "active"
+        elif action == "block":
+            ad.status = "inactive"
+        elif action == "review":
+            ad.status = "scheduled"  # Using scheduled as "pending review"
+
+        ad.updated_at = get_current_timestamp()
+        new_status = ad.status
+        db.commit()
+        return new_status
+
+    new_status = await run_db(moderate)
+    if new_status is None:
         raise HTTPException(status_code=404, detail="Ad not found")
 
-    if action == "approve":
-        ad.status = "active"
-    elif action == "block":
-        ad.status = "inactive"
-    elif action == "review":
-        ad.status = "scheduled"  # Using scheduled as "pending review"
-
-    ad.updated_at = get_current_timestamp()
-    db.commit()
-
     return {
         "status": "success",
         "message": f"Ad {action}d successfully",
         "ad_id": ad_id,
-        "new_status": ad.status
+        "new_status": new_status
     }
 
 
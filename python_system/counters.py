@@ -0,0 +1,164 @@
+"""
+Write-behind aggregator for ad counters (views, likes, contacts, ...)
+
+Hot endpoints used to read-modify-write an Ad row and commit on every hit:
+one SQLite write transaction per page view. Here increments are summed in
+memory per ad_id and written as one batched
+UPDATE ads SET views_count = views_count + ? ... transaction, either every
+`flush_interval_ms` or once `flush_every` increments are pending.
+
+Usage:
+    counters = get_counter_aggregator()
+    counters.increment(ad_id, "views_count")
+    views = (ad.views_count or 0) + counters.pending(ad_id)["views_count"]
+"""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from typing import Dict, Optional
+import threading
+
+from database import engine as default_engine
+
+COUNTER_COLUMNS = (
+    "views_count",
+    "likes_count",
+    "dislikes_count",
+    "favorites_count",
+    "contacts_count",
+)
+
+_UPDATE_SQL = text(
+    "UPDATE ads SET "
+    + ", ".join(f"{column} = COALESCE({column}, 0) + :{column}" for column in COUNTER_COLUMNS)
+    + " WHERE ad_id = :ad_id"
+)
+
+
+class CounterAggregator:
+    """Accumulates counter deltas per ad and flushes them in one transaction"""
+
+    def __init__(
+        self,
+        engine: Engine = default_engine,
+        flush_interval_ms: int = 500,
+        flush_every: int = 1000
+    ):
+        self.engine = engine
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.flush_every = flush_every
+
+        self._deltas: Dict[str, Dict[str, int]] = {}
+        # Swapped out by flush() but not yet committed; still counted by pending()
+        self._inflight: Dict[str, Dict[str, int]] = {}
+        self._pending_events = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the background flusher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="counter-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write everything still pending"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠ Counter flush failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------------
+
+    def increment(self, ad_id: str, column: str, delta: int = 1):
+        if column not in COUNTER_COLUMNS:
+            raise ValueError(f"Unknown counter column: {column}")
+
+        with self._lock:
+            deltas = self._deltas.setdefault(ad_id, dict.fromkeys(COUNTER_COLUMNS, 0))
+            deltas[column] += delta
+            self._pending_events += 1
+            full = self._pending_events >= self.flush_every
+
+        if full:
+            self._wake.set()
+
+    def pending(self, ad_id: str) -> Dict[str, int]:
+        """Deltas not yet written for an ad (all zeros if none)"""
+        with self._lock:
+            pending = dict(self._deltas.get(ad_id) or dict.fromkeys(COUNTER_COLUMNS, 0))
+            for column, value in self._inflight.get(ad_id, {}).items():
+                pending[column] += value
+            return pending
+
+    def current(self, ad) -> Dict[str, int]:
+        """An Ad's counters as stored plus anything still pending"""
+        pending = self.pending(ad.ad_id)
+        return {column: (getattr(ad, column) or 0) + pending[column] for column in COUNTER_COLUMNS}
+
+    def flush(self) -> int:
+        """Write pending deltas in one transaction; returns ads updated"""
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._deltas = self._deltas, {}
+                self._inflight = deltas
+                self._pending_events = 0
+
+            if not deltas:
+                return 0
+
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(_UPDATE_SQL, [
+                        {"ad_id": ad_id, **values} for ad_id, values in deltas.items()
+                    ])
+            except Exception:
+                # Merge back so nothing is lost; the next flush retries
+                with self._lock:
+                    self._inflight = {}
+                    for ad_id, values in deltas.items():
+                        merged = self._deltas.setdefault(ad_id, dict.fromkeys(COUNTER_COLUMNS, 0))
+                        for column, value in values.items():
+                            merged[column] += value
+                raise
+
+            with self._lock:
+                self._inflight = {}
+            return len(deltas)
+
+
+_aggregator: Optional[CounterAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_counter_aggregator() -> CounterAggregator:
+    """Process-wide CounterAggregator (flusher started on first use)"""
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = CounterAggregator()
+                _aggregator.start()
+    return _aggregator
@@ -2,10 +2,17 @@
 Database configuration for AdSphere Python System
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+import asyncio
 import os
+import re
 
 # Database configuration - use python_shared/database/adsphere.db
 DATABASE_PATH = Path(__file__).parent / "python_shared" / "database"
@@ -13,15 +20,116 @@ DATABASE_PATH.mkdir(parents=True, exist_ok=True)
 
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}/adsphere.db"
 
-# Create engine
-engine = create_engine(
+# Pragmas applied to every connection (all three services share the file)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",          # readers never block the writer
+    "synchronous": "NORMAL",        # durable at checkpoints; safe with WAL
+    "busy_timeout": 5000,           # wait for locks instead of failing
+    "cache_size": -64000,           # 64 MB page cache per connection
+    "mmap_size": 268435456,         # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+}
+
+READER_POOL_SIZE = int(os.getenv("DB_READER_POOL_SIZE", "8"))
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "16"))
+
+
+def create_sqlite_engine(url: str, readonly: bool = False, **kwargs):
+    """
+    Engine with the shared SQLite pragmas applied on connect.
+
+    Args:
+        url: sqlite:/// URL
+        readonly: Reader pool; connections are PRAGMA query_only
+        kwargs: Passed through to create_engine (pool sizing etc.)
+    """
+    kwargs.setdefault("connect_args", {})
+    kwargs["connect_args"].setdefault("check_same_thread", False)
+    kwargs["connect_args"].setdefault("timeout", SQLITE_PRAGMAS["busy_timeout"] / 1000)
+    kwargs.setdefault("echo", False)  # Set to True for SQL logging
+
+    sqlite_engine = create_engine(url, **kwargs)
+
+    @event.listens_for(sqlite_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if readonly:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return sqlite_engine
+
+
+# Single writer connection: writes queue in the pool instead of racing for
+# SQLite's lock and failing with "database is locked"
+engine = create_sqlite_engine(DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=30)
+
+# Reader pool: WAL lets these run concurrently with the writer
+read_engine = create_sqlite_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=False  # Set to True for SQL logging
+    readonly=True,
+    pool_size=READER_POOL_SIZE,
+    max_overflow=READER_POOL_SIZE
 )
 
+
+# Raw SQL that needs the writer (reader connections are query_only)
+_WRITE_SQL = re.compile(
+    r"^\s*(?:INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|REINDEX|ANALYZE|VACUUM)\b"
+    r"|^\s*WITH\b.*\b(?:INSERT|UPDATE|DELETE|REPLACE)\b",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def is_write(clause) -> bool:
+    """True for ORM/Core DML and for text() statements that modify the DB"""
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return bool(_WRITE_SQL.match(clause.text))
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the reader pool and writes to the writer connection.
+
+    Writes are flushes, DML statements (including text() DML), anything
+    inside a SAVEPOINT, and every statement after mark_write(). Once a
+    transaction has written, every later statement in it also uses the
+    writer, so a session always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self._flushing or self.info.get("wrote") or is_write(clause)
+            or self.in_nested_transaction()
+        ):
+            self.info["wrote"] = True
+            return engine
+        return read_engine
+
+
+def mark_write(session: Session):
+    """
+    Route the rest of the session's current transaction to the writer.
+
+    For read-then-write sequences that must see the writer's snapshot,
+    e.g. a SELECT whose result decides an UPDATE in the same transaction.
+    """
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("wrote", None)
+
+
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
 
 def get_db():
@@ -33,6 +141,21 @@ def get_db():
         db.close()
 
 
+# Bounded pool for blocking DB work called from async routes
+_db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Run blocking SQLAlchemy work off the event loop.
+
+    Usage:
+        ads = await run_db(lambda: query.limit(20).all())
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, partial(func, *args, **kwargs))
+
+
 def init_db():
     """Initialize database with all models"""
     from models import Base
@@ -40,6 +163,31 @@ def init_db():
     print("✅ Database initialized successfully")
 
 
+# Superseded indexes dropped by create_indexes()
+RETIRED_INDEXES = (
+    "idx_ads_status_views",     # plain-column keyset indexes, replaced by
+    "idx_ads_status_favs",      # the COALESCE(counter, 0) idx_ads_keyset_*
+    "idx_ads_status_likes",
+)
+
+
+def create_indexes():
+    """Create any model indexes missing from an existing database (idempotent)"""
+    from models import Base
+    created = 0
+    with engine.begin() as conn:
+        for name in RETIRED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.exec_driver_sql(
+                    str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+                )
+                created += 1
+        conn.exec_driver_sql("ANALYZE")
+    print(f"✅ Indexes up to date ({created} checked)")
+
+
 def drop_all_tables():
     """Drop all tables (for development only)"""
     from models import Base
@@ -48,5 +196,9 @@ def drop_all_tables():
 
 
 if __name__ == "__main__":
-    init_db()
+    import sys
+    if "--indexes" in sys.argv:
+        create_indexes()
+    else:
+        init_db()
 
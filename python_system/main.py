@@ -8,7 +8,7 @@ from fastapi import FastAPI, HTTPException, Depends, Request, Session
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, JSON, Boolean, Float
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Boolean, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session as DBSession
 from pydantic import BaseModel
@@ -20,6 +20,8 @@ from typing import Optional, List
 import uvicorn
 from pathlib import Path
 
+from database import create_sqlite_engine
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -34,7 +36,8 @@ ACCESS_TOKEN_EXPIRE_HOURS = 24
 # DATABASE MODELS
 # ============================================================================
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Same connection pragmas (WAL, busy_timeout, cache) as the shared database module
+engine = create_sqlite_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
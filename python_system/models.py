@@ -3,7 +3,7 @@ SQLAlchemy Models for AdSphere Python System
 These models MATCH the existing database schema exactly
 """
 
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -91,6 +91,22 @@ class Ad(Base):
     company = relationship("Company", back_populates="ads")
     category = relationship("Category", back_populates="ads")
 
+    # Composite indexes for listing filters + keyset sorts (see pagination.py);
+    # created on existing databases by database.create_indexes(). Counters
+    # are nullable (rows written outside the ORM), so their sort keys are
+    # COALESCE(counter, 0) expressions, matching pagination.sort_expression().
+    __table_args__ = (
+        Index("idx_ads_status_created", "status", created_at.desc(), ad_id.desc()),
+        Index("idx_ads_status_category_created", "status", "category_slug", created_at.desc(), ad_id.desc()),
+        Index("idx_ads_keyset_views", "status", func.coalesce(views_count, 0).desc(),
+              created_at.desc(), ad_id.desc()),
+        Index("idx_ads_keyset_favs", "status", func.coalesce(favorites_count, 0).desc(),
+              created_at.desc(), ad_id.desc()),
+        Index("idx_ads_keyset_likes", "status", func.coalesce(likes_count, 0).desc(),
+              func.coalesce(views_count, 0).desc(), created_at.desc(), ad_id.desc()),
+        Index("idx_ads_company_status_created", "company_slug", "status", created_at.desc(), ad_id.desc()),
+    )
+
 
 # ============================================================================
 # COMPANY CATEGORIES (many-to-many relationship)
@@ -851,6 +851,94 @@ async def process_text(request: TextProcessRequest):
     return response
 
 
+class TextBatchRequest(BaseModel):
+    """Request for batch text moderation"""
+    items: List[TextProcessRequest]
+
+
+class TextBatchResponse(BaseModel):
+    """Batch text moderation results, in request order"""
+    success: bool
+    results: List[TextProcessResponse] = []
+    count: int = 0
+    processing_time_ms: float = 0
+    error: Optional[str] = None
+
+
+MAX_TEXT_BATCH_SIZE = 256
+
+
+@router.post("/text/batch", response_model=TextBatchResponse)
+async def process_text_batch(request: TextBatchRequest):
+    """
+    Moderate many ad texts in one call.
+
+    Every model stage (language detection, embeddings, FAISS, intent,
+    toxicity) runs once over the whole batch instead of once per item,
+    which is what catalog rescans should use.
+
+    Example:
+        POST /moderate/text/batch
+        {
+            "items": [
+                {"title": "iPhone 15 for sale", "description": "Sealed box"},
+                {"title": "Bike", "description": "Lightly used", "category": "sports"}
+            ]
+        }
+    """
+    start_time = time.time()
+
+    response = TextBatchResponse(success=False)
+
+    if len(request.items) > MAX_TEXT_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_TEXT_BATCH_SIZE} items)"
+        )
+
+    try:
+        pipeline = get_pipeline()
+
+        results = pipeline.moderate_text_batch([
+            {
+                "title": item.title,
+                "description": item.description,
+                "category": item.category,
+                "user_context": {
+                    "category": item.category,
+                    "language": item.language,
+                    **(item.context or {})
+                }
+            }
+            for item in request.items
+        ])
+
+        elapsed_ms = (time.time() - start_time) * 1000
+        for result in results:
+            response.results.append(TextProcessResponse(
+                success=True,
+                decision=result.get('decision', 'approve'),
+                risk_level=result.get('risk_level', 'low'),
+                global_score=result.get('global_score', 0.0),
+                category_scores=result.get('category_scores', {}),
+                flags=result.get('flags', []),
+                reasons=result.get('reasons', []),
+                detected_language=result.get('detected_language'),
+                intent=result.get('intent'),
+                ai_insights=result.get('ai_insights', []),
+                processing_time_ms=elapsed_ms / max(1, len(results))
+            ))
+
+        response.success = True
+        response.count = len(response.results)
+
+    except Exception as e:
+        response.error = str(e)
+
+    response.processing_time_ms = (time.time() - start_time) * 1000
+    return response
+
+
 # Alias for text processing
 @router.post("/text", response_model=TextProcessResponse)
 async def process_text_alias(request: TextProcessRequest):
@@ -60,27 +60,21 @@ async def ws_moderate(websocket: WebSocket):
         # ==========================================================
         # schedule async task into batch coordinator
         # ==========================================================
-        await coordinator.schedule(job_id, asset_bytes)
+        fut = await coordinator.schedule(job_id, asset_bytes)
 
         # ==========================================================
-        # stream partials until full task result available
+        # stream partials as each stage completes (no polling)
         # ==========================================================
-        fut = coordinator._pending[job_id]
-
-        # we poll until complete
-        while not fut.done():
-            await asyncio.sleep(0.01)
-
-            partial = getattr(fut, "_partial", None)
-            if partial:
-                await websocket.send_json({
-                    "job_id": job_id,
-                    "partial": True,
-                    "data": partial
-                })
+        async for stage, partial in coordinator.partials(job_id):
+            await websocket.send_json({
+                "job_id": job_id,
+                "partial": True,
+                "stage": stage,
+                "data": partial
+            })
 
         # FUTURE COMPLETED → full result ready
-        full = fut.result()
+        full = await fut
 
         # ==========================================================
         # write to cache
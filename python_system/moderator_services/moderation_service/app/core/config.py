@@ -44,6 +44,10 @@ class Settings(BaseSettings):
     GPU_ENABLED: bool = False
     CUDA_DEVICE: int = 0
 
+    # Model host (serve models from dedicated worker processes)
+    MODEL_HOST_ENABLED: bool = False
+    MODEL_HOST_MAX_BATCH: int = 32
+
     # Thresholds (0.0-1.0)
     THRESHOLD_NUDITY_APPROVE: float = 0.2
     THRESHOLD_NUDITY_REVIEW: float = 0.4
@@ -81,6 +85,18 @@ class Settings(BaseSettings):
     CACHE_DIR: str = "./cache"
     CACHE_TTL_SECONDS: int = 86400  # 24 hours
 
+    # Text embeddings (SemanticEncoder cache + VectorDatabase index)
+    EMBEDDING_CACHE_DIR: Optional[str] = "./cache/embeddings"
+    EMBEDDING_CACHE_CAPACITY: int = 100000
+    VECTOR_INDEX_DIR: Optional[str] = "./cache/vector_index"
+    VECTOR_INDEX_ANN_THRESHOLD: int = 5000
+    VECTOR_INDEX_ANN_TYPE: Optional[str] = "hnsw"  # hnsw, ivf, or None for exact
+
+    # Rule-match cache (TextRulesEngine)
+    RULE_CACHE_MAX_ENTRIES: int = 10000
+    RULE_CACHE_TTL_SECONDS: int = 3600
+    RULE_CACHE_SHARED_PATH: Optional[str] = None  # SQLite file shared by workers
+
     # API Auth (optional)
     API_KEY: Optional[str] = None
 
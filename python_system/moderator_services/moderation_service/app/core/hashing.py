@@ -3,9 +3,10 @@ Content fingerprinting and perceptual hashing
 """
 import hashlib
 import imagehash
-from PIL import Image
 from typing import Optional
 
+from app.services.decoded_image import DecodedImage, ImageInput
+
 
 class ContentHasher:
     """
@@ -32,56 +33,60 @@ class ContentHasher:
         return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
     @staticmethod
-    def perceptual_hash_image(image_path: str) -> Optional[str]:
+    def perceptual_hash_image(image: ImageInput) -> Optional[str]:
         """
         Generate perceptual hash (pHash) of image.
         Useful for detecting near-duplicates.
         """
         try:
-            img = Image.open(image_path)
+            img = DecodedImage.ensure(image).source
             phash = imagehash.phash(img)
             return str(phash)
         except Exception as e:
-            print(f"Error hashing image {image_path}: {e}")
+            print(f"Error hashing image {image}: {e}")
             return None
 
     @staticmethod
-    def average_hash_image(image_path: str) -> Optional[str]:
+    def average_hash_image(image: ImageInput) -> Optional[str]:
         """
         Generate average hash (aHash) of image.
         Faster but less robust than pHash.
         """
         try:
-            img = Image.open(image_path)
+            img = DecodedImage.ensure(image).source
             ahash = imagehash.average_hash(img)
             return str(ahash)
         except Exception as e:
-            print(f"Error hashing image {image_path}: {e}")
+            print(f"Error hashing image {image}: {e}")
             return None
 
     @staticmethod
-    def difference_hash_image(image_path: str) -> Optional[str]:
+    def difference_hash_image(image: ImageInput) -> Optional[str]:
         """
         Generate difference hash (dHash) of image.
         Good for detecting transformations.
         """
         try:
-            img = Image.open(image_path)
+            img = DecodedImage.ensure(image).source
             dhash = imagehash.dhash(img)
             return str(dhash)
         except Exception as e:
-            print(f"Error hashing image {image_path}: {e}")
+            print(f"Error hashing image {image}: {e}")
             return None
 
     @staticmethod
-    def combined_image_fingerprint(image_path: str) -> dict:
+    def combined_image_fingerprint(image: ImageInput) -> dict:
         """
         Generate multiple hashes for robust fingerprinting.
+
+        Accepts a path or a DecodedImage; the file is read and decoded
+        once and shared by all hashes.
         """
+        image = DecodedImage.ensure(image)
         return {
-            "sha256": ContentHasher.hash_file(image_path),
-            "phash": ContentHasher.perceptual_hash_image(image_path),
-            "ahash": ContentHasher.average_hash_image(image_path),
-            "dhash": ContentHasher.difference_hash_image(image_path),
+            "sha256": image.sha256,
+            "phash": ContentHasher.perceptual_hash_image(image),
+            "ahash": ContentHasher.average_hash_image(image),
+            "dhash": ContentHasher.difference_hash_image(image),
         }
 
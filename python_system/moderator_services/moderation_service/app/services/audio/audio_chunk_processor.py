@@ -234,23 +234,12 @@ def _load_audio_models():
     if _audio_models_loaded:
         return _audio_models
 
-    # Whisper ASR
-    try:
-        import whisper
-        _audio_models['whisper'] = whisper.load_model("small")
-        print("✓ Whisper ASR loaded")
-    except Exception as e:
-        print(f"⚠ Whisper not available: {e}")
-        _audio_models['whisper'] = None
-
-    # Detoxify
-    try:
-        from detoxify import Detoxify
-        _audio_models['detoxify'] = Detoxify('original')
-        print("✓ Detoxify loaded for audio")
-    except Exception as e:
-        print(f"⚠ Detoxify not available: {e}")
-        _audio_models['detoxify'] = None
+    # Whisper ASR and Detoxify are shared with the image/text pipelines
+    # through the model host instead of loading private copies here
+    from app.workers.model_host import get_model
+
+    _audio_models['whisper'] = get_model('asr')
+    _audio_models['detoxify'] = get_model('detoxify')
 
     _audio_models_loaded = True
     return _audio_models
@@ -476,12 +465,10 @@ def _analyze_chunk_sync(chunk: AudioChunk) -> ChunkAnalysisResult:
     # 1. Transcribe with Whisper (auto-detects language)
     if whisper_model:
         try:
-            transcription = whisper_model.transcribe(
-                chunk.chunk_path,
-                task="transcribe",
-                verbose=False
-                # language=None means auto-detect
-            )
+            # language=None means auto-detect
+            transcription = whisper_model.transcribe(chunk.chunk_path)
+            if transcription.get('error'):
+                raise RuntimeError(transcription['error'])
 
             result.transcription = transcription.get('text', '').strip()
             result.language = transcription.get('language', 'unknown')
@@ -501,8 +488,7 @@ def _analyze_chunk_sync(chunk: AudioChunk) -> ChunkAnalysisResult:
     # 2. Analyze toxicity (Detoxify works best with English, but provides scores for any text)
     if detoxify_model and result.transcription:
         try:
-            scores = detoxify_model.predict(result.transcription)
-            result.toxicity_scores = {k: float(v) for k, v in scores.items()}
+            result.toxicity_scores = detoxify_model.analyze(result.transcription)
 
             # Check thresholds
             if result.toxicity_scores.get('toxicity', 0) > 0.5:
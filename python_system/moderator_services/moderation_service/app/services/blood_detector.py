@@ -4,7 +4,7 @@ Detects graphic violence and gore content
 """
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 import os
 import numpy as np
 
@@ -20,6 +20,7 @@ for _path in [str(MODERATOR_SERVICES_DIR), str(MODERATION_SERVICE_DIR), str(APP_
         sys.path.insert(0, _path)
 
 from model_registry import ensure_models, get_model_path, is_model_available
+from app.services.decoded_image import DecodedImage, ImageInput
 
 # Ensure required models are available
 REQUIRED_MODELS = ['torch']
@@ -75,28 +76,42 @@ class BloodDetector:
         except Exception as e:
             print(f"⚠ Failed to load blood model: {e}")
 
-    def detect(self, image_path: str) -> Dict[str, any]:
+    def detect(self, image: ImageInput) -> Dict[str, any]:
         """
         Detect blood/gore in image.
 
         Args:
-            image_path: Path to image file
+            image: Path to image file or a shared DecodedImage
 
         Returns:
             Dict with blood detection results
         """
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: List[ImageInput]) -> List[Dict[str, any]]:
+        """
+        Detect blood/gore in several images with one CNN forward pass.
+
+        Args:
+            images: Paths, DecodedImages or RGB arrays
+
+        Returns:
+            One result dict per input image (same shape as detect())
+        """
+        images = [DecodedImage.ensure(image) for image in images]
+        if not images:
+            return []
+
         if self.model is None:
             # Fallback: use color-based heuristic
-            return self._color_based_detection(image_path)
+            return [self._color_based_detection(image) for image in images]
 
         try:
             import torch
-            from PIL import Image
             import torchvision.transforms as transforms
 
-            # Preprocess image
+            # Preprocess image (resize is memoized on the shared image)
             transform = transforms.Compose([
-                transforms.Resize((224, 224)),
                 transforms.ToTensor(),
                 transforms.Normalize(
                     mean=[0.485, 0.456, 0.406],
@@ -104,25 +119,26 @@ class BloodDetector:
                 )
             ])
 
-            image = Image.open(image_path).convert('RGB')
-            input_tensor = transform(image).unsqueeze(0)
+            input_tensor = torch.stack([
+                transform(image.resized((224, 224))) for image in images
+            ])
 
             # Inference
             with torch.no_grad():
                 output = self.model(input_tensor)
-                prob = torch.sigmoid(output).item()
+                probs = torch.sigmoid(output).reshape(len(images), -1)[:, 0].tolist()
 
-            return {
+            return [{
                 "blood_score": float(prob),
                 "blood_detected": prob > 0.5,
                 "method": "cnn"
-            }
+            } for prob in probs]
 
         except Exception as e:
             print(f"Blood detection error: {e}")
-            return self._color_based_detection(image_path)
+            return [self._color_based_detection(image) for image in images]
 
-    def _color_based_detection(self, image_path: str) -> Dict[str, any]:
+    def _color_based_detection(self, image: DecodedImage) -> Dict[str, any]:
         """
         Fallback: Color-based blood detection (heuristic).
 
@@ -131,12 +147,11 @@ class BloodDetector:
         try:
             import cv2
 
-            image = cv2.imread(image_path)
-            if image is None:
+            if not image.exists:
                 return {"blood_score": 0.0, "blood_detected": False, "error": "Failed to load image"}
 
-            # Convert to HSV
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+            # HSV view is shared with other detectors
+            hsv = image.hsv
 
             # Blood-like red color range in HSV
             # Hue: 0-10 and 160-180 (red spectrum)
@@ -153,7 +168,7 @@ class BloodDetector:
             mask = cv2.bitwise_or(mask1, mask2)
 
             # Calculate percentage of blood-like pixels
-            total_pixels = image.shape[0] * image.shape[1]
+            total_pixels = hsv.shape[0] * hsv.shape[1]
             blood_pixels = np.count_nonzero(mask)
             blood_ratio = blood_pixels / total_pixels
 
@@ -180,7 +195,7 @@ class BloodDetector:
         Detect blood across multiple video frames.
 
         Args:
-            frame_paths: List of frame image paths
+            frame_paths: List of frame image paths or DecodedImages
 
         Returns:
             Aggregated blood detection results
@@ -0,0 +1,228 @@
+"""
+Decoded image context
+Reads and decodes an image once so every detector can share the pixels
+"""
+import hashlib
+import io
+import os
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+
+class DecodedImage:
+    """
+    Shared, lazily decoded view of a single image.
+
+    The file is read from disk at most once and decoded at most once.
+    Derived representations (RGB/BGR/HSV arrays, resized copies) are
+    created on first access and memoized, so passing the same instance
+    through the hasher, NSFW, YOLO, blood and OCR stages costs a single
+    JPEG/PNG decode.
+
+    Detectors may run concurrently on one instance (the batch coordinator
+    fans a task out to several stages), so every lazy view is built under
+    a per-instance lock and published once.
+
+    Usage:
+        image = DecodedImage.from_path("/tmp/upload.jpg")
+        hasher.combined_image_fingerprint(image)
+        violence_detector.detect(image)
+    """
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        rgb: Optional[np.ndarray] = None
+    ):
+        if data is None and path is None and rgb is None:
+            raise ValueError("DecodedImage requires data, path or rgb")
+
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = data
+        self._source = None
+        self._pil = None
+        self._rgb = np.ascontiguousarray(rgb) if rgb is not None else None
+        self._bgr = None
+        self._hsv = None
+        self._gray = None
+        self._sha256 = None
+        self._resized: Dict[Tuple[int, int, int], object] = {}
+
+    # ----------------------------
+    # Constructors
+    # ----------------------------
+
+    @classmethod
+    def from_path(cls, path: str) -> "DecodedImage":
+        """Create a context backed by a file (read lazily)"""
+        return cls(path=str(path))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, path: Optional[str] = None) -> "DecodedImage":
+        """Create a context from in-memory encoded bytes"""
+        return cls(data=data, path=path)
+
+    @classmethod
+    def from_array(cls, rgb: np.ndarray) -> "DecodedImage":
+        """Create a context from an already decoded RGB array"""
+        return cls(rgb=rgb)
+
+    @classmethod
+    def ensure(cls, image: "ImageInput") -> "DecodedImage":
+        """Wrap a path or bytes in a DecodedImage; pass instances through"""
+        if isinstance(image, DecodedImage):
+            return image
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(bytes(image))
+        if isinstance(image, np.ndarray):
+            return cls.from_array(image)
+        return cls.from_path(image)
+
+    # ----------------------------
+    # Raw content
+    # ----------------------------
+
+    @property
+    def exists(self) -> bool:
+        """True if the image has content to decode"""
+        if self._data is not None or self._rgb is not None:
+            return True
+        return bool(self.path) and os.path.exists(self.path)
+
+    @property
+    def data(self) -> bytes:
+        """Encoded bytes (read from disk once)"""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    if self.path is None:
+                        raise ValueError("DecodedImage has no encoded bytes")
+                    with open(self.path, "rb") as f:
+                        self._data = f.read()
+        return self._data
+
+    @property
+    def sha256(self) -> str:
+        """SHA256 of the encoded bytes"""
+        if self._sha256 is None:
+            with self._lock:
+                if self._sha256 is None:
+                    if self._data is None and self.path is None:
+                        # Array-backed context: hash the pixels instead
+                        self._sha256 = hashlib.sha256(self._rgb.tobytes()).hexdigest()
+                    else:
+                        self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    # ----------------------------
+    # Decoded views (lazy + memoized)
+    # ----------------------------
+
+    @property
+    def source(self):
+        """
+        PIL image as decoded, before any mode conversion.
+
+        Perceptual hashes are computed on this so fingerprints match the
+        ones stored from Image.open() (palette/alpha/grayscale images
+        hash differently after an RGB conversion).
+        """
+        if self._source is None:
+            with self._lock:
+                if self._source is None:
+                    from PIL import Image
+
+                    if self._data is None and self.path is None:
+                        self._source = Image.fromarray(self._rgb)
+                    else:
+                        img = Image.open(io.BytesIO(self.data))
+                        img.load()
+                        self._source = img
+        return self._source
+
+    @property
+    def pil(self):
+        """PIL image in RGB mode"""
+        if self._pil is None:
+            with self._lock:
+                if self._pil is None:
+                    img = self.source
+                    self._pil = img if img.mode == "RGB" else img.convert("RGB")
+        return self._pil
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """HxWx3 uint8 array in RGB order"""
+        if self._rgb is None:
+            with self._lock:
+                if self._rgb is None:
+                    self._rgb = np.asarray(self.pil)
+        return self._rgb
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """HxWx3 uint8 array in BGR order (OpenCV / YOLO / PaddleOCR input)"""
+        if self._bgr is None:
+            with self._lock:
+                if self._bgr is None:
+                    self._bgr = np.ascontiguousarray(self.rgb[:, :, ::-1])
+        return self._bgr
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """HxWx3 uint8 array in OpenCV HSV space"""
+        if self._hsv is None:
+            with self._lock:
+                if self._hsv is None:
+                    import cv2
+
+                    self._hsv = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    @property
+    def gray(self) -> np.ndarray:
+        """HxW float array, mean of the RGB channels"""
+        if self._gray is None:
+            with self._lock:
+                if self._gray is None:
+                    self._gray = np.mean(self.rgb, axis=2)
+        return self._gray
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.rgb.shape
+
+    def resized(self, size: Tuple[int, int], resample: Optional[int] = None):
+        """
+        Resized copy of the RGB PIL image, memoized per (size, resample).
+
+        Args:
+            size: (width, height)
+            resample: PIL resampling filter (defaults to bilinear)
+        """
+        from PIL import Image
+
+        if resample is None:
+            resample = Image.BILINEAR
+
+        key = (int(size[0]), int(size[1]), int(resample))
+        resized = self._resized.get(key)
+        if resized is None:
+            with self._lock:
+                resized = self._resized.get(key)
+                if resized is None:
+                    resized = self.pil.resize((key[0], key[1]), resample)
+                    self._resized[key] = resized
+        return resized
+
+    def __repr__(self) -> str:
+        source = self.path or f"<{len(self._data or b'')} bytes>"
+        return f"DecodedImage({source})"
+
+
+# Anything a detector accepts in place of a decoded context
+ImageInput = Union[str, bytes, np.ndarray, DecodedImage]
@@ -0,0 +1,128 @@
+"""
+Multi-pattern keyword matching (Aho-Corasick)
+Finds every keyword occurrence in a single pass over the text
+"""
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of keywords.
+
+    Build once, then scan any number of texts in O(len(text) + hits),
+    independent of how many keywords are loaded.
+
+    Usage:
+        matcher = KeywordMatcher([("cocaine", rule_a), ("gun", rule_b)])
+        for position, keyword, payload in matcher.finditer("gun and cocaine"):
+            ...
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]] = ()):
+        """
+        Args:
+            patterns: (keyword, payload) pairs. The payload is returned
+                with each hit; the same keyword may carry several payloads.
+        """
+        # Trie as parallel arrays: transitions, failure links, outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._keywords: List[str] = []
+        self._payloads: List[Any] = []
+
+        for keyword, payload in patterns:
+            self._insert(keyword, payload)
+        self._build_links()
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def _insert(self, keyword: str, payload: Any):
+        if not keyword:
+            return
+
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+
+        self._out[node].append(len(self._keywords))
+        self._keywords.append(keyword)
+        self._payloads.append(payload)
+
+    def _build_links(self):
+        """Breadth-first failure links; merge outputs along them."""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str, Any]]:
+        """
+        Yield (start_position, keyword, payload) for every occurrence.
+
+        Hits are yielded in order of their end position.
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        keywords = self._keywords
+        payloads = self._payloads
+
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            for pattern_id in out[node]:
+                keyword = keywords[pattern_id]
+                yield index - len(keyword) + 1, keyword, payloads[pattern_id]
+
+    def first_hits(self, text: str) -> List[Tuple[int, str, Any]]:
+        """
+        First occurrence of each matched (keyword, payload) pair.
+
+        Results follow the order the patterns were added, which keeps
+        output stable for callers that used to loop over keyword lists.
+        """
+        first: Dict[int, int] = {}
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        keywords = self._keywords
+
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            for pattern_id in out[node]:
+                # Hits arrive by end position, so the first one seen is
+                # also the leftmost occurrence of that keyword
+                if pattern_id not in first:
+                    first[pattern_id] = index - len(keywords[pattern_id]) + 1
+
+        return [
+            (first[pattern_id], keywords[pattern_id], self._payloads[pattern_id])
+            for pattern_id in sorted(first)
+        ]
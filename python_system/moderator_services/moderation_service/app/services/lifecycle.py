@@ -3,9 +3,11 @@
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+from app.core.config import settings
 from app.infra.queue_client import QueueClient
 from app.services.cache_layer import ModerationCache
 from app.workers.batch_coordinator import BatchCoordinator, _load_models
+from app.workers.model_host import start_model_host, stop_model_host
 
 queue = None
 cache = None
@@ -20,9 +22,17 @@ async def init_services():
     cache = ModerationCache()
     coordinator = BatchCoordinator()
 
+    loop = asyncio.get_event_loop()
+
+    # start model-serving processes before anything asks for a model
+    if settings.MODEL_HOST_ENABLED:
+        await loop.run_in_executor(
+            _executor,
+            lambda: start_model_host(max_batch=settings.MODEL_HOST_MAX_BATCH)
+        )
+
     # load model weights to avoid cold start during first job
     # Use the standalone _load_models function in a thread pool
-    loop = asyncio.get_event_loop()
     await loop.run_in_executor(_executor, _load_models)
 
     # start batch + workers in background
@@ -41,6 +51,8 @@ async def shutdown_services():
     if coordinator:
         await coordinator.shutdown()
 
+    stop_model_host()
+
 
 def get_batch_coordinator() -> BatchCoordinator:
     """
@@ -8,23 +8,18 @@ import uuid
 from datetime import datetime
 
 from app.services.text_rules import TextRulesEngine
-from app.services.text_detoxify import DetoxifyService
 from app.services.text.text_moderation_pipeline import (
     TextModerationPipeline,
     TextModerationInput,
     ModerationDecision,
     ViolationType
 )
-from app.services.nsfw_detector import NSFWDetector
-from app.services.yolo_violence import ViolenceDetector
-from app.services.yolo_weapons import WeaponDetector
-from app.services.blood_detector import BloodDetector
-from app.services.ocr_paddle import OCRService
-from app.services.asr_whisper import ASRService
 from app.services.video_processor import VideoProcessor
 from app.services.contextual_intelligence import ContextualIntelligence
+from app.services.decoded_image import DecodedImage, ImageInput
 from app.core.decision_engine import DecisionEngine
 from app.core.hashing import ContentHasher
+from app.workers.model_host import get_model
 from app.models.schemas import CategoryScores, ModerationRequest
 from app.utils.logging import audit_logger, app_logger
 
@@ -52,7 +47,7 @@ class MasterModerationPipeline:
     def __init__(self):
         # Initialize all services
         self.text_rules = TextRulesEngine()
-        self.text_detoxify = DetoxifyService()  # Keep as fallback
+        self.text_detoxify = get_model("detoxify")  # Keep as fallback
 
         # NEW: Initialize comprehensive text moderation pipeline
         try:
@@ -64,42 +59,14 @@ class MasterModerationPipeline:
             self.text_pipeline = None
             self.use_new_text_pipeline = False
 
-        # Optional services - don't crash if they fail
-        try:
-            self.nsfw_detector = NSFWDetector()
-        except Exception as e:
-            app_logger.warning(f"NSFWDetector failed to load: {e}")
-            self.nsfw_detector = None
-
-        try:
-            self.violence_detector = ViolenceDetector()
-        except Exception as e:
-            app_logger.warning(f"ViolenceDetector failed to load: {e}")
-            self.violence_detector = None
-
-        try:
-            self.weapon_detector = WeaponDetector()
-        except Exception as e:
-            app_logger.warning(f"WeaponDetector failed to load: {e}")
-            self.weapon_detector = None
-
-        try:
-            self.blood_detector = BloodDetector()
-        except Exception as e:
-            app_logger.warning(f"BloodDetector failed to load: {e}")
-            self.blood_detector = None
-
-        try:
-            self.ocr_service = OCRService()
-        except Exception as e:
-            app_logger.warning(f"OCRService failed to load: {e}")
-            self.ocr_service = None
-
-        try:
-            self.asr_service = ASRService()
-        except Exception as e:
-            app_logger.warning(f"ASRService failed to load: {e}")
-            self.asr_service = None
+        # Optional model-backed services come from the shared model host
+        # (or its process-wide singletons); None when unavailable
+        self.nsfw_detector = get_model("nsfw")
+        self.violence_detector = get_model("violence")
+        self.weapon_detector = get_model("weapon")
+        self.blood_detector = get_model("blood")
+        self.ocr_service = get_model("ocr")
+        self.asr_service = get_model("asr")
 
         try:
             self.video_processor = VideoProcessor()
@@ -186,6 +153,58 @@ class MasterModerationPipeline:
         # Run the comprehensive moderation
         result = self.text_pipeline.moderate(input_data)
 
+        return self._build_text_pipeline_result(result, user_context, audit_id)
+
+    def moderate_text_batch(self, items: List[Dict]) -> List[Dict]:
+        """
+        Moderate several text-only items in one pass.
+
+        With the TextModerationPipeline loaded, every model stage runs
+        once over the whole batch; otherwise items fall back to the
+        legacy path one by one.
+
+        Args:
+            items: Dicts with title, description and optional category,
+                user_context
+
+        Returns:
+            One moderation result dict per item, in input order
+        """
+        if not (self.use_new_text_pipeline and self.text_pipeline):
+            return [
+                self.moderate_text(
+                    title=item.get('title', ''),
+                    description=item.get('description', ''),
+                    category=item.get('category'),
+                    user_context=item.get('user_context')
+                )
+                for item in items
+            ]
+
+        inputs = [
+            TextModerationInput(
+                title=item.get('title', ''),
+                description=item.get('description', ''),
+                category=item.get('category')
+            )
+            for item in items
+        ]
+        results = self.text_pipeline.moderate_batch(inputs)
+
+        return [
+            self._build_text_pipeline_result(
+                result, item.get('user_context'), self._generate_audit_id()
+            )
+            for item, result in zip(items, results)
+        ]
+
+    def _build_text_pipeline_result(
+        self,
+        result,
+        user_context: Optional[Dict],
+        audit_id: str
+    ) -> Dict:
+        """Map a TextModerationResult to the moderation response dict"""
         # Map violation types to category scores
         category_scores = CategoryScores()
 
@@ -229,6 +248,7 @@ class MasterModerationPipeline:
                     'intent_confidence': result.intent_confidence,
                     'violations': [v.value for v in result.violations],
                     'semantic_flags': result.semantic_flags,
+                    'stages_run': result.stages_run,
                 }
             }
         }
@@ -331,15 +351,16 @@ class MasterModerationPipeline:
 
         if combined_text.strip():
             # Detoxify
-            text_scores = self.text_detoxify.analyze(combined_text)
-            category_scores.hate = text_scores.get('toxicity', 0.0)
-            category_scores.self_harm = text_scores.get('identity_attack', 0.0) * 0.5
-
-            ai_sources['detoxify'] = {
-                'model_name': 'detoxify',
-                'score': text_scores.get('toxicity', 0.0),
-                'details': text_scores
-            }
+            if self.text_detoxify:
+                text_scores = self.text_detoxify.analyze(combined_text)
+                category_scores.hate = text_scores.get('toxicity', 0.0)
+                category_scores.self_harm = text_scores.get('identity_attack', 0.0) * 0.5
+
+                ai_sources['detoxify'] = {
+                    'model_name': 'detoxify',
+                    'score': text_scores.get('toxicity', 0.0),
+                    'details': text_scores
+                }
 
             # Spam detection
             spam_score = self._detect_spam(combined_text)
@@ -410,10 +431,13 @@ class MasterModerationPipeline:
             user_context=user_context
         )
 
-    def moderate_image(self, image_path: str, user_context: Optional[Dict] = None) -> Dict:
+    def moderate_image(self, image_path: ImageInput, user_context: Optional[Dict] = None) -> Dict:
         """
         Moderate single image.
 
+        The image is read and decoded once into a DecodedImage that every
+        detector below shares.
+
         Flow:
         1. Content fingerprinting
         2. NSFW detection
@@ -426,8 +450,10 @@ class MasterModerationPipeline:
         start_time = time.time()
         audit_id = self._generate_audit_id()
 
+        image = DecodedImage.ensure(image_path)
+
         # Fingerprinting
-        fingerprint = self.content_hasher.combined_image_fingerprint(image_path)
+        fingerprint = self.content_hasher.combined_image_fingerprint(image)
 
         category_scores = CategoryScores()
         ai_sources = {}
@@ -435,7 +461,7 @@ class MasterModerationPipeline:
         # NSFW (optional)
         if self.nsfw_detector:
             try:
-                nsfw_result = self.nsfw_detector.analyze_image(image_path)
+                nsfw_result = self.nsfw_detector.analyze_image(image)
                 category_scores.nudity = nsfw_result.get('nudity', 0.0)
                 category_scores.sexual_content = nsfw_result.get('sexual_content', 0.0)
                 ai_sources['nsfw'] = {
@@ -449,7 +475,7 @@ class MasterModerationPipeline:
         # Violence (optional)
         if self.violence_detector:
             try:
-                violence_result = self.violence_detector.detect(image_path)
+                violence_result = self.violence_detector.detect(image)
                 category_scores.violence = violence_result.get('violence_score', 0.0)
                 ai_sources['violence'] = {
                     'model_name': 'yolo_violence',
@@ -462,7 +488,7 @@ class MasterModerationPipeline:
         # Weapons (optional)
         if self.weapon_detector:
             try:
-                weapon_result = self.weapon_detector.detect(image_path)
+                weapon_result = self.weapon_detector.detect(image)
                 category_scores.weapons = weapon_result.get('weapon_score', 0.0)
                 ai_sources['weapons'] = {
                     'model_name': 'yolo_weapons',
@@ -475,7 +501,7 @@ class MasterModerationPipeline:
         # Blood (optional)
         if self.blood_detector:
             try:
-                blood_result = self.blood_detector.detect(image_path)
+                blood_result = self.blood_detector.detect(image)
                 category_scores.blood = blood_result.get('blood_score', 0.0)
                 ai_sources['blood'] = {
                     'model_name': 'blood_cnn',
@@ -488,7 +514,7 @@ class MasterModerationPipeline:
         # OCR + text moderation (optional)
         if self.ocr_service:
             try:
-                ocr_result = self.ocr_service.extract_text(image_path)
+                ocr_result = self.ocr_service.extract_text(image)
                 ocr_text = ocr_result.get('text', '')
                 if ocr_text.strip():
                     text_mod = self.moderate_text("", ocr_text, user_context=user_context)
@@ -0,0 +1,239 @@
+"""
+MatchCache
+Bounded LRU/TTL cache for synchronous, content-keyed results.
+
+Supports:
+- stable digest keys (identical across processes and restarts)
+- LRU eviction at a fixed entry budget + per-entry TTL
+- hit/miss/eviction counters
+- optional SQLite tier shared by every worker on the host
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class MatchCache:
+    """
+    In-process LRU in front of an optional shared SQLite tier.
+
+    Keys are hex digests produced by `digest()`; values are whatever the
+    caller stores. The shared tier needs `encode`/`decode` to turn values
+    into JSON-serializable objects and back.
+
+    Usage:
+        cache = MatchCache(max_entries=10000, ttl_seconds=3600)
+        key = cache.digest(text)
+        result = cache.get(key)
+        if result is None:
+            result = compute(text)
+            cache.put(key, result)
+    """
+
+    # Shared-tier housekeeping runs every N writes
+    SHARED_PURGE_EVERY = 500
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600,
+        shared_path: Optional[str] = None,
+        namespace: str = "default",
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_seconds)
+        self.namespace = namespace
+        self._encode = encode or (lambda value: value)
+        self._decode = decode or (lambda value: value)
+
+        # key -> (expires_at, value)
+        self._store: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+
+        # The shared tier holds the working set of every worker
+        self.shared_max_entries = self.max_entries * 10
+        self._shared_writes = 0
+        self._shared_path = shared_path
+        self._local = threading.local()
+        if shared_path:
+            self._init_shared()
+
+    # ----------------------------
+    # Keys
+    # ----------------------------
+
+    @staticmethod
+    def digest(text: str, salt: str = "") -> str:
+        """Stable 128-bit digest of text (unlike hash(), same in every process)"""
+        h = hashlib.blake2b(digest_size=16)
+        if salt:
+            h.update(salt.encode("utf-8"))
+            h.update(b"\x00")
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    # ----------------------------
+    # Core API
+    # ----------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None (expired entries are dropped)"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._store.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._store[key]
+
+        value = self._shared_get(key, now) if self._shared_path else None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.shared_hits += 1
+            self._store_local(key, value, now)
+        return value
+
+    def put(self, key: str, value: Any):
+        """Store a value in the local tier and, if configured, the shared tier"""
+        now = time.time()
+        with self._lock:
+            self._store_local(key, value, now)
+
+        if self._shared_path:
+            self._shared_put(key, value, now)
+
+    def clear(self):
+        """
+        Drop every local entry.
+
+        Shared entries are left alone: other workers may still be valid
+        for them, and callers that change what a key means should salt
+        the digest instead.
+        """
+        with self._lock:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for metrics endpoints"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._store),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "shared": bool(self._shared_path)
+            }
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    # ----------------------------
+    # Local tier
+    # ----------------------------
+
+    def _store_local(self, key: str, value: Any, now: float):
+        """Insert under self._lock, evicting least recently used entries"""
+        self._store[key] = (now + self.ttl, value)
+        self._store.move_to_end(key)
+
+        while len(self._store) > self.max_entries:
+            self._store.popitem(last=False)
+            self.evictions += 1
+
+    # ----------------------------
+    # Shared SQLite tier
+    # ----------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._shared_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_shared(self):
+        try:
+            directory = os.path.dirname(os.path.abspath(self._shared_path))
+            os.makedirs(directory, exist_ok=True)
+
+            conn = self._conn()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS match_cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_match_cache_expires ON match_cache(expires_at)")
+            conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠ Shared match cache disabled: {e}")
+            self._shared_path = None
+
+    def _shared_get(self, key: str, now: float) -> Optional[Any]:
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM match_cache WHERE namespace = ? AND key = ? AND expires_at >= ?",
+                (self.namespace, key, now)
+            ).fetchone()
+            return self._decode(json.loads(row[0])) if row else None
+        except (sqlite3.Error, ValueError, TypeError):
+            return None
+
+    def _shared_put(self, key: str, value: Any, now: float):
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO match_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(self._encode(value)), now + self.ttl)
+            )
+            self._shared_writes += 1
+            if self._shared_writes % self.SHARED_PURGE_EVERY == 0:
+                self._purge_shared(conn, now)
+            conn.commit()
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            print(f"⚠ Shared match cache write failed: {e}")
+
+    def _purge_shared(self, conn: sqlite3.Connection, now: float):
+        """Drop expired rows, then trim the namespace to its entry budget"""
+        conn.execute("DELETE FROM match_cache WHERE expires_at < ?", (now,))
+        conn.execute(
+            """
+            DELETE FROM match_cache
+            WHERE namespace = ? AND expires_at < (
+                SELECT expires_at FROM match_cache
+                WHERE namespace = ?
+                ORDER BY expires_at DESC
+                LIMIT 1 OFFSET ?
+            )
+            """,
+            (self.namespace, self.namespace, self.shared_max_entries)
+        )
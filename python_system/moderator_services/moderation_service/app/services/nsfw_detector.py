@@ -3,8 +3,7 @@ NSFW detection combining OpenNSFW2 and NudeNet
 """
 import sys
 from pathlib import Path
-from typing import Dict
-import os
+from typing import Dict, List
 
 # Set up paths for model_registry import
 # Path: services/nsfw_detector.py -> services -> app -> moderation_service -> moderator_services
@@ -18,6 +17,7 @@ for _path in [str(MODERATOR_SERVICES_DIR), str(MODERATION_SERVICE_DIR), str(APP_
         sys.path.insert(0, _path)
 
 from model_registry import ensure_models
+from app.services.decoded_image import DecodedImage, ImageInput
 
 # Ensure required models are available (nudenet is optional)
 REQUIRED_MODELS = ['nudenet']
@@ -55,42 +55,70 @@ class NSFWDetector:
         except Exception as e:
             print(f"⚠ NudeNet not available: {e}")
 
-    def analyze_image(self, image_path: str) -> Dict[str, float]:
+    def analyze_image(self, image: ImageInput) -> Dict[str, float]:
         """
         Analyze image for NSFW content.
 
         Args:
-            image_path: Path to image file
+            image: Path to image file or a shared DecodedImage
 
         Returns:
             Dict with scores:
                 - nudity: Overall nudity score
                 - sexual_content: Explicit sexual content score
         """
-        if not os.path.exists(image_path):
-            return {'nudity': 0.0, 'sexual_content': 0.0}
+        return self.detect_batch([image])[0]
 
-        scores = {'nudity': 0.0, 'sexual_content': 0.0}
+    def detect_batch(self, images: List[ImageInput], batch_size: int = 8) -> List[Dict[str, float]]:
+        """
+        Analyze several images, feeding each model the whole list at once.
+
+        Args:
+            images: Paths, DecodedImages or RGB arrays
+            batch_size: NudeNet inference batch size
+
+        Returns:
+            One score dict per input image (same shape as analyze_image())
+        """
+        images = [DecodedImage.ensure(image) for image in images]
+        scores = [{'nudity': 0.0, 'sexual_content': 0.0} for _ in images]
+
+        # Images that are missing on disk keep zero scores
+        present = [i for i, image in enumerate(images) if image.exists]
+        if not present:
+            return scores
 
         # OpenNSFW2
         if self.open_nsfw_model:
             try:
+                import numpy as np
                 import open_nsfw2 as on2
-                nsfw_prob = on2.predict_image(self.open_nsfw_model, image_path)
-                scores['nudity'] = float(nsfw_prob)
+                inputs = np.stack([
+                    on2.preprocess_image(images[i].pil, on2.Preprocessing.YAHOO)
+                    for i in present
+                ])
+                probs = self.open_nsfw_model.predict(inputs, batch_size=batch_size, verbose=0)
+                for i, prob in zip(present, probs):
+                    scores[i]['nudity'] = float(prob[1])
             except Exception as e:
                 print(f"OpenNSFW2 error: {e}")
 
         # NudeNet
         if self.nudenet_classifier:
             try:
-                result = self.nudenet_classifier.classify(image_path)
-                # NudeNet returns dict like: {image_path: {'safe': 0.8, 'unsafe': 0.2}}
-                if image_path in result:
-                    unsafe_score = result[image_path].get('unsafe', 0.0)
-                    scores['sexual_content'] = float(unsafe_score)
+                # Array inputs come back keyed by their position in the list
+                result = self.nudenet_classifier.classify(
+                    [images[i].bgr for i in present],
+                    batch_size=batch_size
+                )
+                for position, i in enumerate(present):
+                    entry = result.get(position)
+                    if not entry:
+                        continue
+                    unsafe_score = float(entry.get('unsafe', 0.0))
+                    scores[i]['sexual_content'] = unsafe_score
                     # Use max of both models
-                    scores['nudity'] = max(scores['nudity'], float(unsafe_score))
+                    scores[i]['nudity'] = max(scores[i]['nudity'], unsafe_score)
             except Exception as e:
                 print(f"NudeNet error: {e}")
 
@@ -101,7 +129,7 @@ class NSFWDetector:
         Analyze multiple video frames and aggregate.
 
         Args:
-            frame_paths: List of paths to frame images
+            frame_paths: List of frame image paths or DecodedImages
 
         Returns:
             Aggregated scores (max across all frames)
@@ -19,6 +19,7 @@ for _path in [str(MODERATOR_SERVICES_DIR), str(MODERATION_SERVICE_DIR), str(APP_
         sys.path.insert(0, _path)
 
 from model_registry import ensure_models
+from app.services.decoded_image import DecodedImage, ImageInput
 
 # Ensure required models are available
 REQUIRED_MODELS = ['paddleocr']
@@ -69,12 +70,12 @@ class OCRService:
             print(f"⚠ PaddleOCR not available: {e}")
             self.ocr = None
 
-    def extract_text(self, image_path: str, confidence_threshold: float = 0.5) -> Dict[str, any]:
+    def extract_text(self, image: ImageInput, confidence_threshold: float = 0.5) -> Dict[str, any]:
         """
         Extract text from image.
 
         Args:
-            image_path: Path to image file
+            image: Path to image file or a shared DecodedImage
             confidence_threshold: Minimum confidence for text detection
 
         Returns:
@@ -87,7 +88,8 @@ class OCRService:
                 "error": "OCR not initialized"
             }
 
-        if not os.path.exists(image_path):
+        image = DecodedImage.ensure(image)
+        if not image.exists:
             return {
                 "text": "",
                 "lines": [],
@@ -95,7 +97,7 @@ class OCRService:
             }
 
         try:
-            result = self.ocr.ocr(image_path, cls=True)
+            result = self.ocr.ocr(image.bgr, cls=True)
 
             if not result or not result[0]:
                 return {
@@ -131,19 +133,40 @@ class OCRService:
             }
 
         except Exception as e:
-            print(f"OCR error on {image_path}: {e}")
+            print(f"OCR error on {image}: {e}")
             return {
                 "text": "",
                 "lines": [],
                 "error": str(e)
             }
 
+    def extract_text_batch(
+        self,
+        images: List[ImageInput],
+        confidence_threshold: float = 0.5
+    ) -> List[Dict[str, any]]:
+        """
+        Extract text from several in-memory images.
+
+        PaddleOCR's ``ocr()`` takes one image per call (its recognizer
+        already batches the text lines it finds), so this iterates over
+        the decoded arrays without touching disk.
+
+        Args:
+            images: Paths, DecodedImages or RGB arrays
+            confidence_threshold: Minimum confidence for text detection
+
+        Returns:
+            One result dict per input image (same shape as extract_text())
+        """
+        return [self.extract_text(image, confidence_threshold) for image in images]
+
     def extract_from_frames(self, frame_paths: List[str]) -> Dict[str, any]:
         """
         Extract text from multiple video frames.
 
         Args:
-            frame_paths: List of frame image paths
+            frame_paths: List of frame image paths or DecodedImages
 
         Returns:
             Aggregated OCR results
@@ -6,7 +6,20 @@ Cache Hierarchy:
 1. In-memory LRU cache (fastest, limited size)
 2. Redis (if available, distributed)
 3. SQLite database (persistent, local)
-4. JSON file (fallback, portable)
+4. JSON-lines log (fallback, portable, append-only)
+
+Values are any JSON-serializable payload. CategoryMatcher stores one scored
+record per query:
+
+    {"keyword": {slug: [score, match_type]},
+     "semantic": "<base64 float32 similarity per category>" or None,
+     "fallback": {slug: score} or None}
+
+Values larger than CacheConfig.MAX_VALUE_BYTES once serialized are not cached.
+
+Only the in-memory tier is written inline; Redis, SQLite and the JSON log
+are written behind by a background thread that also flushes batched hit
+statistics, compacts the log and deletes expired SQLite rows.
 
 Usage:
     from cache import SearchCache
@@ -30,10 +43,11 @@ import sys
 import json
 import time
 import hashlib
+import atexit
 import asyncio
 import sqlite3
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 from functools import lru_cache
 from collections import OrderedDict
@@ -53,6 +67,9 @@ except ImportError:
     REDIS_AVAILABLE = False
     logger.warning("Redis not available. Using local cache only.")
 
+# A cached value: a CategoryMatcher scored record or a plain result list
+CacheValue = Union[Dict[str, Any], List[Dict]]
+
 
 # ==============================================================================
 # CONFIGURATION
@@ -74,12 +91,25 @@ class CacheConfig:
 
     # Size limits
     MEMORY_CACHE_SIZE = 10000  # Max entries in memory
+    MAX_VALUE_BYTES = int(os.getenv("SEARCH_CACHE_MAX_VALUE_BYTES", 64 * 1024))  # serialized size per entry
+
+    # Write-behind: slower tiers are written by a background thread
+    WRITE_BEHIND_INTERVAL = 0.5  # seconds between flushes
+    WRITE_BEHIND_MAX_PENDING = 1000  # flush early past this many queued writes
+    WRITE_BEHIND_MAX_ATTEMPTS = 5  # flushes a failing tier write is retried for
+
+    # JSON log is rewritten once this many dead lines outnumber live entries
+    JSON_COMPACT_MIN_LINES = 1000
+
+    # Expired SQLite rows are deleted by the writer thread this often
+    CLEANUP_INTERVAL = 3600
 
     # File paths
     BASE_DIR = Path(__file__).parent.parent.parent.parent.parent
     CACHE_DIR = BASE_DIR / "cache" / "search"
     DB_PATH = CACHE_DIR / "search_cache.db"
-    JSON_PATH = CACHE_DIR / "search_cache.json"
+    LOG_PATH = CACHE_DIR / "search_cache.jsonl"
+    JSON_PATH = CACHE_DIR / "search_cache.json"  # legacy whole-file cache, imported once
 
     @classmethod
     def ensure_dirs(cls):
@@ -166,132 +196,189 @@ class LRUCache:
 # ==============================================================================
 
 class SQLiteCache:
-    """SQLite-based persistent cache."""
+    """
+    SQLite-based persistent cache.
+
+    Each thread keeps one long-lived WAL connection (so statements stay
+    prepared in its statement cache). get() is a plain SELECT: expired rows
+    are left for cleanup_expired() and access counts are buffered until
+    flush_stats(), so reads never take the write lock.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA cache_size=-16000",
+        "PRAGMA temp_store=MEMORY",
+    )
 
     def __init__(self, db_path: Path):
         self.db_path = db_path
+        self._local = threading.local()
+        self._pending_hits: Dict[str, List] = {}
+        self._hits_lock = threading.Lock()
         self._init_db()
 
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=5, cached_statements=64)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+        return conn
+
     def _init_db(self) -> None:
         """Initialize database schema."""
         CacheConfig.ensure_dirs()
 
-        conn = sqlite3.connect(str(self.db_path))
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS search_cache (
-                query_hash TEXT PRIMARY KEY,
-                query TEXT NOT NULL,
-                results TEXT NOT NULL,
-                created_at REAL NOT NULL,
-                accessed_at REAL NOT NULL,
-                access_count INTEGER DEFAULT 1,
-                ttl INTEGER DEFAULT 604800
-            )
-        """)
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    query_hash TEXT PRIMARY KEY,
+                    query TEXT NOT NULL,
+                    results TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    access_count INTEGER DEFAULT 1,
+                    ttl INTEGER DEFAULT 604800
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_query ON search_cache(query)
-        """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_query ON search_cache(query)
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_created ON search_cache(created_at)
-        """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_created ON search_cache(created_at)
+            """)
 
-        conn.commit()
-        conn.close()
+            # Lets cleanup_expired() range-scan instead of reading every row
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_expires ON search_cache(created_at + ttl)
+            """)
 
     def _hash_query(self, query: str) -> str:
         """Generate hash for query."""
         return hashlib.sha256(query.lower().strip().encode()).hexdigest()[:32]
 
-    def get(self, query: str) -> Optional[List[Dict]]:
+    def get(self, query: str) -> Optional[CacheValue]:
         """Get cached results for query."""
         query_hash = self._hash_query(query)
 
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-
-            cursor.execute("""
+            row = self._conn().execute("""
                 SELECT results, created_at, ttl FROM search_cache
                 WHERE query_hash = ?
-            """, (query_hash,))
-
-            row = cursor.fetchone()
-
-            if row:
-                results_json, created_at, ttl = row
-
-                # Check TTL
-                if time.time() - created_at > ttl:
-                    # Expired, delete
-                    cursor.execute("DELETE FROM search_cache WHERE query_hash = ?", (query_hash,))
-                    conn.commit()
-                    conn.close()
-                    return None
+            """, (query_hash,)).fetchone()
+        except Exception as e:
+            logger.error(f"SQLite cache get error: {e}")
+            return None
 
-                # Update access stats
-                cursor.execute("""
-                    UPDATE search_cache 
-                    SET accessed_at = ?, access_count = access_count + 1
-                    WHERE query_hash = ?
-                """, (time.time(), query_hash))
-                conn.commit()
-                conn.close()
+        if not row:
+            return None
 
-                return json.loads(results_json)
+        results_json, created_at, ttl = row
 
-            conn.close()
+        # Expired rows are removed by cleanup_expired()
+        now = time.time()
+        if now - created_at > ttl:
             return None
 
-        except Exception as e:
-            logger.error(f"SQLite cache get error: {e}")
-            return None
+        # Access stats are written by flush_stats()
+        with self._hits_lock:
+            pending = self._pending_hits.setdefault(query_hash, [0, 0.0])
+            pending[0] += 1
+            pending[1] = now
+
+        return json.loads(results_json)
 
-    def set(self, query: str, results: List[Dict], ttl: int = None) -> bool:
+    def set(self, query: str, results: CacheValue, ttl: int = None) -> bool:
         """Store results in cache."""
-        query_hash = self._hash_query(query)
-        ttl = ttl or CacheConfig.CACHE_TTL
+        return self.set_many([(query, results, ttl)]) == 1
 
-        try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                INSERT OR REPLACE INTO search_cache 
-                (query_hash, query, results, created_at, accessed_at, access_count, ttl)
-                VALUES (?, ?, ?, ?, ?, 1, ?)
-            """, (
-                query_hash,
+    def set_many(self, entries: List[Tuple[str, CacheValue, Optional[int]]]) -> int:
+        """
+        Store several (query, results, ttl) entries in one transaction.
+
+        Returns:
+            Number of entries written
+        """
+        now = time.time()
+        rows = [
+            (
+                self._hash_query(query),
                 query.lower().strip(),
                 json.dumps(results),
-                time.time(),
-                time.time(),
-                ttl
-            ))
+                now,
+                now,
+                ttl or CacheConfig.CACHE_TTL
+            )
+            for query, results, ttl in entries
+        ]
+        if not rows:
+            return 0
 
-            conn.commit()
-            conn.close()
-            return True
+        try:
+            conn = self._conn()
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO search_cache 
+                    (query_hash, query, results, created_at, accessed_at, access_count, ttl)
+                    VALUES (?, ?, ?, ?, ?, 1, ?)
+                """, rows)
+            return len(rows)
 
         except Exception as e:
             logger.error(f"SQLite cache set error: {e}")
-            return False
+            return 0
+
+    def flush_stats(self) -> int:
+        """
+        Write buffered access counts in one transaction.
+
+        Returns:
+            Number of rows updated
+        """
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+
+        if not pending:
+            return 0
+
+        try:
+            conn = self._conn()
+            with conn:
+                conn.executemany("""
+                    UPDATE search_cache 
+                    SET accessed_at = MAX(accessed_at, ?), access_count = access_count + ?
+                    WHERE query_hash = ?
+                """, [(accessed, hits, query_hash) for query_hash, (hits, accessed) in pending.items()])
+            return len(pending)
+        except Exception as e:
+            logger.error(f"SQLite stats flush error: {e}")
+            # Keep the counts for the next flush
+            with self._hits_lock:
+                for query_hash, (hits, accessed) in pending.items():
+                    merged = self._pending_hits.setdefault(query_hash, [0, 0.0])
+                    merged[0] += hits
+                    merged[1] = max(merged[1], accessed)
+            return 0
 
     def delete(self, query: str) -> bool:
         """Delete entry from cache."""
         query_hash = self._hash_query(query)
 
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM search_cache WHERE query_hash = ?", (query_hash,))
-            conn.commit()
-            deleted = cursor.rowcount > 0
-            conn.close()
-            return deleted
+            conn = self._conn()
+            with conn:
+                cursor = conn.execute("DELETE FROM search_cache WHERE query_hash = ?", (query_hash,))
+            with self._hits_lock:
+                self._pending_hits.pop(query_hash, None)
+            return cursor.rowcount > 0
         except Exception as e:
             logger.error(f"SQLite cache delete error: {e}")
             return False
@@ -299,13 +386,12 @@ class SQLiteCache:
     def clear(self) -> int:
         """Clear all cached entries."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM search_cache")
-            count = cursor.fetchone()[0]
-            cursor.execute("DELETE FROM search_cache")
-            conn.commit()
-            conn.close()
+            conn = self._conn()
+            with conn:
+                count = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+                conn.execute("DELETE FROM search_cache")
+            with self._hits_lock:
+                self._pending_hits.clear()
             return count
         except Exception as e:
             logger.error(f"SQLite cache clear error: {e}")
@@ -314,41 +400,40 @@ class SQLiteCache:
     def cleanup_expired(self) -> int:
         """Remove expired entries."""
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                DELETE FROM search_cache 
-                WHERE (created_at + ttl) < ?
-            """, (time.time(),))
-
-            deleted = cursor.rowcount
-            conn.commit()
-            conn.close()
-            return deleted
+            conn = self._conn()
+            with conn:
+                cursor = conn.execute("""
+                    DELETE FROM search_cache 
+                    WHERE (created_at + ttl) < ?
+                """, (time.time(),))
+            return cursor.rowcount
         except Exception as e:
             logger.error(f"SQLite cleanup error: {e}")
             return 0
 
+    def close(self) -> None:
+        """Flush access stats and close this thread's connection."""
+        self.flush_stats()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
     def stats(self) -> Dict:
         """Get cache statistics."""
+        self.flush_stats()
+
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
+            conn = self._conn()
 
-            cursor.execute("SELECT COUNT(*) FROM search_cache")
-            total = cursor.fetchone()[0]
+            total = conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
 
-            cursor.execute("SELECT SUM(access_count) FROM search_cache")
-            total_hits = cursor.fetchone()[0] or 0
+            total_hits = conn.execute("SELECT SUM(access_count) FROM search_cache").fetchone()[0] or 0
 
-            cursor.execute("""
+            top_queries = conn.execute("""
                 SELECT query, access_count FROM search_cache 
                 ORDER BY access_count DESC LIMIT 10
-            """)
-            top_queries = cursor.fetchall()
-
-            conn.close()
+            """).fetchall()
 
             return {
                 "total_entries": total,
@@ -361,103 +446,267 @@ class SQLiteCache:
 
 
 # ==============================================================================
-# JSON FILE CACHE (Fallback)
+# JSON LOG CACHE (Fallback)
 # ==============================================================================
 
 class JSONCache:
-    """JSON file-based cache (fallback/portable)."""
+    """
+    Append-only JSON-lines cache (fallback/portable).
+
+    Every change is one appended line ({"op": "set" | "del" | "hits" | "clear"}),
+    so a write costs the size of one entry rather than the whole cache.
+    Replaying the log rebuilds the in-memory index on start. Hit counts are
+    kept in memory and appended as a single "hits" line per flush();
+    compact() rewrites the log with only the live entries.
+    """
 
-    def __init__(self, json_path: Path):
-        self.json_path = json_path
+    def __init__(self, log_path: Path, legacy_path: Optional[Path] = None):
+        self.log_path = log_path
+        self.legacy_path = legacy_path
         self.lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        self._pending_hits: Dict[str, List] = {}
+        self._lines = 0
+        self._tail: Optional[List[str]] = None
         self._load()
+        self._file = open(self.log_path, 'a', encoding='utf-8')
+        self._import_legacy()
 
     def _load(self) -> None:
-        """Load cache from file."""
+        """Replay the log into memory."""
         CacheConfig.ensure_dirs()
 
-        if self.json_path.exists():
-            try:
-                with open(self.json_path, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-            except:
-                self.data = {"entries": {}, "metadata": {"created": time.time()}}
-        else:
-            self.data = {"entries": {}, "metadata": {"created": time.time()}}
-
-    def _save(self) -> None:
-        """Save cache to file."""
+        if not self.log_path.exists():
+            return
+
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-append
+                    continue
+                self._lines += 1
+                self._apply(record)
+
+        now = time.time()
+        for key in [k for k, e in self.entries.items() if self._expired(e, now)]:
+            del self.entries[key]
+
+    def _apply(self, record: Dict) -> None:
+        op = record.get("op")
+        if op == "set":
+            self.entries[record["key"]] = {
+                "query": record["query"],
+                "results": record["results"],
+                "created": record["created"],
+                "accessed": record["created"],
+                "hits": record.get("hits", 1),
+                "ttl": record["ttl"]
+            }
+        elif op == "del":
+            self.entries.pop(record["key"], None)
+        elif op == "hits":
+            for key, (hits, accessed) in record["hits"].items():
+                entry = self.entries.get(key)
+                if entry:
+                    entry["hits"] = hits
+                    entry["accessed"] = accessed
+        elif op == "clear":
+            self.entries.clear()
+
+    def _import_legacy(self) -> None:
+        """One-time import of the old whole-file search_cache.json."""
+        if not self.legacy_path or not self.legacy_path.exists() or self._lines:
+            return
+
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f).get("entries", {})
+        except Exception as e:
+            logger.warning(f"Legacy JSON cache unreadable, skipping import: {e}")
+            return
+
+        now = time.time()
+        with self.lock:
+            for key, entry in legacy.items():
+                if "results" in entry and not self._expired(entry, now):
+                    self.entries[key] = {
+                        "query": entry.get("query", key),
+                        "results": entry["results"],
+                        "created": entry.get("created", now),
+                        "accessed": entry.get("accessed", now),
+                        "hits": entry.get("hits", 1),
+                        "ttl": entry.get("ttl", CacheConfig.CACHE_TTL)
+                    }
+
+        self.compact()
+        self.legacy_path.unlink()
+        logger.info(f"Imported {len(self.entries)} entries from {self.legacy_path.name}")
+
+    def _append(self, record: Dict) -> bool:
+        """Append one record (caller holds the lock)."""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
         try:
-            with open(self.json_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            self._file.write(line + "\n")
         except Exception as e:
-            logger.error(f"JSON cache save error: {e}")
+            logger.error(f"JSON cache append error: {e}")
+            return False
+        self._lines += 1
+        if self._tail is not None:
+            self._tail.append(line)
+        return True
+
+    @staticmethod
+    def _expired(entry: Dict, now: float) -> bool:
+        return now - entry.get("created", 0) > entry.get("ttl", CacheConfig.CACHE_TTL)
 
     def _normalize_key(self, query: str) -> str:
         """Normalize query for use as key."""
         return query.lower().strip()
 
-    def get(self, query: str) -> Optional[List[Dict]]:
+    def get(self, query: str) -> Optional[CacheValue]:
         """Get cached results."""
         with self.lock:
             key = self._normalize_key(query)
-            entry = self.data["entries"].get(key)
+            entry = self.entries.get(key)
 
             if not entry:
                 return None
 
-            # Check TTL
-            if time.time() - entry.get("created", 0) > entry.get("ttl", CacheConfig.CACHE_TTL):
-                del self.data["entries"][key]
-                self._save()
+            # Expired entries are dropped here and left out of the next compaction
+            now = time.time()
+            if self._expired(entry, now):
+                del self.entries[key]
+                self._pending_hits.pop(key, None)
                 return None
 
-            # Update access stats
-            entry["accessed"] = time.time()
+            # Access stats are written by the next flush()
+            entry["accessed"] = now
             entry["hits"] = entry.get("hits", 0) + 1
-            self._save()
+            self._pending_hits[key] = [entry["hits"], now]
 
             return entry.get("results")
 
-    def set(self, query: str, results: List[Dict], ttl: int = None) -> bool:
+    def set(self, query: str, results: CacheValue, ttl: int = None) -> bool:
         """Store results in cache."""
         with self.lock:
             key = self._normalize_key(query)
+            now = time.time()
+            ttl = ttl or CacheConfig.CACHE_TTL
 
-            self.data["entries"][key] = {
+            self.entries[key] = {
                 "query": query,
                 "results": results,
-                "created": time.time(),
-                "accessed": time.time(),
+                "created": now,
+                "accessed": now,
                 "hits": 1,
-                "ttl": ttl or CacheConfig.CACHE_TTL
+                "ttl": ttl
             }
-
-            self._save()
-            return True
+            self._pending_hits.pop(key, None)
+            return self._append({
+                "op": "set", "key": key, "query": query,
+                "results": results, "created": now, "ttl": ttl
+            })
 
     def delete(self, query: str) -> bool:
         """Delete entry."""
         with self.lock:
             key = self._normalize_key(query)
-            if key in self.data["entries"]:
-                del self.data["entries"][key]
-                self._save()
+            if key in self.entries:
+                del self.entries[key]
+                self._pending_hits.pop(key, None)
+                self._append({"op": "del", "key": key})
                 return True
             return False
 
     def clear(self) -> int:
         """Clear all entries."""
         with self.lock:
-            count = len(self.data["entries"])
-            self.data["entries"] = {}
-            self._save()
+            count = len(self.entries)
+            self.entries.clear()
+            self._pending_hits.clear()
+            self._append({"op": "clear"})
             return count
 
+    def flush(self) -> None:
+        """Append batched hit counts and push buffered lines to the OS."""
+        with self.lock:
+            if self._pending_hits:
+                hits, self._pending_hits = self._pending_hits, {}
+                self._append({"op": "hits", "hits": hits})
+            try:
+                self._file.flush()
+            except Exception as e:
+                logger.error(f"JSON cache flush error: {e}")
+
+    def needs_compaction(self) -> bool:
+        """True once dead lines outnumber live entries (and there are enough to matter)."""
+        with self.lock:
+            dead = self._lines - len(self.entries)
+            return dead >= CacheConfig.JSON_COMPACT_MIN_LINES and dead > len(self.entries)
+
+    def compact(self) -> int:
+        """
+        Rewrite the log with only live entries.
+
+        The snapshot is written without holding the lock; lines appended
+        meanwhile are carried over before the new file is swapped in.
+
+        Returns:
+            Number of log lines dropped
+        """
+        with self._compact_lock:
+            self.flush()
+            now = time.time()
+            with self.lock:
+                snapshot = [(k, dict(e)) for k, e in self.entries.items() if not self._expired(e, now)]
+                before = self._lines
+                self._tail = []
+
+            tmp_path = self.log_path.with_suffix(self.log_path.suffix + ".tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for key, entry in snapshot:
+                        f.write(json.dumps({
+                            "op": "set", "key": key, "query": entry["query"],
+                            "results": entry["results"], "created": entry["created"],
+                            "ttl": entry["ttl"], "hits": entry.get("hits", 1)
+                        }, ensure_ascii=False, separators=(',', ':')) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                with self.lock:
+                    with open(tmp_path, 'a', encoding='utf-8') as f:
+                        for line in self._tail:
+                            f.write(line + "\n")
+                    self._file.close()
+                    os.replace(tmp_path, self.log_path)
+                    self._file = open(self.log_path, 'a', encoding='utf-8')
+                    dropped = before - len(snapshot)
+                    self._lines = len(snapshot) + len(self._tail)
+                    self._tail = None
+                    # Expired entries were left out of the file
+                    for key in [k for k, e in self.entries.items() if self._expired(e, now)]:
+                        del self.entries[key]
+                    return dropped
+            except Exception as e:
+                logger.error(f"JSON cache compaction error: {e}")
+                with self.lock:
+                    self._tail = None
+                return 0
+
+    def close(self) -> None:
+        """Flush pending hits and close the log."""
+        self.flush()
+        with self.lock:
+            self._file.close()
+
     def stats(self) -> Dict:
         """Get cache statistics."""
         with self.lock:
-            entries = self.data["entries"]
+            entries = self.entries
             total_hits = sum(e.get("hits", 0) for e in entries.values())
 
             # Top queries by hits
@@ -469,6 +718,7 @@ class JSONCache:
 
             return {
                 "total_entries": len(entries),
+                "log_lines": self._lines,
                 "total_hits": total_hits,
                 "top_queries": [
                     {"query": k, "hits": v.get("hits", 0)}
@@ -487,6 +737,8 @@ class RedisCache:
     def __init__(self):
         self.client = None
         self.async_client = None
+        self._pending_hits: Dict[str, List] = {}
+        self._hits_lock = threading.Lock()
         self._connect()
 
     def _connect(self) -> bool:
@@ -517,7 +769,7 @@ class RedisCache:
         normalized = query.lower().strip()
         return f"{CacheConfig.REDIS_PREFIX}{normalized}"
 
-    def get(self, query: str) -> Optional[List[Dict]]:
+    def get(self, query: str) -> Optional[CacheValue]:
         """Get from Redis."""
         if not self.client:
             return None
@@ -527,9 +779,11 @@ class RedisCache:
             data = self.client.get(key)
 
             if data:
-                # Update access stats
-                self.client.hincrby(f"{key}:meta", "hits", 1)
-                self.client.hset(f"{key}:meta", "accessed", time.time())
+                # Access stats are sent in one pipeline by flush_stats()
+                with self._hits_lock:
+                    pending = self._pending_hits.setdefault(key, [0, 0.0])
+                    pending[0] += 1
+                    pending[1] = time.time()
                 return json.loads(data)
 
             return None
@@ -537,7 +791,7 @@ class RedisCache:
             logger.error(f"Redis get error: {e}")
             return None
 
-    def set(self, query: str, results: List[Dict], ttl: int = None) -> bool:
+    def set(self, query: str, results: CacheValue, ttl: int = None) -> bool:
         """Store in Redis."""
         if not self.client:
             return False
@@ -563,6 +817,25 @@ class RedisCache:
             logger.error(f"Redis set error: {e}")
             return False
 
+    def flush_stats(self) -> int:
+        """Send batched hit counts; returns the number of keys updated."""
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+
+        if not pending or not self.client:
+            return 0
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, (hits, accessed) in pending.items():
+                pipe.hincrby(f"{key}:meta", "hits", hits)
+                pipe.hset(f"{key}:meta", "accessed", accessed)
+            pipe.execute()
+            return len(pending)
+        except Exception as e:
+            logger.error(f"Redis stats flush error: {e}")
+            return 0
+
     def delete(self, query: str) -> bool:
         """Delete from Redis."""
         if not self.client:
@@ -625,9 +898,14 @@ class SearchCache:
     1. In-memory LRU (fastest)
     2. Redis (distributed, if available)
     3. SQLite (persistent)
-    4. JSON file (fallback)
+    4. JSON log (fallback)
 
-    Write-through: writes to ALL available tiers
+    Write-behind: set() only updates memory and queues the write; a
+    background thread writes queued entries to the slower tiers every
+    WRITE_BEHIND_INTERVAL seconds (repeated writes of a query coalesce).
+
+    Values are CacheValue payloads (see the module docstring); ones over
+    MAX_VALUE_BYTES serialized are refused by set().
     """
 
     def __init__(self):
@@ -639,21 +917,31 @@ class SearchCache:
 
         self.redis = RedisCache() if REDIS_AVAILABLE else None
         self.sqlite = SQLiteCache(CacheConfig.DB_PATH)
-        self.json = JSONCache(CacheConfig.JSON_PATH)
+        self.json = JSONCache(CacheConfig.LOG_PATH, legacy_path=CacheConfig.JSON_PATH)
 
         # Stats tracking
         self.total_requests = 0
         self.tier_hits = {"memory": 0, "redis": 0, "sqlite": 0, "json": 0, "miss": 0}
 
+        # query -> (results, ttl, tiers still to write, failed flush attempts)
+        self._pending: "OrderedDict[str, Tuple[CacheValue, int, set, int]]" = OrderedDict()
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="search-cache-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
         logger.info("🚀 SearchCache initialized")
         logger.info(f"   Memory: {CacheConfig.MEMORY_CACHE_SIZE} entries")
         logger.info(f"   Redis: {'✅ Available' if self.redis and self.redis.client else '❌ Not available'}")
         logger.info(f"   SQLite: {CacheConfig.DB_PATH}")
-        logger.info(f"   JSON: {CacheConfig.JSON_PATH}")
+        logger.info(f"   JSON: {CacheConfig.LOG_PATH}")
 
-    def get(self, query: str) -> Optional[List[Dict]]:
+    def get(self, query: str) -> Optional[CacheValue]:
         """
-        Get cached results for query.
+        Get the cached value for query.
         Checks all tiers in order and promotes cache hits to faster tiers.
         """
         self.total_requests += 1
@@ -665,6 +953,14 @@ class SearchCache:
             self.tier_hits["memory"] += 1
             return result
 
+        # Written but not yet flushed to the slower tiers
+        with self._pending_lock:
+            pending = self._pending.get(query)
+        if pending:
+            self.tier_hits["memory"] += 1
+            self.memory.set(query, pending[0])
+            return pending[0]
+
         # Tier 2: Redis
         if self.redis:
             result = self.redis.get(query)
@@ -680,8 +976,7 @@ class SearchCache:
             self.tier_hits["sqlite"] += 1
             # Promote to faster tiers
             self.memory.set(query, result)
-            if self.redis:
-                self.redis.set(query, result)
+            self._queue(query, result, CacheConfig.CACHE_TTL, {"redis"})
             return result
 
         # Tier 4: JSON (fallback)
@@ -690,64 +985,212 @@ class SearchCache:
             self.tier_hits["json"] += 1
             # Promote to faster tiers
             self.memory.set(query, result)
-            if self.redis:
-                self.redis.set(query, result)
-            self.sqlite.set(query, result)
+            self._queue(query, result, CacheConfig.CACHE_TTL, {"redis", "sqlite"})
             return result
 
         # Cache miss
         self.tier_hits["miss"] += 1
         return None
 
-    def set(self, query: str, results: List[Dict], ttl: int = None) -> bool:
+    def set(self, query: str, results: CacheValue, ttl: int = None) -> bool:
         """
-        Store results in ALL cache tiers (write-through).
+        Store a value in memory and queue the write to the slower tiers.
+
+        Args:
+            query: Search query (normalized to lower case)
+            results: JSON-serializable value, e.g. a CategoryMatcher scored record
+            ttl: Seconds to keep it in the persistent tiers
+
+        Returns:
+            False if the value is over MAX_VALUE_BYTES and was not cached
         """
         query = query.lower().strip()
         ttl = ttl or CacheConfig.CACHE_TTL
 
-        # Write to all tiers
+        size = len(json.dumps(results, separators=(',', ':')))
+        if size > CacheConfig.MAX_VALUE_BYTES:
+            logger.warning(
+                f"Search cache value for '{query}' is {size} bytes "
+                f"(limit {CacheConfig.MAX_VALUE_BYTES}), not cached"
+            )
+            return False
+
         self.memory.set(query, results)
+        self._queue(query, results, ttl, {"redis", "sqlite", "json"})
 
-        if self.redis:
-            self.redis.set(query, results, ttl)
+        return True
 
-        self.sqlite.set(query, results, ttl)
-        self.json.set(query, results, ttl)
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
 
-        return True
+    def _queue(self, query: str, results: CacheValue, ttl: int, tiers: set) -> None:
+        with self._pending_lock:
+            queued = self._pending.pop(query, None)
+            if queued:
+                tiers = tiers | queued[2]
+            self._pending[query] = (results, ttl, tiers, 0)
+            full = len(self._pending) >= CacheConfig.WRITE_BEHIND_MAX_PENDING
+
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write queued entries to the slower tiers and flush batched hit stats.
+
+        Entries stay in the pending map (and visible to get()) until every
+        tier they were queued for has been written. A tier write that fails
+        is retried on the next flush, up to WRITE_BEHIND_MAX_ATTEMPTS times.
+
+        Returns:
+            Number of entries fully written
+        """
+        with self._write_lock:
+            with self._pending_lock:
+                batch = list(self._pending.items())
+
+            written: Dict[str, set] = {}
+            redis_up = bool(self.redis and self.redis.client)
+            for query, (results, ttl, tiers, _) in batch:
+                done = written.setdefault(query, set())
+                if "redis" in tiers and (not redis_up or self._write_tier(self.redis, query, results, ttl)):
+                    done.add("redis")   # no Redis configured: nothing to write
+                if "json" in tiers and self._write_tier(self.json, query, results, ttl):
+                    done.add("json")
+
+            # One SQLite transaction for the whole batch (all or nothing)
+            sqlite_batch = [
+                (query, results, ttl)
+                for query, (results, ttl, tiers, _) in batch
+                if "sqlite" in tiers
+            ]
+            if sqlite_batch and self.sqlite.set_many(sqlite_batch) == len(sqlite_batch):
+                for query, _, _ in sqlite_batch:
+                    written[query].add("sqlite")
+
+            completed = self._settle(batch, written)
+
+            if self.redis:
+                self.redis.flush_stats()
+            self.sqlite.flush_stats()
+            self.json.flush()
+            return completed
+
+    @staticmethod
+    def _write_tier(tier, query: str, results: CacheValue, ttl: int) -> bool:
+        try:
+            return bool(tier.set(query, results, ttl))
+        except Exception as e:
+            logger.error(f"Search cache {type(tier).__name__} write failed for '{query}': {e}")
+            return False
+
+    def _settle(self, batch, written: Dict[str, set]) -> int:
+        """Drop written tiers from pending entries; requeue what failed."""
+        completed = 0
+        with self._pending_lock:
+            for query, entry in batch:
+                # Re-set (or deleted) while the batch was being written: the
+                # newer entry carries its own tiers and is left alone
+                if self._pending.get(query) is not entry:
+                    continue
+
+                results, ttl, tiers, attempts = entry
+                remaining = tiers - written[query]
+                if not remaining:
+                    del self._pending[query]
+                    completed += 1
+                elif attempts + 1 >= CacheConfig.WRITE_BEHIND_MAX_ATTEMPTS:
+                    del self._pending[query]
+                    logger.error(
+                        f"Search cache gave up writing '{query}' to {sorted(remaining)} "
+                        f"after {attempts + 1} attempts"
+                    )
+                else:
+                    self._pending[query] = (results, ttl, remaining, attempts + 1)
+        return completed
+
+    def _write_loop(self) -> None:
+        last_cleanup = time.time()
+        while not self._closed:
+            self._wake.wait(CacheConfig.WRITE_BEHIND_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Search cache write-behind failed: {e}")
+
+            if self._closed:
+                break
+            try:
+                if self.json.needs_compaction():
+                    dropped = self.json.compact()
+                    logger.info(f"JSON cache compacted: {dropped} lines dropped")
+            except Exception as e:
+                logger.error(f"JSON cache compaction failed: {e}")
+
+            if time.time() - last_cleanup >= CacheConfig.CLEANUP_INTERVAL:
+                last_cleanup = time.time()
+                deleted = self.sqlite.cleanup_expired()
+                if deleted:
+                    logger.info(f"SQLite cache cleanup: {deleted} expired entries removed")
+
+    def close(self) -> None:
+        """Stop the writer and flush everything still queued."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._writer is not threading.current_thread():
+            self._writer.join(timeout=5)
+        self.flush()
+        self.sqlite.close()
+        self.json.close()
 
     def delete(self, query: str) -> bool:
         """Delete from all cache tiers."""
         query = query.lower().strip()
 
-        # Could use memory._remove but this is cleaner
-        self.memory.cache.pop(query, None)
-        self.memory.timestamps.pop(query, None)
+        # Every tier is cleared under the write lock, so an in-flight batch
+        # can't write the entry back to a tier that was already cleared
+        with self._write_lock:
+            with self._pending_lock:
+                self._pending.pop(query, None)
 
-        if self.redis:
-            self.redis.delete(query)
+            with self.memory.lock:
+                self.memory._remove(query)
+
+            if self.redis:
+                self.redis.delete(query)
 
-        self.sqlite.delete(query)
-        self.json.delete(query)
+            self.sqlite.delete(query)
+            self.json.delete(query)
 
         return True
 
     def clear(self) -> Dict[str, int]:
         """Clear all cache tiers."""
-        return {
-            "memory": self.memory.clear(),
-            "redis": self.redis.clear() if self.redis else 0,
-            "sqlite": self.sqlite.clear(),
-            "json": self.json.clear()
-        }
+        with self._write_lock:
+            with self._pending_lock:
+                self._pending.clear()
+
+            return {
+                "memory": self.memory.clear(),
+                "redis": self.redis.clear() if self.redis else 0,
+                "sqlite": self.sqlite.clear(),
+                "json": self.json.clear()
+            }
 
     def stats(self) -> Dict:
         """Get comprehensive cache statistics."""
         total = self.total_requests or 1
 
+        with self._pending_lock:
+            pending_writes = len(self._pending)
+
         return {
             "total_requests": self.total_requests,
+            "pending_writes": pending_writes,
             "hit_rate": 1 - (self.tier_hits["miss"] / total),
             "tier_hits": self.tier_hits,
             "tier_hit_rates": {
@@ -790,7 +1233,7 @@ class SearchCache:
         """Cleanup expired entries in persistent stores."""
         return {
             "sqlite": self.sqlite.cleanup_expired(),
-            # JSON cleanup happens on read
+            "json": self.json.compact()
         }
 
 
@@ -805,13 +1248,13 @@ class AsyncSearchCache:
         self._cache = SearchCache()
         self._lock = asyncio.Lock()
 
-    async def get(self, query: str) -> Optional[List[Dict]]:
+    async def get(self, query: str) -> Optional[CacheValue]:
         """Async get from cache."""
         # Run sync cache in thread pool
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self._cache.get, query)
 
-    async def set(self, query: str, results: List[Dict], ttl: int = None) -> bool:
+    async def set(self, query: str, results: CacheValue, ttl: int = None) -> bool:
         """Async set in cache."""
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self._cache.set, query, results, ttl)
@@ -869,6 +1312,7 @@ if __name__ == "__main__":
     ]
 
     cache.set("hungry", test_results)
+    cache.flush()
     result = cache.get("hungry")
 
     if result == test_results:
@@ -4,14 +4,23 @@ Uses sentence transformers to match user queries to categories
 Loads models through the central model_registry
 
 CACHE-FIRST ARCHITECTURE:
-1. Check cache for existing results (fastest)
-2. If cache miss, query the model
-3. Store results in cache for future queries
+1. Check cache for the query's scores (fastest)
+2. If cache miss, reuse the scores of a near-duplicate query (near_duplicate)
+3. Otherwise query the model
+4. Store the scores in cache for future queries
+
+Cached entries hold the raw scores (keyword hits + similarity to every
+category), not a filtered list, so top_k and threshold are applied at read
+time and one entry serves every (top_k, threshold) combination. The
+similarity vector is stored as base64 float32 (about 5 bytes per category
+instead of ~20 for a JSON float list) to stay within the cache's value budget.
 """
 
 import os
 import sys
 import json
+import base64
+import hashlib
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
@@ -38,12 +47,24 @@ except ImportError:
 
 # Try to import sentence transformers
 try:
-    from sentence_transformers import SentenceTransformer, util
+    from sentence_transformers import SentenceTransformer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     print("Warning: sentence-transformers not installed. Using fallback matching.")
 
+# Import keyword index
+try:
+    from .keyword_index import KeywordIndex
+except ImportError:
+    from keyword_index import KeywordIndex
+
+# Import near-duplicate index
+try:
+    from .near_duplicate import NearDuplicateIndex
+except ImportError:
+    from near_duplicate import NearDuplicateIndex
+
 # Import cache
 try:
     from .cache import SearchCache, get_cache
@@ -82,10 +103,17 @@ class CategoryMatcher:
 
         # Cache stats
         self.cache_hits = 0
+        self.near_hits = 0
         self.cache_misses = 0
+        self.near_duplicates = NearDuplicateIndex()
+        self._fingerprint = ""
         self.model = None
         self.categories: Dict[str, Dict] = {}
-        self.category_embeddings: Dict[str, np.ndarray] = {}
+        self.category_slugs: List[str] = []
+        self.category_names: List[str] = []
+        self._slug_index: Dict[str, int] = {}
+        self.embedding_matrix: Optional[np.ndarray] = None  # (categories, dim), rows L2-normalized
+        self.keyword_index = KeywordIndex()
         self.is_loaded = False
 
         # Default category definitions with multilingual descriptions and keywords
@@ -497,30 +525,136 @@ class CategoryMatcher:
             categories: Dict mapping category slugs to category info
                        e.g., {"food": {"name": "Food", "description": "..."}}
         """
-        self.categories = categories
+        self.categories = dict(categories)
+        self._index_categories()
         self._compute_embeddings()
+        self._categories_changed()
 
     def load_default_categories(self) -> None:
         """Load default category definitions."""
-        self.categories = self.default_categories
+        self.categories = dict(self.default_categories)
+        self._index_categories()
         self._compute_embeddings()
+        self._categories_changed()
+
+    def add_category(self, slug: str, info: Dict) -> None:
+        """
+        Add (or replace) one category without re-embedding the others.
+
+        Args:
+            slug: Category slug
+            info: {"name": ..., "description": ..., "keywords": [...]}
+        """
+        if slug in self.categories:
+            # Keywords may have been removed; rebuild from scratch
+            self.categories[slug] = info
+            self._index_categories()
+            self._compute_embeddings()
+            self._categories_changed()
+            return
+
+        self.categories[slug] = info
+        self._slug_index[slug] = len(self.category_slugs)
+        self.category_slugs.append(slug)
+        self.category_names.append(info.get("name", slug))
+        self.keyword_index.add(slug, info)
+
+        if self.embedding_matrix is not None:
+            row = self._normalize(self.model.encode([self._embedding_text(slug, info)], convert_to_numpy=True))
+            self.embedding_matrix = np.ascontiguousarray(np.vstack([self.embedding_matrix, row]))
+
+        self._categories_changed()
+
+    def _categories_changed(self) -> None:
+        """
+        New cache namespace for the current categories + model. Cached score
+        vectors are indexed by category slot, so they only apply to the set
+        they were computed against.
+        """
+        digest = hashlib.sha1(self.model_name.encode("utf-8"))
+        for slug in self.category_slugs:
+            digest.update(b"\0" + slug.encode("utf-8") + b"\0")
+            digest.update(self._embedding_text(slug, self.categories[slug]).encode("utf-8"))
+        self._fingerprint = digest.hexdigest()[:12]
+        self.near_duplicates.clear()
+
+    def _index_categories(self) -> None:
+        """Slug/name arrays and the keyword index for the current categories"""
+        self.category_slugs = list(self.categories)
+        self.category_names = [self.categories[slug].get("name", slug) for slug in self.category_slugs]
+        self._slug_index = {slug: i for i, slug in enumerate(self.category_slugs)}
+        self.keyword_index = KeywordIndex.build(self.categories)
+
+    @staticmethod
+    def _embedding_text(slug: str, info: Dict) -> str:
+        """Rich text representation of a category for embedding"""
+        text_parts = [info.get("name", slug)]
+        if "description" in info:
+            text_parts.append(info["description"])
+        if "keywords" in info:
+            text_parts.append(" ".join(info["keywords"]))
+        return " ".join(text_parts)
 
     def _compute_embeddings(self) -> None:
-        """Compute embeddings for all categories."""
-        if not self.model or not SENTENCE_TRANSFORMERS_AVAILABLE:
+        """
+        Embed all categories in one batch into a (categories, dim) float32
+        matrix with L2-normalized rows, so cosine similarity is a dot product.
+        """
+        self.embedding_matrix = None
+
+        if not self.model or not SENTENCE_TRANSFORMERS_AVAILABLE or not self.category_slugs:
             return
 
-        for slug, info in self.categories.items():
-            # Create rich text representation for embedding
-            text_parts = [info.get("name", slug)]
-            if "description" in info:
-                text_parts.append(info["description"])
-            if "keywords" in info:
-                text_parts.append(" ".join(info["keywords"]))
+        texts = [self._embedding_text(slug, self.categories[slug]) for slug in self.category_slugs]
+        self.embedding_matrix = self._normalize(self.model.encode(texts, convert_to_numpy=True))
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Contiguous float32 copy with unit-length rows"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @property
+    def category_embeddings(self) -> Dict[str, np.ndarray]:
+        """slug -> normalized embedding (rows of embedding_matrix)"""
+        if self.embedding_matrix is None:
+            return {}
+        return dict(zip(self.category_slugs, self.embedding_matrix))
+
+    def _semantic_scores(self, queries: List[str]) -> Optional[np.ndarray]:
+        """
+        Cosine similarity of each query to each category: (queries, categories).
+        One encode call for the batch and one matmul; None without a model.
+        """
+        if self.embedding_matrix is None or not self.model or not queries:
+            return None
+        query_matrix = self._normalize(self.model.encode(queries, convert_to_numpy=True))
+        return query_matrix @ self.embedding_matrix.T
+
+    @staticmethod
+    def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def _ensure_loaded(self) -> None:
+        if not self.is_loaded:
+            self.load_model()
+            self.load_default_categories()
 
-            combined_text = " ".join(text_parts)
-            embedding = self.model.encode(combined_text, convert_to_numpy=True)
-            self.category_embeddings[slug] = embedding
+    def _cache_key(self, query: str) -> str:
+        mode = "s" if self.embedding_matrix is not None else "k"
+        return f"scores|{self._fingerprint}{mode}|{query}"
 
     def match(self, query: str, top_k: int = 3, threshold: float = 0.3) -> List[Dict]:
         """
@@ -528,11 +662,12 @@ class CategoryMatcher:
 
         Flow:
         1. CHECK CACHE FIRST (fastest path)
-        2. If cache miss, use hybrid matching:
+        2. Near-duplicate query already scored: reuse its semantic scores
+        3. Otherwise use hybrid matching:
            a. Check exact keyword matches (highest priority)
            b. Use semantic similarity
            c. Combine scores for best results
-        3. Store results in cache for future queries
+        4. Store the scores in cache for future queries
 
         Args:
             query: User's search query
@@ -542,109 +677,209 @@ class CategoryMatcher:
         Returns:
             List of matching categories with scores
         """
-        if not self.is_loaded:
-            self.load_model()
-            self.load_default_categories()
+        return self.match_many([query], top_k, threshold)[0]
 
-        query = query.strip().lower()
-        if not query:
-            return []
+    def match_many(self, queries: List[str], top_k: int = 3, threshold: float = 0.3) -> List[List[Dict]]:
+        """
+        Match several queries at once.
 
-        # ==========================================
-        # STEP 1: CHECK CACHE FIRST (fastest path)
-        # ==========================================
-        if self.use_cache and self.cache:
-            # Create cache key with parameters
-            cache_key = f"{query}|k{top_k}|t{threshold}"
-            cached_result = self.cache.get(cache_key)
+        Cache misses are encoded in a single batch and scored against every
+        category with one (queries x dim) @ (dim x categories) matmul.
+
+        Args:
+            queries: User search queries
+            top_k: Number of top matches per query
+            threshold: Minimum similarity score (0-1)
+
+        Returns:
+            One result list per query, in input order
+        """
+        self._ensure_loaded()
+
+        normalized = [" ".join((query or "").lower().split()) for query in queries]
+        results: List[Optional[List[Dict]]] = [None] * len(normalized)
+        misses: Dict[str, List[int]] = {}
+        use_near = self.embedding_matrix is not None
+
+        for i, query in enumerate(normalized):
+            if not query:
+                results[i] = []
+                continue
+
+            # ==========================================
+            # STEP 1: CHECK CACHE FIRST (fastest path)
+            # ==========================================
+            if self.use_cache and self.cache:
+                scored = self.cache.get(self._cache_key(query))
+                if scored:
+                    self.cache_hits += 1
+                    results[i] = self._rank_scored(scored, top_k, threshold)
+                    if use_near and query not in self.near_duplicates:
+                        self.near_duplicates.add(query, self._unpack_scores(scored["semantic"]))
+                    continue
+
+            # ==========================================
+            # STEP 2: NEAR-DUPLICATE of a scored query
+            # ==========================================
+            if use_near and query not in misses:
+                near = self.near_duplicates.lookup(query)
+                if near is not None:
+                    # Keyword hits are recomputed for this exact query
+                    self.near_hits += 1
+                    results[i] = self._rank_scored(self._score_query(query, near[1]), top_k, threshold)
+                    continue
+
+            self.cache_misses += 1
+            misses.setdefault(query, []).append(i)
+
+        if misses:
+            # ==========================================
+            # STEP 3: CACHE MISS - Query the model (one batch)
+            # ==========================================
+            miss_queries = list(misses)
+            scores = self._semantic_scores(miss_queries)
+
+            for row, query in enumerate(miss_queries):
+                semantic_scores = scores[row] if scores is not None else None
+                scored = self._score_query(query, semantic_scores)
+                matched = self._rank_scored(scored, top_k, threshold)
+
+                # ==========================================
+                # STEP 4: Store scores in cache
+                # ==========================================
+                if self.use_cache and self.cache:
+                    self.cache.set(self._cache_key(query), scored)
+                if semantic_scores is not None:
+                    self.near_duplicates.add(query, semantic_scores.copy())
+
+                for i in misses[query]:
+                    results[i] = matched
+
+        return results
+
+    def _in_category_order(self, slugs) -> List[str]:
+        return sorted(slugs, key=self._slug_index.__getitem__)
 
-            if cached_result:
-                self.cache_hits += 1
-                # Return cached results (already filtered by top_k and threshold)
-                return cached_result
+    def _keyword_candidates(self, query_normalized: str) -> Dict[str, Dict]:
+        """Exact / partial keyword hits for the hybrid matcher (index lookups)"""
+        results = {}
 
-        self.cache_misses += 1
+        # Exact match in keywords
+        exact = self.keyword_index.exact_keyword(query_normalized)
 
-        # ==========================================
-        # STEP 2: CACHE MISS - Query the model
-        # ==========================================
-        results = self._hybrid_match(query, top_k, threshold)
+        # Partial keyword match (keyword inside the query, or query inside a keyword)
+        partial = set()
+        if len(query_normalized) >= 3:
+            partial = self.keyword_index.partial_keyword(query_normalized) - exact
 
-        # ==========================================
-        # STEP 3: Store results in cache
-        # ==========================================
-        if self.use_cache and self.cache and results:
-            cache_key = f"{query}|k{top_k}|t{threshold}"
-            self.cache.set(cache_key, results)
+        for slug in self._in_category_order(exact | partial):
+            results[slug] = {
+                "slug": slug,
+                "name": self.categories[slug].get("name", slug),
+                "score": 0.98 if slug in exact else 0.7,  # Very high score for exact match
+                "match_type": "exact_keyword" if slug in exact else "partial_keyword"
+            }
 
         return results
 
-    def _hybrid_match(self, query: str, top_k: int, threshold: float) -> List[Dict]:
+    def _hybrid_match(self, query: str, top_k: int, threshold: float,
+                      semantic_scores: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Hybrid matching combining exact keywords + semantic similarity.
         This achieves 0.95+ accuracy by catching exact matches that semantic might miss.
+
+        Args:
+            semantic_scores: Precomputed similarities to every category (from
+                             a match_many batch); computed here if omitted
         """
-        results = {}
         query_normalized = query.strip().lower()
 
-        # Step 1: Check for EXACT keyword matches (highest priority - score boost)
-        for slug, info in self.categories.items():
-            keywords = [kw.lower() for kw in info.get("keywords", [])]
+        if semantic_scores is None:
+            scores = self._semantic_scores([query_normalized])
+            semantic_scores = scores[0] if scores is not None else None
 
-            # Exact match in keywords
-            if query_normalized in keywords:
-                results[slug] = {
-                    "slug": slug,
-                    "name": info.get("name", slug),
-                    "score": 0.98,  # Very high score for exact match
-                    "match_type": "exact_keyword"
-                }
-                continue
+        return self._rank_scored(self._score_query(query_normalized, semantic_scores), top_k, threshold)
 
-            # Partial keyword match
-            for kw in keywords:
-                if query_normalized == kw or kw == query_normalized:
-                    results[slug] = {
-                        "slug": slug,
-                        "name": info.get("name", slug),
-                        "score": 0.95,
-                        "match_type": "keyword"
-                    }
-                    break
-                elif len(query_normalized) >= 3 and (query_normalized in kw or kw in query_normalized):
-                    if slug not in results or results[slug]["score"] < 0.7:
-                        results[slug] = {
-                            "slug": slug,
-                            "name": info.get("name", slug),
-                            "score": 0.7,
-                            "match_type": "partial_keyword"
-                        }
+    def _score_query(self, query_normalized: str, semantic_scores: Optional[np.ndarray]) -> Dict:
+        """
+        Everything about a query's match that doesn't depend on top_k or
+        threshold (JSON-serializable, this is what the cache stores):
+
+            keyword:  {slug: [score, match_type]} exact/partial keyword hits,
+                      already boosted by semantic similarity
+            semantic: similarity to every category (by slot) as base64
+                      float32 (see _pack_scores), or None
+            fallback: {slug: score} pure keyword scores, only when there
+                      are no keyword hits
+        """
+        # Step 1: Check for EXACT keyword matches (highest priority - score boost)
+        keyword = {
+            slug: [result["score"], result["match_type"]]
+            for slug, result in self._keyword_candidates(query_normalized).items()
+        }
 
         # Step 2: Semantic matching (if model available)
-        if self.model and SENTENCE_TRANSFORMERS_AVAILABLE and self.category_embeddings:
-            query_embedding = self.model.encode(query_normalized, convert_to_numpy=True)
-
-            for slug, cat_embedding in self.category_embeddings.items():
-                similarity = float(util.cos_sim(query_embedding, cat_embedding)[0][0])
-
-                if slug in results:
-                    # Boost existing keyword matches with semantic score
-                    # Take the higher of keyword score or semantic * 1.2
-                    boosted_semantic = min(0.99, similarity * 1.2)
-                    if boosted_semantic > results[slug]["score"]:
-                        results[slug]["score"] = round(boosted_semantic, 4)
-                        results[slug]["match_type"] = "hybrid"
-                elif similarity >= threshold:
+        if semantic_scores is not None:
+            # Boost existing keyword matches with semantic score
+            # Take the higher of keyword score or semantic * 1.2
+            for slug, hit in keyword.items():
+                similarity = float(semantic_scores[self._slug_index[slug]])
+                boosted_semantic = min(0.99, similarity * 1.2)
+                if boosted_semantic > hit[0]:
+                    hit[0] = round(boosted_semantic, 4)
+                    hit[1] = "hybrid"
+
+        return {
+            "keyword": keyword,
+            "semantic": self._pack_scores(semantic_scores) if semantic_scores is not None else None,
+            # Step 3 input: only consulted when nothing else qualifies
+            "fallback": None if keyword else self._keyword_scores(query_normalized)
+        }
+
+    @staticmethod
+    def _pack_scores(scores: np.ndarray) -> str:
+        """Similarity vector -> base64 of its float32 bytes (lossless at the precision ranked)"""
+        return base64.b64encode(np.asarray(scores, dtype="<f4").tobytes()).decode("ascii")
+
+    @staticmethod
+    def _unpack_scores(packed) -> np.ndarray:
+        """Inverse of _pack_scores; also reads entries cached as a float list"""
+        if isinstance(packed, str):
+            return np.frombuffer(base64.b64decode(packed), dtype="<f4").astype(np.float32)
+        return np.asarray(packed, dtype=np.float32)
+
+    def _rank_scored(self, scored: Dict, top_k: int, threshold: float) -> List[Dict]:
+        """Apply top_k / threshold to a _score_query() result"""
+        results = {
+            slug: {
+                "slug": slug,
+                "name": self.categories[slug].get("name", slug),
+                "score": score,
+                "match_type": match_type
+            }
+            for slug, (score, match_type) in scored["keyword"].items()
+        }
+
+        if scored["semantic"] is not None:
+            semantic_scores = self._unpack_scores(scored["semantic"])
+
+            # Only the best top_k (+ slots keyword hits may take) can make the cut
+            for i in self._top_indices(semantic_scores, top_k + len(results)):
+                similarity = float(semantic_scores[i])
+                if similarity < threshold:
+                    break
+                slug = self.category_slugs[i]
+                if slug not in results:
                     results[slug] = {
                         "slug": slug,
-                        "name": self.categories[slug].get("name", slug),
+                        "name": self.category_names[i],
                         "score": round(similarity, 4),
                         "match_type": "semantic"
                     }
 
         # Step 3: If no results yet, fall back to pure keyword matching
         if not results:
-            return self._keyword_match(query_normalized, top_k, threshold)
+            return self._rank_keyword_scores(scored["fallback"] or {}, top_k, threshold)
 
         # Sort by score descending
         sorted_results = sorted(results.values(), key=lambda x: x["score"], reverse=True)
@@ -652,57 +887,64 @@ class CategoryMatcher:
 
     def _semantic_match(self, query: str, top_k: int, threshold: float) -> List[Dict]:
         """Perform semantic similarity matching."""
-        query_embedding = self.model.encode(query, convert_to_numpy=True)
+        scores = self._semantic_scores([query])
+        if scores is None:
+            return []
+        scores = scores[0]
 
         results = []
-        for slug, cat_embedding in self.category_embeddings.items():
-            similarity = float(util.cos_sim(query_embedding, cat_embedding)[0][0])
-
-            if similarity >= threshold:
-                results.append({
-                    "slug": slug,
-                    "name": self.categories[slug].get("name", slug),
-                    "score": round(similarity, 4),
-                    "match_type": "semantic"
-                })
-
-        # Sort by score descending
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
+        for i in self._top_indices(scores, top_k):
+            similarity = float(scores[i])
+            if similarity < threshold:
+                break
+            results.append({
+                "slug": self.category_slugs[i],
+                "name": self.category_names[i],
+                "score": round(similarity, 4),
+                "match_type": "semantic"
+            })
+        return results
 
     def _keyword_match(self, query: str, top_k: int, threshold: float) -> List[Dict]:
         """Fallback keyword-based matching."""
-        results = []
-        query_words = set(query.split())
-
-        for slug, info in self.categories.items():
-            score = 0.0
-
-            # Check category name
-            name = info.get("name", slug).lower()
-            if query in name or name in query:
-                score = max(score, 0.9)
-
-            # Check keywords
-            keywords = info.get("keywords", [])
-            for keyword in keywords:
-                keyword = keyword.lower()
-                if query == keyword:
-                    score = max(score, 0.95)
-                elif query in keyword or keyword in query:
-                    score = max(score, 0.7)
-                elif any(word in keyword or keyword in word for word in query_words):
-                    score = max(score, 0.5)
-
-            # Check description
-            description = info.get("description", "").lower()
-            if query in description:
-                score = max(score, 0.6)
+        return self._rank_keyword_scores(self._keyword_scores(query), top_k, threshold)
+
+    def _keyword_scores(self, query: str) -> Dict[str, float]:
+        """Best keyword-match score per matching category"""
+        index = self.keyword_index
+        scores: Dict[str, float] = {}
+
+        def bump(slugs, score):
+            for slug in slugs:
+                if scores.get(slug, 0.0) < score:
+                    scores[slug] = score
+
+        # Check category name
+        bump(index.name_match(query), 0.9)
+
+        # Check keywords
+        bump(index.exact_keyword(query), 0.95)
+        bump(index.partial_keyword(query), 0.7)
+        for word in set(query.split()):
+            bump(index.partial_keyword(word), 0.5)
+
+        # Check description
+        bump(index.description_match(query), 0.6)
 
+        return scores
+
+    def _rank_keyword_scores(self, scores: Dict[str, float], top_k: int, threshold: float) -> List[Dict]:
+        """Apply top_k / threshold to _keyword_scores() output"""
+        # Unmatched categories score 0, so they only qualify at threshold <= 0
+        candidates = self.category_slugs if threshold <= 0 else self._in_category_order(scores)
+
+        results = []
+        for slug in candidates:
+            score = scores.get(slug, 0.0)
             if score >= threshold:
                 results.append({
                     "slug": slug,
-                    "name": info.get("name", slug),
+                    "name": self.categories[slug].get("name", slug),
                     "score": round(score, 4),
                     "match_type": "keyword"
                 })
@@ -722,8 +964,12 @@ class CategoryMatcher:
         stats = {
             "cache_enabled": self.use_cache,
             "matcher_cache_hits": self.cache_hits,
+            "matcher_near_hits": self.near_hits,
             "matcher_cache_misses": self.cache_misses,
-            "matcher_hit_rate": self.cache_hits / max(1, self.cache_hits + self.cache_misses)
+            "matcher_hit_rate": (self.cache_hits + self.near_hits) / max(
+                1, self.cache_hits + self.near_hits + self.cache_misses
+            ),
+            "near_duplicates": self.near_duplicates.stats()
         }
 
         if self.use_cache and self.cache:
@@ -739,8 +985,11 @@ class CategoryMatcher:
             result = self.cache.clear()
             result["cleared"] = True
 
+        self.near_duplicates.clear()
+
         # Reset local stats
         self.cache_hits = 0
+        self.near_hits = 0
         self.cache_misses = 0
 
         return result
@@ -778,7 +1027,11 @@ class CategoryMatcher:
                 "furniture", "sofa", "pet", "dog", "cat"
             ]
 
-        return self.cache.warmup(queries, lambda q: self._hybrid_match(q, 3, 0.3))
+        misses = self.cache_misses
+        self.match_many(queries)
+        cached = self.cache_misses - misses
+        print(f"Cache warmup complete: {cached}/{len(queries)} queries scored")
+        return cached
 
 
 # Singleton instance for reuse
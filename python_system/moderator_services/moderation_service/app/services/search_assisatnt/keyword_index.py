@@ -0,0 +1,148 @@
+"""
+Keyword Index - precompiled lookups for CategoryMatcher keyword scoring
+
+Built once per category set (set_categories / load_default_categories /
+add_category) so a query never re-lowercases or rescans every keyword:
+
+1. Exact-term hash map:       keyword -> categories
+2. Prefix trie:               keywords that occur inside the query
+                              (walk from each query position)
+3. N-gram inverted postings:  keywords / names / descriptions that contain
+                              the query (intersect the query's n-gram
+                              postings, then verify the few candidates)
+
+Lookups cost O(len(query) * longest keyword) for the trie and the size of
+the rarest n-gram's posting list for containment, independent of how many
+categories or keywords exist.
+"""
+
+from typing import Dict, Iterable, List, Set
+
+GRAM_SIZE = 3
+_END = "\0"
+
+
+class SubstringIndex:
+    """
+    Strings (each owned by one or more category slugs) indexed for
+    exact, "string in query" and "query in string" lookups.
+    """
+
+    def __init__(self, with_trie: bool = True, gram_size: int = GRAM_SIZE):
+        self.with_trie = with_trie
+        self.gram_size = gram_size
+        self.strings: List[str] = []
+        self.owners: List[Set[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._trie: Dict = {}
+        self._grams: Dict[str, Set[int]] = {}
+
+    def add(self, string: str, owner: str) -> None:
+        string = string.lower()
+        if not string:
+            return
+
+        string_id = self._ids.get(string)
+        if string_id is not None:
+            self.owners[string_id].add(owner)
+            return
+
+        string_id = len(self.strings)
+        self._ids[string] = string_id
+        self.strings.append(string)
+        self.owners.append({owner})
+
+        if self.with_trie:
+            node = self._trie
+            for char in string:
+                node = node.setdefault(char, {})
+            node[_END] = string_id
+
+        # All grams up to gram_size, so short queries are answered exactly too
+        for size in range(1, self.gram_size + 1):
+            for start in range(len(string) - size + 1):
+                self._grams.setdefault(string[start:start + size], set()).add(string_id)
+
+    def exact(self, query: str) -> Set[str]:
+        """Owners of strings equal to the query"""
+        string_id = self._ids.get(query)
+        return self.owners[string_id] if string_id is not None else set()
+
+    def within(self, query: str) -> Set[int]:
+        """Ids of strings that occur somewhere inside the query"""
+        found: Set[int] = set()
+        for start in range(len(query)):
+            node = self._trie
+            for char in query[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                string_id = node.get(_END)
+                if string_id is not None:
+                    found.add(string_id)
+        return found
+
+    def containing(self, query: str) -> Set[int]:
+        """Ids of strings that contain the query"""
+        if len(query) <= self.gram_size:
+            return set(self._grams.get(query, ()))
+
+        postings = []
+        for start in range(len(query) - self.gram_size + 1):
+            posting = self._grams.get(query[start:start + self.gram_size])
+            if not posting:
+                return set()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+        # N-grams can all match without being contiguous; confirm
+        return {string_id for string_id in candidates if query in self.strings[string_id]}
+
+    def owners_of(self, string_ids: Iterable[int]) -> Set[str]:
+        owners: Set[str] = set()
+        for string_id in string_ids:
+            owners |= self.owners[string_id]
+        return owners
+
+
+class KeywordIndex:
+    """Keyword, name and description indexes for one category set"""
+
+    def __init__(self):
+        self.keywords = SubstringIndex()
+        self.names = SubstringIndex()
+        self.descriptions = SubstringIndex(with_trie=False)
+
+    @classmethod
+    def build(cls, categories: Dict[str, Dict]) -> "KeywordIndex":
+        index = cls()
+        for slug, info in categories.items():
+            index.add(slug, info)
+        return index
+
+    def add(self, slug: str, info: Dict) -> None:
+        for keyword in info.get("keywords", []):
+            self.keywords.add(keyword, slug)
+        self.names.add(info.get("name", slug), slug)
+        self.descriptions.add(info.get("description", ""), slug)
+
+    def exact_keyword(self, query: str) -> Set[str]:
+        """Categories with a keyword equal to the query"""
+        return self.keywords.exact(query)
+
+    def partial_keyword(self, query: str) -> Set[str]:
+        """Categories with a keyword inside the query or containing it"""
+        return self.keywords.owners_of(self.keywords.within(query) | self.keywords.containing(query))
+
+    def name_match(self, query: str) -> Set[str]:
+        """Categories whose name is inside the query or contains it"""
+        return self.names.owners_of(self.names.within(query) | self.names.containing(query))
+
+    def description_match(self, query: str) -> Set[str]:
+        """Categories whose description contains the query"""
+        return self.descriptions.owners_of(self.descriptions.containing(query))
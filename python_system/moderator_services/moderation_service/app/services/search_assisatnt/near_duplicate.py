@@ -0,0 +1,175 @@
+"""
+Near-Duplicate Index - approximate cache tier for CategoryMatcher
+
+Most search traffic is paraphrases of a few thousand intents ("cheap laptop",
+"cheap laptops", "laptop cheap"). Every query the model has scored is kept
+here as (lexical embedding -> semantic score vector). A new query whose
+embedding lies within a cosine radius of a cached one reuses that score
+vector instead of running the sentence transformer.
+
+The lookup embedding is a hashed bag of character trigrams plus a weighted
+stem (first few characters) per token: word order independent, tolerant of
+plural and inflection suffixes, and far cheaper than the transformer encode
+this tier exists to skip. The stem weight keeps an extra word ("cheap laptop
+bag") outside the radius while a changed suffix ("cheap laptops") is inside.
+
+The radius alone is not enough for long queries: one changed word moves the
+cosine less the more words surround it ("best place to find a job in nairobi
+city centre" vs "... a sedan in ..." scores above 0.9). So a cached entry is
+only reused when its sorted token stems equal the query's - a reordering or a
+suffix change, never a different word.
+
+Entries live in a fixed-capacity float32 matrix, so a lookup is one
+matrix-vector product; when full, the least recently used entry's row is
+reused.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import threading
+import zlib
+
+import numpy as np
+
+EMBEDDING_DIM = 512
+GRAM_SIZE = 3
+STEM_LENGTH = 5
+STEM_WEIGHT = 2.0
+DEFAULT_RADIUS = 0.9       # minimum cosine similarity to reuse an entry
+DEFAULT_CAPACITY = 4096
+
+
+def token_stem(token: str) -> str:
+    """Leading characters of a token, with a plural "s" dropped first"""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        token = token[:-1]
+    return token[:STEM_LENGTH]
+
+
+def stem_key(query: str) -> Tuple[str, ...]:
+    """Sorted token stems: equal for reorderings and suffix changes only"""
+    return tuple(sorted(token_stem(token) for token in query.split()))
+
+
+def lexical_embedding(query: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Unit-length hashed trigram + stem counts of the query's tokens"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in query.split():
+        stem = "#" + token_stem(token)
+        vector[zlib.crc32(stem.encode("utf-8")) % dim] += STEM_WEIGHT
+
+        padded = f"<{token}>"
+        for start in range(max(1, len(padded) - GRAM_SIZE + 1)):
+            gram = padded[start:start + GRAM_SIZE]
+            vector[zlib.crc32(gram.encode("utf-8")) % dim] += 1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class NearDuplicateIndex:
+    """
+    LRU-bounded query -> payload map searchable by cosine radius.
+
+    Usage:
+        index = NearDuplicateIndex()
+        index.add("cheap laptop", scores)
+        hit = index.lookup("laptop cheap")   # ("cheap laptop", scores, 1.0)
+    """
+
+    def __init__(self, radius: float = DEFAULT_RADIUS, capacity: int = DEFAULT_CAPACITY,
+                 dim: int = EMBEDDING_DIM):
+        self.radius = radius
+        self.capacity = capacity
+        self.dim = dim
+
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._keys: List[Optional[str]] = [None] * capacity
+        self._stems: List[Optional[Tuple[str, ...]]] = [None] * capacity
+        self._payloads: List[Optional[np.ndarray]] = [None] * capacity
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._used = 0     # rows [0, _used) have been handed out at least once
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, query: str) -> bool:
+        return query in self._slots
+
+    def add(self, query: str, payload: np.ndarray) -> None:
+        """Store (or refresh) a query's payload, evicting the LRU entry when full"""
+        vector = lexical_embedding(query, self.dim)
+        if not vector.any():
+            return
+
+        with self._lock:
+            slot = self._slots.get(query)
+            if slot is not None:
+                self._slots.move_to_end(query)
+            elif self._used < self.capacity:
+                slot = self._used
+                self._used += 1
+            else:
+                _, slot = self._slots.popitem(last=False)
+
+            self._slots[query] = slot
+            self._matrix[slot] = vector
+            self._keys[slot] = query
+            self._stems[slot] = stem_key(query)
+            self._payloads[slot] = payload
+
+    def lookup(self, query: str) -> Optional[Tuple[str, np.ndarray, float]]:
+        """
+        Nearest cached query within the radius with the same token stems.
+
+        Returns:
+            (cached query, its payload, cosine similarity), or None
+        """
+        vector = lexical_embedding(query, self.dim)
+        stems = stem_key(query)
+
+        with self._lock:
+            if not self._used or not vector.any():
+                self.misses += 1
+                return None
+
+            similarities = self._matrix[:self._used] @ vector
+            candidates = np.flatnonzero(similarities >= self.radius)
+            candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+            best = next((int(slot) for slot in candidates if self._stems[slot] == stems), None)
+            if best is None:
+                self.misses += 1
+                return None
+
+            similarity = float(similarities[best])
+            key = self._keys[best]
+            self._slots.move_to_end(key)
+            self.hits += 1
+            return key, self._payloads[best], similarity
+
+    def clear(self) -> int:
+        """Drop every entry (the category set or model changed)"""
+        with self._lock:
+            count = len(self._slots)
+            self._matrix[:self._used] = 0
+            self._keys = [None] * self.capacity
+            self._stems = [None] * self.capacity
+            self._payloads = [None] * self.capacity
+            self._slots.clear()
+            self._used = 0
+            return count
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._slots),
+                "capacity": self.capacity,
+                "radius": self.radius,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0
+            }
@@ -9,7 +9,7 @@ Models are loaded through the model_registry for centralized management.
 
 import sys
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 # Set up paths for model_registry imports
 # Path: text/classifiers.py -> text -> services -> app -> moderation_service -> moderator_services
@@ -116,6 +116,39 @@ class IntentClassifier:
             print(f"⚠ Intent classification error: {e}")
             return "legitimate_product_or_service", 0.5, {}
 
+    def classify_batch(
+        self, texts: List[str], batch_size: int = 8
+    ) -> List[Tuple[str, float, Dict[str, float]]]:
+        """Classify intent of several texts through one batched pipeline call"""
+        default = ("legitimate_product_or_service", 0.5, {})
+        results = [default] * len(texts)
+
+        positions = [i for i, text in enumerate(texts) if text]
+        if not self.classifier or not positions:
+            return results
+
+        try:
+            outputs = self.classifier(
+                [texts[i] for i in positions],
+                candidate_labels=self.INTENTS,
+                multi_label=False,
+                batch_size=batch_size
+            )
+            if isinstance(outputs, dict):
+                outputs = [outputs]
+
+            for i, result in zip(positions, outputs):
+                results[i] = (
+                    result['labels'][0],
+                    result['scores'][0],
+                    dict(zip(result['labels'], result['scores']))
+                )
+
+        except Exception as e:
+            print(f"⚠ Batch intent classification error: {e}")
+
+        return results
+
 
 class ContextClassifier:
     """
@@ -222,6 +255,61 @@ class ContextClassifier:
 
         return scores
 
+    def classify_batch(self, texts: List[str], batch_size: int = 32) -> List[Dict[str, float]]:
+        """Get toxicity scores for several texts with batched forward passes"""
+        results = [{label: 0.0 for label in self.LABELS} for _ in texts]
+
+        positions = [i for i, text in enumerate(texts) if text]
+        if not positions:
+            return results
+
+        if self.model is not None:
+            for start in range(0, len(positions), batch_size):
+                chunk = positions[start:start + batch_size]
+                for i, scores in zip(chunk, self._classify_multilingual_batch([texts[i] for i in chunk])):
+                    results[i] = scores
+            return results
+
+        if self._detoxify is not None:
+            try:
+                # Detoxify returns {label: [score per text]} for list input
+                predictions = self._detoxify.predict([texts[i][:5000] for i in positions])
+                for row, i in enumerate(positions):
+                    results[i] = {k: float(v[row]) for k, v in predictions.items()}
+            except Exception as e:
+                print(f"⚠ Detoxify batch classification error: {e}")
+
+        return results
+
+    def _classify_multilingual_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Classify a padded batch with the multilingual toxicity model"""
+        results = [{label: 0.0 for label in self.LABELS} for _ in texts]
+
+        try:
+            import torch
+
+            with torch.inference_mode():
+                encoded = self.tokenizer(
+                    [text[:2000] for text in texts],
+                    truncation=True,
+                    max_length=256,
+                    padding=True,
+                    return_tensors="pt"
+                ).to(self.device)
+
+                logits = self.model(**encoded).logits
+                probs = torch.sigmoid(logits).cpu().numpy()
+
+            for row, scores in zip(probs, results):
+                for idx, label in enumerate(self.LABELS):
+                    if idx < len(row):
+                        scores[label] = float(row[idx])
+
+        except Exception as e:
+            print(f"⚠ Multilingual toxicity batch classification error: {e}")
+
+        return results
+
     def _classify_multilingual(self, text: str) -> Dict[str, float]:
         """Classify using multilingual toxicity model"""
         scores = {label: 0.0 for label in self.LABELS}
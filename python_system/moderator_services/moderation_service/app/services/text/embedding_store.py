@@ -0,0 +1,317 @@
+"""
+Embedding Store
+===============
+
+Persistent embedding cache for SemanticEncoder.
+
+Vectors live in a memory-mapped float32 file (one fixed-size slot per
+text); a small SQLite table maps text digests to slots and tracks
+recency for LRU eviction. Safe to share between worker processes:
+slot allocation runs inside a SQLite write transaction, and each slot
+carries the digest of the text it holds, so a reader that raced an
+eviction sees a mismatch instead of another text's vector.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingStore:
+    """
+    Disk-backed LRU cache of text embeddings for one model.
+
+    Usage:
+        store = EmbeddingStore("./cache/embeddings", "all-MiniLM-L6-v2", 384)
+        cached = store.get_many(texts)          # ndarray or None per text
+        store.put_many(missing_texts, vectors)
+    """
+
+    DIGEST_SIZE = 16
+
+    # Pending recency updates are written back in batches of this size
+    TOUCH_FLUSH_EVERY = 256
+    # ...or once they are this old, so other processes evict by fresh recency
+    TOUCH_FLUSH_SECONDS = 5.0
+
+    def __init__(
+        self,
+        directory: str,
+        model_name: str,
+        dimension: int,
+        capacity: int = 100_000
+    ):
+        self.model_name = model_name
+        self.dimension = int(dimension)
+        self.capacity = max(1, int(capacity))
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.directory = os.path.join(directory, safe_name)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._tags_path = os.path.join(self.directory, "tags.bin")
+        self._db_path = os.path.join(self.directory, "meta.db")
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.time()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._init_meta()
+        self._vectors = self._open_vectors()
+        self._tags = self._open_tags()
+
+    # ----------------------------
+    # Setup
+    # ----------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_meta(self):
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                digest TEXT PRIMARY KEY,
+                slot INTEGER NOT NULL UNIQUE,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS store_info (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+
+        layout = f"{self.dimension}x{self.capacity}+tags"
+        row = conn.execute("SELECT value FROM store_info WHERE key = 'layout'").fetchone()
+        if row is None or row[0] != layout:
+            # Dimension or capacity changed: slots no longer line up
+            conn.execute("DELETE FROM embeddings")
+            conn.execute(
+                "INSERT OR REPLACE INTO store_info (key, value) VALUES ('layout', ?)",
+                (layout,)
+            )
+            for path in (self._vectors_path, self._tags_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _open_vectors(self) -> np.memmap:
+        shape = (self.capacity, self.dimension)
+        expected = self.capacity * self.dimension * 4
+
+        if not os.path.exists(self._vectors_path) or os.path.getsize(self._vectors_path) != expected:
+            # Sparse file of the full size; pages are only touched on write
+            with open(self._vectors_path, "wb") as f:
+                f.truncate(expected)
+
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=shape)
+
+    def _open_tags(self) -> np.memmap:
+        """Raw digest of the text each slot holds; all zeros while a slot is rewritten"""
+        shape = (self.capacity, self.DIGEST_SIZE)
+        expected = self.capacity * self.DIGEST_SIZE
+
+        if not os.path.exists(self._tags_path) or os.path.getsize(self._tags_path) != expected:
+            with open(self._tags_path, "wb") as f:
+                f.truncate(expected)
+
+        return np.memmap(self._tags_path, dtype=np.uint8, mode="r+", shape=shape)
+
+    # ----------------------------
+    # Keys
+    # ----------------------------
+
+    def digest(self, text: str) -> str:
+        """Key for a text under this store's model"""
+        h = hashlib.blake2b(digest_size=self.DIGEST_SIZE)
+        h.update(self.model_name.encode("utf-8"))
+        h.update(b"\x00")
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    # ----------------------------
+    # Core API
+    # ----------------------------
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Return a cached vector (copy) or None for each text"""
+        if not texts:
+            return []
+
+        digests = [self.digest(text) for text in texts]
+        slots: Dict[str, int] = {}
+
+        unique = list(set(digests))
+        conn = self._conn()
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for digest, slot in conn.execute(
+                f"SELECT digest, slot FROM embeddings WHERE digest IN ({placeholders})",
+                chunk
+            ):
+                slots[digest] = slot
+
+        now = time.time()
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for digest in digests:
+                slot = slots.get(digest)
+                if slot is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                row = np.array(self._vectors[slot])
+                # The slot may have been evicted and rewritten since the
+                # lookup; the tag is checked after the copy, so a match
+                # means the row was not being overwritten while copied
+                if self._tags[slot].tobytes() != bytes.fromhex(digest):
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self._touched[digest] = now
+                results.append(row)
+
+            flush = bool(self._touched) and (
+                len(self._touched) >= self.TOUCH_FLUSH_EVERY
+                or now - self._last_flush >= self.TOUCH_FLUSH_SECONDS
+            )
+
+        if flush:
+            self.flush()
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store vectors, evicting the least recently used slots when full"""
+        if not texts:
+            return
+
+        self.flush()
+
+        pending = {}
+        for text, vector in zip(texts, vectors):
+            if vector is None:
+                continue
+            array = np.asarray(vector, dtype=np.float32).reshape(-1)
+            if array.shape[0] != self.dimension:
+                continue
+            pending[self.digest(text)] = array
+
+        if not pending:
+            return
+
+        conn = self._conn()
+        now = time.time()
+        try:
+            # Serializes slot allocation across processes
+            conn.execute("BEGIN IMMEDIATE")
+
+            existing = {
+                digest: slot
+                for digest, slot in conn.execute(
+                    f"SELECT digest, slot FROM embeddings WHERE digest IN ({','.join('?' * len(pending))})",
+                    list(pending)
+                )
+            }
+            new_digests = [d for d in pending if d not in existing]
+
+            used = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            free = max(0, self.capacity - used)
+
+            assignments: Dict[str, int] = dict(existing)
+            if new_digests:
+                # Slots fill up contiguously and evicted slots are reused
+                # at once, so the occupied slots are always 0..used-1
+                free_slots = iter(range(used, self.capacity))
+
+                # Never evict a slot this batch is about to rewrite
+                if existing:
+                    conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE digest = ?",
+                        [(now, digest) for digest in existing]
+                    )
+                evict_count = min(
+                    max(0, len(new_digests) - free),
+                    max(0, used - len(existing))
+                )
+                evicted = conn.execute(
+                    "SELECT digest, slot FROM embeddings ORDER BY last_used ASC LIMIT ?",
+                    (evict_count,)
+                ).fetchall() if evict_count else []
+                conn.executemany("DELETE FROM embeddings WHERE digest = ?", [(d,) for d, _ in evicted])
+                reuse = (slot for _, slot in evicted)
+
+                for digest in new_digests[:free + len(evicted)]:
+                    slot = next(free_slots, None)
+                    if slot is None:
+                        slot = next(reuse)
+                    assignments[digest] = slot
+
+            with self._lock:
+                # Untag before rewriting so concurrent readers miss
+                for slot in assignments.values():
+                    self._tags[slot] = 0
+                for digest, slot in assignments.items():
+                    self._vectors[slot] = pending[digest]
+                for digest, slot in assignments.items():
+                    self._tags[slot] = np.frombuffer(bytes.fromhex(digest), dtype=np.uint8)
+            self._vectors.flush()
+            self._tags.flush()
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (digest, slot, last_used) VALUES (?, ?, ?)",
+                [(digest, slot, now) for digest, slot in assignments.items()]
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            print(f"⚠ Embedding store write failed: {e}")
+
+    def flush(self):
+        """Write pending LRU recency updates"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._last_flush = time.time()
+
+        if not touched:
+            return
+        try:
+            conn = self._conn()
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE digest = ?",
+                [(ts, digest) for digest, ts in touched.items()]
+            )
+        except sqlite3.Error as e:
+            print(f"⚠ Embedding store touch failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "capacity": self.capacity,
+            "entries": self._conn().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0],
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
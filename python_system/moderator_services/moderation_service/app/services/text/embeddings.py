@@ -5,19 +5,43 @@ Embeddings Module (Rewritten)
 Step 4 & 5: Semantic embedding + FAISS similarity search
 """
 
-from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
 from .models import ViolationType
 
 
 class SemanticEncoder:
     """Step 4: Semantic embedding using Sentence Transformers"""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache_dir: Optional[str] = None,
+        cache_capacity: int = 100_000
+    ):
+        """
+        Args:
+            model_name: SentenceTransformer model
+            cache_dir: Directory for the persistent EmbeddingStore
+                (None disables caching)
+            cache_capacity: Max cached embeddings before LRU eviction
+        """
         self.model = None
         self.model_name = model_name
         self.dimension = None
+        self.store = None
         self._load_model()
 
+        if cache_dir and self.model:
+            try:
+                from .embedding_store import EmbeddingStore
+                self.store = EmbeddingStore(cache_dir, model_name, self.dimension, cache_capacity)
+                print(f"✓ Embedding cache ready ({self.store.directory})")
+            except Exception as e:
+                print(f"⚠ Embedding cache unavailable: {e}")
+
     def _load_model(self):
         """Load sentence transformer model"""
         try:
@@ -37,21 +61,29 @@ class SemanticEncoder:
         if not self.model or not text:
             return None
 
-        try:
-            emb = self.model.encode(text, convert_to_numpy=True)
-            return emb.tolist()
-        except Exception as e:
-            print(f"⚠ Encoding error: {e}")
-            return None
+        embeddings = self.encode_batch([text])
+        return embeddings[0] if embeddings else None
 
     def encode_batch(self, texts: List[str]) -> Optional[List[List[float]]]:
-        """Encode batch texts"""
+        """Encode batch texts (only cache misses reach the model)"""
         if not self.model or not texts:
             return None
 
         try:
-            embs = self.model.encode(texts, convert_to_numpy=True)
-            return embs.tolist()
+            if self.store is None:
+                embs = self.model.encode(texts, convert_to_numpy=True)
+                return embs.tolist()
+
+            cached = self.store.get_many(texts)
+            missing = [i for i, emb in enumerate(cached) if emb is None]
+
+            if missing:
+                computed = self.model.encode([texts[i] for i in missing], convert_to_numpy=True)
+                self.store.put_many([texts[i] for i in missing], computed)
+                for i, emb in zip(missing, computed):
+                    cached[i] = emb
+
+            return [emb.tolist() for emb in cached]
         except Exception as e:
             print(f"⚠ Batch encoding error: {e}")
             return None
@@ -60,18 +92,44 @@ class SemanticEncoder:
 class VectorDatabase:
     """Step 5: FAISS vector similarity search"""
 
+    INDEX_FILE = "index.faiss"
+    META_FILE = "index_meta.json"
+
     def __init__(
         self,
         encoder: SemanticEncoder,
         similarity_threshold: float = 0.70,
         preload_patterns: bool = True,
+        index_dir: Optional[str] = None,
+        ann_threshold: int = 5000,
+        ann_type: Optional[str] = "hnsw",
     ):
+        """
+        Args:
+            encoder: SemanticEncoder used for patterns and new examples
+            similarity_threshold: Minimum similarity returned by search
+            preload_patterns: Index the seed violation patterns
+            index_dir: Directory the index is saved to / reloaded from
+                (None keeps it in memory only)
+            ann_threshold: Vector count at which the flat index is
+                rebuilt as an approximate index
+            ann_type: "hnsw", "ivf", or None to always stay exact
+        """
         self.encoder = encoder
         self.index = None
         self.dimension = encoder.dimension
         self.similarity_threshold = similarity_threshold
+        self.index_dir = index_dir
+        self.ann_threshold = ann_threshold
+        self.ann_type = ann_type if ann_type in ("hnsw", "ivf") else None
         self.violation_texts: List[str] = []
         self.violation_labels: List[ViolationType] = []
+
+        # Confirmed examples added at runtime (kept to rebuild the index
+        # when the seed patterns or the encoder change)
+        self.examples: List[Tuple[str, ViolationType]] = []
+        self._fingerprint = None
+        self._quantizer = None
         self._initialize()
 
         if preload_patterns:
@@ -184,25 +242,146 @@ class VectorDatabase:
         ]
 
     def _load_and_index_patterns(self):
-        """Encode + add patterns at startup"""
+        """Reload the saved index, or encode + add patterns at startup"""
         if not self.index:
             return
 
         self._load_violation_patterns()
+        seed_texts, seed_labels = self.violation_texts, self.violation_labels
+        self.violation_texts, self.violation_labels = [], []
+
+        self._fingerprint = self._compute_fingerprint(seed_texts, seed_labels)
+        saved_examples = self._load_saved_examples()
 
-        embeddings = self.encoder.encode_batch(self.violation_texts)
+        if self._load_index():
+            print(f"✓ Loaded {self.index.ntotal} violation vectors from {self.index_dir}")
+            return
+
+        embeddings = self.encoder.encode_batch(seed_texts)
         if not embeddings:
             print("⚠ Pattern embedding failed")
             return
 
-        self.add_vectors(embeddings, self.violation_labels)
+        self.add_vectors(embeddings, seed_labels, seed_texts)
         print(f"✓ Preloaded {len(embeddings)} violation vectors")
 
+        # Re-embed examples confirmed under a previous index
+        if saved_examples:
+            self.add(
+                [text for text, _ in saved_examples],
+                [label for _, label in saved_examples],
+                save=False
+            )
+            print(f"✓ Re-indexed {len(saved_examples)} confirmed examples")
+
+        self.save()
+
+    def _compute_fingerprint(self, texts: List[str], labels: List[ViolationType]) -> str:
+        """Identifies the seed set + encoder a saved index was built from"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{self.encoder.model_name}:{self.dimension}".encode("utf-8"))
+        for text, label in zip(texts, labels):
+            h.update(f"\x00{label.value}\x00{text}".encode("utf-8"))
+        return h.hexdigest()
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+
+    def _paths(self) -> Tuple[str, str]:
+        return (
+            os.path.join(self.index_dir, self.INDEX_FILE),
+            os.path.join(self.index_dir, self.META_FILE)
+        )
+
+    def _read_meta(self) -> Optional[Dict]:
+        if not self.index_dir:
+            return None
+        _, meta_path = self._paths()
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_saved_examples(self) -> List[Tuple[str, ViolationType]]:
+        meta = self._read_meta() or {}
+        examples = []
+        for text, label in meta.get("examples", []):
+            try:
+                examples.append((text, ViolationType(label)))
+            except ValueError:
+                continue
+        return examples
+
+    def _load_index(self) -> bool:
+        """Load a saved index if it was built from the same seeds + encoder"""
+        meta = self._read_meta()
+        if not meta or meta.get("fingerprint") != self._fingerprint:
+            return False
+
+        try:
+            import faiss
+
+            index_path, _ = self._paths()
+            index = faiss.read_index(index_path)
+            labels = [ViolationType(label) for label in meta["labels"]]
+            texts = list(meta["texts"])
+
+            if index.ntotal != len(labels) or len(texts) != len(labels) or index.d != self.dimension:
+                return False
+
+            self.index = index
+            self.violation_labels = labels
+            self.violation_texts = texts
+            self.examples = [(text, ViolationType(label)) for text, label in meta.get("examples", [])]
+            self._configure_search()
+            return True
+
+        except Exception as e:
+            print(f"⚠ Saved FAISS index unusable, rebuilding: {e}")
+            return False
+
+    def save(self):
+        """Write the index + metadata atomically (no-op without index_dir)"""
+        if not self.index_dir or not self.index:
+            return
+
+        try:
+            import faiss
+
+            os.makedirs(self.index_dir, exist_ok=True)
+            index_path, meta_path = self._paths()
+
+            faiss.write_index(self.index, index_path + ".tmp")
+            os.replace(index_path + ".tmp", index_path)
+
+            meta = {
+                "fingerprint": self._fingerprint,
+                "model": self.encoder.model_name,
+                "dimension": self.dimension,
+                "index_type": type(self.index).__name__,
+                "texts": self.violation_texts,
+                "labels": [label.value for label in self.violation_labels],
+                "examples": [[text, label.value] for text, label in self.examples],
+            }
+            with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(meta_path + ".tmp", meta_path)
+
+        except Exception as e:
+            print(f"⚠ FAISS index save failed: {e}")
+
     # -----------------------------
     # Runtime FAISS operations
     # -----------------------------
 
-    def add_vectors(self, vectors: List[List[float]], labels: List[ViolationType]):
+    def add_vectors(
+        self,
+        vectors: List[List[float]],
+        labels: List[ViolationType],
+        texts: Optional[List[str]] = None
+    ):
         """Add vectors to FAISS index"""
         if not self.index:
             return
@@ -210,40 +389,123 @@ class VectorDatabase:
         import numpy as np
         self.index.add(np.array(vectors, dtype=np.float32))
         self.violation_labels.extend(labels)
+        self.violation_texts.extend(texts if texts is not None else [""] * len(labels))
+
+        self._maybe_upgrade_index()
+
+    def add(
+        self,
+        texts: List[str],
+        labels: List[ViolationType],
+        save: bool = True
+    ) -> int:
+        """
+        Add confirmed violation examples to the index.
+
+        Args:
+            texts: Example texts (e.g. ads confirmed by a moderator)
+            labels: Violation type per text
+            save: Persist the index afterwards
+
+        Returns:
+            Number of vectors added
+        """
+        if not self.index or not texts:
+            return 0
+
+        embeddings = self.encoder.encode_batch(list(texts))
+        if not embeddings:
+            return 0
+
+        self.add_vectors(embeddings, list(labels), list(texts))
+        self.examples.extend(zip(texts, labels))
+
+        if save:
+            self.save()
+        return len(embeddings)
+
+    def _maybe_upgrade_index(self):
+        """Switch from exact to approximate search once the set is large"""
+        import faiss
+
+        if not self.ann_type or not isinstance(self.index, faiss.IndexFlat):
+            return
+        if self.index.ntotal < self.ann_threshold:
+            return
+
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+
+        if self.ann_type == "ivf":
+            nlist = max(1, int(4 * (len(vectors) ** 0.5)))
+            self._quantizer = faiss.IndexFlatL2(self.dimension)
+            index = faiss.IndexIVFFlat(self._quantizer, self.dimension, nlist)
+            index.train(vectors)
+        else:
+            index = faiss.IndexHNSWFlat(self.dimension, 32)
+
+        index.add(vectors)
+        self.index = index
+        self._configure_search()
+        print(f"✓ FAISS index upgraded to {type(index).__name__} ({index.ntotal} vectors)")
+
+    def _configure_search(self):
+        """Search-time accuracy knobs for approximate indexes"""
+        if hasattr(self.index, "hnsw"):
+            self.index.hnsw.efSearch = 64
+        if hasattr(self.index, "nprobe"):
+            self.index.nprobe = max(1, getattr(self.index, "nlist", 16) // 16)
 
     def search(self, query_embedding: List[float], k: int = 5) -> List[Dict]:
         """Search nearest vectors + return structured result"""
-
-        if not self.index:
-            return []
         if not query_embedding:
             return []
+        return self.search_batch([query_embedding], k=k)[0]
+
+    def search_batch(self, query_embeddings: List[Optional[List[float]]], k: int = 5) -> List[List[Dict]]:
+        """
+        Search nearest vectors for several queries with one FAISS call.
+
+        Args:
+            query_embeddings: One embedding per query (None entries are skipped)
+            k: Neighbours per query
+
+        Returns:
+            One result list per query, in input order
+        """
+        results: List[List[Dict]] = [[] for _ in query_embeddings]
+
+        if not self.index or not self.index.ntotal:
+            return results
+
+        positions = [i for i, emb in enumerate(query_embeddings) if emb]
+        if not positions:
+            return results
 
         try:
             import numpy as np
 
-            query = np.array([query_embedding], dtype=np.float32)
+            query = np.array([query_embeddings[i] for i in positions], dtype=np.float32)
             distances, indices = self.index.search(query, min(k, self.index.ntotal))
 
-            results = []
-            for dist, idx in zip(distances[0], indices[0]):
-                if idx < 0 or idx >= len(self.violation_labels):
-                    continue
+            for row, position in enumerate(positions):
+                for dist, idx in zip(distances[row], indices[row]):
+                    if idx < 0 or idx >= len(self.violation_labels):
+                        continue
 
-                similarity = 1.0 / (1.0 + dist)  # L2 → similarity score
+                    similarity = 1.0 / (1.0 + dist)  # L2 → similarity score
 
-                if similarity < self.similarity_threshold:
-                    continue  # ignore weak matches
+                    if similarity < self.similarity_threshold:
+                        continue  # ignore weak matches
 
-                results.append({
-                    "similarity": similarity,
-                    "distance": float(dist),
-                    "violation_type": self.violation_labels[idx].value,
-                    "reference_text": self.violation_texts[idx],
-                })
+                    results[position].append({
+                        "similarity": similarity,
+                        "distance": float(dist),
+                        "violation_type": self.violation_labels[idx].value,
+                        "reference_text": self.violation_texts[idx],
+                    })
 
             return results
 
         except Exception as e:
             print(f"⚠ Vector search error: {e}")
-            return []
+            return [[] for _ in query_embeddings]
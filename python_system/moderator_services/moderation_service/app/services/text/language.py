@@ -5,7 +5,7 @@ Language Detector
 Step 3: Language detection using XLM-RoBERTa.
 """
 
-from typing import Tuple
+from typing import List, Tuple
 
 
 class LanguageDetector:
@@ -91,6 +91,36 @@ class LanguageDetector:
         # Fallback: simple heuristic
         return self._fallback_detect(text)
 
+    def detect_batch(self, texts: List[str], batch_size: int = 16) -> List[Tuple[str, float]]:
+        """Detect the language of several texts with one classifier call"""
+        results: List[Tuple[str, float]] = [("en", 0.5)] * len(texts)
+
+        # Very short texts keep the default, like detect()
+        pending = [i for i, text in enumerate(texts) if text and len(text.strip()) >= 3]
+        if not pending:
+            return results
+
+        if self.classifier:
+            try:
+                batch = [texts[i][:512].replace('\n', ' ') for i in pending]
+                outputs = self.classifier(batch, batch_size=batch_size)
+
+                for i, output in zip(pending, outputs):
+                    top_result = output[0] if isinstance(output, list) else output
+                    label = top_result.get('label', 'english').lower()
+                    results[i] = (
+                        self.LANG_MAP.get(label, label[:2]),
+                        float(top_result.get('score', 0.5))
+                    )
+                return results
+
+            except Exception as e:
+                print(f"⚠ Batch language detection error: {e}")
+
+        for i in pending:
+            results[i] = self._fallback_detect(texts[i])
+        return results
+
     def _fallback_detect(self, text: str) -> Tuple[str, float]:
         """Simple fallback language detection"""
         # Check for common language patterns
@@ -81,4 +81,25 @@ class TextModerationResult:
     # Processing metadata
     processing_time_ms: float = 0.0
     models_used: List[str] = field(default_factory=list)
+    stages_run: List[str] = field(default_factory=list)
+
+
+@dataclass
+class CascadeConfig:
+    """
+    Cheap-first cascade settings for TextModerationPipeline.
+
+    Stages run in order (rules -> semantic -> classifiers) and a text
+    leaves the cascade as soon as a cheap stage is confident about it.
+    """
+    enabled: bool = True
+
+    # Rules stage: texts this short with no rule/keyword hit are approved
+    trivial_max_words: int = 3
+
+    # Semantic stage: best FAISS similarity below this (and no rule hit)
+    # approves; at or above block_above the semantic match decides alone.
+    # Anything in between goes to the intent/toxicity classifiers.
+    approve_below: float = 0.75
+    block_above: float = 0.92
 
@@ -8,7 +8,7 @@ Main orchestrator that coordinates all 10 steps of text analysis.
 import sys
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 # Set up paths for imports
 # Path: text/pipeline.py -> text -> services -> app -> moderation_service -> moderator_services
@@ -29,6 +29,7 @@ except ImportError:
         return True
 
 from .models import (
+    CascadeConfig,
     ModerationDecision,
     ViolationType,
     TextModerationInput,
@@ -42,6 +43,25 @@ from .aggregator import FeatureAggregator
 from .policy import PolicyEvaluator
 from .utils import ExplanationGenerator, KeywordMatcher
 
+try:
+    from app.services.text_rules import TextRulesEngine
+except ImportError:
+    TextRulesEngine = None
+
+try:
+    from app.core.config import settings
+except ImportError:
+    settings = None
+
+
+# Unambiguous keyword categories that settle a text without the ML stages
+KEYWORD_VIOLATIONS = {
+    'weapons': ViolationType.WEAPONS,
+    'drugs': ViolationType.DRUGS,
+    'illegal': ViolationType.ILLEGAL,
+    'adult': ViolationType.SEXUAL,
+}
+
 
 class TextModerationPipeline:
     """
@@ -49,8 +69,15 @@ class TextModerationPipeline:
     Orchestrates all 10 steps of text analysis.
     """
 
-    def __init__(self, preload_models: bool = True):
-        """Initialize the pipeline"""
+    def __init__(self, preload_models: bool = True, cascade: Optional[CascadeConfig] = None):
+        """
+        Initialize the pipeline
+
+        Args:
+            preload_models: Load models eagerly
+            cascade: Cheap-first cascade settings (CascadeConfig(enabled=False)
+                runs every stage on every text)
+        """
         print("\n" + "="*60)
         print("  Initializing Text Moderation Pipeline")
         print("="*60 + "\n")
@@ -62,14 +89,28 @@ class TextModerationPipeline:
         # Initialize components
         self.normalizer = TextNormalizer()
         self.language_detector = LanguageDetector()
-        self.semantic_encoder = SemanticEncoder()
-        self.vector_db = VectorDatabase(encoder=self.semantic_encoder)
+        if settings is not None:
+            self.semantic_encoder = SemanticEncoder(
+                cache_dir=settings.EMBEDDING_CACHE_DIR,
+                cache_capacity=settings.EMBEDDING_CACHE_CAPACITY
+            )
+            self.vector_db = VectorDatabase(
+                encoder=self.semantic_encoder,
+                index_dir=settings.VECTOR_INDEX_DIR,
+                ann_threshold=settings.VECTOR_INDEX_ANN_THRESHOLD,
+                ann_type=settings.VECTOR_INDEX_ANN_TYPE
+            )
+        else:
+            self.semantic_encoder = SemanticEncoder()
+            self.vector_db = VectorDatabase(encoder=self.semantic_encoder)
         self.intent_classifier = IntentClassifier()
         self.context_classifier = ContextClassifier()
         self.feature_aggregator = FeatureAggregator()
         self.policy_evaluator = PolicyEvaluator()
         self.explanation_generator = ExplanationGenerator()
         self.keyword_matcher = KeywordMatcher()
+        self.rules_engine = TextRulesEngine() if TextRulesEngine else None
+        self.cascade = cascade or CascadeConfig()
 
         print("\n" + "="*60)
         print("  Text Moderation Pipeline Ready")
@@ -86,54 +127,204 @@ class TextModerationPipeline:
         Returns:
             TextModerationResult with decision and analysis
         """
+        return self.moderate_batch([input_data])[0]
+
+    def moderate_batch(
+        self,
+        inputs: List[TextModerationInput],
+        batch_size: int = 16
+    ) -> List[TextModerationResult]:
+        """
+        Run the pipeline on several inputs, one model call per stage.
+
+        With the cascade enabled, stages run cheapest first and each text
+        stops at the first stage that settles it:
+
+        1. rules: keyword matcher + rules engine. Unambiguous keyword
+           hits are decided here; short texts with no hit are approved.
+        2. semantic: embeddings + FAISS. Texts far from every known
+           violation (and with no rule hit) are approved, near-duplicates
+           of a known violation are decided on that match.
+        3. classifiers: language ID, BART-MNLI intent and toxicity, only
+           for texts still in the uncertainty band.
+
+        Each stage sees all of its texts in one batched model call.
+        TextModerationResult.stages_run lists the stages a text went
+        through.
+
+        Args:
+            inputs: TextModerationInput items
+            batch_size: Max texts per transformer forward pass
+
+        Returns:
+            One TextModerationResult per input, in input order
+        """
         start_time = time.time()
-        models_used = []
+        results: List[Optional[TextModerationResult]] = [None] * len(inputs)
+        cascade = self.cascade if self.cascade.enabled else None
 
         # Combine title and description
-        full_text = f"{input_data.title} {input_data.description}".strip()
-
-        if not full_text:
-            return TextModerationResult(
-                decision=ModerationDecision.APPROVE,
-                confidence=1.0,
-                explanation="Empty content - auto-approved",
-                processing_time_ms=0
+        texts = [f"{item.title} {item.description}".strip() for item in inputs]
+
+        pending = []
+        for i, full_text in enumerate(texts):
+            if not full_text:
+                results[i] = TextModerationResult(
+                    decision=ModerationDecision.APPROVE,
+                    confidence=1.0,
+                    explanation="Empty content - auto-approved",
+                    processing_time_ms=0
+                )
+            else:
+                pending.append(i)
+
+        if not pending:
+            return results
+
+        # Per-text signals, filled in as stages run
+        signals = {
+            i: {
+                'stages': [],
+                'models': [],
+                'language': None,
+                'embedding': None,
+                'similar': [],
+                'intent': ("legitimate_product_or_service", 0.5, {}),
+                'toxicity': {},
+                'violations': []
+            }
+            for i in pending
+        }
+
+        # Stage 1: rules + keywords
+        uncertain = []
+        for i in pending:
+            signal = signals[i]
+            signal['stages'].append('rules')
+
+            keyword_hits = self.keyword_matcher.match_categories(texts[i])
+            rule_hit = bool(keyword_hits)
+            if self.rules_engine is not None:
+                rule_hit = rule_hit or self.rules_engine.check(texts[i])['has_violations']
+
+            if cascade and keyword_hits:
+                # Unambiguous violation: policy decides on the keywords
+                signal['violations'] = list({
+                    KEYWORD_VIOLATIONS[category]
+                    for category in keyword_hits.values()
+                    if category in KEYWORD_VIOLATIONS
+                })
+                continue
+            if cascade and not rule_hit and len(texts[i].split()) <= cascade.trivial_max_words:
+                continue
+
+            signal['rule_hit'] = rule_hit
+            uncertain.append(i)
+
+        # Stage 2: semantic encoding + vector similarity search
+        if uncertain:
+            normalized = {i: self.normalizer.normalize(texts[i]) for i in uncertain}
+            to_encode = [i for i in uncertain if normalized[i]]
+            if to_encode:
+                encoded = self.semantic_encoder.encode_batch([normalized[i] for i in to_encode])
+                for i, embedding in zip(to_encode, encoded or []):
+                    signals[i]['embedding'] = embedding
+
+            embedded = [i for i in uncertain if signals[i]['embedding']]
+            for i, similar in zip(embedded, self.vector_db.search_batch(
+                [signals[i]['embedding'] for i in embedded], k=5
+            )):
+                signals[i]['similar'] = similar
+
+            semantic_ready = bool(self.vector_db.index is not None and self.vector_db.index.ntotal)
+            still_uncertain = []
+            for i in uncertain:
+                signal = signals[i]
+                if signal['embedding']:
+                    signal['stages'].append('semantic')
+                    signal['models'].append("SentenceTransformer")
+                    if signal['similar']:
+                        signal['models'].append("FAISS")
+
+                # Without a working encoder/index the text stays uncertain
+                best = max((m.get('similarity', 0.0) for m in signal['similar']), default=0.0)
+                if cascade and signal['embedding'] and semantic_ready:
+                    if best >= cascade.block_above:
+                        continue
+                    if best < cascade.approve_below and not signal['rule_hit']:
+                        continue
+                still_uncertain.append(i)
+            uncertain = still_uncertain
+
+        # Stage 3: language ID + intent + toxicity classifiers
+        if uncertain:
+            batch_texts = [texts[i] for i in uncertain]
+            languages = self.language_detector.detect_batch(batch_texts, batch_size=batch_size)
+            intents = self.intent_classifier.classify_batch(batch_texts, batch_size=batch_size)
+            toxicity_batch = self.context_classifier.classify_batch(batch_texts, batch_size=batch_size)
+
+            for i, language, intent, toxicity in zip(uncertain, languages, intents, toxicity_batch):
+                signal = signals[i]
+                signal['stages'].append('classifiers')
+                signal['language'] = language
+                signal['intent'] = intent
+                signal['toxicity'] = toxicity
+
+                if self.language_detector.classifier:
+                    signal['models'].insert(0, "XLM-RoBERTa-LID")
+                if self.intent_classifier.classifier:
+                    signal['models'].append("BART-MNLI")
+                if self.context_classifier.model:
+                    signal['models'].append("Polyglot-Toxic")
+                elif hasattr(self.context_classifier, '_detoxify') and self.context_classifier._detoxify:
+                    signal['models'].append("Detoxify")
+
+        # Per-text time is the batch wall time split evenly
+        elapsed_per_text = (time.time() - start_time) * 1000 / len(pending)
+
+        for i in pending:
+            signal = signals[i]
+            item_start = time.time()
+
+            # Texts that left the cascade early get the heuristic language
+            detected_lang, lang_confidence = (
+                signal['language'] or self.language_detector._fallback_detect(texts[i])
             )
-
-        # Step 2: Normalize text
-        normalized_text = self.normalizer.normalize(full_text)
-        tokens = self.normalizer.tokenize(full_text)
-        entities = self.normalizer.extract_entities(full_text)
-
-        # Step 3: Detect language
-        detected_lang, lang_confidence = self.language_detector.detect(full_text)
-        if self.language_detector.classifier:
-            models_used.append("XLM-RoBERTa-LID")
-
-        # Step 4: Semantic encoding
-        embedding = self.semantic_encoder.encode(normalized_text)
-        if embedding:
-            models_used.append("SentenceTransformer")
-
-        # Step 5: Vector similarity search
-        similar_violations = []
-        if embedding:
-            similar_violations = self.vector_db.search(embedding, k=5)
-            if similar_violations:
-                models_used.append("FAISS")
-
-        # Step 6: Intent classification
-        intent, intent_conf, intent_scores = self.intent_classifier.classify(full_text)
-        if self.intent_classifier.classifier:
-            models_used.append("BART-MNLI")
-
-        # Step 7: Context/toxicity classification
-        toxicity_scores = self.context_classifier.classify(full_text)
-        if self.context_classifier.model:
-            models_used.append("Polyglot-Toxic")
-        elif hasattr(self.context_classifier, '_detoxify') and self.context_classifier._detoxify:
-            models_used.append("Detoxify")
-
+            intent, intent_conf, intent_scores = signal['intent']
+
+            results[i] = self._evaluate(
+                input_data=inputs[i],
+                full_text=texts[i],
+                detected_lang=detected_lang,
+                lang_confidence=lang_confidence,
+                intent=intent,
+                intent_conf=intent_conf,
+                intent_scores=intent_scores,
+                toxicity_scores=signal['toxicity'],
+                similar_violations=signal['similar'],
+                models_used=signal['models'],
+                extra_violations=signal['violations']
+            )
+            results[i].stages_run = signal['stages']
+            results[i].processing_time_ms = elapsed_per_text + (time.time() - item_start) * 1000
+
+        return results
+
+    def _evaluate(
+        self,
+        input_data: TextModerationInput,
+        full_text: str,
+        detected_lang: str,
+        lang_confidence: float,
+        intent: str,
+        intent_conf: float,
+        intent_scores: Dict[str, float],
+        toxicity_scores: Dict[str, float],
+        similar_violations: List[Dict],
+        models_used: List[str],
+        extra_violations: Optional[List[ViolationType]] = None
+    ) -> TextModerationResult:
+        """Steps 8-10 for one text, given its model outputs"""
         # Keyword matching
         matched_keywords, keyword_violations = self.keyword_matcher.match(full_text)
 
@@ -146,8 +337,9 @@ class TextModerationPipeline:
             context_flags=[]
         )
 
-        # Add keyword violations
+        # Add keyword violations (and any decided by the cascade)
         violations.extend(keyword_violations)
+        violations.extend(extra_violations or [])
         violations = list(set(violations))
 
         # Step 9: Policy evaluation
@@ -168,9 +360,6 @@ class TextModerationPipeline:
             detected_language=detected_lang
         )
 
-        # Build result
-        processing_time = (time.time() - start_time) * 1000
-
         violation_scores = {}
         for v in violations:
             violation_scores[v.value] = component_scores.get(v.value, risk_score)
@@ -191,7 +380,6 @@ class TextModerationPipeline:
             policy_score=1.0 - risk_score,
             explanation=explanation,
             detailed_rationale=rationale,
-            processing_time_ms=processing_time,
             models_used=models_used
         )
 
@@ -19,6 +19,7 @@ The pipeline has been refactored into smaller modules:
 
 # Re-export everything for backward compatibility
 from .models import (
+    CascadeConfig,
     ModerationDecision,
     ViolationType,
     TextModerationInput,
@@ -40,6 +41,7 @@ from .pipeline import (
 )
 
 __all__ = [
+    'CascadeConfig',
     'ModerationDecision',
     'ViolationType',
     'TextModerationInput',
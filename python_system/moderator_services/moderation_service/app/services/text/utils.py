@@ -121,3 +121,16 @@ class KeywordMatcher:
         # Don't return violation types - let the ML models decide
         return matched_keywords, matched_types
 
+    def match_categories(self, text: str) -> Dict[str, str]:
+        """Map each matched critical keyword to its category"""
+        if not text:
+            return {}
+
+        text_lower = text.lower()
+        return {
+            keyword: category
+            for category, keywords in self.critical_keywords.items()
+            for keyword in keywords
+            if keyword in text_lower
+        }
+
@@ -3,7 +3,7 @@ Text toxicity detection using Detoxify
 """
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 # Set up paths for model_registry import
 # Path: services/text_detoxify.py -> services -> app -> moderation_service -> moderator_services
@@ -49,6 +49,17 @@ class DetoxifyService:
         self.model = Detoxify(model_type)
         self.model_type = model_type
 
+    @staticmethod
+    def _empty_scores() -> Dict[str, float]:
+        return {
+            'toxicity': 0.0,
+            'severe_toxicity': 0.0,
+            'obscene': 0.0,
+            'threat': 0.0,
+            'insult': 0.0,
+            'identity_attack': 0.0
+        }
+
     def analyze(self, text: str) -> Dict[str, float]:
         """
         Analyze text for toxicity.
@@ -60,14 +71,7 @@ class DetoxifyService:
             Dict with scores for each category (0.0-1.0)
         """
         if not text or not text.strip():
-            return {
-                'toxicity': 0.0,
-                'severe_toxicity': 0.0,
-                'obscene': 0.0,
-                'threat': 0.0,
-                'insult': 0.0,
-                'identity_attack': 0.0
-            }
+            return self._empty_scores()
 
         # Truncate very long text
         text = text[:5000]
@@ -81,12 +85,34 @@ class DetoxifyService:
 
         except Exception as e:
             print(f"Error in Detoxify analysis: {e}")
-            return {
-                'toxicity': 0.0,
-                'severe_toxicity': 0.0,
-                'obscene': 0.0,
-                'threat': 0.0,
-                'insult': 0.0,
-                'identity_attack': 0.0
-            }
+            return self._empty_scores()
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Analyze several texts with a single Detoxify forward pass.
+
+        Args:
+            texts: Input texts
+
+        Returns:
+            One score dict per input text (same shape as analyze())
+        """
+        results = [self._empty_scores() for _ in texts]
+
+        # Blank texts keep zero scores and are not sent to the model
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not indices:
+            return results
+
+        try:
+            scores = self.model.predict([texts[i][:5000] for i in indices])
+
+            # Detoxify returns {label: [score per text]}
+            for label, values in scores.items():
+                for i, value in zip(indices, values):
+                    results[i][label] = float(value)
+
+        except Exception as e:
+            print(f"Error in Detoxify batch analysis: {e}")
 
+        return results
@@ -2,9 +2,14 @@
 Rule-based text filtering for fast pre-screening
 Complements ML models with explicit pattern matching
 """
+import hashlib
 import re
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+
+from app.core.config import settings
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.match_cache import MatchCache
 
 
 @dataclass
@@ -131,8 +136,66 @@ class TextRulesEngine:
         r'\s+': ' '  # Normalize whitespace
     }
 
-    def __init__(self):
-        self.match_cache = {}
+    # Bumped by add_custom_rule; the keyword dicts above are shared by
+    # every engine, so each instance rebuilds its matchers when it changes
+    _rules_version = 0
+
+    def __init__(
+        self,
+        cache_size: Optional[int] = None,
+        cache_ttl: Optional[float] = None,
+        shared_cache_path: Optional[str] = None
+    ):
+        """
+        Args:
+            cache_size: Max cached results (default RULE_CACHE_MAX_ENTRIES)
+            cache_ttl: Seconds a cached result stays valid
+            shared_cache_path: SQLite file shared by worker processes
+                (default RULE_CACHE_SHARED_PATH; None keeps it in-process)
+        """
+        self.match_cache = MatchCache(
+            max_entries=cache_size or settings.RULE_CACHE_MAX_ENTRIES,
+            ttl_seconds=cache_ttl or settings.RULE_CACHE_TTL_SECONDS,
+            shared_path=shared_cache_path or settings.RULE_CACHE_SHARED_PATH,
+            namespace="text_rules",
+            encode=self._encode_result,
+            decode=self._decode_result
+        )
+        self._obfuscations = [
+            (re.compile(pattern), replacement)
+            for pattern, replacement in self.OBFUSCATIONS.items()
+        ]
+        self._build_matchers()
+
+    def _build_matchers(self):
+        """Compile keyword lists into Aho-Corasick matchers."""
+        keyword_rules = []
+        obfuscated_rules = []
+
+        for severity, rules in (
+            ("critical", self.CRITICAL_KEYWORDS),
+            ("high", self.HIGH_KEYWORDS),
+            ("medium", self.MEDIUM_KEYWORDS)
+        ):
+            for category, keywords in rules.items():
+                for keyword in keywords:
+                    keyword_rules.append((keyword, (severity, category)))
+                    if severity == "critical":
+                        # Obfuscation checks run on normalized text, so
+                        # normalize the keyword once here, not per check
+                        obfuscated_rules.append(
+                            (self._normalize_text(keyword), (category, keyword))
+                        )
+
+        self._keyword_matcher = KeywordMatcher(keyword_rules)
+        self._obfuscated_matcher = KeywordMatcher(obfuscated_rules)
+        self._matchers_version = TextRulesEngine._rules_version
+
+        # Salts cache keys so workers with different custom rules never
+        # share results through the shared tier
+        self._rules_fingerprint = hashlib.blake2b(
+            repr(keyword_rules).encode("utf-8"), digest_size=8
+        ).hexdigest()
 
     def check(self, text: str) -> Dict[str, any]:
         """
@@ -152,10 +215,16 @@ class TextRulesEngine:
         if not text or not text.strip():
             return self._empty_result()
 
+        # Rules added through another engine instance
+        if self._matchers_version != TextRulesEngine._rules_version:
+            self._build_matchers()
+            self.match_cache.clear()
+
         # Check cache
-        text_hash = hash(text)
-        if text_hash in self.match_cache:
-            return self.match_cache[text_hash]
+        cache_key = self.match_cache.digest(text, salt=self._rules_fingerprint)
+        cached = self.match_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         matches = []
         flags = set()
@@ -163,47 +232,17 @@ class TextRulesEngine:
         text_lower = text.lower()
         text_normalized = self._normalize_text(text)
 
-        # 1. Critical keywords (auto-block)
-        for category, keywords in self.CRITICAL_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    matches.append(RuleMatch(
-                        rule_name=f"critical_{category}",
-                        matched_text=keyword,
-                        category=category,
-                        severity="critical",
-                        position=text_lower.find(keyword),
-                        keyword=keyword  # Add for context analysis
-                    ))
-                    flags.add(category)
-
-        # 2. High severity keywords
-        for category, keywords in self.HIGH_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    matches.append(RuleMatch(
-                        rule_name=f"high_{category}",
-                        matched_text=keyword,
-                        category=category,
-                        severity="high",
-                        position=text_lower.find(keyword),
-                        keyword=keyword  # Add for context analysis
-                    ))
-                    flags.add(category)
-
-        # 3. Medium severity keywords
-        for category, keywords in self.MEDIUM_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    matches.append(RuleMatch(
-                        rule_name=f"medium_{category}",
-                        matched_text=keyword,
-                        category=category,
-                        severity="medium",
-                        position=text_lower.find(keyword),
-                        keyword=keyword  # Add for context analysis
-                    ))
-                    flags.add(category)
+        # 1-3. Critical / high / medium keywords in a single pass
+        for position, keyword, (severity, category) in self._keyword_matcher.first_hits(text_lower):
+            matches.append(RuleMatch(
+                rule_name=f"{severity}_{category}",
+                matched_text=keyword,
+                category=category,
+                severity=severity,
+                position=position,
+                keyword=keyword  # Add for context analysis
+            ))
+            flags.add(category)
 
         # 4. Pattern matching
         for pattern_name, pattern in self.PATTERNS.items():
@@ -238,35 +277,29 @@ class TextRulesEngine:
         }
 
         # Cache result
-        self.match_cache[text_hash] = result
+        self.match_cache.put(cache_key, result)
 
         return result
 
     def _normalize_text(self, text: str) -> str:
         """Normalize text to catch obfuscated content"""
         normalized = text.lower()
-        for pattern, replacement in self.OBFUSCATIONS.items():
-            normalized = re.sub(pattern, replacement, normalized)
+        for pattern, replacement in self._obfuscations:
+            normalized = pattern.sub(replacement, normalized)
         return normalized.strip()
 
     def _check_obfuscated(self, normalized_text: str) -> List[RuleMatch]:
-        """Check normalized text for obfuscated keywords"""
-        matches = []
-
-        # Check critical keywords in normalized form
-        for category, keywords in self.CRITICAL_KEYWORDS.items():
-            for keyword in keywords:
-                keyword_normalized = self._normalize_text(keyword)
-                if keyword_normalized in normalized_text:
-                    matches.append(RuleMatch(
-                        rule_name=f"obfuscated_{category}",
-                        matched_text=keyword,
-                        category=category,
-                        severity="critical",
-                        position=normalized_text.find(keyword_normalized)
-                    ))
-
-        return matches
+        """Check normalized text for obfuscated critical keywords"""
+        return [
+            RuleMatch(
+                rule_name=f"obfuscated_{category}",
+                matched_text=keyword,
+                category=category,
+                severity="critical",
+                position=position
+            )
+            for position, _, (category, keyword) in self._obfuscated_matcher.first_hits(normalized_text)
+        ]
 
     def _determine_severity(self, matches: List[RuleMatch]) -> str:
         """Determine overall severity from matches"""
@@ -296,6 +329,19 @@ class TextRulesEngine:
             'categories_flagged': []
         }
 
+    @staticmethod
+    def _encode_result(result: Dict) -> Dict:
+        """JSON-safe copy of a check() result for the shared cache tier"""
+        return {**result, 'matches': [asdict(m) for m in result['matches']]}
+
+    @staticmethod
+    def _decode_result(data: Dict) -> Dict:
+        return {**data, 'matches': [RuleMatch(**m) for m in data['matches']]}
+
+    def cache_stats(self) -> Dict[str, any]:
+        """Hit/miss counters of the rule-match cache"""
+        return self.match_cache.stats()
+
     def add_custom_rule(self, category: str, keywords: List[str], severity: str = "medium"):
         """
         Add custom rules dynamically.
@@ -318,6 +364,8 @@ class TextRulesEngine:
                 self.MEDIUM_KEYWORDS[category] = []
             self.MEDIUM_KEYWORDS[category].extend(keywords)
 
-        # Clear cache when rules change
+        # Rebuild matchers and clear cache when rules change
+        TextRulesEngine._rules_version += 1
+        self._build_matchers()
         self.match_cache.clear()
 
@@ -25,6 +25,8 @@ for _path in [str(MODERATOR_SERVICES_DIR), str(MODERATION_SERVICE_DIR), str(APP_
         sys.path.insert(0, _path)
 
 from model_registry import ensure_models, get_model_path
+from app.services.decoded_image import DecodedImage
+from app.workers.model_host import get_model
 
 # Ensure required models are available
 REQUIRED_MODELS = ['yolov8n', 'ultralytics']
@@ -127,40 +129,13 @@ class VideoFrameProcessor:
 
     def _load_models(self):
         """Load all detection models"""
-        # NSFW Detector
-        try:
-            from app.services.nsfw_detector import NSFWDetector
-            self.nsfw_detector = NSFWDetector()
-        except Exception as e:
-            print(f"⚠ NSFW detector not available: {e}")
-
-        # Violence Detector
-        try:
-            from app.services.yolo_violence import ViolenceDetector
-            self.violence_detector = ViolenceDetector()
-        except Exception as e:
-            print(f"⚠ Violence detector not available: {e}")
-
-        # Weapon Detector
-        try:
-            from app.services.yolo_weapons import WeaponDetector
-            self.weapon_detector = WeaponDetector()
-        except Exception as e:
-            print(f"⚠ Weapon detector not available: {e}")
-
-        # Blood Detector
-        try:
-            from app.services.blood_detector import BloodDetector
-            self.blood_detector = BloodDetector()
-        except Exception as e:
-            print(f"⚠ Blood detector not available: {e}")
-
-        # OCR Service
-        try:
-            from app.services.ocr_paddle import OCRService
-            self.ocr_service = OCRService()
-        except Exception as e:
-            print(f"⚠ OCR service not available: {e}")
+        # Detectors are shared through the model host (or its
+        # process-wide singletons) rather than loaded per processor
+        self.nsfw_detector = get_model("nsfw")
+        self.violence_detector = get_model("violence")
+        self.weapon_detector = get_model("weapon")
+        self.blood_detector = get_model("blood")
+        self.ocr_service = get_model("ocr")
 
         # Object Detector (use YOLO)
         try:
@@ -271,12 +246,15 @@ class VideoFrameProcessor:
         if not os.path.exists(frame_path):
             return analysis
 
+        # Decode once and share across all detectors
+        frame = DecodedImage.from_path(frame_path)
+
         flags = []
 
         # 1. NSFW Detection
         if self.nsfw_detector:
             try:
-                nsfw_result = self.nsfw_detector.analyze_image(frame_path)
+                nsfw_result = self.nsfw_detector.analyze_image(frame)
                 analysis.nsfw_score = max(
                     nsfw_result.get('nudity', 0.0),
                     nsfw_result.get('sexual_content', 0.0)
@@ -289,7 +267,7 @@ class VideoFrameProcessor:
         # 2. Violence Detection
         if self.violence_detector:
             try:
-                violence_result = self.violence_detector.detect(frame_path)
+                violence_result = self.violence_detector.detect(frame)
                 analysis.violence_score = violence_result.get('violence_score', 0.0)
                 if analysis.violence_score > 0.5:
                     flags.append('violence')
@@ -299,7 +277,7 @@ class VideoFrameProcessor:
         # 3. Weapon Detection
         if self.weapon_detector:
             try:
-                weapon_result = self.weapon_detector.detect(frame_path)
+                weapon_result = self.weapon_detector.detect(frame)
                 analysis.weapon_score = weapon_result.get('weapon_score', 0.0)
                 if weapon_result.get('weapon_detected', False):
                     flags.append('weapon')
@@ -309,7 +287,7 @@ class VideoFrameProcessor:
         # 4. Blood Detection
         if self.blood_detector:
             try:
-                blood_result = self.blood_detector.detect(frame_path)
+                blood_result = self.blood_detector.detect(frame)
                 analysis.blood_score = blood_result.get('blood_score', 0.0)
                 if analysis.blood_score > 0.5:
                     flags.append('blood')
@@ -319,7 +297,7 @@ class VideoFrameProcessor:
         # 5. OCR - Text extraction
         if self.ocr_service and not skip_ocr:
             try:
-                ocr_result = self.ocr_service.extract_text(frame_path)
+                ocr_result = self.ocr_service.extract_text(frame)
                 analysis.text_detected = ocr_result.get('text', '')
             except:
                 pass
@@ -327,7 +305,7 @@ class VideoFrameProcessor:
         # 6. Object Detection
         if self.object_detector:
             try:
-                predictions = self.object_detector(frame_path, verbose=False)
+                predictions = self.object_detector(frame.bgr, verbose=False)
                 for result in predictions:
                     if result.boxes is not None:
                         for box in result.boxes:
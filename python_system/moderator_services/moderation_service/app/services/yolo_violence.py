@@ -4,7 +4,7 @@ Detects fights, physical altercations, aggressive behavior
 """
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import cv2
 import numpy as np
 
@@ -20,6 +20,7 @@ for _path in [str(MODERATOR_SERVICES_DIR), str(MODERATION_SERVICE_DIR), str(APP_
         sys.path.insert(0, _path)
 
 from model_registry import ensure_models, get_model_path, is_model_available
+from app.services.decoded_image import DecodedImage, ImageInput
 
 # Ensure required models are available
 REQUIRED_MODELS = ['ultralytics', 'cv2']
@@ -77,12 +78,12 @@ class ViolenceDetector:
         except Exception as e:
             print(f"⚠ Failed to load violence model: {e}")
 
-    def detect(self, image_path: str, confidence_threshold: float = 0.25) -> Dict[str, any]:
+    def detect(self, image: ImageInput, confidence_threshold: float = 0.25) -> Dict[str, any]:
         """
         Detect violence in image.
 
         Args:
-            image_path: Path to image file
+            image: Path to image file or a shared DecodedImage
             confidence_threshold: Minimum confidence for detection
 
         Returns:
@@ -91,62 +92,99 @@ class ViolenceDetector:
                 - detections: List of detected violent actions
                 - violence_detected: Boolean
         """
+        return self.detect_batch([image], confidence_threshold)[0]
+
+    def detect_batch(
+        self,
+        images: List[ImageInput],
+        confidence_threshold: float = 0.25
+    ) -> List[Dict[str, any]]:
+        """
+        Detect violence in several images with a single YOLO forward pass.
+
+        Args:
+            images: Paths, DecodedImages or RGB arrays
+            confidence_threshold: Minimum confidence for detection
+
+        Returns:
+            One result dict per input image (same shape as detect())
+        """
+        if not images:
+            return []
+
         if self.model is None:
-            return {
-                "violence_score": 0.0,
-                "detections": [],
-                "violence_detected": False,
-                "error": "Model not loaded"
-            }
+            return [self._error_result("Model not loaded") for _ in images]
+
+        # Decode each input on its own: an unreadable one fails only its slot
+        results: List[Optional[Dict[str, any]]] = [None] * len(images)
+        frames, decoded = [], []
+        for i, image in enumerate(images):
+            try:
+                frames.append(DecodedImage.ensure(image).bgr)
+                decoded.append(i)
+            except Exception as e:
+                results[i] = self._error_result(f"Could not decode image: {e}")
+
+        if not frames:
+            return results
 
         try:
-            results = self.model(image_path, verbose=False)
+            outputs = self.model(frames, verbose=False)
+            for i, output in zip(decoded, outputs):
+                results[i] = self._parse_result(output, confidence_threshold)
 
-            detections = []
-            max_confidence = 0.0
+        except Exception as e:
+            print(f"Violence detection error: {e}")
+            for i in decoded:
+                results[i] = self._error_result(str(e))
 
-            for result in results:
-                if result.boxes is None:
-                    continue
+        return results
 
-                for box in result.boxes:
-                    conf = float(box.conf[0])
-                    if conf < confidence_threshold:
-                        continue
+    @staticmethod
+    def _error_result(message: str) -> Dict[str, any]:
+        return {
+            "violence_score": 0.0,
+            "detections": [],
+            "violence_detected": False,
+            "error": message
+        }
 
-                    cls = int(box.cls[0])
-                    class_name = result.names.get(cls, f"class_{cls}")
+    @staticmethod
+    def _parse_result(result, confidence_threshold: float) -> Dict[str, any]:
+        """Convert one ultralytics Results object into a detection dict"""
+        detections = []
+        max_confidence = 0.0
 
-                    detections.append({
-                        "class": class_name,
-                        "confidence": conf,
-                        "bbox": box.xyxy[0].tolist()
-                    })
+        if result.boxes is not None:
+            for box in result.boxes:
+                conf = float(box.conf[0])
+                if conf < confidence_threshold:
+                    continue
 
-                    max_confidence = max(max_confidence, conf)
+                cls = int(box.cls[0])
+                class_name = result.names.get(cls, f"class_{cls}")
 
-            return {
-                "violence_score": max_confidence,
-                "detections": detections,
-                "violence_detected": max_confidence >= confidence_threshold,
-                "num_detections": len(detections)
-            }
+                detections.append({
+                    "class": class_name,
+                    "confidence": conf,
+                    "bbox": box.xyxy[0].tolist()
+                })
 
-        except Exception as e:
-            print(f"Violence detection error: {e}")
-            return {
-                "violence_score": 0.0,
-                "detections": [],
-                "violence_detected": False,
-                "error": str(e)
-            }
+                max_confidence = max(max_confidence, conf)
+
+        return {
+            "violence_score": max_confidence,
+            "detections": detections,
+            "violence_detected": max_confidence >= confidence_threshold,
+            "num_detections": len(detections)
+        }
 
     def detect_video_frames(self, frame_paths: List[str]) -> Dict[str, any]:
         """
         Detect violence across multiple video frames.
 
         Args:
-            frame_paths: List of frame image paths
+            frame_paths: List of frame image paths or DecodedImages
 
         Returns:
             Aggregated violence detection results
@@ -4,7 +4,7 @@ Detects guns, knives, and other weapons using multiple strategies
 """
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
 import numpy as np
 
@@ -20,6 +20,7 @@ for _path in [str(MODERATOR_SERVICES_DIR), str(MODERATION_SERVICE_DIR), str(APP_
         sys.path.insert(0, _path)
 
 from model_registry import ensure_models, get_model_path
+from app.services.decoded_image import DecodedImage, ImageInput
 
 # Ensure required models are available
 REQUIRED_MODELS = ['yolov8n', 'ultralytics', 'transformers', 'torch']
@@ -88,10 +89,88 @@ class WeaponDetector:
             print(f"⚠ Image classifier not available: {e}")
             self.classifier = None
 
-    def detect(self, image_path: str, confidence_threshold: float = 0.25) -> Dict[str, any]:
+    def detect(self, image: ImageInput, confidence_threshold: float = 0.25) -> Dict[str, any]:
         """
         Detect weapons using multiple strategies.
+
+        All strategies share one decoded copy of the image.
+        """
+        return self.detect_batch([image], confidence_threshold)[0]
+
+    def detect_batch(
+        self,
+        images: List[ImageInput],
+        confidence_threshold: float = 0.25
+    ) -> List[Dict[str, any]]:
         """
+        Detect weapons in several images.
+
+        YOLO and the image classifier each run once over the whole list;
+        the gun heuristic is per-image numpy work on the shared arrays.
+
+        Args:
+            images: Paths, DecodedImages or RGB arrays
+            confidence_threshold: Minimum YOLO confidence
+
+        Returns:
+            One result dict per input image (same shape as detect())
+        """
+        if not images:
+            return []
+
+        # Decode each input on its own: an unreadable one fails only its slot
+        results: List[Optional[Dict[str, any]]] = [None] * len(images)
+        decoded, positions = [], []
+        for i, image in enumerate(images):
+            try:
+                image = DecodedImage.ensure(image)
+                image.rgb   # decode now, not inside a strategy
+                decoded.append(image)
+                positions.append(i)
+            except Exception as e:
+                results[i] = {
+                    "weapon_score": 0.0,
+                    "detections": [],
+                    "weapon_detected": False,
+                    "weapon_types": [],
+                    "analysis": {},
+                    "error": f"Could not decode image: {e}"
+                }
+
+        if not decoded:
+            return results
+
+        # A strategy that fails is reported, not read as "no weapon"
+        errors = []
+
+        # Strategy 1: YOLO Object Detection
+        try:
+            yolo_outputs = self._yolo_detect_batch(decoded, confidence_threshold)
+        except Exception as e:
+            print(f"YOLO detection error: {e}")
+            errors.append(f"YOLO detection failed: {e}")
+            yolo_outputs = [(0.0, [])] * len(decoded)
+
+        # Strategy 2: Image Classification
+        try:
+            class_outputs = self._classify_batch(decoded)
+        except Exception as e:
+            print(f"Classification error: {e}")
+            errors.append(f"Classification failed: {e}")
+            class_outputs = [(0.0, [])] * len(decoded)
+
+        # Strategy 3: Gun-specific visual analysis
+        gun_scores = [self._analyze_for_guns(image) for image in decoded]
+
+        for i, yolo_output, class_output, gun_score in zip(positions, yolo_outputs, class_outputs, gun_scores):
+            results[i] = self._combine(yolo_output, class_output, gun_score)
+            if errors:
+                results[i]["error"] = "; ".join(errors)
+
+        return results
+
+    def _combine(self, yolo_output: tuple, class_output: tuple, gun_score: float) -> Dict[str, any]:
+        """Merge the three strategy outputs for one image"""
         results = {
             "weapon_score": 0.0,
             "detections": [],
@@ -102,8 +181,7 @@ class WeaponDetector:
 
         scores = []
 
-        # Strategy 1: YOLO Object Detection
-        yolo_score, yolo_detections = self._yolo_detect(image_path, confidence_threshold)
+        yolo_score, yolo_detections = yolo_output
         results["analysis"]["yolo"] = {
             "score": yolo_score,
             "detections": yolo_detections
@@ -112,8 +190,7 @@ class WeaponDetector:
             scores.append(yolo_score)
             results["detections"].extend(yolo_detections)
 
-        # Strategy 2: Image Classification
-        class_score, class_labels = self._classify_image(image_path)
+        class_score, class_labels = class_output
         results["analysis"]["classification"] = {
             "score": class_score,
             "labels": class_labels
@@ -128,8 +205,6 @@ class WeaponDetector:
                         "source": "classifier"
                     })
 
-        # Strategy 3: Gun-specific visual analysis
-        gun_score = self._analyze_for_guns(image_path)
         results["analysis"]["gun_analysis"] = {"score": gun_score}
         if gun_score > 0.3:
             scores.append(gun_score)
@@ -144,91 +219,87 @@ class WeaponDetector:
 
         return results
 
-    def _yolo_detect(self, image_path: str, confidence_threshold: float) -> tuple:
-        """YOLO-based detection for COCO weapon classes"""
+    def _yolo_detect_batch(self, images: List[DecodedImage], confidence_threshold: float) -> List[tuple]:
+        """YOLO-based detection for COCO weapon classes, one forward pass per list (raises on failure)"""
         if self.yolo_model is None:
-            return 0.0, []
+            return [(0.0, []) for _ in images]
 
-        try:
-            predictions = self.yolo_model(image_path, verbose=False)
-
-            detections = []
-            max_conf = 0.0
-
-            for result in predictions:
-                if result.boxes is None:
-                    continue
-
-                for box in result.boxes:
-                    cls_id = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    cls_name = result.names.get(cls_id, "")
-
-                    # Check if it's a weapon-related class
-                    if cls_id in self.COCO_WEAPON_CLASSES or cls_name.lower() in ['knife', 'scissors', 'baseball bat']:
-                        if conf >= confidence_threshold:
-                            detections.append({
-                                "class": cls_name,
-                                "confidence": conf,
-                                "bbox": box.xyxy[0].tolist(),
-                                "source": "yolo"
-                            })
-                            max_conf = max(max_conf, conf)
-
-            return max_conf, detections
+        predictions = self.yolo_model([image.bgr for image in images], verbose=False)
+        return [self._parse_yolo(result, confidence_threshold) for result in predictions]
 
-        except Exception as e:
-            print(f"YOLO detection error: {e}")
-            return 0.0, []
+    def _parse_yolo(self, result, confidence_threshold: float) -> tuple:
+        """Extract weapon-class boxes from one ultralytics Results object"""
+        detections = []
+        max_conf = 0.0
 
-    def _classify_image(self, image_path: str) -> tuple:
-        """Use image classification to identify weapons"""
-        if self.classifier is None:
-            return 0.0, []
-
-        try:
-            from PIL import Image
-            image = Image.open(image_path).convert('RGB')
+        if result.boxes is None:
+            return max_conf, detections
 
-            predictions = self.classifier(image, top_k=10)
+        for box in result.boxes:
+            cls_id = int(box.cls[0])
+            conf = float(box.conf[0])
+            cls_name = result.names.get(cls_id, "")
+
+            # Check if it's a weapon-related class
+            if cls_id in self.COCO_WEAPON_CLASSES or cls_name.lower() in ['knife', 'scissors', 'baseball bat']:
+                if conf >= confidence_threshold:
+                    detections.append({
+                        "class": cls_name,
+                        "confidence": conf,
+                        "bbox": box.xyxy[0].tolist(),
+                        "source": "yolo"
+                    })
+                    max_conf = max(max_conf, conf)
 
-            weapon_labels = []
-            max_score = 0.0
+        return max_conf, detections
 
-            for pred in predictions:
-                label = pred['label'].lower()
-                score = pred['score']
+    def _classify_batch(self, images: List[DecodedImage]) -> List[tuple]:
+        """Use image classification to identify weapons (batched pipeline call; raises on failure)"""
+        if self.classifier is None:
+            return [(0.0, []) for _ in images]
+
+        predictions = self.classifier(
+            [image.pil for image in images],
+            top_k=10,
+            batch_size=len(images)
+        )
+        # A single input comes back as a flat list of predictions
+        if len(images) == 1 and predictions and isinstance(predictions[0], dict):
+            predictions = [predictions]
+
+        return [self._weapon_labels(preds) for preds in predictions]
+
+    def _weapon_labels(self, predictions: List[Dict]) -> tuple:
+        """Pick weapon-related labels out of one image's top-k predictions"""
+        weapon_labels = []
+        max_score = 0.0
 
-                # Check if label contains weapon keywords
-                for keyword in self.WEAPON_KEYWORDS:
-                    if keyword in label:
-                        weapon_labels.append(pred['label'])
-                        max_score = max(max_score, score)
-                        break
+        for pred in predictions:
+            label = pred['label'].lower()
+            score = pred['score']
 
-            return max_score, weapon_labels
+            # Check if label contains weapon keywords
+            for keyword in self.WEAPON_KEYWORDS:
+                if keyword in label:
+                    weapon_labels.append(pred['label'])
+                    max_score = max(max_score, score)
+                    break
 
-        except Exception as e:
-            print(f"Classification error: {e}")
-            return 0.0, []
+        return max_score, weapon_labels
 
-    def _analyze_for_guns(self, image_path: str) -> float:
+    def _analyze_for_guns(self, image: DecodedImage) -> float:
         """
         Visual analysis specifically for gun detection.
         Uses shape and color patterns common in firearms.
         """
         try:
-            from PIL import Image
-            import numpy as np
-
-            img = Image.open(image_path).convert('RGB')
-            img_array = np.array(img)
+            img_array = image.rgb
 
             # Analyze image characteristics
             height, width = img_array.shape[:2]
 
             # Convert to grayscale for edge analysis
-            gray = np.mean(img_array, axis=2)
+            gray = image.gray
 
             # Look for dark, elongated objects (gun-like shapes)
             dark_pixels = gray < 80  # Dark pixels (guns are often black/dark)
@@ -267,7 +338,7 @@ class WeaponDetector:
         Detect weapons in multiple video frames.
 
         Args:
-            frame_paths: List of paths to frame images
+            frame_paths: List of frame image paths or DecodedImages
 
         Returns:
             Aggregated results (max score across frames)
@@ -1,10 +1,11 @@
 import asyncio
-import os
-import tempfile
-from collections import defaultdict
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
+from app.services.decoded_image import DecodedImage
+from app.workers.model_host import get_model
+
 
 # Global model instances (loaded once per process for efficiency)
 _models = {}
@@ -12,67 +13,23 @@ _models_loaded = False
 
 
 def _load_models():
-    """Load all AI models once per worker process."""
+    """
+    Resolve all AI models once per worker process.
+
+    Detectors come from the shared model host (or its process-wide
+    singletons), so the coordinator never holds its own copies.
+    """
     global _models, _models_loaded
 
     if _models_loaded:
         return _models
 
-    # OCR Service
-    try:
-        from app.services.ocr_paddle import OCRService
-        _models['ocr'] = OCRService()
-        print("✓ OCR model loaded")
-    except Exception as e:
-        print(f"⚠ OCR not available: {e}")
-        _models['ocr'] = None
-
-    # NSFW Detector
-    try:
-        from app.services.nsfw_detector import NSFWDetector
-        _models['nsfw'] = NSFWDetector()
-        print("✓ NSFW detector loaded")
-    except Exception as e:
-        print(f"⚠ NSFW detector not available: {e}")
-        _models['nsfw'] = None
-
-    # Weapon Detector
-    try:
-        from app.services.yolo_weapons import WeaponDetector
-        _models['weapon'] = WeaponDetector()
-        print("✓ Weapon detector loaded")
-    except Exception as e:
-        print(f"⚠ Weapon detector not available: {e}")
-        _models['weapon'] = None
-
-    # Violence Detector
-    try:
-        from app.services.yolo_violence import ViolenceDetector
-        _models['violence'] = ViolenceDetector()
-        print("✓ Violence detector loaded")
-    except Exception as e:
-        print(f"⚠ Violence detector not available: {e}")
-        _models['violence'] = None
-
-    # Blood Detector
-    try:
-        from app.services.blood_detector import BloodDetector
-        _models['blood'] = BloodDetector()
-        print("✓ Blood detector loaded")
-    except Exception as e:
-        print(f"⚠ Blood detector not available: {e}")
-        _models['blood'] = None
-
-    # Text Moderator (Detoxify)
-    try:
-        from app.services.text_detoxify import DetoxifyService
-        _models['detoxify'] = DetoxifyService()
-        print("✓ Detoxify loaded")
-    except Exception as e:
-        print(f"⚠ Detoxify not available: {e}")
-        _models['detoxify'] = None
+    for key in ('ocr', 'nsfw', 'weapon', 'violence', 'blood', 'detoxify'):
+        _models[key] = get_model(key)
+        if _models[key] is not None:
+            print(f"✓ {key} model ready")
 
-    # Text Rules Engine
+    # Text Rules Engine (no model weights, stays local)
     try:
         from app.services.text_rules import TextRulesEngine
         _models['text_rules'] = TextRulesEngine()
@@ -85,23 +42,43 @@ def _load_models():
     return _models
 
 
-def _save_bytes_to_temp(asset_bytes: bytes, suffix: str = ".jpg") -> str:
-    """Save bytes to a temporary file and return path."""
-    fd, path = tempfile.mkstemp(suffix=suffix)
-    try:
-        os.write(fd, asset_bytes)
-    finally:
-        os.close(fd)
-    return path
+# Pipeline stages every task must pass through before it is finalized
+STAGES = ("ocr", "nsfw", "violence", "weapons", "policy")
 
+# Stages fed directly by the batcher; "policy" is fed by the OCR stage
+MEDIA_STAGES = ("ocr", "nsfw", "violence", "weapons")
 
-def _cleanup_temp(path: str):
-    """Remove temporary file."""
-    try:
-        if path and os.path.exists(path):
-            os.unlink(path)
-    except:
-        pass
+# Finished futures kept for wait_for_result() callers that arrive late
+FINISHED_RESULTS_KEPT = 1024
+
+# Concurrent consumers per stage queue
+DEFAULT_STAGE_CONCURRENCY = {
+    "ocr": 1,
+    "nsfw": 1,
+    "violence": 1,
+    "weapons": 1,
+    "policy": 1,
+}
+
+
+class _Task:
+    """
+    One scheduled asset.
+
+    Every stage queue holds references to the same _Task objects, so the
+    asset buffer (and its decoded pixels) exists once per task no matter
+    how many stages read it.
+    """
+
+    __slots__ = ("task_id", "asset", "asset_type", "future", "results", "partials")
+
+    def __init__(self, task_id: str, asset: Any, asset_type: str, future: asyncio.Future):
+        self.task_id = task_id
+        self.asset = asset
+        self.asset_type = asset_type
+        self.future = future
+        self.results: Dict[str, Any] = {"task_id": task_id, "type": asset_type}
+        self.partials: Optional[asyncio.Queue] = None
 
 
 class BatchCoordinator:
@@ -119,46 +96,64 @@ class BatchCoordinator:
     2. NSFW Worker - Detect nudity/sexual content
     3. Violence Worker - Detect violence/blood
     4. Weapons Worker - Detect guns/knives
-    5. Policy Worker - Apply text rules + reasoning
+    5. Policy Worker - Apply text rules + reasoning (after OCR)
+
+    Flow is event-driven: the batcher and every stage block on bounded
+    asyncio queues, and results are delivered by completing the task's
+    future - nothing sleeps or polls.
     """
 
     def __init__(
         self,
         batch_size: int = 8,
         max_wait_ms: int = 40,
-        max_workers: int = 4
+        max_workers: int = 4,
+        queue_size: int = 32,
+        stage_concurrency: Optional[Dict[str, int]] = None
     ):
+        """
+        Args:
+            batch_size: Max assets per batch
+            max_wait_ms: Max time to wait for a batch to fill
+            max_workers: Thread pool size for model inference
+            queue_size: Max batches buffered per stage (backpressure)
+            stage_concurrency: Per-stage consumer count overrides
+        """
         # Batch behavior
         self.batch_size = batch_size
         self.max_wait_ms = max_wait_ms / 1000
         self.max_workers = max_workers
 
-        # Task futures for result delivery
-        self._pending: Dict[str, asyncio.Future] = {}
+        self.stage_concurrency = dict(DEFAULT_STAGE_CONCURRENCY)
+        if stage_concurrency:
+            self.stage_concurrency.update(stage_concurrency)
+
+        # Live tasks by id
+        self._tasks: Dict[str, _Task] = {}
 
-        # Queue assets for batching
-        self._batch_queue = asyncio.Queue()
+        # Recently finalized futures by id (bounded, oldest dropped first)
+        self._finished: "OrderedDict[str, asyncio.Future]" = OrderedDict()
 
-        # Pipeline input buckets
-        self._buckets = defaultdict(list)
+        # Intake queue of single tasks, bounded so schedule() applies backpressure
+        self._intake: asyncio.Queue = asyncio.Queue(maxsize=queue_size * batch_size)
+
+        # Per-stage queues of batches (tuples of _Task references)
+        self._stage_queues: Dict[str, asyncio.Queue] = {
+            stage: asyncio.Queue(maxsize=queue_size) for stage in STAGES
+        }
 
         # Shutdown signaling
         self._closed = False
-
-        # Locks to protect concurrent batch draining
-        self._batch_lock = asyncio.Lock()
+        self._worker_tasks: List[asyncio.Task] = []
 
         # Thread pool for CPU-bound model inference
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
 
-        # Results accumulator
-        self._results: Dict[str, Dict[str, Any]] = {}
-
     # -------------------------------------------------
     # Public API
     # -------------------------------------------------
 
-    async def schedule(self, task_id: str, asset_bytes: bytes, asset_type: str = "image"):
+    async def schedule(self, task_id: str, asset_bytes: bytes, asset_type: str = "image") -> asyncio.Future:
         """
         Schedule a new moderation request.
 
@@ -166,15 +161,25 @@ class BatchCoordinator:
             task_id: Unique identifier for this task
             asset_bytes: Raw bytes of the image/media
             asset_type: Type of asset ("image", "video_frame", "text")
+
+        Returns:
+            Future resolved with the aggregated moderation result
         """
-        if task_id in self._pending:
-            return
+        task = self._tasks.get(task_id)
+        if task:
+            return task.future
 
-        fut = asyncio.get_event_loop().create_future()
-        self._pending[task_id] = fut
-        self._results[task_id] = {"task_id": task_id, "type": asset_type}
+        future = asyncio.get_event_loop().create_future()
+        self._finished.pop(task_id, None)
 
-        await self._batch_queue.put((task_id, asset_bytes, asset_type))
+        # Wrap media bytes once so every stage shares a single decode
+        asset = asset_bytes if asset_type == "text" else DecodedImage.from_bytes(asset_bytes)
+
+        task = _Task(task_id, asset, asset_type, future)
+        self._tasks[task_id] = task
+
+        await self._intake.put(task)
+        return future
 
     async def wait_for_result(self, task_id: str, timeout: float = 30.0) -> Optional[Dict]:
         """
@@ -185,19 +190,66 @@ class BatchCoordinator:
             timeout: Max seconds to wait
 
         Returns:
-            Aggregated moderation result or None if timeout
+            Aggregated moderation result, a timeout error, or None for an
+            unknown task id
         """
-        fut = self._pending.get(task_id)
-        if fut:
+        finished = self._finished.pop(task_id, None)
+        if finished is not None:
+            return finished.result()
+
+        task = self._tasks.get(task_id)
+        if task:
             try:
-                return await asyncio.wait_for(fut, timeout=timeout)
+                return await asyncio.wait_for(asyncio.shield(task.future), timeout=timeout)
             except asyncio.TimeoutError:
                 return {"error": "timeout", "task_id": task_id}
         return None
 
+    async def partials(self, task_id: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield (stage, result) pairs as each stage finishes for a task.
+
+        Stages that already completed are replayed first. The iterator
+        ends when the task is finalized; await the future for the
+        aggregated result.
+        """
+        task = self._tasks.get(task_id)
+        if task is None or task.future.done():
+            return
+
+        if task.partials is None:
+            task.partials = asyncio.Queue()
+            for stage in STAGES:
+                if stage in task.results:
+                    task.partials.put_nowait((stage, task.results[stage]))
+
+        while True:
+            update = await task.partials.get()
+            if update is None:
+                return
+            yield update
+
+    async def load_models(self):
+        """Load model weights in the inference pool."""
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(self._executor, _load_models)
+
     async def shutdown(self):
         """Gracefully shutdown the coordinator."""
         self._closed = True
+
+        for worker in self._worker_tasks:
+            worker.cancel()
+        self._worker_tasks = []
+
+        for task in self._tasks.values():
+            if not task.future.done():
+                task.future.cancel()
+            if task.partials is not None:
+                task.partials.put_nowait(None)
+        self._tasks.clear()
+        self._finished.clear()
+
         self._executor.shutdown(wait=False)
 
     # -------------------------------------------------
@@ -209,17 +261,29 @@ class BatchCoordinator:
         Start batching + async workers in parallel.
         """
         # Pre-load models
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(self._executor, _load_models)
+        await self.load_models()
+
+        handlers = {
+            "ocr": self._ocr_stage,
+            "nsfw": self._nsfw_stage,
+            "violence": self._violence_stage,
+            "weapons": self._weapons_stage,
+            "policy": self._policy_stage,
+        }
+
+        self._worker_tasks = [asyncio.create_task(self._run_batcher())]
+        for stage, handler in handlers.items():
+            for _ in range(max(1, self.stage_concurrency.get(stage, 1))):
+                self._worker_tasks.append(
+                    asyncio.create_task(self._run_stage(stage, handler))
+                )
 
-        await asyncio.gather(
-            self._run_batcher(),
-            self._run_ocr_worker(),
-            self._run_nsfw_worker(),
-            self._run_violence_worker(),
-            self._run_weapons_worker(),
-            self._run_policy_worker(),
-        )
+        try:
+            await asyncio.gather(*self._worker_tasks)
+        except asyncio.CancelledError:
+            for worker in self._worker_tasks:
+                worker.cancel()
+            raise
 
     # -------------------------------------------------
     # Batching Loop
@@ -227,161 +291,147 @@ class BatchCoordinator:
 
     async def _run_batcher(self):
         """Collects tasks and forms batches for workers."""
-        while not self._closed:
-            try:
-                task = await asyncio.wait_for(
-                    self._batch_queue.get(),
-                    timeout=self.max_wait_ms
-                )
-            except asyncio.TimeoutError:
-                task = None
-
-            async with self._batch_lock:
-                if task:
-                    task_id, asset, asset_type = task
-                    self._buckets["raw"].append((task_id, asset, asset_type))
-
-                # Flush when batch is full or on timeout with pending items
-                if len(self._buckets["raw"]) >= self.batch_size:
-                    batch = self._buckets["raw"][:self.batch_size]
-                    self._buckets["raw"] = self._buckets["raw"][self.batch_size:]
-                    await self._schedule_batch_to_workers(batch)
-                elif task is None and self._buckets["raw"]:
-                    batch = self._buckets["raw"]
-                    self._buckets["raw"] = []
-                    await self._schedule_batch_to_workers(batch)
-
-    async def _schedule_batch_to_workers(self, batch: List[tuple]):
-        """Broadcast batch to all worker pipelines."""
-        # Each worker gets a copy of the batch
-        self._buckets["ocr_in"].extend(batch)
-        self._buckets["nsfw_in"].extend(batch)
-        self._buckets["violence_in"].extend(batch)
-        self._buckets["weapons_in"].extend(batch)
-        self._buckets["policy_in"].extend(batch)
-
-    # -------------------------------------------------
-    # Worker Implementations (with real models)
-    # -------------------------------------------------
-
-    async def _run_ocr_worker(self):
-        """Worker: Extract text from images using PaddleOCR."""
-        while not self._closed:
-            if not self._buckets["ocr_in"]:
-                await asyncio.sleep(0.005)
-                continue
-
-            batch = self._buckets["ocr_in"]
-            self._buckets["ocr_in"] = []
-
-            for task_id, asset_bytes, asset_type in batch:
-                if asset_type == "text":
-                    # Text assets don't need OCR
-                    self._append_result(task_id, "ocr", {"text": "", "skipped": True})
-                    continue
-
-                result = await self._run_ocr(asset_bytes)
-                self._append_result(task_id, "ocr", result)
-
-    async def _run_nsfw_worker(self):
-        """Worker: Detect NSFW content."""
-        while not self._closed:
-            if not self._buckets["nsfw_in"]:
-                await asyncio.sleep(0.005)
-                continue
-
-            batch = self._buckets["nsfw_in"]
-            self._buckets["nsfw_in"] = []
-
-            for task_id, asset_bytes, asset_type in batch:
-                if asset_type == "text":
-                    self._append_result(task_id, "nsfw", {"score": 0.0, "skipped": True})
-                    continue
-
-                result = await self._run_nsfw(asset_bytes)
-                self._append_result(task_id, "nsfw", result)
+        loop = asyncio.get_event_loop()
 
-    async def _run_violence_worker(self):
-        """Worker: Detect violence and blood."""
         while not self._closed:
-            if not self._buckets["violence_in"]:
-                await asyncio.sleep(0.005)
-                continue
-
-            batch = self._buckets["violence_in"]
-            self._buckets["violence_in"] = []
+            # Block until work arrives
+            batch = [await self._intake.get()]
+
+            # Fill the batch until it is full or max_wait_ms has passed
+            deadline = loop.time() + self.max_wait_ms
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._intake.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._schedule_batch_to_workers(tuple(batch))
+
+    async def _schedule_batch_to_workers(self, batch: Tuple[_Task, ...]):
+        """Hand the same batch tuple to every media stage."""
+        for stage in MEDIA_STAGES:
+            await self._stage_queues[stage].put(batch)
+
+    async def _run_stage(self, stage: str, handler):
+        """Consume batches for one stage until cancelled."""
+        queue = self._stage_queues[stage]
 
-            for task_id, asset_bytes, asset_type in batch:
-                if asset_type == "text":
-                    self._append_result(task_id, "violence", {"score": 0.0, "skipped": True})
-                    continue
-
-                result = await self._run_violence(asset_bytes)
-                self._append_result(task_id, "violence", result)
-
-    async def _run_weapons_worker(self):
-        """Worker: Detect weapons."""
         while not self._closed:
-            if not self._buckets["weapons_in"]:
-                await asyncio.sleep(0.005)
-                continue
-
-            batch = self._buckets["weapons_in"]
-            self._buckets["weapons_in"] = []
+            batch = await queue.get()
+            try:
+                await handler(batch)
+            except Exception as e:
+                # Never leave a task waiting on a stage that crashed
+                for task in batch:
+                    if stage not in task.results:
+                        self._append_result(task, stage, {"error": str(e)})
+            finally:
+                queue.task_done()
 
-            for task_id, asset_bytes, asset_type in batch:
-                if asset_type == "text":
-                    self._append_result(task_id, "weapons", {"score": 0.0, "skipped": True})
-                    continue
+    # -------------------------------------------------
+    # Stage Implementations (with real models)
+    # -------------------------------------------------
 
-                result = await self._run_weapons(asset_bytes)
-                self._append_result(task_id, "weapons", result)
+    async def _ocr_stage(self, batch: Tuple[_Task, ...]):
+        """Stage: Extract text from images using PaddleOCR, then feed policy."""
+        try:
+            # Text assets don't need OCR
+            tasks, images = self._split_media(batch, "ocr", {"text": "", "skipped": True})
+            if images:
+                results = await self._run_ocr_batch(images)
+                for task, result in zip(tasks, results):
+                    self._append_result(task, "ocr", result)
+        finally:
+            # Policy reads OCR text, so it only sees the batch once OCR is done
+            await self._stage_queues["policy"].put(batch)
+
+    async def _nsfw_stage(self, batch: Tuple[_Task, ...]):
+        """Stage: Detect NSFW content."""
+        tasks, images = self._split_media(batch, "nsfw", {"score": 0.0, "skipped": True})
+        if images:
+            results = await self._run_nsfw_batch(images)
+            for task, result in zip(tasks, results):
+                self._append_result(task, "nsfw", result)
+
+    async def _violence_stage(self, batch: Tuple[_Task, ...]):
+        """Stage: Detect violence and blood."""
+        tasks, images = self._split_media(batch, "violence", {"score": 0.0, "skipped": True})
+        if images:
+            results = await self._run_violence_batch(images)
+            for task, result in zip(tasks, results):
+                self._append_result(task, "violence", result)
+
+    async def _weapons_stage(self, batch: Tuple[_Task, ...]):
+        """Stage: Detect weapons."""
+        tasks, images = self._split_media(batch, "weapons", {"score": 0.0, "skipped": True})
+        if images:
+            results = await self._run_weapons_batch(images)
+            for task, result in zip(tasks, results):
+                self._append_result(task, "weapons", result)
+
+    async def _policy_stage(self, batch: Tuple[_Task, ...]):
+        """Stage: Apply policy rules to OCR text."""
+        texts = [task.results.get("ocr", {}).get("text", "") for task in batch]
+        results = await self._run_policy_batch(texts)
+        for task, result in zip(batch, results):
+            self._append_result(task, "policy", result)
+
+    def _split_media(
+        self,
+        batch: Tuple[_Task, ...],
+        key: str,
+        skipped: Dict[str, Any]
+    ) -> Tuple[List[_Task], List[DecodedImage]]:
+        """
+        Separate a batch into media items for inference.
 
-    async def _run_policy_worker(self):
-        """Worker: Apply policy rules and make final decision."""
-        while not self._closed:
-            if not self._buckets["policy_in"]:
-                await asyncio.sleep(0.005)
+        Text assets get the ``skipped`` placeholder result immediately.
+        """
+        tasks = []
+        images = []
+        for task in batch:
+            if task.asset_type == "text":
+                self._append_result(task, key, dict(skipped))
                 continue
-
-            batch = self._buckets["policy_in"]
-            self._buckets["policy_in"] = []
-
-            for task_id, asset_bytes, asset_type in batch:
-                result = await self._run_policy(task_id)
-                self._append_result(task_id, "policy", result)
+            tasks.append(task)
+            images.append(task.asset)
+        return tasks, images
 
     # -------------------------------------------------
     # Result Aggregator
     # -------------------------------------------------
 
-    def _append_result(self, task_id: str, key: str, value: Any):
-        """Append partial result and complete future when all pipelines done."""
-        if task_id not in self._results:
-            self._results[task_id] = {"task_id": task_id}
-
-        self._results[task_id][key] = value
+    def _append_result(self, task: _Task, key: str, value: Any):
+        """Record a stage result and complete the future when all stages are done."""
+        task.results[key] = value
 
-        # Check if all 5 pipelines completed
-        result = self._results[task_id]
-        required_keys = {"ocr", "nsfw", "violence", "weapons", "policy"}
+        if task.partials is not None:
+            task.partials.put_nowait((key, value))
 
-        if required_keys.issubset(result.keys()):
+        if all(stage in task.results for stage in STAGES):
             # All pipelines complete - finalize result
-            final_result = self._finalize_result(task_id)
+            final_result = self._finalize_result(task.results)
 
-            fut = self._pending.get(task_id)
-            if fut and not fut.done():
-                fut.set_result(final_result)
+            if not task.future.done():
+                task.future.set_result(final_result)
 
-            # Cleanup
-            del self._results[task_id]
-            if task_id in self._pending:
-                del self._pending[task_id]
+            if task.partials is not None:
+                task.partials.put_nowait(None)
 
-    def _finalize_result(self, task_id: str) -> Dict[str, Any]:
+            # Cleanup (drops the asset buffer); the future stays reachable
+            # for a wait_for_result() that comes after the task finished
+            self._tasks.pop(task.task_id, None)
+            task.asset = None
+            self._finished[task.task_id] = task.future
+            while len(self._finished) > FINISHED_RESULTS_KEPT:
+                self._finished.popitem(last=False)
+
+    def _finalize_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Aggregate all pipeline results into final moderation decision."""
-        result = self._results.get(task_id, {})
+        task_id = result.get("task_id")
 
         # Extract scores
         nsfw_score = result.get("nsfw", {}).get("score", 0.0)
@@ -445,215 +495,172 @@ class BatchCoordinator:
     # Model Execution (actual implementations)
     # -------------------------------------------------
 
-    async def _run_ocr(self, asset_bytes: bytes) -> Dict[str, Any]:
-        """Run OCR on image bytes."""
+    async def _run_ocr_batch(self, images: List[DecodedImage]) -> List[Dict[str, Any]]:
+        """Run OCR on a bucket of decoded images."""
         models = _load_models()
         ocr = models.get('ocr')
 
         if not ocr:
-            return {"text": "", "error": "OCR not available"}
+            return [{"text": "", "error": "OCR not available"} for _ in images]
 
-        temp_path = None
         try:
-            # Save bytes to temp file
             loop = asyncio.get_event_loop()
-            temp_path = await loop.run_in_executor(
+            results = await loop.run_in_executor(
                 self._executor,
-                _save_bytes_to_temp,
-                asset_bytes,
-                ".jpg"
+                ocr.extract_text_batch,
+                images
             )
 
-            # Run OCR
-            result = await loop.run_in_executor(
-                self._executor,
-                ocr.extract_text,
-                temp_path
-            )
-
-            return {
+            return [{
                 "text": result.get("text", ""),
                 "lines": result.get("lines", []),
                 "num_lines": result.get("num_lines", 0)
-            }
+            } for result in results]
         except Exception as e:
-            return {"text": "", "error": str(e)}
-        finally:
-            if temp_path:
-                _cleanup_temp(temp_path)
+            return [{"text": "", "error": str(e)} for _ in images]
 
-    async def _run_nsfw(self, asset_bytes: bytes) -> Dict[str, Any]:
-        """Run NSFW detection on image bytes."""
+    async def _run_nsfw_batch(self, images: List[DecodedImage]) -> List[Dict[str, Any]]:
+        """Run NSFW detection on a bucket with one forward pass per model."""
         models = _load_models()
         nsfw = models.get('nsfw')
 
         if not nsfw:
-            return {"score": 0.0, "error": "NSFW detector not available"}
+            return [{"score": 0.0, "error": "NSFW detector not available"} for _ in images]
 
-        temp_path = None
         try:
             loop = asyncio.get_event_loop()
-            temp_path = await loop.run_in_executor(
-                self._executor,
-                _save_bytes_to_temp,
-                asset_bytes,
-                ".jpg"
-            )
-
-            result = await loop.run_in_executor(
+            results = await loop.run_in_executor(
                 self._executor,
-                nsfw.analyze_image,
-                temp_path
+                nsfw.detect_batch,
+                images
             )
 
-            return {
+            return [{
                 "score": max(result.get("nudity", 0.0), result.get("sexual_content", 0.0)),
                 "nudity": result.get("nudity", 0.0),
                 "sexual_content": result.get("sexual_content", 0.0)
-            }
+            } for result in results]
         except Exception as e:
-            return {"score": 0.0, "error": str(e)}
-        finally:
-            if temp_path:
-                _cleanup_temp(temp_path)
+            return [{"score": 0.0, "error": str(e)} for _ in images]
 
-    async def _run_violence(self, asset_bytes: bytes) -> Dict[str, Any]:
-        """Run violence and blood detection on image bytes."""
+    async def _run_violence_batch(self, images: List[DecodedImage]) -> List[Dict[str, Any]]:
+        """Run violence and blood detection on a bucket with one forward pass each."""
         models = _load_models()
         violence = models.get('violence')
         blood = models.get('blood')
 
-        temp_path = None
         try:
             loop = asyncio.get_event_loop()
-            temp_path = await loop.run_in_executor(
-                self._executor,
-                _save_bytes_to_temp,
-                asset_bytes,
-                ".jpg"
-            )
 
-            violence_score = 0.0
-            blood_score = 0.0
+            violence_scores = [0.0] * len(images)
+            blood_scores = [0.0] * len(images)
 
             if violence:
-                v_result = await loop.run_in_executor(
+                v_results = await loop.run_in_executor(
                     self._executor,
-                    violence.detect,
-                    temp_path
+                    violence.detect_batch,
+                    images
                 )
-                violence_score = v_result.get("violence_score", 0.0)
+                violence_scores = [r.get("violence_score", 0.0) for r in v_results]
 
             if blood:
-                b_result = await loop.run_in_executor(
+                b_results = await loop.run_in_executor(
                     self._executor,
-                    blood.detect,
-                    temp_path
+                    blood.detect_batch,
+                    images
                 )
-                blood_score = b_result.get("blood_score", 0.0)
+                blood_scores = [r.get("blood_score", 0.0) for r in b_results]
 
-            return {
+            return [{
                 "violence_score": violence_score,
                 "blood_score": blood_score
-            }
+            } for violence_score, blood_score in zip(violence_scores, blood_scores)]
         except Exception as e:
-            return {"violence_score": 0.0, "blood_score": 0.0, "error": str(e)}
-        finally:
-            if temp_path:
-                _cleanup_temp(temp_path)
+            return [{"violence_score": 0.0, "blood_score": 0.0, "error": str(e)} for _ in images]
 
-    async def _run_weapons(self, asset_bytes: bytes) -> Dict[str, Any]:
-        """Run weapon detection on image bytes."""
+    async def _run_weapons_batch(self, images: List[DecodedImage]) -> List[Dict[str, Any]]:
+        """Run weapon detection on a bucket with one forward pass per model."""
         models = _load_models()
         weapon = models.get('weapon')
 
         if not weapon:
-            return {"weapon_score": 0.0, "error": "Weapon detector not available"}
+            return [{"weapon_score": 0.0, "error": "Weapon detector not available"} for _ in images]
 
-        temp_path = None
         try:
             loop = asyncio.get_event_loop()
-            temp_path = await loop.run_in_executor(
-                self._executor,
-                _save_bytes_to_temp,
-                asset_bytes,
-                ".jpg"
-            )
-
-            result = await loop.run_in_executor(
+            results = await loop.run_in_executor(
                 self._executor,
-                weapon.detect,
-                temp_path
+                weapon.detect_batch,
+                images
             )
 
-            return {
+            return [{
                 "weapon_score": result.get("weapon_score", 0.0),
                 "weapon_detected": result.get("weapon_detected", False),
                 "weapon_types": result.get("weapon_types", [])
-            }
+            } for result in results]
         except Exception as e:
-            return {"weapon_score": 0.0, "error": str(e)}
-        finally:
-            if temp_path:
-                _cleanup_temp(temp_path)
+            return [{"weapon_score": 0.0, "error": str(e)} for _ in images]
 
-    async def _run_policy(self, task_id: str) -> Dict[str, Any]:
-        """Apply policy rules based on accumulated results."""
+    async def _run_policy_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Apply policy rules to the OCR text of a batch (one Detoxify pass)."""
         models = _load_models()
         text_rules = models.get('text_rules')
         detoxify = models.get('detoxify')
 
-        result = self._results.get(task_id, {})
-        ocr_text = result.get("ocr", {}).get("text", "")
-
-        policy_result = {
+        policy_results = [{
             "has_violations": False,
             "should_block": False,
             "flags": [],
             "reasons": []
-        }
+        } for _ in texts]
+
+        loop = asyncio.get_event_loop()
 
         # Check text rules
-        if text_rules and ocr_text:
-            try:
-                loop = asyncio.get_event_loop()
-                rules_result = await loop.run_in_executor(
-                    self._executor,
-                    text_rules.check,
-                    ocr_text
-                )
+        if text_rules:
+            for text, policy_result in zip(texts, policy_results):
+                if not text:
+                    continue
+                try:
+                    rules_result = await loop.run_in_executor(
+                        self._executor,
+                        text_rules.check,
+                        text
+                    )
 
-                if rules_result.get("has_violations"):
-                    policy_result["has_violations"] = True
-                    policy_result["flags"].extend(rules_result.get("flags", []))
-                    policy_result["reasons"].extend(rules_result.get("reasons", []))
+                    if rules_result.get("has_violations"):
+                        policy_result["has_violations"] = True
+                        policy_result["flags"].extend(rules_result.get("flags", []))
+                        policy_result["reasons"].extend(rules_result.get("reasons", []))
 
-                if rules_result.get("should_block"):
-                    policy_result["should_block"] = True
+                    if rules_result.get("should_block"):
+                        policy_result["should_block"] = True
 
-            except Exception as e:
-                policy_result["error"] = str(e)
+                except Exception as e:
+                    policy_result["error"] = str(e)
 
         # Check toxicity
-        if detoxify and ocr_text:
+        indices = [i for i, text in enumerate(texts) if text]
+        if detoxify and indices:
             try:
-                loop = asyncio.get_event_loop()
-                toxicity = await loop.run_in_executor(
+                scores = await loop.run_in_executor(
                     self._executor,
-                    detoxify.analyze,
-                    ocr_text
+                    detoxify.analyze_batch,
+                    [texts[i] for i in indices]
                 )
 
-                if toxicity.get("toxicity", 0.0) > 0.5:
-                    policy_result["has_violations"] = True
-                    policy_result["flags"].append("toxic_text")
+                for i, toxicity in zip(indices, scores):
+                    if toxicity.get("toxicity", 0.0) > 0.5:
+                        policy_results[i]["has_violations"] = True
+                        policy_results[i]["flags"].append("toxic_text")
 
-                policy_result["toxicity_scores"] = toxicity
+                    policy_results[i]["toxicity_scores"] = toxicity
 
             except Exception as e:
                 pass
 
-        return policy_result
+        return policy_results
 
 
 # Convenience function to create and run coordinator
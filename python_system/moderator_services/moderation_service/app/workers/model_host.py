@@ -0,0 +1,595 @@
+"""
+Model Host
+Serves detector models from dedicated worker processes.
+
+Every pipeline (MasterModerationPipeline, BatchCoordinator,
+VideoFrameProcessor, audio chunk processing) obtains models through
+``get_model(name)``. Without a running host that returns a process-wide
+singleton, so a process never holds two copies of the same model. With
+the host started, it returns a ``RemoteModel`` proxy whose calls are sent
+over a pipe to the worker process that owns the model:
+
+- each worker process loads its models exactly once
+- decoded images travel through shared memory (decoded once by the caller)
+- requests queued on a worker are coalesced into ``*_batch`` calls; a
+  caller whose items come back as errors is re-run on its own
+- inference runs outside the caller's process and off its event loop
+- a worker that died is respawned on the next call routed to it
+
+Usage:
+    start_model_host()                      # once, at service startup
+    nsfw = get_model("nsfw")
+    scores = nsfw.detect_batch(images)      # same API as NSFWDetector
+    stop_model_host()
+"""
+
+import importlib
+import itertools
+import multiprocessing
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.decoded_image import DecodedImage
+
+
+# name -> "module:Class" (instantiated with no arguments)
+MODEL_SPECS = {
+    "ocr": "app.services.ocr_paddle:OCRService",
+    "nsfw": "app.services.nsfw_detector:NSFWDetector",
+    "weapon": "app.services.yolo_weapons:WeaponDetector",
+    "violence": "app.services.yolo_violence:ViolenceDetector",
+    "blood": "app.services.blood_detector:BloodDetector",
+    "detoxify": "app.services.text_detoxify:DetoxifyService",
+    "asr": "app.services.asr_whisper:ASRService",
+}
+
+# name -> methods callable through the host (RemoteModel and the worker
+# both refuse anything else)
+MODEL_METHODS = {
+    "ocr": ("extract_text", "extract_text_batch", "extract_from_frames",
+            "detect_urls", "detect_phone_numbers"),
+    "nsfw": ("analyze_image", "detect_batch", "analyze_video_frames"),
+    "weapon": ("detect", "detect_batch", "detect_video_frames"),
+    "violence": ("detect", "detect_batch", "detect_video_frames"),
+    "blood": ("detect", "detect_batch", "detect_video_frames"),
+    "detoxify": ("analyze", "analyze_batch"),
+    "asr": ("transcribe", "transcribe_with_timestamps"),
+}
+
+# name -> attribute left None when the service constructed but its weights
+# didn't load; such a service only returns errors, so it counts as unavailable
+REQUIRED_ATTRS = {
+    "asr": "model",
+}
+
+# Seconds before a worker that died is respawned again
+RESPAWN_BACKOFF = 10.0
+
+# Single-item methods that can be coalesced into a batch method
+BATCH_METHODS = {
+    "detect": "detect_batch",
+    "analyze_image": "detect_batch",
+    "extract_text": "extract_text_batch",
+    "analyze": "analyze_batch",
+}
+
+
+class ModelHostError(RuntimeError):
+    """Raised when a hosted model call fails or the host is unavailable."""
+
+
+# =============================================================================
+# In-process singletons
+# =============================================================================
+
+_local_models: Dict[str, Any] = {}
+_local_lock = threading.Lock()
+
+
+def load_local_model(name: str) -> Optional[Any]:
+    """
+    Instantiate a model once per process.
+
+    Failures are cached as None so callers degrade the same way they did
+    when each pipeline loaded its own copy.
+    """
+    if name in _local_models:
+        return _local_models[name]
+
+    with _local_lock:
+        if name in _local_models:
+            return _local_models[name]
+
+        spec = MODEL_SPECS.get(name)
+        if spec is None:
+            raise KeyError(f"Unknown model: {name}")
+
+        module_name, class_name = spec.split(":")
+        try:
+            module = importlib.import_module(module_name)
+            instance = getattr(module, class_name)()
+        except Exception as e:
+            print(f"⚠ {class_name} not available: {e}")
+            instance = None
+
+        required = REQUIRED_ATTRS.get(name)
+        if instance is not None and required and getattr(instance, required, None) is None:
+            print(f"⚠ {class_name} not available: {required} not loaded")
+            instance = None
+        _local_models[name] = instance
+
+        return _local_models[name]
+
+
+# =============================================================================
+# Shared-memory image transport
+# =============================================================================
+
+class _SharedImage:
+    """Picklable handle to an RGB array stored in shared memory."""
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return (self.name, self.shape, self.dtype)
+
+    def __setstate__(self, state):
+        self.name, self.shape, self.dtype = state
+
+    def load(self) -> DecodedImage:
+        """Copy the pixels out of shared memory into a local DecodedImage."""
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, track=False)
+        except TypeError:
+            # Python < 3.13: attaching registers with the resource tracker,
+            # which the worker shares with the owner. Skip the registration
+            # so the owner's unlink stays the only bookkeeping entry.
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args, **kwargs: None
+            try:
+                shm = shared_memory.SharedMemory(name=self.name)
+            finally:
+                resource_tracker.register = register
+
+        try:
+            view = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+            rgb = np.array(view)
+            del view
+        finally:
+            shm.close()
+
+        return DecodedImage.from_array(rgb)
+
+
+def _release_segment(shm: shared_memory.SharedMemory):
+    try:
+        shm.close()
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class _SegmentPool:
+    """
+    Owns the shared-memory copy of each DecodedImage sent to the host.
+
+    A DecodedImage sent to several models (NSFW, YOLO, OCR...) is copied
+    into shared memory once; the segment is freed when the image is
+    garbage-collected.
+    """
+
+    def __init__(self):
+        self._handles: "weakref.WeakKeyDictionary[DecodedImage, _SharedImage]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def share(self, image: DecodedImage) -> _SharedImage:
+        with self._lock:
+            handle = self._handles.get(image)
+            if handle is not None:
+                return handle
+
+            rgb = image.rgb
+            shm = shared_memory.SharedMemory(create=True, size=max(1, rgb.nbytes))
+            np.ndarray(rgb.shape, dtype=rgb.dtype, buffer=shm.buf)[...] = rgb
+
+            handle = _SharedImage(shm.name, rgb.shape, rgb.dtype.str)
+            self._handles[image] = handle
+            weakref.finalize(image, _release_segment, shm)
+            return handle
+
+
+def _pack(value: Any, pool: _SegmentPool) -> Any:
+    """Replace DecodedImages (also inside lists/tuples) with shared handles."""
+    if isinstance(value, DecodedImage):
+        return pool.share(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_pack(v, pool) for v in value)
+    return value
+
+
+def _unpack(value: Any) -> Any:
+    if isinstance(value, _SharedImage):
+        return value.load()
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unpack(v) for v in value)
+    return value
+
+
+# =============================================================================
+# Worker process
+# =============================================================================
+
+def _serve(conn, model_names: Sequence[str], max_batch: int):
+    """Worker process main loop: load models once, then answer requests."""
+    models = {name: load_local_model(name) for name in model_names}
+    conn.send(("ready", {name: model is not None for name, model in models.items()}))
+
+    while True:
+        try:
+            requests = [conn.recv()]
+        except EOFError:
+            return
+
+        # Coalesce whatever else is already queued on the pipe
+        while len(requests) < max_batch and conn.poll():
+            requests.append(conn.recv())
+
+        if any(request is None for request in requests):
+            requests = [r for r in requests if r is not None]
+            _handle_requests(conn, models, requests)
+            return
+
+        _handle_requests(conn, models, requests)
+
+
+def _is_error(output: Any) -> bool:
+    """A batch method's per-item error result ({..., "error": ...})."""
+    return isinstance(output, dict) and bool(output.get("error"))
+
+
+def _call_alone(conn, model: Any, request: tuple):
+    """Answer one request with its own (uncoalesced) call."""
+    request_id, name, method, args, kwargs = request
+    try:
+        conn.send((request_id, True, getattr(model, method)(*_unpack(args), **kwargs)))
+    except Exception as e:
+        conn.send((request_id, False, f"{name}.{method} failed: {e}"))
+
+
+def _handle_requests(conn, models: Dict[str, Any], requests: List[tuple]):
+    """Group requests by (model, batch method) and answer each one."""
+    groups: Dict[Tuple[str, str], List[tuple]] = {}
+    singles: List[tuple] = []
+
+    for request in requests:
+        request_id, name, method, args, kwargs = request
+        model = models.get(name)
+        batch_method = method if method.endswith("_batch") else BATCH_METHODS.get(method)
+
+        if method not in MODEL_METHODS.get(name, ()):
+            conn.send((request_id, False, f"{name}.{method} is not exposed by the model host"))
+            continue
+
+        if (
+            model is not None and batch_method and not kwargs and len(args) == 1
+            and batch_method in MODEL_METHODS[name] and hasattr(model, batch_method)
+        ):
+            groups.setdefault((name, batch_method), []).append(request)
+        else:
+            singles.append(request)
+
+    for (name, batch_method), group in groups.items():
+        # Flatten every request's items into one list for a single call
+        batch = []
+        sizes = []
+        items = []
+        for request in group:
+            request_id, _, method, args, _ = request
+            try:
+                values = _unpack(args[0])
+            except Exception as e:
+                # Only this caller's input is bad; the rest of the batch still runs
+                conn.send((request_id, False, f"{name}.{method} failed: {e}"))
+                continue
+            batch.append(request)
+            if method == batch_method:
+                sizes.append(len(values))
+                items.extend(values)
+            else:
+                sizes.append(None)
+                items.append(values)
+
+        if not batch:
+            continue
+
+        try:
+            outputs = getattr(models[name], batch_method)(items)
+            if len(outputs) != len(items):
+                raise ValueError(f"returned {len(outputs)} results for {len(items)} items")
+        except Exception as e:
+            if len(batch) == 1 and batch[0][2] == batch_method:
+                conn.send((batch[0][0], False, f"{name}.{batch_method} failed: {e}"))
+            else:
+                # Don't let one caller's input fail everyone coalesced with it
+                for request in batch:
+                    _call_alone(conn, models[name], request)
+            continue
+
+        offset = 0
+        for request, size in zip(batch, sizes):
+            if size is None:
+                value, offset = outputs[offset], offset + 1
+                failed = _is_error(value)
+            else:
+                value, offset = list(outputs[offset:offset + size]), offset + size
+                failed = any(_is_error(v) for v in value)
+
+            if failed and (len(batch) > 1 or request[2] != batch_method):
+                # Batch methods report bad items as error results; redo this
+                # caller alone so its answer matches an uncoalesced call
+                _call_alone(conn, models[name], request)
+            else:
+                conn.send((request[0], True, value))
+
+    for request in singles:
+        model = models.get(request[1])
+        if model is None:
+            conn.send((request[0], False, f"Model '{request[1]}' is not available"))
+            continue
+        _call_alone(conn, model, request)
+
+
+# =============================================================================
+# Client side
+# =============================================================================
+
+class _WorkerHandle:
+    """Parent-side end of one worker process."""
+
+    def __init__(self, ctx, model_names: Sequence[str], max_batch: int):
+        self.model_names = tuple(model_names)
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_serve,
+            args=(child_conn, self.model_names, max_batch),
+            name=f"model-host-{'-'.join(self.model_names)}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.available: Dict[str, bool] = {}
+        self._send_lock = threading.Lock()
+        self._futures: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._reader = None
+
+    def wait_ready(self):
+        try:
+            tag, available = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise ModelHostError(f"Model host worker exited while loading: {e}")
+        self.available = available
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        """Process running and its pipe still being read"""
+        return (
+            self.process.is_alive()
+            and self._reader is not None and self._reader.is_alive()
+        )
+
+    def submit(self, name: str, method: str, args: tuple, kwargs: dict) -> Future:
+        future = Future()
+        with self._send_lock:
+            request_id = next(self._ids)
+            self._futures[request_id] = future
+            try:
+                self.conn.send((request_id, name, method, args, kwargs))
+            except (OSError, EOFError) as e:
+                self._futures.pop(request_id, None)
+                future.set_exception(ModelHostError(f"Model host worker unavailable: {e}"))
+        return future
+
+    def _read_loop(self):
+        while True:
+            try:
+                request_id, ok, value = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            future = self._futures.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(ModelHostError(value))
+
+        # Worker is gone - fail anything still waiting
+        for future in list(self._futures.values()):
+            if not future.done():
+                future.set_exception(ModelHostError("Model host worker exited"))
+        self._futures.clear()
+
+    def stop(self, timeout: float = 5.0):
+        try:
+            with self._send_lock:
+                self.conn.send(None)
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class ModelHost:
+    """
+    Pool of model-serving processes.
+
+    Args:
+        groups: worker name -> model names loaded in that process
+                (defaults to one process per model in MODEL_SPECS)
+        max_batch: Max queued requests coalesced per worker iteration
+    """
+
+    def __init__(self, groups: Optional[Dict[str, Sequence[str]]] = None, max_batch: int = 32):
+        self.groups = groups or {name: [name] for name in MODEL_SPECS}
+        self.max_batch = max_batch
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: Dict[str, _WorkerHandle] = {}
+        self._routes: Dict[str, _WorkerHandle] = {}
+        self._group_of = {name: group for group, names in self.groups.items() for name in names}
+        self._respawned_at: Dict[str, float] = {}
+        self._respawn_lock = threading.Lock()
+        self._segments = _SegmentPool()
+
+    def start(self):
+        """Spawn all workers and wait until their models are loaded."""
+        # Start every process first so models load in parallel
+        for group, model_names in self.groups.items():
+            self._workers[group] = _WorkerHandle(self._ctx, model_names, self.max_batch)
+
+        for worker in self._workers.values():
+            worker.wait_ready()
+            self._route(worker)
+
+        print(f"✓ Model host started: {sorted(self._routes)}")
+
+    def stop(self):
+        for worker in self._workers.values():
+            worker.stop()
+        self._workers.clear()
+        self._routes.clear()
+
+    def hosts(self, name: str) -> bool:
+        return name in self._routes
+
+    def _route(self, worker: _WorkerHandle):
+        for name, ok in worker.available.items():
+            if ok:
+                self._routes[name] = worker
+            elif self._routes.get(name) is not None:
+                del self._routes[name]
+
+    def _live_worker(self, name: str) -> _WorkerHandle:
+        """The worker serving ``name``, respawning its process if it died."""
+        worker = self._routes.get(name)
+        if worker is None:
+            raise ModelHostError(f"Model '{name}' is not hosted")
+        if worker.alive:
+            return worker
+
+        group = self._group_of[name]
+        with self._respawn_lock:
+            worker = self._workers[group]
+            if worker.alive:
+                return worker
+
+            # A worker that keeps crashing fails fast instead of reloading per call
+            since = time.monotonic() - self._respawned_at.get(group, float("-inf"))
+            if since < RESPAWN_BACKOFF:
+                raise ModelHostError(f"Model host worker '{group}' is down (respawned {since:.0f}s ago)")
+            self._respawned_at[group] = time.monotonic()
+
+            print(f"⚠ Model host worker '{group}' died, respawning")
+            worker.stop(timeout=0)
+            worker = _WorkerHandle(self._ctx, self.groups[group], self.max_batch)
+            worker.wait_ready()
+            self._workers[group] = worker
+            self._route(worker)
+
+        if self._routes.get(name) is not worker:
+            raise ModelHostError(f"Model '{name}' failed to load after respawn")
+        return worker
+
+    def submit(self, name: str, method: str, *args, **kwargs) -> Future:
+        """Send a call to the worker owning ``name``; returns a Future."""
+        worker = self._live_worker(name)
+        return worker.submit(name, method, _pack(args, self._segments), kwargs)
+
+    def call(self, name: str, method: str, *args, **kwargs) -> Any:
+        """Blocking call (use from executor threads, not the event loop)."""
+        return self.submit(name, method, *args, **kwargs).result()
+
+
+class RemoteModel:
+    """
+    Proxy exposing a hosted model's methods as blocking calls.
+
+    Only the methods listed in MODEL_METHODS are proxied, so attribute
+    probes (``hasattr(model, "detect_batch")``) answer truthfully and
+    anything else fails locally instead of in the worker.
+    """
+
+    def __init__(self, host: ModelHost, name: str):
+        self._host = host
+        self._name = name
+        self._methods = MODEL_METHODS.get(name, ())
+
+    def __getattr__(self, method: str):
+        if method.startswith("_") or method not in self._methods:
+            raise AttributeError(f"RemoteModel({self._name}) has no method '{method}'")
+
+        def remote_call(*args, **kwargs):
+            return self._host.call(self._name, method, *args, **kwargs)
+
+        remote_call.__name__ = method
+        return remote_call
+
+    def __repr__(self) -> str:
+        return f"RemoteModel({self._name})"
+
+
+# =============================================================================
+# Module-level client API
+# =============================================================================
+
+_host: Optional[ModelHost] = None
+
+
+def start_model_host(groups: Optional[Dict[str, Sequence[str]]] = None, max_batch: int = 32) -> ModelHost:
+    """Start the shared model host for this process (idempotent)."""
+    global _host
+    if _host is None:
+        host = ModelHost(groups=groups, max_batch=max_batch)
+        host.start()
+        _host = host
+    return _host
+
+
+def stop_model_host():
+    global _host
+    if _host is not None:
+        _host.stop()
+        _host = None
+
+
+def get_model_host() -> Optional[ModelHost]:
+    return _host
+
+
+def get_model(name: str) -> Optional[Any]:
+    """
+    Return the model called ``name``.
+
+    A RemoteModel proxy when the host is running and serves it, otherwise
+    the process-wide local instance (None if it failed to load).
+    """
+    if _host is not None and _host.hosts(name):
+        return RemoteModel(_host, name)
+    return load_local_model(name)
@@ -0,0 +1,191 @@
+"""
+Tests for app.workers.batch_coordinator
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import asyncio
+import io
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.workers import batch_coordinator
+from app.workers.batch_coordinator import BatchCoordinator
+
+
+def png_bytes(color=(200, 30, 30)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class FakeDetector:
+    """Records each detect_batch call; scores by red channel"""
+
+    def __init__(self, key):
+        self.key = key
+        self.batches = []
+
+    def detect_batch(self, images):
+        self.batches.append(len(images))
+        return [{self.key: image.rgb[0, 0, 0] / 255} for image in images]
+
+
+class FakeNSFW(FakeDetector):
+    def detect_batch(self, images):
+        self.batches.append(len(images))
+        return [{"nudity": 0.1, "sexual_content": 0.0} for _ in images]
+
+
+class FakeOCR:
+    def __init__(self):
+        self.batches = []
+
+    def extract_text_batch(self, images):
+        self.batches.append(len(images))
+        return [{"text": "buy cocaine", "lines": ["buy cocaine"], "num_lines": 1} for _ in images]
+
+
+class FakeDetoxify:
+    def __init__(self):
+        self.batches = []
+
+    def analyze_batch(self, texts):
+        self.batches.append(len(texts))
+        return [{"toxicity": 0.1} for _ in texts]
+
+
+@pytest.fixture
+def models(monkeypatch):
+    from app.services.text_rules import TextRulesEngine
+
+    fakes = {
+        "ocr": FakeOCR(),
+        "nsfw": FakeNSFW("nudity"),
+        "weapon": FakeDetector("weapon_score"),
+        "violence": FakeDetector("violence_score"),
+        "blood": FakeDetector("blood_score"),
+        "detoxify": FakeDetoxify(),
+        "text_rules": TextRulesEngine(),
+    }
+    monkeypatch.setattr(batch_coordinator, "_models", fakes)
+    monkeypatch.setattr(batch_coordinator, "_models_loaded", True)
+    return fakes
+
+
+async def _run(coordinator, assets):
+    workers = asyncio.create_task(coordinator.run_workers())
+    futures = [await coordinator.schedule(task_id, data, asset_type) for task_id, data, asset_type in assets]
+    results = await asyncio.wait_for(asyncio.gather(*futures), timeout=5)
+    await coordinator.shutdown()
+    workers.cancel()
+    return results
+
+
+class TestBatchedInference:
+    def test_one_forward_pass_per_bucket(self, models):
+        coordinator = BatchCoordinator(batch_size=4, max_wait_ms=200)
+        assets = [(f"t{i}", png_bytes(), "image") for i in range(4)]
+
+        results = asyncio.run(_run(coordinator, assets))
+
+        for key in ("ocr", "nsfw", "weapon", "violence", "blood"):
+            assert models[key].batches == [4], key
+        assert models["detoxify"].batches == [4]
+        assert [r["task_id"] for r in results] == ["t0", "t1", "t2", "t3"]
+
+    def test_results_stay_with_their_task(self, models):
+        coordinator = BatchCoordinator(batch_size=3, max_wait_ms=200)
+        assets = [("safe", png_bytes((0, 0, 0)), "image"), ("red", png_bytes((255, 0, 0)), "image")]
+
+        safe, red = asyncio.run(_run(coordinator, assets))
+
+        assert safe["category_scores"]["weapons"] == 0.0
+        assert red["category_scores"]["weapons"] == 1.0
+        assert red["decision"] == "block"
+        # OCR text went through the policy stage
+        assert "drugs_hard" in safe["flags"]
+
+    def test_text_assets_skip_media_models(self, models):
+        coordinator = BatchCoordinator(batch_size=2, max_wait_ms=200)
+        assets = [("img", png_bytes(), "image"), ("txt", b"hello", "text")]
+
+        image_result, text_result = asyncio.run(_run(coordinator, assets))
+
+        assert models["weapon"].batches == [1]
+        assert text_result["category_scores"]["weapons"] == 0.0
+        assert image_result["pipelines_completed"] == 5
+
+
+class FailingDetector(FakeDetector):
+    def detect_batch(self, images):
+        raise RuntimeError("CUDA out of memory")
+
+
+class TestEventDriven:
+    def test_wait_for_result_after_task_finished(self, models):
+        async def scenario():
+            coordinator = BatchCoordinator(batch_size=2, max_wait_ms=10)
+            workers = asyncio.create_task(coordinator.run_workers())
+            future = await coordinator.schedule("t0", png_bytes())
+            await asyncio.wait_for(future, timeout=5)
+
+            late = await coordinator.wait_for_result("t0", timeout=1)
+            unknown = await coordinator.wait_for_result("nope", timeout=1)
+            await coordinator.shutdown()
+            workers.cancel()
+            return future.result(), late, unknown
+
+        result, late, unknown = asyncio.run(scenario())
+        assert late == result
+        assert unknown is None
+
+    def test_partials_stream_every_stage(self, models):
+        async def scenario():
+            coordinator = BatchCoordinator(batch_size=1, max_wait_ms=10)
+            await coordinator.schedule("t0", png_bytes())
+            stream = coordinator.partials("t0")
+            workers = asyncio.create_task(coordinator.run_workers())
+            stages = [stage async for stage, _ in stream]
+            await coordinator.shutdown()
+            workers.cancel()
+            return stages
+
+        stages = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+        assert sorted(stages) == sorted(batch_coordinator.STAGES)
+        # Policy reads OCR text, so it always follows OCR
+        assert stages.index("policy") > stages.index("ocr")
+
+    def test_crashed_stage_still_completes_the_task(self, models, monkeypatch):
+        async def crash(batch):
+            raise RuntimeError("stage crashed")
+
+        coordinator = BatchCoordinator(batch_size=2, max_wait_ms=10)
+        monkeypatch.setattr(coordinator, "_nsfw_stage", crash)
+
+        (result,) = asyncio.run(_run(coordinator, [("t0", png_bytes(), "image")]))
+
+        assert result["pipelines_completed"] == 5
+        assert result["category_scores"]["nsfw"] == 0.0
+
+    def test_model_error_is_reported_per_item(self, models):
+        models["weapon"] = FailingDetector("weapon_score")
+        coordinator = BatchCoordinator(batch_size=2, max_wait_ms=10)
+
+        (result,) = asyncio.run(_run(coordinator, [("t0", png_bytes(), "image")]))
+
+        assert result["category_scores"]["weapons"] == 0.0
+
+    def test_partial_batch_flushes_after_max_wait(self, models):
+        coordinator = BatchCoordinator(batch_size=64, max_wait_ms=20)
+
+        results = asyncio.run(_run(coordinator, [("t0", png_bytes(), "image")]))
+
+        assert results[0]["task_id"] == "t0"
+        assert models["weapon"].batches == [1]
@@ -0,0 +1,189 @@
+"""
+Tests for app.services.search_assisatnt.category_matcher
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# The package __init__ pulls in the sentence-transformer matcher
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "services" / "search_assisatnt"))
+
+import category_matcher
+from cache import CacheConfig
+from category_matcher import CategoryMatcher
+from near_duplicate import NearDuplicateIndex, lexical_embedding
+
+
+QUERIES = ["hungry", "cheap laptop", "used car for sale", "apartment to rent", "sofa", "nothing relevant zz"]
+PARAMS = [(3, 0.3), (1, 0.0), (5, 0.1), (2, 0.6)]
+
+
+class FakeModel:
+    """Deterministic stand-in for a sentence transformer"""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.encoded += len(texts)
+        return np.stack([lexical_embedding(text.lower(), 64) for text in texts])
+
+
+class DictCache:
+    """SearchCache interface over a plain dict"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.entries[key] = value
+        return True
+
+
+@pytest.fixture
+def matcher(monkeypatch):
+    monkeypatch.setattr(category_matcher, "SENTENCE_TRANSFORMERS_AVAILABLE", True)
+    instance = CategoryMatcher(use_cache=False)
+    instance.model = FakeModel()
+    instance.is_loaded = True
+    instance.load_default_categories()
+    return instance
+
+
+def _with_cache(matcher):
+    matcher.use_cache = True
+    matcher.cache = DictCache()
+    return matcher.cache
+
+
+class TestMatrixScoring:
+    def test_semantic_scores_are_cosine_similarities(self, matcher):
+        queries = ["cheap laptop", "hungry"]
+        scores = matcher._semantic_scores(queries)
+
+        assert scores.shape == (len(queries), len(matcher.category_slugs))
+        for row, query in enumerate(queries):
+            q = matcher.model.encode([query])[0]
+            for i, slug in enumerate(matcher.category_slugs):
+                c = matcher.model.encode([matcher._embedding_text(slug, matcher.categories[slug])])[0]
+                expected = np.dot(q, c) / (np.linalg.norm(q) * np.linalg.norm(c))
+                assert scores[row, i] == pytest.approx(expected, abs=1e-5)
+
+    def test_top_indices_matches_full_sort(self):
+        rng = np.random.default_rng(3)
+        scores = rng.random(50).astype(np.float32)
+        order = list(np.argsort(-scores, kind="stable"))
+
+        for k in (0, 1, 5, 50, 80):
+            assert list(CategoryMatcher._top_indices(scores, k)) == order[:k]
+
+    def test_add_category_appends_a_row(self, matcher):
+        info = {"name": "Boats", "description": "Boats and yachts", "keywords": ["yacht"]}
+        matcher.add_category("boats", info)
+
+        assert matcher.embedding_matrix.shape[0] == len(matcher.category_slugs)
+        expected = CategoryMatcher._normalize(matcher.model.encode([matcher._embedding_text("boats", info)]))[0]
+        assert np.allclose(matcher.embedding_matrix[-1], expected)
+        assert matcher.match("yacht", top_k=1)[0]["slug"] == "boats"
+
+
+class TestScoredCache:
+    def test_cached_results_match_uncached(self, matcher):
+        expected = {params: [matcher._hybrid_match(q, *params) for q in QUERIES] for params in PARAMS}
+
+        _with_cache(matcher)
+        matcher.match_many(QUERIES)
+        matcher.near_duplicates.clear()
+        for params, results in expected.items():
+            assert matcher.match_many(QUERIES, *params) == results
+        assert matcher.cache_misses == len(QUERIES)
+
+    def test_one_entry_per_query(self, matcher):
+        cache = _with_cache(matcher)
+        for params in PARAMS:
+            matcher.match_many(QUERIES, *params)
+        # Queries that match nothing are cached too
+        assert len(cache.entries) == len(QUERIES)
+
+    def test_semantic_scores_round_trip_and_fit_budget(self, matcher):
+        cache = _with_cache(matcher)
+        matcher.match("cheap laptop")
+        scored = next(iter(cache.entries.values()))
+
+        assert isinstance(scored["semantic"], str)
+        unpacked = CategoryMatcher._unpack_scores(scored["semantic"])
+        assert np.array_equal(unpacked, matcher._semantic_scores(["cheap laptop"])[0])
+        # Entries cached as a float list still read back
+        assert np.array_equal(CategoryMatcher._unpack_scores(unpacked.tolist()), unpacked)
+
+        assert len(json.dumps(scored)) < CacheConfig.MAX_VALUE_BYTES
+
+    def test_category_change_invalidates_keys(self, matcher):
+        key = matcher._cache_key("sofa")
+        matcher.add_category("boats", {"name": "Boats", "keywords": ["boat", "yacht"]})
+        assert matcher._cache_key("sofa") != key
+        assert len(matcher.near_duplicates) == 0
+
+
+class TestNearDuplicates:
+    def test_paraphrase_reuses_semantic_scores(self, matcher):
+        _with_cache(matcher)
+        matcher.match("cheap laptop")
+        encoded = matcher.model.encoded
+
+        results = matcher.match("laptops cheap")
+
+        assert matcher.near_hits == 1
+        assert matcher.model.encoded == encoded
+        assert results == matcher._rank_scored(
+            matcher._score_query("laptops cheap", matcher._semantic_scores(["cheap laptop"])[0]), 3, 0.3
+        )
+
+    def test_index_lookup_radius(self):
+        index = NearDuplicateIndex()
+        index.add("cheap laptop", np.ones(3, dtype=np.float32))
+
+        hit = index.lookup("laptop cheap")
+        assert hit is not None and hit[0] == "cheap laptop"
+        assert index.lookup("cheap laptops") is not None
+        assert index.lookup("cheap laptop bag") is None
+        assert index.lookup("") is None
+
+    @pytest.mark.parametrize("cached, query", [
+        ("best place to find a job in nairobi city centre", "best place to find a sedan in nairobi city centre"),
+        ("i need a cheap second hand laptop in good condition", "i need a cheap second hand car in good condition"),
+    ])
+    def test_long_query_with_a_different_noun_is_not_reused(self, matcher, cached, query):
+        index = NearDuplicateIndex()
+        index.add(cached, np.ones(3, dtype=np.float32))
+        assert float(lexical_embedding(cached) @ lexical_embedding(query)) >= index.radius
+        assert index.lookup(query) is None
+        assert index.lookup(" ".join(reversed(cached.split()))) is not None
+
+        matcher.match(cached)
+        encoded = matcher.model.encoded
+        matcher.match(query)
+
+        assert matcher.near_hits == 0
+        assert matcher.model.encoded == encoded + 1
+
+    def test_index_evicts_least_recently_used(self):
+        index = NearDuplicateIndex(capacity=2)
+        index.add("cheap laptop", np.zeros(1, dtype=np.float32))
+        index.add("used car", np.zeros(1, dtype=np.float32))
+        index.lookup("cheap laptop")
+        index.add("red sofa", np.zeros(1, dtype=np.float32))
+
+        assert "cheap laptop" in index and "red sofa" in index
+        assert "used car" not in index
+        assert index.lookup("used car") is None
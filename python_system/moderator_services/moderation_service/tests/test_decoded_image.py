@@ -0,0 +1,95 @@
+"""
+Tests for app.services.decoded_image.DecodedImage
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import io
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.decoded_image import DecodedImage
+
+
+def encoded(mode="RGB", size=(32, 24), fmt="PNG"):
+    img = Image.new("RGB", size)
+    img.putdata([(x * 8 % 256, y * 10 % 256, (x + y) % 256)
+                 for y in range(size[1]) for x in range(size[0])])
+    if mode == "P":
+        img = img.quantize(colors=16)
+    elif mode != "RGB":
+        img = img.convert(mode)
+    buf = io.BytesIO()
+    img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def test_concurrent_first_access_decodes_once(monkeypatch):
+    opened = []
+    real_open = Image.open
+
+    def counting_open(*args, **kwargs):
+        opened.append(1)
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(Image, "open", counting_open)
+    image = DecodedImage.from_bytes(encoded())
+
+    start = threading.Barrier(8)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append((image.rgb, image.bgr, image.resized((8, 8))))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(opened) == 1
+    assert all(r[0] is results[0][0] and r[1] is results[0][1] and r[2] is results[0][2] for r in results)
+
+
+@pytest.mark.parametrize("mode", ["P", "L", "RGBA"])
+def test_source_keeps_original_mode(mode):
+    image = DecodedImage.from_bytes(encoded(mode))
+
+    assert image.source.mode == mode
+    assert image.pil.mode == "RGB"
+    assert image.rgb.shape == (24, 32, 3)
+
+
+def test_rgb_image_is_not_copied():
+    image = DecodedImage.from_bytes(encoded("RGB"))
+    assert image.pil is image.source
+
+
+def test_array_backed_views():
+    rgb = np.zeros((4, 5, 3), dtype=np.uint8)
+    rgb[..., 0] = 255
+    image = DecodedImage.from_array(rgb)
+
+    assert image.source.mode == "RGB"
+    assert image.bgr[0, 0].tolist() == [0, 0, 255]
+
+
+@pytest.mark.parametrize("mode", ["P", "L", "RGBA"])
+def test_perceptual_hash_matches_plain_open(tmp_path, mode):
+    imagehash = pytest.importorskip("imagehash")
+    from app.core.hashing import ContentHasher
+
+    path = tmp_path / "image.png"
+    path.write_bytes(encoded(mode))
+
+    expected = str(imagehash.phash(Image.open(path)))
+    assert ContentHasher.perceptual_hash_image(str(path)) == expected
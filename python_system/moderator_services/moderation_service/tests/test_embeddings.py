@@ -0,0 +1,196 @@
+"""
+Tests for app.services.text.embedding_store and app.services.text.embeddings
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.text.embedding_store import EmbeddingStore
+from app.services.text.embeddings import SemanticEncoder, VectorDatabase
+from app.services.text.models import ViolationType
+
+faiss = pytest.importorskip("faiss")
+
+DIM = 16
+
+
+class FakeModel:
+    """Deterministic stand-in for a SentenceTransformer"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % DIM] += 1.0
+        return vectors
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel()
+
+    def load(self):
+        self.model = model
+        self.dimension = DIM
+
+    monkeypatch.setattr(SemanticEncoder, "_load_model", load)
+    return model
+
+
+def vector(value):
+    return np.full(DIM, value, dtype=np.float32)
+
+
+class TestEmbeddingStore:
+    def test_round_trip_survives_reopen(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "model/a", DIM, capacity=8)
+        store.put_many(["one", "two"], [vector(1), vector(2)])
+
+        reopened = EmbeddingStore(str(tmp_path), "model/a", DIM, capacity=8)
+        one, missing, two = reopened.get_many(["one", "nope", "two"])
+
+        assert np.array_equal(one, vector(1)) and np.array_equal(two, vector(2))
+        assert missing is None
+        assert reopened.stats()["hits"] == 2
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "m", DIM, capacity=2)
+        store.put_many(["a"], [vector(1)])
+        store.put_many(["b"], [vector(2)])
+        store.get_many(["a"])
+        store.put_many(["c"], [vector(3)])
+
+        a, b, c = store.get_many(["a", "b", "c"])
+        assert b is None
+        assert np.array_equal(a, vector(1)) and np.array_equal(c, vector(3))
+        assert store.stats()["entries"] == 2
+
+    def test_layout_change_resets(self, tmp_path):
+        EmbeddingStore(str(tmp_path), "m", DIM, capacity=4).put_many(["a"], [vector(1)])
+
+        resized = EmbeddingStore(str(tmp_path), "m", DIM, capacity=8)
+        assert resized.get_many(["a"]) == [None]
+
+    def test_models_do_not_share_entries(self, tmp_path):
+        EmbeddingStore(str(tmp_path), "m1", DIM).put_many(["a"], [vector(1)])
+        assert EmbeddingStore(str(tmp_path), "m2", DIM).get_many(["a"]) == [None]
+
+    def test_wrong_dimension_is_skipped(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "m", DIM)
+        store.put_many(["a", "b"], [np.ones(DIM + 1), None])
+        assert store.get_many(["a", "b"]) == [None, None]
+
+    def test_slot_rewritten_during_a_read_is_a_miss(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path), "m", DIM, capacity=1)
+        store.put_many(["a"], [vector(1)])
+        # A second worker process sharing the same files
+        other = EmbeddingStore(str(tmp_path), "m", DIM, capacity=1)
+        conn = store._conn()
+
+        class EvictAfterLookup:
+            def execute(self, sql, params=()):
+                rows = conn.execute(sql, params).fetchall()
+                if sql.startswith("SELECT digest, slot"):
+                    other.put_many(["b"], [vector(2)])
+                return rows
+
+        store._local.conn = EvictAfterLookup()
+        try:
+            assert store.get_many(["a"]) == [None]
+        finally:
+            store._local.conn = conn
+        assert np.array_equal(store.get_many(["b"])[0], vector(2))
+
+    def test_hot_entries_survive_another_process_evicting(self, tmp_path):
+        writer = EmbeddingStore(str(tmp_path), "m", DIM, capacity=2)
+        writer.put_many(["a"], [vector(1)])
+        writer.put_many(["b"], [vector(2)])
+
+        reader = EmbeddingStore(str(tmp_path), "m", DIM, capacity=2)
+        reader.TOUCH_FLUSH_SECONDS = 0
+        reader.get_many(["a"])
+        writer.put_many(["c"], [vector(3)])
+
+        assert writer.get_many(["a", "b"])[1] is None
+        assert np.array_equal(writer.get_many(["a"])[0], vector(1))
+
+
+class TestSemanticEncoder:
+    def test_only_cache_misses_reach_the_model(self, tmp_path, fake_model):
+        encoder = SemanticEncoder(cache_dir=str(tmp_path))
+        first = encoder.encode_batch(["buy a car", "sell a bike"])
+
+        again = SemanticEncoder(cache_dir=str(tmp_path)).encode_batch(["sell a bike", "rent a flat", "buy a car"])
+
+        assert fake_model.encoded == ["buy a car", "sell a bike", "rent a flat"]
+        assert again[0] == first[1] and again[2] == first[0]
+
+
+class TestVectorDatabase:
+    def test_index_is_reloaded_without_reencoding(self, tmp_path, fake_model):
+        encoder = SemanticEncoder()
+        db = VectorDatabase(encoder, index_dir=str(tmp_path))
+        seeded = db.index.ntotal
+        encoded = len(fake_model.encoded)
+
+        reloaded = VectorDatabase(encoder, index_dir=str(tmp_path))
+
+        assert len(fake_model.encoded) == encoded
+        assert reloaded.index.ntotal == seeded
+        assert reloaded.violation_texts == db.violation_texts
+
+    def test_examples_persist_and_survive_a_seed_change(self, tmp_path, fake_model, monkeypatch):
+        encoder = SemanticEncoder()
+        db = VectorDatabase(encoder, index_dir=str(tmp_path))
+        assert db.add(["stolen phones cheap no box"], [ViolationType.ILLEGAL]) == 1
+
+        reloaded = VectorDatabase(encoder, index_dir=str(tmp_path))
+        assert ("stolen phones cheap no box", ViolationType.ILLEGAL) in reloaded.examples
+
+        # New seed patterns: the index is rebuilt and the example re-embedded
+        original = VectorDatabase._load_violation_patterns
+
+        def extra_seed(self):
+            original(self)
+            self.violation_texts.append("brand new seed pattern")
+            self.violation_labels.append(ViolationType.SPAM)
+
+        monkeypatch.setattr(VectorDatabase, "_load_violation_patterns", extra_seed)
+        rebuilt = VectorDatabase(encoder, index_dir=str(tmp_path))
+
+        assert rebuilt.index.ntotal == db.index.ntotal + 1
+        assert "stolen phones cheap no box" in rebuilt.violation_texts
+
+    def test_search_batch_matches_single_searches(self, fake_model):
+        db = VectorDatabase(SemanticEncoder(), similarity_threshold=0.0)
+        queries = [db.encoder.encode(text) for text in ["buy guns cheap firearms for sale", "free money", "nice sofa"]]
+
+        batched = db.search_batch(queries + [None], k=3)
+
+        assert batched[:3] == [db.search(query, k=3) for query in queries]
+        assert batched[3] == []
+        assert batched[0][0]["violation_type"] == ViolationType.WEAPONS.value
+
+    def test_upgrades_to_approximate_index(self, fake_model):
+        db = VectorDatabase(SemanticEncoder(), ann_threshold=10, ann_type="hnsw")
+
+        assert isinstance(db.index, faiss.IndexHNSWFlat)
+        assert db.index.ntotal == len(db.violation_labels)
+        hit = db.search(db.encoder.encode("free money guaranteed winner"), k=1)
+        assert hit[0]["reference_text"] == "free money guaranteed winner"
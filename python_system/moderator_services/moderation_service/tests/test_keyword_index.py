@@ -0,0 +1,132 @@
+"""
+Tests for app.services.search_assisatnt.keyword_index
+
+The index must agree with the per-category scans CategoryMatcher ran
+before it existed (reproduced here as the reference).
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# The package __init__ pulls in the sentence-transformer matcher
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "services" / "search_assisatnt"))
+
+from category_matcher import CategoryMatcher
+from keyword_index import KeywordIndex, SubstringIndex
+
+
+def reference_candidates(categories, query):
+    """Exact / partial keyword hits as scanned per category"""
+    results = {}
+    for slug, info in categories.items():
+        keywords = [kw.lower() for kw in info.get("keywords", [])]
+        if query in keywords:
+            results[slug] = (0.98, "exact_keyword")
+            continue
+        for kw in keywords:
+            if len(query) >= 3 and (query in kw or kw in query):
+                results[slug] = (0.7, "partial_keyword")
+    return results
+
+
+def reference_scores(categories, query):
+    """Fallback keyword scores as scanned per category"""
+    scores = {}
+    query_words = set(query.split())
+    for slug, info in categories.items():
+        score = 0.0
+        name = info.get("name", slug).lower()
+        if query in name or name in query:
+            score = max(score, 0.9)
+        for keyword in info.get("keywords", []):
+            keyword = keyword.lower()
+            if query == keyword:
+                score = max(score, 0.95)
+            elif query in keyword or keyword in query:
+                score = max(score, 0.7)
+            elif any(word in keyword or keyword in word for word in query_words):
+                score = max(score, 0.5)
+        if query in info.get("description", "").lower():
+            score = max(score, 0.6)
+        if score:
+            scores[slug] = score
+    return scores
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    instance = CategoryMatcher(use_cache=False)
+    instance.is_loaded = True
+    instance.load_default_categories()
+    return instance
+
+
+@pytest.fixture(scope="module")
+def queries(matcher):
+    rng = random.Random(7)
+    keywords = sorted({kw.lower() for info in matcher.categories.values() for kw in info.get("keywords", [])})
+    names = [info["name"].lower() for info in matcher.categories.values()]
+
+    # Empty queries never reach the index (match_many answers them with [])
+    generated = set(keywords) | set(names) | {"a", "zz", "xyz nothing", "rent", "car"}
+    for keyword in rng.sample(keywords, min(150, len(keywords))):
+        start = rng.randrange(len(keyword))
+        generated.add(keyword[start:start + rng.randint(1, 6)])
+    for _ in range(150):
+        generated.add(" ".join(rng.sample(keywords, 2)))
+    return sorted(generated)
+
+
+class TestSubstringIndex:
+    def test_within_and_containing(self):
+        index = SubstringIndex()
+        for string, owner in [("car", "vehicles"), ("cart", "shop"), ("scar", "health"), ("Car", "autos")]:
+            index.add(string, owner)
+
+        assert index.exact("car") == {"vehicles", "autos"}
+        assert index.owners_of(index.within("used cars")) == {"vehicles", "autos"}
+        assert index.owners_of(index.containing("ar")) == {"vehicles", "autos", "shop", "health"}
+        assert index.owners_of(index.containing("cart")) == {"shop"}
+        # Grams present but not contiguous
+        assert index.containing("cars") == set()
+
+    def test_empty_strings_are_ignored(self):
+        index = SubstringIndex()
+        index.add("", "nothing")
+        assert index.strings == []
+
+
+class TestKeywordIndexEquivalence:
+    def test_candidates_match_reference(self, matcher, queries):
+        for query in queries:
+            expected = reference_candidates(matcher.categories, query)
+            actual = {
+                slug: (hit["score"], hit["match_type"])
+                for slug, hit in matcher._keyword_candidates(query).items()
+            }
+            assert actual == expected, query
+
+    def test_fallback_scores_match_reference(self, matcher, queries):
+        for query in queries:
+            assert matcher._keyword_scores(query) == reference_scores(matcher.categories, query), query
+
+    def test_added_category_is_indexed(self, matcher):
+        categories = dict(matcher.categories)
+        categories["boats"] = {"name": "Boats", "description": "Boats and yachts", "keywords": ["Yacht", "dinghy"]}
+
+        index = KeywordIndex.build(categories)
+        incremental = KeywordIndex.build(matcher.categories)
+        incremental.add("boats", categories["boats"])
+
+        for query in ["yacht", "dinghy sale", "acht", "boats", "and yachts"]:
+            assert incremental.exact_keyword(query) == index.exact_keyword(query)
+            assert incremental.partial_keyword(query) == index.partial_keyword(query)
+            assert incremental.name_match(query) == index.name_match(query)
+            assert incremental.description_match(query) == index.description_match(query)
+        assert index.exact_keyword("yacht") == {"boats"}
@@ -0,0 +1,98 @@
+"""
+Tests for app.services.match_cache and the TextRulesEngine result cache
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import match_cache
+from app.services.match_cache import MatchCache
+from app.services.text_rules import RuleMatch, TextRulesEngine
+
+
+class TestMatchCache:
+    def test_digest_is_stable_across_processes(self):
+        code = "from app.services.match_cache import MatchCache; print(MatchCache.digest('héllo', salt='v1'))"
+        other = subprocess.run(
+            [sys.executable, "-c", code], cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        assert other == MatchCache.digest("héllo", salt="v1")
+        assert MatchCache.digest("héllo") != MatchCache.digest("héllo", salt="v1")
+
+    def test_evicts_least_recently_used(self):
+        cache = MatchCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+        assert len(cache) == 2
+
+    def test_entries_expire(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(match_cache.time, "time", lambda: now[0])
+        cache = MatchCache(ttl_seconds=10)
+        cache.put("a", 1)
+
+        now[0] += 10
+        assert cache.get("a") == 1
+        now[0] += 1
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_shared_tier_serves_other_instances(self, tmp_path):
+        path = str(tmp_path / "match_cache.db")
+        writer = MatchCache(shared_path=path, namespace="rules")
+        reader = MatchCache(shared_path=path, namespace="rules")
+        other_namespace = MatchCache(shared_path=path, namespace="other")
+
+        writer.put("key", {"score": 1})
+
+        assert reader.get("key") == {"score": 1}
+        assert reader.stats()["shared_hits"] == 1
+        assert other_namespace.get("key") is None
+
+    def test_shared_tier_trims_to_budget(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(MatchCache, "SHARED_PURGE_EVERY", 5)
+        cache = MatchCache(max_entries=1, shared_path=str(tmp_path / "match_cache.db"))
+        for i in range(25):
+            cache.put(f"k{i}", i)
+
+        rows = cache._conn().execute("SELECT COUNT(*) FROM match_cache").fetchone()[0]
+        assert rows <= cache.shared_max_entries + cache.SHARED_PURGE_EVERY
+
+
+class TestRulesEngineCache:
+    def test_repeated_text_is_served_from_cache(self):
+        engine = TextRulesEngine(cache_size=10)
+        first = engine.check("Buy cocaine here")
+        second = engine.check("Buy cocaine here")
+
+        assert second is first
+        assert engine.cache_stats()["hits"] == 1
+        assert engine.cache_stats()["max_entries"] == 10
+
+    def test_shared_results_decode_to_rule_matches(self, tmp_path):
+        path = str(tmp_path / "rules.db")
+        expected = TextRulesEngine(shared_cache_path=path).check("Buy cocaine here")
+
+        engine = TextRulesEngine(shared_cache_path=path)
+        result = engine.check("Buy cocaine here")
+
+        assert engine.cache_stats()["shared_hits"] == 1
+        assert all(isinstance(m, RuleMatch) for m in result["matches"])
+        assert result["matches"] == expected["matches"]
+        assert result["severity"] == expected["severity"]
@@ -0,0 +1,211 @@
+"""
+Tests for app.workers.model_host
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.workers import model_host
+from app.workers.model_host import (
+    ModelHost, ModelHostError, RemoteModel, _SharedImage, _handle_requests
+)
+
+
+class FakeConn:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def replies(self):
+        return {request_id: (ok, value) for request_id, ok, value in self.sent}
+
+
+class FakeDetector:
+    def __init__(self):
+        self.batches = []
+
+    def detect(self, item):
+        return {"single": item}
+
+    def detect_batch(self, items):
+        self.batches.append(list(items))
+        return [{"item": item} for item in items]
+
+    def reload_weights(self):
+        raise AssertionError("not exposed")
+
+
+def test_bad_input_fails_only_its_own_request():
+    conn = FakeConn()
+    detector = FakeDetector()
+    missing = _SharedImage("psm_does_not_exist", (2, 2, 3), "|u1")
+
+    _handle_requests(conn, {"weapon": detector}, [
+        (1, "weapon", "detect", ("a",), {}),
+        (2, "weapon", "detect", (missing,), {}),
+        (3, "weapon", "detect_batch", (["b", "c"],), {}),
+    ])
+
+    replies = conn.replies()
+    assert replies[1] == (True, {"item": "a"})
+    assert replies[2][0] is False and "weapon.detect failed" in replies[2][1]
+    assert replies[3] == (True, [{"item": "b"}, {"item": "c"}])
+    assert detector.batches == [["a", "b", "c"]]
+
+
+class FailOpenDetector:
+    """Whole batch comes back as error results if any input is bad"""
+
+    def __init__(self):
+        self.batches = []
+
+    def detect(self, item):
+        if item == "bad":
+            raise ValueError("cannot decode")
+        return {"score": 1.0}
+
+    def detect_batch(self, items):
+        self.batches.append(list(items))
+        if "bad" in items:
+            return [{"score": 0.0, "error": "cannot decode"} for _ in items]
+        if "crash" in items:
+            raise RuntimeError("CUDA out of memory")
+        return [{"score": 1.0} for _ in items]
+
+
+def test_error_results_are_retried_per_caller():
+    conn = FakeConn()
+    detector = FailOpenDetector()
+
+    _handle_requests(conn, {"weapon": detector}, [
+        (1, "weapon", "detect", ("good",), {}),
+        (2, "weapon", "detect", ("bad",), {}),
+        (3, "weapon", "detect_batch", (["good", "good"],), {}),
+    ])
+
+    replies = conn.replies()
+    assert replies[1] == (True, {"score": 1.0})
+    assert replies[2][0] is False and "cannot decode" in replies[2][1]
+    assert replies[3] == (True, [{"score": 1.0}, {"score": 1.0}])
+
+
+def test_failed_batch_call_is_retried_per_caller():
+    conn = FakeConn()
+
+    _handle_requests(conn, {"weapon": FailOpenDetector()}, [
+        (1, "weapon", "detect", ("good",), {}),
+        (2, "weapon", "detect_batch", (["crash"],), {}),
+    ])
+
+    replies = conn.replies()
+    assert replies[1] == (True, {"score": 1.0})
+    assert replies[2][0] is False and "CUDA out of memory" in replies[2][1]
+
+
+def test_lone_batch_caller_gets_its_error_results():
+    conn = FakeConn()
+    _handle_requests(conn, {"weapon": FailOpenDetector()}, [(1, "weapon", "detect_batch", (["bad"],), {})])
+
+    assert conn.replies()[1] == (True, [{"score": 0.0, "error": "cannot decode"}])
+
+
+def test_worker_refuses_methods_outside_allowlist():
+    conn = FakeConn()
+    _handle_requests(conn, {"weapon": FakeDetector()}, [(1, "weapon", "reload_weights", (), {})])
+
+    ok, message = conn.replies()[1]
+    assert ok is False and "not exposed" in message
+
+
+def test_remote_model_proxies_only_allowlisted_methods():
+    class Host:
+        def call(self, name, method, *args, **kwargs):
+            return (name, method, args)
+
+    nsfw = RemoteModel(Host(), "nsfw")
+
+    assert nsfw.detect_batch(["x"]) == ("nsfw", "detect_batch", (["x"],))
+    assert hasattr(nsfw, "analyze_image")
+    assert not hasattr(nsfw, "detect")          # NSFWDetector has no detect()
+    assert not hasattr(nsfw, "model")
+    assert not hasattr(nsfw, "_private")
+
+
+class FakeWorker:
+    """Stands in for _WorkerHandle; flip `alive` to simulate a crash"""
+
+    spawned = []
+
+    def __init__(self, ctx, model_names, max_batch):
+        self.model_names = tuple(model_names)
+        self.available = {}
+        self.alive = True
+        self.stopped = False
+        FakeWorker.spawned.append(self)
+
+    def wait_ready(self):
+        self.available = {name: True for name in self.model_names}
+
+    def submit(self, name, method, args, kwargs):
+        future = Future()
+        future.set_result((id(self), method))
+        return future
+
+    def stop(self, timeout=5.0):
+        self.stopped = True
+
+
+@pytest.fixture
+def host(monkeypatch):
+    FakeWorker.spawned = []
+    monkeypatch.setattr(model_host, "_WorkerHandle", FakeWorker)
+    host = ModelHost(groups={"vision": ["weapon", "blood"]})
+    host.start()
+    return host
+
+
+def test_dead_worker_is_respawned(host):
+    first = FakeWorker.spawned[0]
+    assert host.call("weapon", "detect", "x") == (id(first), "detect")
+
+    first.alive = False
+    second_result = host.call("blood", "detect", "x")
+
+    assert len(FakeWorker.spawned) == 2 and first.stopped
+    assert second_result == (id(FakeWorker.spawned[1]), "detect")
+    assert host.call("weapon", "detect", "x")[0] == id(FakeWorker.spawned[1])
+
+
+def test_crashing_worker_backs_off(host):
+    FakeWorker.spawned[0].alive = False
+    host.call("weapon", "detect", "x")
+
+    FakeWorker.spawned[1].alive = False
+    with pytest.raises(ModelHostError, match="is down"):
+        host.call("weapon", "detect", "x")
+    assert len(FakeWorker.spawned) == 2
+
+
+class WeightlessASR:
+    """Constructs fine, but its weights failed to load (Whisper missing)"""
+
+    def __init__(self):
+        self.model = None
+
+
+def test_service_without_weights_is_unavailable(monkeypatch):
+    monkeypatch.setattr(model_host, "_local_models", {})
+    monkeypatch.setitem(model_host.MODEL_SPECS, "asr", f"{__name__}:WeightlessASR")
+
+    assert model_host.load_local_model("asr") is None
+    assert model_host.get_model("asr") is None
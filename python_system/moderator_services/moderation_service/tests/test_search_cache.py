@@ -0,0 +1,271 @@
+"""
+Tests for app.services.search_assisatnt.cache
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# The package __init__ pulls in the sentence-transformer matcher
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "services" / "search_assisatnt"))
+
+import cache
+from cache import CacheConfig, JSONCache, SearchCache, SQLiteCache
+
+
+RESULTS = [{"category": "food", "score": 0.9}]
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setattr(CacheConfig, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(CacheConfig, "DB_PATH", tmp_path / "search_cache.db")
+    monkeypatch.setattr(CacheConfig, "LOG_PATH", tmp_path / "search_cache.jsonl")
+    monkeypatch.setattr(CacheConfig, "JSON_PATH", tmp_path / "search_cache.json")
+    # Flushes are driven by the tests, not the writer thread
+    monkeypatch.setattr(CacheConfig, "WRITE_BEHIND_INTERVAL", 3600)
+    monkeypatch.setattr(cache, "REDIS_AVAILABLE", False)
+    return CacheConfig
+
+
+@pytest.fixture
+def search_cache(config):
+    instance = SearchCache()
+    yield instance
+    instance.close()
+
+
+def _fail(*args, **kwargs):
+    raise OSError("disk full")
+
+
+class TestWriteBehind:
+    def test_flush_writes_every_tier(self, search_cache):
+        search_cache.set("Hungry", RESULTS)
+        assert search_cache.flush() == 1
+
+        assert search_cache.stats()["pending_writes"] == 0
+        assert search_cache.sqlite.get("hungry") == RESULTS
+        assert search_cache.json.get("hungry") == RESULTS
+
+    def test_failed_tier_stays_queued_and_is_retried(self, search_cache, monkeypatch):
+        search_cache.set("hungry", RESULTS)
+        search_cache.set("thirsty", RESULTS)
+        write = search_cache.json.set
+        monkeypatch.setattr(search_cache.json, "set", _fail)
+
+        assert search_cache.flush() == 0
+        # SQLite got both; only the JSON write is still owed
+        assert search_cache.sqlite.get("thirsty") == RESULTS
+        assert search_cache._pending["hungry"][2] == {"json"}
+        assert search_cache._pending["thirsty"][2] == {"json"}
+
+        # Still served while queued
+        search_cache.memory.clear()
+        assert search_cache.get("thirsty") == RESULTS
+
+        monkeypatch.setattr(search_cache.json, "set", write)
+        assert search_cache.flush() == 2
+        assert search_cache.json.get("hungry") == RESULTS
+        assert not search_cache._pending
+
+    def test_failed_sqlite_batch_is_requeued(self, search_cache, monkeypatch):
+        search_cache.set("hungry", RESULTS)
+        monkeypatch.setattr(search_cache.sqlite, "set_many", lambda entries: 0)
+
+        assert search_cache.flush() == 0
+        assert search_cache._pending["hungry"][2] == {"sqlite"}
+
+    def test_gives_up_after_max_attempts(self, search_cache, monkeypatch):
+        monkeypatch.setattr(CacheConfig, "WRITE_BEHIND_MAX_ATTEMPTS", 2)
+        monkeypatch.setattr(search_cache.sqlite, "set_many", lambda entries: 0)
+        search_cache.set("hungry", RESULTS)
+
+        search_cache.flush()
+        assert "hungry" in search_cache._pending
+        search_cache.flush()
+        assert "hungry" not in search_cache._pending
+
+    def test_entry_reset_during_flush_is_kept(self, search_cache, monkeypatch):
+        search_cache.set("hungry", RESULTS)
+        newer = [{"category": "restaurants", "score": 0.8}]
+        write = search_cache.json.set
+
+        def set_then_race(query, results, ttl=None):
+            search_cache.set(query, newer)
+            return write(query, results, ttl)
+
+        monkeypatch.setattr(search_cache.json, "set", set_then_race)
+        search_cache.flush()
+
+        assert search_cache._pending["hungry"][0] == newer
+        assert search_cache._pending["hungry"][2] == {"redis", "sqlite", "json"}
+
+    def test_value_over_budget_is_not_cached(self, search_cache, monkeypatch):
+        monkeypatch.setattr(CacheConfig, "MAX_VALUE_BYTES", 100)
+        scored = {"keyword": {}, "semantic": "A" * 200, "fallback": None}
+
+        assert search_cache.set("hungry", scored) is False
+        assert search_cache.get("hungry") is None
+        assert not search_cache._pending
+
+    def test_scored_record_round_trips(self, search_cache):
+        scored = {"keyword": {"food": [0.98, "exact_keyword"]}, "semantic": "AACAPw==", "fallback": None}
+        search_cache.set("hungry", scored)
+        search_cache.flush()
+        search_cache.memory.clear()
+
+        assert search_cache.get("hungry") == scored
+
+    def test_delete_clears_every_tier(self, search_cache):
+        search_cache.set("hungry", RESULTS)
+        search_cache.flush()
+        search_cache.set("hungry", RESULTS)
+
+        search_cache.delete("hungry")
+
+        assert search_cache.get("hungry") is None
+        assert not search_cache._pending
+        assert search_cache.sqlite.get("hungry") is None
+        assert search_cache.json.get("hungry") is None
+
+
+class TestJSONCache:
+    def test_log_replays_sets_deletes_and_hits(self, config):
+        log = JSONCache(config.LOG_PATH)
+        log.set("hungry", RESULTS)
+        log.set("thirsty", RESULTS)
+        log.delete("thirsty")
+        log.get("hungry")
+        log.close()
+
+        replayed = JSONCache(config.LOG_PATH)
+        assert replayed.get("hungry") == RESULTS
+        assert replayed.get("thirsty") is None
+        assert replayed.entries["hungry"]["hits"] >= 2
+        replayed.close()
+
+    def test_torn_last_line_is_skipped(self, config):
+        log = JSONCache(config.LOG_PATH)
+        log.set("hungry", RESULTS)
+        log.close()
+        with open(config.LOG_PATH, "a", encoding="utf-8") as f:
+            f.write('{"op": "set", "key": "thir')
+
+        replayed = JSONCache(config.LOG_PATH)
+        assert replayed.get("hungry") == RESULTS
+        replayed.close()
+
+    def test_compaction_keeps_live_entries(self, config, monkeypatch):
+        monkeypatch.setattr(CacheConfig, "JSON_COMPACT_MIN_LINES", 10)
+        log = JSONCache(config.LOG_PATH)
+        for i in range(20):
+            log.set("hungry", [{"category": "food", "score": i / 20}])
+        log.set("thirsty", RESULTS)
+        log.delete("thirsty")
+
+        assert log.needs_compaction()
+        assert log.compact() > 0
+        assert not log.needs_compaction()
+        log.close()
+
+        with open(config.LOG_PATH, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["key"] for line in lines] == ["hungry"]
+
+        replayed = JSONCache(config.LOG_PATH)
+        assert replayed.get("hungry") == [{"category": "food", "score": 19 / 20}]
+        assert replayed.get("thirsty") is None
+        replayed.close()
+
+
+@pytest.fixture
+def sqlite_cache(config):
+    instance = SQLiteCache(config.DB_PATH)
+    yield instance
+    instance.close()
+
+
+def stored_hits(config, query):
+    with sqlite3.connect(str(config.DB_PATH)) as conn:
+        return conn.execute("SELECT access_count FROM search_cache WHERE query = ?", (query,)).fetchone()[0]
+
+
+class TestSQLiteCache:
+    def test_connection_is_reused_per_thread(self, sqlite_cache):
+        conn = sqlite_cache._conn()
+        others = []
+        thread = threading.Thread(target=lambda: others.append(sqlite_cache._conn()))
+        thread.start()
+        thread.join()
+
+        assert sqlite_cache._conn() is conn
+        assert others[0] is not conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_hits_are_written_in_batches(self, config, sqlite_cache):
+        assert sqlite_cache.set_many([("hungry", RESULTS, None), ("thirsty", RESULTS, None)]) == 2
+        conn = sqlite_cache._conn()
+        changes = conn.total_changes
+
+        for _ in range(3):
+            assert sqlite_cache.get("Hungry ") == RESULTS
+        sqlite_cache.get("thirsty")
+        assert conn.total_changes == changes
+        assert stored_hits(config, "hungry") == 1
+
+        assert sqlite_cache.flush_stats() == 2
+        assert stored_hits(config, "hungry") == 4
+        assert sqlite_cache.flush_stats() == 0
+        assert sqlite_cache.stats()["top_queries"][0] == {"query": "hungry", "hits": 4}
+
+    def test_reads_do_not_wait_for_writers(self, config, sqlite_cache):
+        sqlite_cache.set("hungry", RESULTS)
+        writer = sqlite3.connect(str(config.DB_PATH), isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            assert sqlite_cache.get("hungry") == RESULTS
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+    def test_expired_rows_are_hidden_until_cleanup(self, sqlite_cache, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "time", lambda: now[0])
+        sqlite_cache.set("hungry", RESULTS, ttl=10)
+        sqlite_cache.set("thirsty", RESULTS, ttl=100)
+
+        now[0] += 11
+        assert sqlite_cache.get("hungry") is None
+        assert sqlite_cache.stats()["total_entries"] == 2
+        assert sqlite_cache.cleanup_expired() == 1
+        assert sqlite_cache.get("thirsty") == RESULTS
+
+    def test_failed_stats_flush_keeps_counts(self, config, sqlite_cache, monkeypatch):
+        sqlite_cache.set("hungry", RESULTS)
+        sqlite_cache.get("hungry")
+        conn = sqlite_cache._conn()
+        monkeypatch.setattr(sqlite_cache, "_conn", lambda: _fail())
+
+        assert sqlite_cache.flush_stats() == 0
+        monkeypatch.setattr(sqlite_cache, "_conn", lambda: conn)
+        sqlite_cache.get("hungry")
+
+        assert sqlite_cache.flush_stats() == 1
+        assert stored_hits(config, "hungry") == 3
+
+    def test_delete_drops_buffered_hits(self, config, sqlite_cache):
+        sqlite_cache.set("hungry", RESULTS)
+        sqlite_cache.get("hungry")
+
+        assert sqlite_cache.delete("hungry")
+        sqlite_cache.set("hungry", RESULTS)
+        sqlite_cache.flush_stats()
+        assert stored_hits(config, "hungry") == 1
@@ -0,0 +1,198 @@
+"""
+Tests for app.services.text.pipeline (batched moderation)
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.text import pipeline as text_pipeline
+from app.services.text.embeddings import SemanticEncoder
+from app.services.text.language import LanguageDetector
+from app.services.text.models import (
+    CascadeConfig, ModerationDecision, TextModerationInput, ViolationType
+)
+from app.services.text.pipeline import TextModerationPipeline
+
+pytest.importorskip("faiss")
+
+DIM = 16
+
+
+class FakeEncoderModel:
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, convert_to_numpy=True):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % DIM] += 1.0
+        return vectors
+
+
+class FakeIntent:
+    classifier = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def classify_batch(self, texts, batch_size=16):
+        self.calls.append((list(texts), batch_size))
+        return [
+            ("scam_or_fraud", 0.9, {"scam_or_fraud": 0.9}) if "winner" in text
+            else ("legitimate_product_or_service", 0.9, {"legitimate_product_or_service": 0.9})
+            for text in texts
+        ]
+
+
+class FakeToxicity:
+    model = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def classify_batch(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        return [{"toxicity": 0.9 if "idiot" in text else 0.01} for text in texts]
+
+
+class HeuristicLanguage(LanguageDetector):
+    def _load_model(self):
+        self.classifier = None
+
+
+@pytest.fixture
+def encoder_model(monkeypatch):
+    model = FakeEncoderModel()
+
+    def load(self):
+        self.model = model
+        self.dimension = DIM
+
+    monkeypatch.setattr(SemanticEncoder, "_load_model", load)
+    monkeypatch.setattr(text_pipeline, "ensure_models", lambda models, verbose=False: True)
+    monkeypatch.setattr(text_pipeline, "settings", None)
+    monkeypatch.setattr(text_pipeline, "LanguageDetector", HeuristicLanguage)
+    monkeypatch.setattr(text_pipeline, "IntentClassifier", FakeIntent)
+    monkeypatch.setattr(text_pipeline, "ContextClassifier", FakeToxicity)
+    return model
+
+
+def make_pipeline(cascade=None):
+    return TextModerationPipeline(cascade=cascade)
+
+
+ITEMS = [
+    TextModerationInput(title="Toyota Corolla 2015", description="One owner, full service history, new tyres"),
+    TextModerationInput(title="", description=""),
+    TextModerationInput(title="Congratulations winner", description="claim your lottery inheritance now by wire transfer"),
+    TextModerationInput(title="You idiot", description="stop sending me these stupid offers for phones"),
+]
+
+
+class TestBatchModeration:
+    def test_one_classifier_call_for_the_batch(self, encoder_model):
+        moderator = make_pipeline(CascadeConfig(enabled=False))
+
+        results = moderator.moderate_batch(ITEMS, batch_size=8)
+
+        assert len(results) == len(ITEMS)
+        assert len(moderator.intent_classifier.calls) == 1
+        texts, batch_size = moderator.intent_classifier.calls[0]
+        assert len(texts) == 3 and batch_size == 8
+        assert len(moderator.context_classifier.calls) == 1
+
+    def test_batch_matches_one_at_a_time(self, encoder_model):
+        moderator = make_pipeline(CascadeConfig(enabled=False))
+
+        batched = moderator.moderate_batch(ITEMS)
+        single = [moderator.moderate(item) for item in ITEMS]
+
+        for a, b in zip(batched, single):
+            assert a.decision == b.decision
+            assert sorted(v.value for v in a.violations) == sorted(v.value for v in b.violations)
+            assert a.toxicity_scores == b.toxicity_scores
+
+    def test_results_follow_input_order(self, encoder_model):
+        moderator = make_pipeline(CascadeConfig(enabled=False))
+
+        clean, empty, scam, toxic = moderator.moderate_batch(ITEMS)
+
+        assert empty.decision == ModerationDecision.APPROVE
+        assert empty.explanation == "Empty content - auto-approved"
+        assert clean.detected_intent == "legitimate_product_or_service"
+        assert scam.detected_intent == "scam_or_fraud"
+        assert toxic.toxicity_scores == {"toxicity": 0.9}
+
+
+class TestCascade:
+    def test_keyword_hit_stops_at_rules(self, encoder_model):
+        moderator = make_pipeline()
+        encoded = len(encoder_model.calls)
+
+        (result,) = moderator.moderate_batch([
+            TextModerationInput(title="Fake passport", description="fake passport and ID cards, fast delivery")
+        ])
+
+        assert result.stages_run == ["rules"]
+        assert ViolationType.ILLEGAL in result.violations
+        assert len(encoder_model.calls) == encoded
+        assert moderator.intent_classifier.calls == []
+
+    def test_trivial_text_is_approved_at_rules(self, encoder_model):
+        moderator = make_pipeline()
+
+        (result,) = moderator.moderate_batch([TextModerationInput(title="Blue sofa", description="")])
+
+        assert result.stages_run == ["rules"]
+        assert result.decision == ModerationDecision.APPROVE
+
+    def test_known_violation_is_decided_by_semantic_match(self, encoder_model):
+        moderator = make_pipeline()
+
+        (result,) = moderator.moderate_batch([
+            TextModerationInput(title="lottery winner inheritance", description="claim now")
+        ])
+
+        assert result.stages_run == ["rules", "semantic"]
+        assert result.similar_violations[0]["violation_type"] == ViolationType.SCAM.value
+        assert moderator.intent_classifier.calls == []
+
+    def test_far_from_every_violation_is_approved_at_semantic(self, encoder_model):
+        moderator = make_pipeline()
+
+        (result,) = moderator.moderate_batch([ITEMS[0]])
+
+        assert result.stages_run == ["rules", "semantic"]
+        assert result.decision == ModerationDecision.APPROVE
+
+    def test_uncertain_texts_reach_the_classifiers(self, encoder_model):
+        moderator = make_pipeline(CascadeConfig(approve_below=0.0, block_above=1.1))
+
+        results = moderator.moderate_batch([ITEMS[0], ITEMS[3]])
+
+        assert [r.stages_run for r in results] == [["rules", "semantic", "classifiers"]] * 2
+        assert len(moderator.intent_classifier.calls) == 1
+
+    def test_disabled_cascade_runs_every_stage(self, encoder_model):
+        moderator = make_pipeline(CascadeConfig(enabled=False))
+
+        results = moderator.moderate_batch([
+            TextModerationInput(title="Fake passport", description="fake passport and ID cards"),
+            TextModerationInput(title="Blue sofa", description="")
+        ])
+
+        assert [r.stages_run for r in results] == [["rules", "semantic", "classifiers"]] * 2
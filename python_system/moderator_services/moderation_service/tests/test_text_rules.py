@@ -0,0 +1,113 @@
+"""
+Tests for app.services.keyword_matcher and the TextRulesEngine keyword pass
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import copy
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.text_rules import TextRulesEngine
+
+
+def brute_force(patterns, text):
+    """Every (start, keyword, payload) occurrence, found keyword by keyword"""
+    hits = []
+    for keyword, payload in patterns:
+        start = text.find(keyword)
+        while keyword and start != -1:
+            hits.append((start, keyword, payload))
+            start = text.find(keyword, start + 1)
+    return hits
+
+
+def reference_keyword_matches(engine, text):
+    """The per-keyword loops TextRulesEngine.check ran before the automaton"""
+    text_lower = text.lower()
+    matches = []
+    for severity, rules in (
+        ("critical", engine.CRITICAL_KEYWORDS),
+        ("high", engine.HIGH_KEYWORDS),
+        ("medium", engine.MEDIUM_KEYWORDS)
+    ):
+        for category, keywords in rules.items():
+            for keyword in keywords:
+                if keyword in text_lower:
+                    matches.append((f"{severity}_{category}", keyword, text_lower.find(keyword)))
+    return matches
+
+
+@pytest.fixture
+def rules(monkeypatch):
+    """Keep add_custom_rule from leaking into other tests (the dicts are class-level)"""
+    for name in ("CRITICAL_KEYWORDS", "HIGH_KEYWORDS", "MEDIUM_KEYWORDS"):
+        monkeypatch.setattr(TextRulesEngine, name, copy.deepcopy(getattr(TextRulesEngine, name)))
+    monkeypatch.setattr(TextRulesEngine, "_rules_version", TextRulesEngine._rules_version)
+
+
+class TestKeywordMatcher:
+    PATTERNS = [("he", 1), ("she", 2), ("his", 3), ("hers", 4), ("he", 5), ("", 6)]
+
+    def test_finds_overlapping_occurrences(self):
+        matcher = KeywordMatcher(self.PATTERNS)
+        text = "ushers and his shed; she hers"
+
+        assert sorted(matcher.finditer(text)) == sorted(brute_force(self.PATTERNS, text))
+        assert len(matcher) == 5
+
+    def test_first_hits_in_pattern_order(self):
+        matcher = KeywordMatcher(self.PATTERNS)
+        text = "his shed ushers"
+
+        expected = []
+        for keyword, payload in self.PATTERNS:
+            if keyword and keyword in text:
+                expected.append((text.find(keyword), keyword, payload))
+        assert matcher.first_hits(text) == expected
+
+    def test_random_texts_match_brute_force(self):
+        rng = random.Random(5)
+        patterns = [("".join(rng.choice("abc") for _ in range(rng.randint(1, 4))), i) for i in range(30)]
+        matcher = KeywordMatcher(patterns)
+
+        for _ in range(200):
+            text = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 40)))
+            assert sorted(matcher.finditer(text)) == sorted(brute_force(patterns, text))
+
+
+class TestRulesEngineKeywords:
+    TEXTS = [
+        "Selling a brand new phone, great price",
+        "Buy cocaine and weed here, guns too",
+        "CHEAP PILLS no prescription, escort services",
+        "Free money!!! click here to get rich quick",
+        "c0c@ine for sale, w.e.e.d",
+        "nothing to see",
+    ]
+
+    def test_matches_per_keyword_scan(self):
+        engine = TextRulesEngine()
+        for text in self.TEXTS:
+            result = engine.check(text)
+            keyword_matches = [
+                (m.rule_name, m.keyword, m.position) for m in result["matches"] if m.keyword
+            ]
+            assert keyword_matches == reference_keyword_matches(engine, text), text
+
+    def test_custom_rule_reaches_other_engines(self, rules):
+        first = TextRulesEngine()
+        second = TextRulesEngine()
+        assert not second.check("a zorblax for sale")["has_violations"]
+
+        first.add_custom_rule("made_up", ["zorblax"], severity="high")
+
+        result = second.check("a zorblax for sale")
+        assert [m.rule_name for m in result["matches"]] == ["high_made_up"]
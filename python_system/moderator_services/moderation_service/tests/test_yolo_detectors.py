@@ -0,0 +1,114 @@
+"""
+Tests for the batched YOLO detectors (violence, weapons)
+
+Run from moderator_services/moderation_service/:
+    pytest tests/
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("cv2")
+
+from app.services.yolo_violence import ViolenceDetector
+
+
+class FakeBox:
+    def __init__(self, cls, conf):
+        self.cls = [cls]
+        self.conf = [conf]
+        self.xyxy = [np.array([0.0, 0.0, 4.0, 4.0])]
+
+
+class FakeResult:
+    def __init__(self, cls, conf):
+        self.boxes = [FakeBox(cls, conf)]
+        self.names = {cls: "fight" if cls == 0 else "knife"}
+
+
+class FakeYOLO:
+    """Scores each frame by its top-left red value; records batch sizes"""
+
+    def __init__(self, cls=0):
+        self.cls = cls
+        self.batches = []
+
+    def __call__(self, frames, verbose=False):
+        self.batches.append(len(frames))
+        # Frames arrive in BGR order
+        return [FakeResult(self.cls, frame[0, 0, 2] / 255) for frame in frames]
+
+
+def array(red):
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    image[..., 0] = red
+    return image
+
+
+GOOD_AND_BAD = [array(204), "/nonexistent.jpg", array(102)]
+
+
+class TestViolenceDetector:
+    def test_bad_input_fails_only_its_own_slot(self):
+        detector = ViolenceDetector(model_path="/nonexistent.pt")
+        detector.model = FakeYOLO()
+
+        good, bad, other = detector.detect_batch(GOOD_AND_BAD)
+
+        assert detector.model.batches == [2]
+        assert "error" not in good and "error" not in other
+        assert good["violence_score"] == pytest.approx(0.8)
+        assert other["violence_score"] == pytest.approx(0.4)
+        assert bad["violence_score"] == 0.0 and "decode" in bad["error"]
+
+    def test_model_failure_is_reported(self):
+        def crash(frames, verbose=False):
+            raise RuntimeError("CUDA out of memory")
+
+        detector = ViolenceDetector(model_path="/nonexistent.pt")
+        detector.model = crash
+
+        results = detector.detect_batch([array(10), array(20)])
+
+        assert all(result["error"] == "CUDA out of memory" for result in results)
+
+
+@pytest.fixture
+def weapon_detector():
+    try:
+        from app.services.yolo_weapons import WeaponDetector
+    except (ImportError, RuntimeError) as e:
+        pytest.skip(f"yolo_weapons unavailable: {e}")
+
+    detector = WeaponDetector.__new__(WeaponDetector)
+    detector.model_path = None
+    detector.yolo_model = FakeYOLO(cls=43)
+    detector.classifier = None
+    return detector
+
+
+class TestWeaponDetector:
+    def test_bad_input_fails_only_its_own_slot(self, weapon_detector):
+        good, bad, other = weapon_detector.detect_batch(GOOD_AND_BAD)
+
+        assert weapon_detector.yolo_model.batches == [2]
+        assert "error" not in good and "error" not in other
+        assert good["weapon_score"] == pytest.approx(0.8)
+        assert good["weapon_types"] == ["knife"]
+        assert bad["weapon_score"] == 0.0 and "decode" in bad["error"]
+
+    def test_failed_strategy_is_reported(self, weapon_detector):
+        def crash(images, **kwargs):
+            raise RuntimeError("classifier down")
+
+        weapon_detector.classifier = crash
+
+        results = weapon_detector.detect_batch([array(204), array(10)])
+
+        assert results[0]["weapon_score"] == pytest.approx(0.8)
+        assert all("classifier down" in result["error"] for result in results)
@@ -0,0 +1,148 @@
+"""
+Keyset (cursor) pagination for ad listings
+
+OFFSET makes SQLite walk and discard every earlier row, so deep pages get
+linearly slower. A cursor instead carries the sort key of the last row
+served, and the next page is a range scan on the matching composite index
+(see Ad.__table_args__).
+
+Cursors are opaque URL-safe strings. They are bound to the sort mode that
+produced them, and a cursor from another sort is rejected.
+
+Counter columns are nullable (rows written outside the ORM). A NULL inside
+a row-value comparison makes the whole comparison NULL, so those rows
+would silently drop out of every cursor page; counters are therefore
+sorted and compared as COALESCE(counter, 0), the expression the keyset
+indexes are built on.
+"""
+
+from sqlalchemy import and_, func, or_, tuple_
+from typing import Any, List, Optional, Sequence, Tuple
+import base64
+import json
+
+from models import Ad
+
+# Sort mode -> (column, descending) keys; ad_id breaks ties so keys are unique
+SORT_KEYS = {
+    "date": [(Ad.created_at, True), (Ad.ad_id, True)],
+    "views": [(Ad.views_count, True), (Ad.created_at, True), (Ad.ad_id, True)],
+    "favs": [(Ad.favorites_count, True), (Ad.created_at, True), (Ad.ad_id, True)],
+    "ai": [(Ad.likes_count, True), (Ad.views_count, True), (Ad.created_at, True), (Ad.ad_id, True)],
+}
+
+
+# Nullable sort columns, keyed and compared as COALESCE(column, 0)
+NULLABLE_KEYS = {"views_count", "favorites_count", "likes_count"}
+
+
+class InvalidCursor(ValueError):
+    """Cursor is malformed or belongs to a different sort"""
+
+
+def sort_keys(sort: str, rank=None) -> List[Tuple[Any, bool]]:
+    """Key columns for a sort mode (relevance needs the FTS rank column)"""
+    if sort == "relevance" and rank is not None:
+        return [(rank, False), (Ad.created_at, True), (Ad.ad_id, True)]
+    return SORT_KEYS.get(sort, SORT_KEYS["date"])
+
+
+def sort_expression(column):
+    """The expression a key column is ordered and compared by"""
+    if getattr(column, "key", None) in NULLABLE_KEYS:
+        return func.coalesce(column, 0)
+    return column
+
+
+def order_by_keys(query, keys: Sequence[Tuple[Any, bool]]):
+    return query.order_by(*[
+        sort_expression(column).desc() if desc else sort_expression(column).asc()
+        for column, desc in keys
+    ])
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    payload = json.dumps([sort, list(values)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, size: int) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if cursor_sort != sort or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Cursor does not match this sort")
+    return values
+
+
+def after_cursor(query, keys: Sequence[Tuple[Any, bool]], values: Sequence[Any]):
+    """Restrict `query` to rows strictly after `values` in key order"""
+    columns = [sort_expression(column) for column, _ in keys]
+
+    # Cursors from NULL counters carry None; the column side is coalesced too
+    values = [0 if value is None and column is not Ad.ad_id else value
+              for (column, _), value in zip(keys, values)]
+
+    if all(desc for _, desc in keys):
+        # Single row-value comparison: SQLite turns this into an index range
+        return query.filter(tuple_(*columns) < tuple_(*values))
+
+    # Mixed directions: (a > x) OR (a = x AND b < y) OR ...
+    clauses = []
+    for i, (_, desc) in enumerate(keys):
+        prefix = [columns[j] == values[j] for j in range(i)]
+        step = columns[i] < values[i] if desc else columns[i] > values[i]
+        clauses.append(and_(*prefix, step))
+    return query.filter(or_(*clauses))
+
+
+def paginate(query, sort: str, limit: int, cursor: Optional[str] = None,
+             page: int = 1, rank=None) -> Tuple[list, Optional[str]]:
+    """
+    Order and slice an Ad query.
+
+    With `cursor`, returns the page after it (keyset). Without one, falls
+    back to `page` via OFFSET so page-number links keep working. Either way
+    a `next_cursor` is returned for the following page.
+
+    Query rows may be Ad instances or tuples starting with one (joined
+    columns). For sort=relevance the rank column is selected temporarily
+    to build the cursor and stripped from the returned rows.
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    keys = sort_keys(sort, rank)
+    query = order_by_keys(query, keys)
+
+    if cursor:
+        query = after_cursor(query, keys, decode_cursor(cursor, sort, len(keys)))
+    elif page > 1:
+        query = query.offset((page - 1) * limit)
+
+    if rank is not None and sort == "relevance":
+        query = query.add_columns(rank)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        values = []
+        for column, _ in keys:
+            if column is rank:
+                values.append(last[-1])
+            else:
+                ad = last if isinstance(last, Ad) else last[0]
+                values.append(getattr(ad, column.key))
+        next_cursor = encode_cursor(sort, values)
+
+    if rank is not None and sort == "relevance":
+        rows = [row[:-1] if len(row) > 2 else row[0] for row in rows]
+
+    return rows, next_cursor
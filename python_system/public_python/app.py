@@ -20,7 +20,8 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))  # python_system directory
 
 from models import Base, Company, Ad, Category, AdView, Interaction, Favorite, get_current_timestamp
-from database import engine, SessionLocal, get_db
+from database import engine, SessionLocal, get_db, run_db
+from response_cache import cached_json
 
 # ============================================================================
 # PATHS CONFIGURATION
@@ -56,6 +57,15 @@ if COMPANY_DATA_PATH.exists():
 # Setup Jinja2 templates
 templates = Jinja2Templates(directory=str(TEMPLATES_PATH))
 
+# Response cache namespace; both apps serve /api/* from the shared Redis tier
+CACHE_NAMESPACE = "public_python"
+
+# Response cache TTLs (seconds); ORM writes invalidate these sooner
+CATEGORIES_CACHE_TTL = 300
+STATS_CACHE_TTL = 30
+ADS_CACHE_TTL = 30
+CACHED_AD_PAGES = 3  # only the first pages of /api/ads are cached
+
 
 # ============================================================================
 # DATABASE HELPERS
@@ -154,14 +164,16 @@ def get_stats_from_db(db: Session):
             "total_likes": int(total_likes),
             "total_favorites": int(total_favorites)
         }
-    except:
+    except Exception as e:
+        # "error" keeps the zero fallback out of the response cache
         return {
             "total_ads": 0,
             "total_views": 0,
             "total_companies": 0,
             "total_categories": 0,
             "total_likes": 0,
-            "total_favorites": 0
+            "total_favorites": 0,
+            "error": str(e)
         }
 
 
@@ -174,9 +186,10 @@ async def home(request: Request, db: Session = Depends(get_db)):
     """Home page - main landing page with ads"""
     start_time = time.time()
 
-    ads_data = get_ads_from_db(db, limit=20)
-    categories = get_categories_from_db(db)
-    stats = get_stats_from_db(db)
+    def load():
+        return get_ads_from_db(db, limit=20), get_categories_from_db(db), get_stats_from_db(db)
+
+    ads_data, categories, stats = await run_db(load)
 
     exec_time = round((time.time() - start_time) * 1000, 2)
 
@@ -205,8 +218,13 @@ async def browse(
     limit = 20
     offset = (page - 1) * limit
 
-    ads_data = get_ads_from_db(db, category=category, search=search, limit=limit, offset=offset)
-    categories = get_categories_from_db(db)
+    def load():
+        return (
+            get_ads_from_db(db, category=category, search=search, limit=limit, offset=offset),
+            get_categories_from_db(db)
+        )
+
+    ads_data, categories = await run_db(load)
 
     total_pages = (ads_data["total"] + limit - 1) // limit
 
@@ -226,7 +244,24 @@ async def browse(
 @app.get("/ad/{ad_id}", response_class=HTMLResponse)
 async def ad_detail(request: Request, ad_id: str, db: Session = Depends(get_db)):
     """Single ad detail page"""
-    ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+    def load():
+        ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+        if not ad:
+            return None, []
+
+        # Increment view count
+        ad.views_count = (ad.views_count or 0) + 1
+        db.commit()
+
+        # Get related ads
+        related_ads = db.query(Ad).filter(
+            Ad.category_slug == ad.category_slug,
+            Ad.ad_id != ad_id,
+            Ad.status == "active"
+        ).limit(4).all()
+        return ad, related_ads
+
+    ad, related_ads = await run_db(load)
 
     if not ad:
         return templates.TemplateResponse("404.html", {
@@ -234,17 +269,6 @@ async def ad_detail(request: Request, ad_id: str, db: Session = Depends(get_db))
             "message": "Ad not found"
         }, status_code=404)
 
-    # Increment view count
-    ad.views_count = (ad.views_count or 0) + 1
-    db.commit()
-
-    # Get related ads
-    related_ads = db.query(Ad).filter(
-        Ad.category_slug == ad.category_slug,
-        Ad.ad_id != ad_id,
-        Ad.status == "active"
-    ).limit(4).all()
-
     ad_data = {
         "id": ad.ad_id,
         "title": ad.title,
@@ -287,7 +311,16 @@ async def ad_detail(request: Request, ad_id: str, db: Session = Depends(get_db))
 @app.get("/category/{category_slug}", response_class=HTMLResponse)
 async def category_page(request: Request, category_slug: str, page: int = 1, db: Session = Depends(get_db)):
     """Category page"""
-    category = db.query(Category).filter(Category.category_slug == category_slug).first()
+    limit = 20
+    offset = (page - 1) * limit
+
+    def load():
+        category = db.query(Category).filter(Category.category_slug == category_slug).first()
+        if not category:
+            return None, None
+        return category, get_ads_from_db(db, category=category_slug, limit=limit, offset=offset)
+
+    category, ads_data = await run_db(load)
 
     if not category:
         return templates.TemplateResponse("404.html", {
@@ -295,10 +328,6 @@ async def category_page(request: Request, category_slug: str, page: int = 1, db:
             "message": "Category not found"
         }, status_code=404)
 
-    limit = 20
-    offset = (page - 1) * limit
-    ads_data = get_ads_from_db(db, category=category_slug, limit=limit, offset=offset)
-
     return templates.TemplateResponse("category.html", {
         "request": request,
         "category": {
@@ -316,12 +345,16 @@ async def category_page(request: Request, category_slug: str, page: int = 1, db:
 @app.get("/categories", response_class=HTMLResponse)
 async def categories_listing(request: Request, db: Session = Depends(get_db)):
     """All categories listing page"""
-    categories = get_categories_with_icons(db)
+    def load():
+        categories = get_categories_with_icons(db)
 
-    # Get ad count per category
-    for cat in categories:
-        count = db.query(Ad).filter(Ad.category_slug == cat["slug"], Ad.status == "active").count()
-        cat["ad_count"] = count
+        # Get ad count per category
+        for cat in categories:
+            count = db.query(Ad).filter(Ad.category_slug == cat["slug"], Ad.status == "active").count()
+            cat["ad_count"] = count
+        return categories
+
+    categories = await run_db(load)
 
     return templates.TemplateResponse("categories.html", {
         "request": request,
@@ -396,7 +429,7 @@ def get_categories_with_icons(db: Session):
 @app.get("/signup", response_class=HTMLResponse)
 async def register_page(request: Request, db: Session = Depends(get_db)):
     """User registration page - GET"""
-    categories = get_categories_with_icons(db)
+    categories = await run_db(get_categories_with_icons, db)
 
     return templates.TemplateResponse("register.html", {
         "request": request,
@@ -416,7 +449,7 @@ async def register_submit(request: Request, db: Session = Depends(get_db)):
     import hashlib
     import uuid
 
-    categories = get_categories_with_icons(db)
+    categories = await run_db(get_categories_with_icons, db)
     form = await request.form()
 
     form_data = {
@@ -445,25 +478,30 @@ async def register_submit(request: Request, db: Session = Depends(get_db)):
         error = "You must agree to the Terms of Service."
     else:
         # Check if user exists
+        def create_user():
+            if db.query(User).filter(User.email == email).first():
+                return False
+
+            # Create user
+            user_id = f"USR_{uuid.uuid4().hex[:12]}"
+            password_hash = hashlib.sha256(password.encode()).hexdigest()  # Use proper hashing in production
+
+            new_user = User(
+                email=email,
+                password_hash=password_hash,
+                full_name=full_name,
+                preferences=str(form_data["interests"]),
+                created_at=get_current_timestamp()
+            )
+            db.add(new_user)
+            db.commit()
+            return True
+
         try:
-            existing = db.query(User).filter(User.email == email).first()
-            if existing:
-                error = "An account with this email already exists."
-            else:
-                # Create user
-                user_id = f"USR_{uuid.uuid4().hex[:12]}"
-                password_hash = hashlib.sha256(password.encode()).hexdigest()  # Use proper hashing in production
-
-                new_user = User(
-                    email=email,
-                    password_hash=password_hash,
-                    full_name=full_name,
-                    preferences=str(form_data["interests"]),
-                    created_at=get_current_timestamp()
-                )
-                db.add(new_user)
-                db.commit()
+            if await run_db(create_user):
                 success = "Account created successfully! You can now login."
+            else:
+                error = "An account with this email already exists."
         except Exception as e:
             error = f"Failed to create account. Please try again."
             print(f"Registration error: {e}")
@@ -523,6 +561,7 @@ async def health_check():
 
 @app.get("/api/ads")
 async def api_get_ads(
+    request: Request,
     category: str = None,
     search: str = None,
     page: int = 1,
@@ -530,22 +569,30 @@ async def api_get_ads(
     db: Session = Depends(get_db)
 ):
     """API: Get ads with filters"""
-    offset = (page - 1) * limit
-    ads_data = get_ads_from_db(db, category=category, search=search, limit=limit, offset=offset)
+    def load():
+        offset = (page - 1) * limit
+        ads_data = get_ads_from_db(db, category=category, search=search, limit=limit, offset=offset)
 
-    return {
-        "status": "success",
-        "total": ads_data["total"],
-        "page": page,
-        "limit": limit,
-        "ads": ads_data["ads"]
-    }
+        return {
+            "status": "success",
+            "total": ads_data["total"],
+            "page": page,
+            "limit": limit,
+            "ads": ads_data["ads"]
+        }
+
+    if page > CACHED_AD_PAGES:
+        return await run_db(load)
+
+    params = {"category": category, "search": search, "page": page, "limit": limit}
+    return await cached_json(request, "/api/ads", params, lambda: run_db(load),
+                             ttl=ADS_CACHE_TTL, tags=("ads",), namespace=CACHE_NAMESPACE)
 
 
 @app.get("/api/ads/{ad_id}")
 async def api_get_ad(ad_id: str, db: Session = Depends(get_db)):
     """API: Get single ad"""
-    ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+    ad = await run_db(db.query(Ad).filter(Ad.ad_id == ad_id).first)
 
     if not ad:
         raise HTTPException(status_code=404, detail="Ad not found")
@@ -578,17 +625,23 @@ async def api_get_ad(ad_id: str, db: Session = Depends(get_db)):
 
 
 @app.get("/api/categories")
-async def api_get_categories(db: Session = Depends(get_db)):
+async def api_get_categories(request: Request, db: Session = Depends(get_db)):
     """API: Get all categories"""
-    categories = get_categories_from_db(db)
-    return {"status": "success", "categories": categories}
+    def load():
+        return {"status": "success", "categories": get_categories_from_db(db)}
+
+    return await cached_json(request, "/api/categories", {}, lambda: run_db(load),
+                             ttl=CATEGORIES_CACHE_TTL, tags=("categories",), namespace=CACHE_NAMESPACE)
 
 
 @app.get("/api/dashboard_stats")
-async def api_dashboard_stats(db: Session = Depends(get_db)):
+async def api_dashboard_stats(request: Request, db: Session = Depends(get_db)):
     """API: Get dashboard statistics"""
-    stats = get_stats_from_db(db)
-    return {"status": "success", **stats}
+    def load():
+        return {"status": "success", **get_stats_from_db(db)}
+
+    return await cached_json(request, "/api/dashboard_stats", {}, lambda: run_db(load),
+                             ttl=STATS_CACHE_TTL, tags=("stats",), namespace=CACHE_NAMESPACE)
 
 
 @app.post("/api/track_interaction")
@@ -599,24 +652,28 @@ async def api_track_interaction(
     db: Session = Depends(get_db)
 ):
     """API: Track user interactions"""
-    ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
-
-    if not ad:
+    def track():
+        ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+        if not ad:
+            return False
+
+        if event_type == "view":
+            ad.views_count = (ad.views_count or 0) + 1
+        elif event_type == "like":
+            ad.likes_count = (ad.likes_count or 0) + 1
+        elif event_type == "dislike":
+            ad.dislikes_count = (ad.dislikes_count or 0) + 1
+        elif event_type == "favorite":
+            ad.favorites_count = (ad.favorites_count or 0) + 1
+        elif event_type in ["call", "sms", "email", "whatsapp"]:
+            ad.contacts_count = (ad.contacts_count or 0) + 1
+
+        db.commit()
+        return True
+
+    if not await run_db(track):
         raise HTTPException(status_code=404, detail="Ad not found")
 
-    if event_type == "view":
-        ad.views_count = (ad.views_count or 0) + 1
-    elif event_type == "like":
-        ad.likes_count = (ad.likes_count or 0) + 1
-    elif event_type == "dislike":
-        ad.dislikes_count = (ad.dislikes_count or 0) + 1
-    elif event_type == "favorite":
-        ad.favorites_count = (ad.favorites_count or 0) + 1
-    elif event_type in ["call", "sms", "email", "whatsapp"]:
-        ad.contacts_count = (ad.contacts_count or 0) + 1
-
-    db.commit()
-
     return {"status": "success", "message": f"Tracked {event_type}"}
 
 
@@ -0,0 +1,315 @@
+"""
+ad_index.py - In-process ad metadata index
+Maps ad_id -> title, company, category and media path
+
+Built once from the SQLite ads table (plus any legacy meta.json-only
+ads under companies/data), then kept current by SQLAlchemy mapper
+events on Ad, so endpoints never walk the data tree per request.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import json
+import threading
+import time
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from models import Ad
+from database import SessionLocal
+
+DATA_PATH = Path(__file__).parent.parent / "companies" / "data"
+
+
+def _entry_from_ad(ad) -> Dict:
+    return {
+        "ad_id": ad.ad_id,
+        "title": ad.title or "Untitled",
+        "company": ad.company_slug,
+        "category": ad.category_slug,
+        "media_path": ad.media_path,
+        "status": ad.status,
+        "timestamp": ad.created_at if isinstance(ad.created_at, int) else 0,
+    }
+
+
+def _entry_from_meta(meta: Dict, ad_id: str, category: str, company: str) -> Dict:
+    primary = meta.get("primary_media") or ""
+    return {
+        "ad_id": ad_id,
+        "title": meta.get("title", "Untitled"),
+        "company": company,
+        "category": category,
+        "media_path": f"{category}/{company}/{ad_id}/{primary}" if primary else None,
+        "status": meta.get("status", "active"),
+        "timestamp": meta.get("timestamp", 0),
+    }
+
+
+class AdIndex:
+    """
+    Thread-safe ad_id -> metadata map with a per-company secondary index.
+
+    Writes made through the ORM are applied when they commit; anything changed
+    behind its back (PHP handlers, other processes) is picked up by a
+    per-id DB lookup on miss and a full rebuild every `refresh_interval`.
+
+    Only the first build blocks. Periodic rebuilds run on a background
+    thread while lookups keep using the current maps, which are swapped in
+    whole when the new ones are ready.
+    """
+
+    def __init__(self, data_path: Path = DATA_PATH, refresh_interval: float = 300):
+        self.data_path = data_path
+        self.refresh_interval = refresh_interval
+
+        self._ads: Dict[str, Dict] = {}
+        self._by_company: Dict[str, Set[str]] = {}
+        self._missing: Set[str] = set()
+        self._built_at = 0.0
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()   # one rebuild at a time
+        self._refreshing = False
+        # put/remove calls made while a rebuild is loading, replayed after the swap
+        self._changes: Optional[List[Tuple[str, Any]]] = None
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def rebuild(self):
+        """Load every ad from the DB, then legacy meta.json-only ads"""
+        with self._build_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Load new maps without blocking lookups, then swap them in (caller holds _build_lock)"""
+        with self._lock:
+            self._changes = []
+        try:
+            ads, by_company = self._load()
+        except Exception:
+            with self._lock:
+                self._changes = None
+            raise
+
+        with self._lock:
+            changes, self._changes = self._changes, None
+            self._ads = ads
+            self._by_company = by_company
+            self._missing = set()
+            self._built_at = time.time()
+
+            # Commits that landed while loading may be missing from the snapshot
+            for op, value in changes:
+                if op == "put":
+                    self.put(value)
+                else:
+                    self.remove(value)
+
+    def _load(self) -> Tuple[Dict[str, Dict], Dict[str, Set[str]]]:
+        ads: Dict[str, Dict] = {}
+
+        db = SessionLocal()
+        try:
+            for ad in db.query(Ad).all():
+                ads[ad.ad_id] = _entry_from_ad(ad)
+        finally:
+            db.close()
+
+        # One walk of the data tree for ads that never made it into the DB
+        if self.data_path.exists():
+            for category_dir in self.data_path.iterdir():
+                if not category_dir.is_dir():
+                    continue
+                for company_dir in category_dir.iterdir():
+                    if not company_dir.is_dir():
+                        continue
+                    for ad_dir in company_dir.iterdir():
+                        if ad_dir.name in ads or not ad_dir.is_dir():
+                            continue
+                        meta_file = ad_dir / "meta.json"
+                        try:
+                            with open(meta_file, "r") as f:
+                                meta = json.load(f)
+                        except (OSError, ValueError):
+                            continue
+                        ads[ad_dir.name] = _entry_from_meta(
+                            meta, ad_dir.name, category_dir.name, company_dir.name
+                        )
+
+        by_company: Dict[str, Set[str]] = {}
+        for ad_id, entry in ads.items():
+            by_company.setdefault(entry["company"], set()).add(ad_id)
+        return ads, by_company
+
+    def _ensure_fresh(self):
+        if not self._built_at:
+            # Nothing to serve yet: the first build blocks
+            with self._build_lock:
+                if not self._built_at:
+                    self._rebuild()
+        elif time.time() - self._built_at >= self.refresh_interval:
+            self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"⚠ Ad index refresh failed: {e}")
+                with self._lock:
+                    self._built_at = time.time()   # retry after another interval
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="ad-index-refresh", daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def put(self, entry: Dict):
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append(("put", entry))
+            old = self._ads.get(entry["ad_id"])
+            if old and old["company"] != entry["company"]:
+                self._by_company.get(old["company"], set()).discard(entry["ad_id"])
+            self._ads[entry["ad_id"]] = entry
+            self._by_company.setdefault(entry["company"], set()).add(entry["ad_id"])
+            self._missing.discard(entry["ad_id"])
+
+    def remove(self, ad_id: str):
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append(("remove", ad_id))
+            old = self._ads.pop(ad_id, None)
+            if old:
+                self._by_company.get(old["company"], set()).discard(ad_id)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, ad_id: str) -> Optional[Dict]:
+        """Metadata for one ad, or None if it doesn't exist"""
+        self._ensure_fresh()
+
+        with self._lock:
+            entry = self._ads.get(ad_id)
+            if entry is not None or ad_id in self._missing:
+                return entry
+
+        # Created outside the ORM since the last build: one PK lookup
+        db = SessionLocal()
+        try:
+            ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+        finally:
+            db.close()
+
+        if ad is None:
+            with self._lock:
+                self._missing.add(ad_id)
+            return None
+
+        entry = _entry_from_ad(ad)
+        self.put(entry)
+        return entry
+
+    def get_many(self, ad_ids: Iterable[str]) -> Dict[str, Dict]:
+        result = {}
+        for ad_id in ad_ids:
+            entry = self.get(ad_id)
+            if entry is not None:
+                result[ad_id] = entry
+        return result
+
+    def title(self, ad_id: str, default: str = "Untitled") -> str:
+        entry = self.get(ad_id)
+        return entry["title"] if entry else default
+
+    def ad_path(self, ad_id: str, base: Path = None) -> Optional[Path]:
+        """Directory holding the ad's media and meta.json"""
+        base = base or self.data_path
+        entry = self.get(ad_id)
+        if entry is not None:
+            return base / entry["category"] / entry["company"] / ad_id
+
+        # File-only ad created since the last build (rare): one targeted glob
+        for ad_dir in base.glob(f"*/*/{ad_id}"):
+            if ad_dir.is_dir():
+                return ad_dir
+        return None
+
+    def company_ads(self, company_slug: str) -> Dict[str, Dict]:
+        self._ensure_fresh()
+        with self._lock:
+            return {ad_id: self._ads[ad_id] for ad_id in self._by_company.get(company_slug, ())}
+
+    def company_last_active(self, company_slug: str) -> int:
+        """Newest ad timestamp for a company (0 if it has none)"""
+        return max((entry["timestamp"] or 0 for entry in self.company_ads(company_slug).values()), default=0)
+
+
+_index: Optional[AdIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_ad_index() -> AdIndex:
+    """Process-wide AdIndex singleton"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AdIndex()
+    return _index
+
+
+# Keep the index in step with every ORM write (upload, update, status,
+# delete). Changes are staged on the session and applied on commit, so a
+# rolled-back transaction never leaks into the index.
+def _stage(target, deleted: bool):
+    session = object_session(target)
+    if session is None or _index is None:
+        return
+    staged = session.info.setdefault("ad_index_changes", {})
+    staged[target.ad_id] = None if deleted else _entry_from_ad(target)
+
+
+@event.listens_for(Ad, "after_insert")
+@event.listens_for(Ad, "after_update")
+def _on_ad_saved(mapper, connection, target):
+    _stage(target, deleted=False)
+
+
+@event.listens_for(Ad, "after_delete")
+def _on_ad_deleted(mapper, connection, target):
+    _stage(target, deleted=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    staged = session.info.pop("ad_index_changes", None)
+    if not staged or _index is None:
+        return
+    for ad_id, entry in staged.items():
+        if entry is None:
+            _index.remove(ad_id)
+        else:
+            _index.put(entry)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session):
+    session.info.pop("ad_index_changes", None)
@@ -18,42 +18,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from models import Company, Ad
 from database import get_db
 
+from ..ad_index import get_ad_index
+
 router = APIRouter()
 
 METADATA_PATH = Path(__file__).parent.parent.parent / "companies" / "metadata"
-DATA_PATH = Path(__file__).parent.parent.parent / "companies" / "data"
 
 
 def calculate_last_active(company_slug: str) -> str:
     """Calculate when user was last active based on ad activity"""
-    latest_timestamp = 0
-
-    if not DATA_PATH.exists():
-        return "Never"
-
-    # Scan all categories
-    for category_dir in DATA_PATH.iterdir():
-        if not category_dir.is_dir():
-            continue
-
-        company_path = category_dir / company_slug
-        if not company_path.exists():
-            continue
-
-        # Check for recent ad folders
-        for ad_folder in company_path.iterdir():
-            if not ad_folder.is_dir():
-                continue
-
-            meta_file = ad_folder / "meta.json"
-            if meta_file.exists():
-                try:
-                    with open(meta_file, "r") as f:
-                        meta = json.load(f)
-                        ts = meta.get("timestamp", 0)
-                        latest_timestamp = max(latest_timestamp, ts)
-                except Exception:
-                    pass
+    latest_timestamp = get_ad_index().company_last_active(company_slug)
 
     if latest_timestamp == 0:
         return "Never"
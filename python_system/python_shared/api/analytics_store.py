@@ -0,0 +1,757 @@
+"""
+analytics_store.py - Append-only analytics event store
+Replaces the per-ad companies/analytics/{ad_id}.json rewrite
+
+Events are buffered in memory and flushed in one SQLite (WAL)
+transaction when the buffer fills up or ages out. Each flush appends
+the raw events and folds their counter deltas into a compact per-ad
+summary row, so tracking never re-reads history.
+
+The same flush also bumps hourly rollup counters per (ad, company,
+event type, day, hour, audience), so range queries for dashboards
+read O(days) rows instead of scanning raw events.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+ANALYTICS_PATH = Path(__file__).parent.parent / "companies" / "analytics"
+ANALYTICS_DB = ANALYTICS_PATH / "events.db"
+
+CONTACT_METHODS = ("call", "sms", "email", "whatsapp")
+
+ROLLUP_DIMENSIONS = ("day", "hour", "ad_id", "company", "type", "audience")
+
+# Summary counters, in column order
+COUNTERS = (
+    "total_views",
+    "total_clicks",
+    "total_contacts",
+    "total_likes",
+    "total_dislikes",
+    "total_favorites",
+    "total_unfavorites",
+    "current_favorites",
+    "total_time_spent",
+    "time_spent_events",
+)
+
+# event type -> counter deltas
+EVENT_COUNTERS = {
+    "view": {"total_views": 1},
+    "click": {"total_clicks": 1},
+    "contact": {"total_contacts": 1},
+    "like": {"total_likes": 1},
+    "dislike": {"total_dislikes": 1},
+    "favorite": {"total_favorites": 1, "current_favorites": 1},
+    "unfavorite": {"total_unfavorites": 1, "current_favorites": -1},
+    **{method: {"total_contacts": 1} for method in CONTACT_METHODS},
+}
+
+
+def detect_age_group(user_agent: str) -> str:
+    """Simple heuristic to detect age group from user agent"""
+    ua_lower = (user_agent or "").lower()
+
+    youth_patterns = ['tiktok', 'snapchat', 'instagram', 'mobile', 'android']
+    middle_age_patterns = ['facebook', 'linkedin', 'chrome', 'safari']
+    elderly_patterns = ['desktop', 'windows', 'msie', 'edge']
+
+    for pattern in youth_patterns:
+        if pattern in ua_lower:
+            return 'youth'
+    for pattern in middle_age_patterns:
+        if pattern in ua_lower:
+            return 'middle_age'
+    for pattern in elderly_patterns:
+        if pattern in ua_lower:
+            return 'elderly'
+
+    return 'unknown'
+
+
+def _resolve_company(ad_id: str) -> str:
+    """Owning company for rollups ('' if the ad isn't known)"""
+    try:
+        from .ad_index import get_ad_index
+    except ImportError:
+        # Run as a script (cron compaction): no package context
+        return ""
+    entry = get_ad_index().get(ad_id)
+    return entry["company"] if entry else ""
+
+
+def _empty_summary(ad_id: str) -> Dict[str, Any]:
+    summary = {"ad_id": ad_id, **{name: 0 for name in COUNTERS}}
+    summary["avg_time_spent"] = 0
+    return summary
+
+
+class AnalyticsStore:
+    """
+    Buffered, append-only analytics events with incremental per-ad counters.
+
+    Usage:
+        store = get_analytics_store()
+        store.record(ad_id, "view", ip=..., user_agent=...)
+        summary = store.get_summary(ad_id)
+    """
+
+    def __init__(
+        self,
+        db_path: Path = ANALYTICS_DB,
+        flush_size: int = 500,
+        flush_interval: float = 1.0,
+        retention_days: int = 90,
+        rollup_retention_days: int = 400,
+        compact_interval: float = 86400
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self.compact_interval = compact_interval
+
+        self._buffer: List[tuple] = []
+        self._deltas: Dict[str, Dict[str, float]] = {}
+        self._last_contact: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._local = threading.local()
+        self._closed = False
+
+        self._init_db()
+        self._backfill_rollups()
+        self._import_legacy_files()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="analytics-flush", daemon=True)
+        self._flusher.start()
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ad_id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                ip TEXT,
+                user_agent TEXT,
+                action TEXT,
+                duration REAL,
+                metadata TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_ad_time ON events(ad_id, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_events_time ON events(timestamp);
+
+            CREATE TABLE IF NOT EXISTS ad_summary (
+                ad_id TEXT PRIMARY KEY,
+                {", ".join(f"{name} REAL NOT NULL DEFAULT 0" for name in COUNTERS)},
+                last_contact INTEGER,
+                updated_at INTEGER
+            );
+
+            CREATE TABLE IF NOT EXISTS event_rollup (
+                day TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                ad_id TEXT NOT NULL,
+                company TEXT NOT NULL DEFAULT '',
+                type TEXT NOT NULL,
+                audience TEXT NOT NULL DEFAULT 'unknown',
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, hour, ad_id, type, audience)
+            );
+            CREATE INDEX IF NOT EXISTS idx_rollup_ad_day ON event_rollup(ad_id, day);
+            CREATE INDEX IF NOT EXISTS idx_rollup_company_day ON event_rollup(company, day);
+
+            CREATE TABLE IF NOT EXISTS legacy_imports (
+                file TEXT PRIMARY KEY,
+                imported_at INTEGER NOT NULL
+            );
+        """)
+        conn.commit()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        ad_id: str,
+        event_type: str,
+        ip: str = "unknown",
+        user_agent: Optional[str] = None,
+        action: Optional[str] = None,
+        duration: Optional[float] = None,
+        metadata: Optional[Dict] = None,
+        timestamp: Optional[int] = None
+    ):
+        """Buffer one event and its counter deltas (no disk I/O)"""
+        now = int(timestamp or time.time())
+        row = (
+            ad_id, event_type, now, ip, user_agent, action, duration,
+            json.dumps(metadata) if metadata else None
+        )
+
+        with self._lock:
+            self._buffer.append(row)
+
+            deltas = self._deltas.setdefault(ad_id, {})
+            for name, delta in EVENT_COUNTERS.get(event_type, {}).items():
+                deltas[name] = deltas.get(name, 0) + delta
+            if event_type == "time_spent" and duration:
+                deltas["total_time_spent"] = deltas.get("total_time_spent", 0) + duration
+                deltas["time_spent_events"] = deltas.get("time_spent_events", 0) + 1
+            if event_type == "contact":
+                self._last_contact[ad_id] = now
+            deltas["updated_at"] = now
+
+            full = len(self._buffer) >= self.flush_size
+
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write buffered events + summary deltas in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+                deltas, self._deltas = self._deltas, {}
+                last_contact, self._last_contact = self._last_contact, {}
+
+            if not rows:
+                return
+
+            conn = self._conn()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO events (ad_id, type, timestamp, ip, user_agent, action, duration, metadata) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    self._apply_deltas(conn, deltas, last_contact)
+                    self._apply_rollups(conn, rows)
+            except sqlite3.Error:
+                # Put everything back so the next flush retries it
+                with self._lock:
+                    self._buffer[:0] = rows
+                    for ad_id, ad_deltas in deltas.items():
+                        merged = self._deltas.setdefault(ad_id, {})
+                        for name, value in ad_deltas.items():
+                            if name == "updated_at":
+                                merged[name] = max(merged.get(name, 0), value)
+                            else:
+                                merged[name] = merged.get(name, 0) + value
+                    for ad_id, ts in last_contact.items():
+                        self._last_contact.setdefault(ad_id, ts)
+                raise
+
+    def _apply_deltas(self, conn: sqlite3.Connection, deltas: Dict, last_contact: Dict):
+        columns = ", ".join(COUNTERS)
+        # current_favorites is clamped at 0 on both paths. excluded.* holds the
+        # clamped insert value, so the update adds the raw delta (bound again
+        # after the VALUES params) or an unfavorite would never be subtracted.
+        placeholders = ", ".join(
+            "MAX(0, ?)" if name == "current_favorites" else "?" for name in COUNTERS
+        )
+        updates = ", ".join(
+            f"{name} = MAX(0, {name} + ?)" if name == "current_favorites"
+            else f"{name} = {name} + excluded.{name}"
+            for name in COUNTERS
+        )
+
+        conn.executemany(
+            f"""
+            INSERT INTO ad_summary (ad_id, {columns}, last_contact, updated_at)
+            VALUES (?, {placeholders}, ?, ?)
+            ON CONFLICT(ad_id) DO UPDATE SET
+                {updates},
+                last_contact = COALESCE(excluded.last_contact, last_contact),
+                updated_at = MAX(COALESCE(updated_at, 0), excluded.updated_at)
+            """,
+            [
+                (
+                    ad_id,
+                    *[ad_deltas.get(name, 0) for name in COUNTERS],
+                    last_contact.get(ad_id),
+                    int(ad_deltas.get("updated_at", time.time())),
+                    ad_deltas.get("current_favorites", 0)
+                )
+                for ad_id, ad_deltas in deltas.items()
+            ]
+        )
+
+    def _apply_rollups(self, conn: sqlite3.Connection, rows: List[tuple]):
+        """Bucket event rows (insert-tuple layout) into hourly rollup counters"""
+        buckets: Counter = Counter()
+        companies: Dict[str, str] = {}
+
+        for ad_id, event_type, timestamp, _ip, user_agent, *_rest in rows:
+            if ad_id not in companies:
+                companies[ad_id] = _resolve_company(ad_id)
+            moment = datetime.fromtimestamp(timestamp)
+            buckets[(
+                moment.strftime("%Y-%m-%d"),
+                moment.hour,
+                ad_id,
+                companies[ad_id],
+                event_type,
+                detect_age_group(user_agent)
+            )] += 1
+
+        conn.executemany(
+            """
+            INSERT INTO event_rollup (day, hour, ad_id, company, type, audience, count)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day, hour, ad_id, type, audience) DO UPDATE SET
+                count = count + excluded.count,
+                company = CASE WHEN excluded.company != '' THEN excluded.company ELSE company END
+            """,
+            [(*key, count) for key, count in buckets.items()]
+        )
+
+    def _flush_loop(self):
+        last_compact = time.time()
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠ Analytics flush failed: {e}")
+
+            if self.compact_interval and time.time() - last_compact >= self.compact_interval:
+                last_compact = time.time()
+                try:
+                    result = self.compact()
+                    print(f"✓ Analytics compacted: {result}")
+                except Exception as e:
+                    print(f"⚠ Analytics compaction failed: {e}")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Reads (flush first so callers see their own writes)
+    # ------------------------------------------------------------------
+
+    def get_summary(self, ad_id: str) -> Dict[str, Any]:
+        """
+        Counters for one ad in the legacy analytics-file shape.
+
+        Still-buffered deltas are added on top of the stored row rather
+        than forcing a flush, so per-request reads stay cheap.
+        """
+        # Holding the flush lock keeps the row and the pending deltas consistent
+        with self._flush_lock:
+            row = self._conn().execute("SELECT * FROM ad_summary WHERE ad_id = ?", (ad_id,)).fetchone()
+            with self._lock:
+                pending = dict(self._deltas.get(ad_id, {}))
+                last_contact = self._last_contact.get(ad_id)
+
+        summary = self._summary_from_row(row) if row else _empty_summary(ad_id)
+        if not pending:
+            return summary
+
+        for name in COUNTERS:
+            summary[name] = summary[name] + pending.get(name, 0)
+        summary["current_favorites"] = max(0, summary["current_favorites"])
+        summary["avg_time_spent"] = (
+            round(summary["total_time_spent"] / summary["time_spent_events"], 2)
+            if summary["time_spent_events"] else 0
+        )
+        if last_contact:
+            summary["last_contact"] = last_contact
+        summary["updated_at"] = int(pending["updated_at"])
+        return summary
+
+    def all_summaries(self, ad_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Counters for every tracked ad (or the given ones)"""
+        self.flush()
+        conn = self._conn()
+        if ad_ids is None:
+            rows = conn.execute("SELECT * FROM ad_summary").fetchall()
+        else:
+            ids = list(ad_ids)
+            rows = []
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows.extend(conn.execute(
+                    f"SELECT * FROM ad_summary WHERE ad_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+        return [self._summary_from_row(row) for row in rows]
+
+    def get_events(
+        self,
+        ad_id: Optional[str] = None,
+        since: Optional[int] = None,
+        types: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Raw events, oldest first.
+
+        Args:
+            ad_id: Restrict to one ad
+            since: Only events with timestamp > since
+            types: Only these event types
+            limit: Keep only the most recent N events
+        """
+        self.flush()
+
+        clauses, params = [], []
+        if ad_id is not None:
+            clauses.append("ad_id = ?")
+            params.append(ad_id)
+        if since is not None:
+            clauses.append("timestamp > ?")
+            params.append(int(since))
+        if types is not None:
+            types = list(types)
+            clauses.append(f"type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+
+        sql = "SELECT * FROM events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        rows = self._conn().execute(sql, params).fetchall()
+        return [self._event_from_row(row) for row in reversed(rows)]
+
+    def recent_events(
+        self,
+        since: int,
+        limit: int,
+        ad_ids: Optional[Iterable[str]] = None,
+        per_ad_limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Most recent events, newest first, for live feeds.
+
+        Unlike get_events() this doesn't force a flush (a feed may lag by
+        up to flush_interval). Rows are streamed newest-first off the time
+        index and reading stops once `limit` events are collected.
+
+        Args:
+            since: Only events with timestamp > since
+            limit: Maximum number of events returned
+            ad_ids: Restrict to these ads (e.g. one company's)
+            per_ad_limit: At most this many events from any single ad
+        """
+        sql = "SELECT * FROM events WHERE timestamp > ?"
+        params: List[Any] = [int(since)]
+        if ad_ids is not None:
+            ad_ids = list(ad_ids)
+            if not ad_ids:
+                return []
+            sql += f" AND ad_id IN ({','.join('?' * len(ad_ids))})"
+            params.extend(ad_ids)
+        sql += " ORDER BY timestamp DESC, id DESC"
+        if per_ad_limit is None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        events: List[Dict[str, Any]] = []
+        per_ad: Counter = Counter()
+        cursor = self._conn().execute(sql, params)
+        try:
+            for row in cursor:
+                if per_ad_limit is not None:
+                    if per_ad[row["ad_id"]] >= per_ad_limit:
+                        continue
+                    per_ad[row["ad_id"]] += 1
+                events.append(self._event_from_row(row))
+                if len(events) >= limit:
+                    break
+        finally:
+            # Ends the read statement early instead of holding the WAL snapshot
+            cursor.close()
+        return events
+
+    def count_by_type(self, since: int, ad_ids: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Event counts per type since `since`, grouped in SQL (no flush, like recent_events)"""
+        sql = "SELECT type, COUNT(*) AS n FROM events WHERE timestamp > ?"
+        params: List[Any] = [int(since)]
+        if ad_ids is not None:
+            ad_ids = list(ad_ids)
+            if not ad_ids:
+                return {}
+            sql += f" AND ad_id IN ({','.join('?' * len(ad_ids))})"
+            params.extend(ad_ids)
+        sql += " GROUP BY type"
+        return {row["type"]: row["n"] for row in self._conn().execute(sql, params)}
+
+    def load_analytics(self, ad_id: str, event_limit: int = 1000) -> Dict[str, Any]:
+        """Summary + most recent events, matching the old {ad_id}.json layout"""
+        analytics = self.get_summary(ad_id)
+        analytics["events"] = self.get_events(ad_id=ad_id, limit=event_limit)
+        return analytics
+
+    def get_rollups(
+        self,
+        since_day: Optional[str] = None,
+        ad_id: Optional[str] = None,
+        company: Optional[str] = None,
+        types: Optional[Iterable[str]] = None,
+        group_by: Iterable[str] = ("day", "type")
+    ) -> List[Dict[str, Any]]:
+        """
+        Summed rollup counters for a day range.
+
+        Args:
+            since_day: First day included (YYYY-MM-DD, local time)
+            ad_id: Restrict to one ad
+            company: Restrict to one company's ads
+            types: Only these event types
+            group_by: Any of day, hour, ad_id, company, type, audience
+
+        Returns:
+            One dict per group with the group_by keys and "count"
+        """
+        group_by = [column for column in group_by if column in ROLLUP_DIMENSIONS]
+        self.flush()
+
+        clauses, params = [], []
+        if since_day is not None:
+            clauses.append("day >= ?")
+            params.append(since_day)
+        if ad_id is not None:
+            clauses.append("ad_id = ?")
+            params.append(ad_id)
+        if company is not None:
+            clauses.append("company = ?")
+            params.append(company)
+        if types is not None:
+            types = list(types)
+            clauses.append(f"type IN ({','.join('?' * len(types))})")
+            params.extend(types)
+
+        select = ", ".join(group_by + ["SUM(count) AS count"])
+        sql = f"SELECT {select} FROM event_rollup"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if group_by:
+            sql += " GROUP BY " + ", ".join(group_by)
+
+        return [dict(row) for row in self._conn().execute(sql, params).fetchall()]
+
+    def delete_ad(self, ad_id: str):
+        """Drop all analytics for an ad"""
+        self.flush()
+        with self._conn() as conn:
+            conn.execute("DELETE FROM events WHERE ad_id = ?", (ad_id,))
+            conn.execute("DELETE FROM ad_summary WHERE ad_id = ?", (ad_id,))
+            conn.execute("DELETE FROM event_rollup WHERE ad_id = ?", (ad_id,))
+
+    @staticmethod
+    def _summary_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        summary = {"ad_id": row["ad_id"]}
+        for name in COUNTERS:
+            value = row[name]
+            summary[name] = int(value) if float(value).is_integer() else value
+        summary["avg_time_spent"] = (
+            round(row["total_time_spent"] / row["time_spent_events"], 2)
+            if row["time_spent_events"] else 0
+        )
+        if row["last_contact"]:
+            summary["last_contact"] = row["last_contact"]
+        if row["updated_at"]:
+            summary["updated_at"] = row["updated_at"]
+        return summary
+
+    @staticmethod
+    def _event_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        event = {
+            "type": row["type"],
+            "timestamp": row["timestamp"],
+            "ip": row["ip"] or "unknown",
+            "ad_id": row["ad_id"],
+        }
+        if row["user_agent"] is not None:
+            event["user_agent"] = row["user_agent"]
+        if row["action"] is not None:
+            event["action"] = row["action"]
+        if row["duration"] is not None:
+            event["duration"] = row["duration"]
+        if row["metadata"]:
+            event["metadata"] = json.loads(row["metadata"])
+        return event
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self, retention_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Prune raw events past the retention window and reclaim space.
+
+        Summary counters are maintained incrementally, so lifetime totals
+        are unaffected; trends and contact breakdowns come from rollups,
+        which are kept for `rollup_retention_days`. Rollup rows whose ad
+        had no known company at ingest are re-attributed here.
+        """
+        self.flush()
+        days = self.retention_days if retention_days is None else retention_days
+        cutoff = int(time.time()) - days * 86400
+        rollup_cutoff = datetime.fromtimestamp(
+            time.time() - self.rollup_retention_days * 86400
+        ).strftime("%Y-%m-%d")
+
+        conn = self._conn()
+        with conn:
+            deleted = conn.execute("DELETE FROM events WHERE timestamp < ?", (cutoff,)).rowcount
+            rollups_pruned = conn.execute("DELETE FROM event_rollup WHERE day < ?", (rollup_cutoff,)).rowcount
+
+            unattributed = [row[0] for row in conn.execute(
+                "SELECT DISTINCT ad_id FROM event_rollup WHERE company = ''"
+            )]
+            conn.executemany(
+                "UPDATE event_rollup SET company = ? WHERE ad_id = ? AND company = ''",
+                [(company, ad_id) for ad_id in unattributed if (company := _resolve_company(ad_id))]
+            )
+
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if deleted or rollups_pruned:
+            conn.execute("VACUUM")
+
+        imported = self._import_legacy_files()
+        return {
+            "events_pruned": deleted,
+            "rollups_pruned": rollups_pruned,
+            "legacy_files_imported": imported
+        }
+
+    def _backfill_rollups(self):
+        """One-time rollup build for events stored before rollups existed"""
+        conn = self._conn()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return
+
+        with conn:
+            conn.execute("DELETE FROM event_rollup")
+            cursor = conn.execute(
+                "SELECT ad_id, type, timestamp, ip, user_agent FROM events ORDER BY id"
+            )
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                self._apply_rollups(conn, [tuple(row) for row in rows])
+        conn.execute("PRAGMA user_version = 1")
+
+    def _import_legacy_files(self) -> int:
+        """
+        Fold old per-ad JSON files into the store, then retire them.
+
+        Every worker process runs this at startup. Each file's events and
+        its legacy_imports marker row commit together under BEGIN
+        IMMEDIATE, so a file is imported exactly once even when processes
+        race, or when one dies between the commit and the rename.
+        """
+        imported = 0
+        for legacy_file in self.db_path.parent.glob("*.json"):
+            try:
+                with open(legacy_file, "r") as f:
+                    legacy = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            ad_id = legacy.get("ad_id", legacy_file.stem)
+            rows = [
+                (
+                    ad_id,
+                    event.get("type", "unknown"),
+                    int(event.get("timestamp", 0)),
+                    event.get("ip", "unknown"),
+                    event.get("user_agent"),
+                    event.get("action"),
+                    event.get("duration"),
+                    json.dumps(event["metadata"]) if event.get("metadata") else None,
+                )
+                for event in legacy.get("events", [])
+            ]
+            time_events = sum(1 for event in legacy.get("events", []) if event.get("type") == "time_spent")
+            deltas = {name: legacy.get(name, 0) or 0 for name in COUNTERS}
+            deltas["time_spent_events"] = time_events
+            deltas["updated_at"] = legacy.get("updated_at", int(time.time()))
+
+            conn = self._conn()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                done = conn.execute(
+                    "SELECT 1 FROM legacy_imports WHERE file = ?", (legacy_file.name,)
+                ).fetchone()
+                if not done:
+                    conn.executemany(
+                        "INSERT INTO events (ad_id, type, timestamp, ip, user_agent, action, duration, metadata) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows
+                    )
+                    self._apply_deltas(conn, {ad_id: deltas}, {ad_id: legacy.get("last_contact")})
+                    self._apply_rollups(conn, rows)
+                    conn.execute(
+                        "INSERT INTO legacy_imports (file, imported_at) VALUES (?, ?)",
+                        (legacy_file.name, int(time.time()))
+                    )
+
+            try:
+                legacy_file.rename(legacy_file.with_suffix(".json.imported"))
+            except FileNotFoundError:
+                pass    # another process retired it first
+            if not done:
+                imported += 1
+
+        return imported
+
+
+_store: Optional[AnalyticsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_analytics_store() -> AnalyticsStore:
+    """Process-wide AnalyticsStore singleton"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AnalyticsStore()
+                # No app lifespan owns the store; write out buffered events on exit
+                atexit.register(_store.close)
+    return _store
+
+
+if __name__ == "__main__":
+    # Run compaction from cron: python analytics_store.py
+    print(get_analytics_store().compact())
@@ -6,35 +6,11 @@ Converted from PHP to Python
 
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
-from pathlib import Path
 from datetime import datetime, timedelta
-import json
-import time
 
-router = APIRouter()
-
-ANALYTICS_PATH = Path(__file__).parent.parent / "companies" / "analytics"
-
-
-def detect_age_group(user_agent: str) -> str:
-    """Simple heuristic to detect age group from user agent"""
-    ua_lower = user_agent.lower()
+from .analytics_store import get_analytics_store
 
-    youth_patterns = ['tiktok', 'snapchat', 'instagram', 'mobile', 'android']
-    middle_age_patterns = ['facebook', 'linkedin', 'chrome', 'safari']
-    elderly_patterns = ['desktop', 'windows', 'msie', 'edge']
-
-    for pattern in youth_patterns:
-        if pattern in ua_lower:
-            return 'youth'
-    for pattern in middle_age_patterns:
-        if pattern in ua_lower:
-            return 'middle_age'
-    for pattern in elderly_patterns:
-        if pattern in ua_lower:
-            return 'elderly'
-
-    return 'unknown'
+router = APIRouter()
 
 
 @router.get("/contact_analytics")
@@ -60,70 +36,37 @@ async def contact_analytics(
             "unknown": 0
         }
 
-        # Calculate cutoff timestamp
-        cutoff = int(time.time()) - (days * 86400)
-
         # Initialize daily data
         daily_data = {}
         for i in range(days):
             date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
             daily_data[date] = {method: 0 for method in contact_methods.keys()}
 
-        if not ANALYTICS_PATH.exists():
-            return {
-                "success": True,
-                "contact_methods": contact_methods,
-                "demographics": demographics,
-                "ai_insights": []
-            }
-
-        # Process analytics files
-        files_to_process = []
-
-        if ad_id:
-            # Specific ad
-            analytics_file = ANALYTICS_PATH / f"{ad_id}.json"
-            if analytics_file.exists():
-                files_to_process.append(analytics_file)
-        else:
-            # All files
-            files_to_process = list(ANALYTICS_PATH.glob("*.json"))
-
-        for analytics_file in files_to_process:
-            try:
-                with open(analytics_file, "r") as f:
-                    analytics = json.load(f)
-
-                events = analytics.get("events", [])
-
-                for event in events:
-                    event_type = event.get("type", "")
-                    timestamp = event.get("timestamp", 0)
-
-                    # Only include events within the time range
-                    if timestamp < cutoff:
-                        continue
-
-                    # Count contact methods
-                    if event_type in contact_methods:
-                        contact_methods[event_type]["count"] += 1
-
-                        # Hourly distribution
-                        hour = datetime.fromtimestamp(timestamp).hour
-                        contact_methods[event_type]["hourly"][hour] += 1
-
-                        # Daily trend
-                        date = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
-                        if date in daily_data:
-                            daily_data[date][event_type] += 1
-
-                        # Demographics
-                        user_agent = event.get("user_agent", "")
-                        age_group = detect_age_group(user_agent)
-                        demographics[age_group] += 1
-
-            except Exception:
-                continue
+        # Pre-aggregated hourly buckets: O(days) rows, not O(events)
+        buckets = get_analytics_store().get_rollups(
+            since_day=min(daily_data.keys()),
+            ad_id=ad_id,
+            company=company,
+            types=contact_methods.keys(),
+            group_by=("type", "day", "hour", "audience")
+        )
+
+        for bucket in buckets:
+            event_type = bucket["type"]
+            count = bucket["count"]
+
+            # Count contact methods
+            contact_methods[event_type]["count"] += count
+
+            # Hourly distribution
+            contact_methods[event_type]["hourly"][bucket["hour"]] += count
+
+            # Daily trend
+            if bucket["day"] in daily_data:
+                daily_data[bucket["day"]][event_type] += count
+
+            # Demographics
+            demographics[bucket["audience"]] += count
 
         # Build trend arrays
         for method in contact_methods.keys():
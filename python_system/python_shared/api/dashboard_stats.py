@@ -10,7 +10,6 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from pathlib import Path
 from datetime import datetime, timedelta
-import json
 import time
 
 import sys
@@ -19,10 +18,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from models import Ad, Category, Company
 from database import get_db
 
+from .analytics_store import get_analytics_store
+
 router = APIRouter()
 
 # Paths
-ANALYTICS_PATH = Path(__file__).parent.parent / "companies" / "analytics"
 DATA_PATH = Path(__file__).parent.parent / "companies" / "data"
 
 
@@ -159,16 +159,13 @@ async def dashboard_stats(
 
 
 def get_trends_from_analytics(company_slug: str = None) -> dict:
-    """Extract trend data from analytics files"""
+    """Extract daily trend data from the analytics rollups"""
     trends = {
         "daily_stats": {},
         "views_trend": [],
         "contacts_trend": []
     }
 
-    if not ANALYTICS_PATH.exists():
-        return trends
-
     # Get last 30 days
     today = datetime.now()
     dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(30)]
@@ -176,27 +173,24 @@ def get_trends_from_analytics(company_slug: str = None) -> dict:
     for date in dates:
         trends["daily_stats"][date] = {"views": 0, "contacts": 0, "clicks": 0}
 
-    # Scan analytics files
-    for analytics_file in ANALYTICS_PATH.glob("*.json"):
-        try:
-            with open(analytics_file, "r") as f:
-                analytics = json.load(f)
-
-            for event in analytics.get("events", []):
-                event_time = event.get("timestamp", 0)
-                if event_time:
-                    date = datetime.fromtimestamp(event_time).strftime("%Y-%m-%d")
-                    if date in trends["daily_stats"]:
-                        event_type = event.get("type", "")
-                        if event_type == "view":
-                            trends["daily_stats"][date]["views"] += 1
-                        elif event_type in ["call", "sms", "email", "whatsapp"]:
-                            trends["daily_stats"][date]["contacts"] += 1
-                        elif event_type == "click":
-                            trends["daily_stats"][date]["clicks"] += 1
-
-        except Exception:
-            continue
+    # Daily rollups for the 30-day window
+    buckets = get_analytics_store().get_rollups(
+        since_day=min(dates),
+        company=company_slug,
+        types=["view", "click", "call", "sms", "email", "whatsapp"],
+        group_by=("day", "type")
+    )
+
+    for bucket in buckets:
+        date = bucket["day"]
+        if date in trends["daily_stats"]:
+            event_type = bucket["type"]
+            if event_type == "view":
+                trends["daily_stats"][date]["views"] += bucket["count"]
+            elif event_type in ["call", "sms", "email", "whatsapp"]:
+                trends["daily_stats"][date]["contacts"] += bucket["count"]
+            elif event_type == "click":
+                trends["daily_stats"][date]["clicks"] += bucket["count"]
 
     # Convert to arrays for charts
     for date in sorted(trends["daily_stats"].keys()):
@@ -16,10 +16,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from models import Ad
 from database import get_db
 
+from .ad_index import get_ad_index
+from .analytics_store import get_analytics_store
+
 router = APIRouter()
 
 DATA_PATH = Path(__file__).parent.parent / "companies" / "data"
-ANALYTICS_PATH = Path(__file__).parent.parent / "companies" / "analytics"
 
 
 def delete_directory(path: Path) -> bool:
@@ -61,10 +63,8 @@ async def delete_ad(ad_id: str, db: Session = Depends(get_db)):
             if ad_path.exists():
                 delete_directory(ad_path)
 
-        # Delete analytics file
-        analytics_file = ANALYTICS_PATH / f"{ad_id}.json"
-        if analytics_file.exists():
-            analytics_file.unlink()
+        # Delete analytics
+        get_analytics_store().delete_ad(ad_id)
 
         return {
             "success": True,
@@ -125,30 +125,19 @@ async def delete_ad_post(request: Request, db: Session = Depends(get_db)):
                         delete_directory(ad_path)
 
                 # Delete analytics
-                analytics_file = ANALYTICS_PATH / f"{ad_id}.json"
-                if analytics_file.exists():
-                    analytics_file.unlink()
+                get_analytics_store().delete_ad(ad_id)
 
                 deleted_count += 1
                 found = True
             else:
-                # Search for the ad in all categories (matching PHP file-based approach)
-                if DATA_PATH.exists():
-                    for category_dir in DATA_PATH.iterdir():
-                        if not category_dir.is_dir():
-                            continue
-                        for company_dir in category_dir.iterdir():
-                            if not company_dir.is_dir():
-                                continue
-                            ad_path = company_dir / ad_id
-                            if ad_path.is_dir():
-                                # Delete the entire ad directory
-                                delete_directory(ad_path)
-                                deleted_count += 1
-                                found = True
-                                break
-                        if found:
-                            break
+                # File-only ad (matching PHP file-based approach)
+                ad_path = get_ad_index().ad_path(ad_id, DATA_PATH)
+                if ad_path is not None and ad_path.is_dir():
+                    # Delete the entire ad directory
+                    delete_directory(ad_path)
+                    get_ad_index().remove(ad_id)
+                    deleted_count += 1
+                    found = True
 
             if not found:
                 errors.append(f"Ad not found or unauthorized: {ad_id}")
@@ -4,34 +4,103 @@ Fetches ads from SQLite database
 Converted from PHP to Python
 """
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import Optional
+from sqlalchemy import func
+from typing import Dict, Optional, Tuple
 import json
+import threading
+import time
 
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from models import Ad, Category, Company
-from database import get_db
+from database import get_db, run_db
+from search_index import apply_search
+from pagination import paginate, encode_cursor, decode_cursor, InvalidCursor
+
+from .ad_ranker import get_ad_ranker
+from .profile_store import get_profile_store
+from .user_profiling import get_device_id
 
 router = APIRouter()
 
+# Total counts per (status, q, category, company); the feed re-asks constantly
+COUNT_CACHE_TTL = 30
+COUNT_CACHE_MAX_ENTRIES = 1024
+_count_cache: Dict[Tuple, Tuple[float, int]] = {}
+_count_lock = threading.Lock()
+
+# Cursor tag for personalized sort=ai pages (carries a rank offset)
+PERSONAL_CURSOR = "ai:personal"
+
+
+def cached_count(key: Tuple, query) -> int:
+    """Row count for a filtered query, cached for COUNT_CACHE_TTL seconds"""
+    now = time.time()
+    with _count_lock:
+        entry = _count_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    # Plain COUNT over the filtered rows (no ORDER BY / subquery wrapper)
+    total = query.order_by(None).with_entities(func.count(Ad.ad_id)).scalar() or 0
+
+    with _count_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            for stale in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+                del _count_cache[stale]
+            if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+                _count_cache.clear()
+        _count_cache[key] = (now + COUNT_CACHE_TTL, total)
+    return total
+
+
+def personalized_page(request: Request, device_id: Optional[str], query, page: int,
+                      page_size: int, cursor: Optional[str], category: str, company: str):
+    """
+    sort=ai for the calling device: rank with AdRanker, then load that page.
+
+    Returns:
+        (rows in rank order, total, next_cursor)
+    """
+    if cursor:
+        offset = decode_cursor(cursor, PERSONAL_CURSOR, 1)[0]
+        if not isinstance(offset, int) or offset < 0:
+            raise InvalidCursor("Malformed cursor")
+    else:
+        offset = (page - 1) * page_size
+
+    affinity = get_profile_store().affinities(device_id or get_device_id(request))
+    ad_ids, total = get_ad_ranker().rank(
+        affinity, page_size, offset, category=category or None, company=company or None
+    )
+
+    position = {ad_id: i for i, ad_id in enumerate(ad_ids)}
+    rows = query.filter(Ad.ad_id.in_(ad_ids)).all() if ad_ids else []
+    rows.sort(key=lambda row: position[row[0].ad_id])
+
+    next_cursor = encode_cursor(PERSONAL_CURSOR, [offset + page_size]) if offset + page_size < total else None
+    return rows, total, next_cursor
+
 
 @router.get("/ads")
 async def get_ads(
+    request: Request,
     page: int = Query(1, ge=1),
     q: str = Query("", description="Search query"),
     category: str = Query("", description="Category filter"),
     company: str = Query("", description="Company filter"),
-    sort: str = Query("date", description="Sort by: date, views, favs, ai"),
+    sort: str = Query("date", description="Sort by: date, views, favs, ai, relevance"),
     pageSize: int = Query(12, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    device_id: Optional[str] = Query(None, description="Device to personalize sort=ai for"),
     db: Session = Depends(get_db)
 ):
-    """Fetch ads with filters and pagination"""
+    """Fetch ads with filters and pagination (page number or keyset cursor)"""
     try:
         # Build query
         query = db.query(Ad).filter(Ad.status == "active")
@@ -40,38 +109,47 @@ async def get_ads(
         if company:
             query = query.filter(Ad.company_slug == company)
 
-        # Search filter
+        # Search filter (FTS5 index, BM25 rank)
+        rank = None
         if q:
-            search_term = f"%{q}%"
-            query = query.filter(
-                (Ad.title.ilike(search_term)) |
-                (Ad.description.ilike(search_term))
-            )
+            query, rank = apply_search(query, Ad, q)
 
         # Category filter
         if category:
             query = query.filter(Ad.category_slug == category)
 
-        # Sorting
-        if sort == "views":
-            query = query.order_by(desc(Ad.views_count), desc(Ad.created_at))
-        elif sort == "favs":
-            query = query.order_by(desc(Ad.favorites_count), desc(Ad.created_at))
-        elif sort == "ai":
-            query = query.order_by(desc(Ad.likes_count), desc(Ad.views_count), desc(Ad.created_at))
-        else:  # date
-            query = query.order_by(desc(Ad.created_at))
+        # Personalized ranking (sort=ai) unless searching, which ranks by text
+        personalized = sort == "ai" and not q and get_ad_ranker() is not None
 
         # Get total count
-        total = query.count()
+        if not personalized:
+            total = await run_db(cached_count, ("active", q, category, company), query)
 
-        # Pagination
-        offset = (page - 1) * pageSize
-        ads = query.offset(offset).limit(pageSize).all()
+        # Category and company names come from the same query
+        query = (
+            query
+            .outerjoin(Category, Category.category_slug == Ad.category_slug)
+            .outerjoin(Company, Company.company_slug == Ad.company_slug)
+            .add_columns(Category.category_name, Company.company_name)
+        )
+
+        # Keyset pagination when a cursor is given, page number otherwise
+        try:
+            if personalized:
+                rows, total, next_cursor = await run_db(
+                    personalized_page, request, device_id, query, page, pageSize, cursor, category, company
+                )
+            else:
+                rows, next_cursor = await run_db(paginate, query, sort, pageSize, cursor=cursor, page=page, rank=rank)
+        except InvalidCursor as e:
+            return JSONResponse(
+                status_code=400,
+                content={"success": False, "error": "Invalid cursor", "message": str(e)}
+            )
 
         # Format ads for frontend
         formatted_ads = []
-        for ad in ads:
+        for ad, category_name, company_name in rows:
             # Build media URLs
             media_url = ""
             media_files = []
@@ -94,18 +172,14 @@ async def get_ads(
                     for f in files
                 ]
 
-            # Get category and company names
-            cat = db.query(Category).filter(Category.category_slug == ad.category_slug).first()
-            comp = db.query(Company).filter(Company.company_slug == ad.company_slug).first()
-
             formatted_ads.append({
                 "ad_id": ad.ad_id,
                 "title": ad.title,
                 "description": ad.description or "",
                 "category": ad.category_slug,
-                "category_name": cat.category_name if cat else ad.category_slug.title(),
+                "category_name": category_name or ad.category_slug.title(),
                 "company": ad.company_slug,
-                "company_name": comp.company_name if comp else ad.company_slug.title(),
+                "company_name": company_name or ad.company_slug.title(),
                 "media": media_files[0] if media_files else media_url,
                 "media_files": media_files,
                 "media_path": media_url,
@@ -129,7 +203,8 @@ async def get_ads(
             "page": page,
             "pageSize": pageSize,
             "total": total,
-            "totalPages": (total + pageSize - 1) // pageSize
+            "totalPages": (total + pageSize - 1) // pageSize,
+            "next_cursor": next_cursor
         }
 
     except Exception as e:
@@ -147,7 +222,7 @@ async def get_ads(
 async def get_single_ad(ad_id: str, db: Session = Depends(get_db)):
     """Fetch single ad by ID"""
     try:
-        ad = db.query(Ad).filter(Ad.ad_id == ad_id).first()
+        ad = await run_db(db.query(Ad).filter(Ad.ad_id == ad_id).first)
 
         if not ad:
             return JSONResponse(
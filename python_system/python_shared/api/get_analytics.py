@@ -6,38 +6,18 @@ Converted from PHP to Python
 
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
-from pathlib import Path
-import json
 
-router = APIRouter()
+from .ad_index import get_ad_index
+from .analytics_store import get_analytics_store
 
-ANALYTICS_PATH = Path(__file__).parent.parent / "companies" / "analytics"
+router = APIRouter()
 
 
 @router.get("/analytics/{ad_id}")
 async def get_ad_analytics(ad_id: str):
     """Get analytics for a specific ad"""
     try:
-        analytics_file = ANALYTICS_PATH / f"{ad_id}.json"
-
-        if not analytics_file.exists():
-            # Return default analytics
-            return {
-                "success": True,
-                "analytics": {
-                    "ad_id": ad_id,
-                    "total_views": 0,
-                    "total_clicks": 0,
-                    "total_contacts": 0,
-                    "total_likes": 0,
-                    "total_dislikes": 0,
-                    "total_favorites": 0,
-                    "events": []
-                }
-            }
-
-        with open(analytics_file, "r") as f:
-            analytics = json.load(f)
+        analytics = get_analytics_store().load_analytics(ad_id)
 
         return {
             "success": True,
@@ -55,18 +35,9 @@ async def get_ad_analytics(ad_id: str):
 async def get_all_analytics(company: str = Query(None)):
     """Get analytics for all ads or by company"""
     try:
-        all_analytics = []
-
-        if not ANALYTICS_PATH.exists():
-            return {"success": True, "analytics": [], "total": 0}
-
-        for analytics_file in ANALYTICS_PATH.glob("*.json"):
-            try:
-                with open(analytics_file, "r") as f:
-                    analytics = json.load(f)
-                    all_analytics.append(analytics)
-            except Exception:
-                continue
+        # Summary rows only; per-ad events are served by /analytics/{ad_id}
+        ad_ids = get_ad_index().company_ads(company).keys() if company else None
+        all_analytics = get_analytics_store().all_summaries(ad_ids)
 
         # Calculate totals
         totals = {
@@ -95,35 +66,13 @@ async def get_all_analytics(company: str = Query(None)):
 async def analytics_summary():
     """Get summary of all analytics"""
     try:
-        if not ANALYTICS_PATH.exists():
-            return {
-                "success": True,
-                "summary": {
-                    "total_ads_tracked": 0,
-                    "total_views": 0,
-                    "total_contacts": 0,
-                    "total_likes": 0,
-                    "total_favorites": 0
-                }
-            }
+        summaries = get_analytics_store().all_summaries()
 
-        total_views = 0
-        total_contacts = 0
-        total_likes = 0
-        total_favorites = 0
-        ads_tracked = 0
-
-        for analytics_file in ANALYTICS_PATH.glob("*.json"):
-            try:
-                with open(analytics_file, "r") as f:
-                    analytics = json.load(f)
-                    ads_tracked += 1
-                    total_views += analytics.get("total_views", 0)
-                    total_contacts += analytics.get("total_contacts", 0)
-                    total_likes += analytics.get("total_likes", 0)
-                    total_favorites += analytics.get("total_favorites", 0)
-            except Exception:
-                continue
+        ads_tracked = len(summaries)
+        total_views = sum(a["total_views"] for a in summaries)
+        total_contacts = sum(a["total_contacts"] for a in summaries)
+        total_likes = sum(a["total_likes"] for a in summaries)
+        total_favorites = sum(a["total_favorites"] for a in summaries)
 
         return {
             "success": True,
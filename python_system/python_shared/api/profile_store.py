@@ -0,0 +1,608 @@
+"""
+profile_store.py - Compact per-device interest profiles
+Replaces the data/user_profiles/{device_id}.json read-modify-write
+
+Each device is one row in a SQLite (WAL) table:
+- running counters (views, likes, favorites, contacts, view duration)
+- a category-affinity vector (float32, one slot per category) that decays
+  exponentially with AFFINITY_HALF_LIFE_DAYS instead of keeping history
+- a bounded ring of the RECENT_SIZE most recent interactions
+
+Interactions are buffered in memory and folded into their rows in one
+transaction per flush. Reads are a single keyed lookup plus any events
+still pending for that device.
+
+Legacy JSON profiles are imported the first time their device is seen
+(or in bulk: python profile_store.py --import) and then deleted.
+"""
+
+import atexit
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+PROFILES_PATH = Path(__file__).parent.parent / "data" / "user_profiles"
+PROFILES_DB = PROFILES_PATH.parent / "user_profiles.db"
+
+AFFINITY_HALF_LIFE_DAYS = 30
+RECENT_SIZE = 20
+
+# action -> category affinity weight
+ACTION_WEIGHTS = {
+    "view": 1.0,
+    "like": 3.0,
+    "favorite": 5.0,
+    "contact": 10.0,
+}
+
+# action -> counter column
+ACTION_COUNTERS = {
+    "view": "total_views",
+    "like": "total_likes",
+    "favorite": "total_favorites",
+    "contact": "total_contacts",
+}
+
+COUNTERS = ("total_views", "total_likes", "total_favorites", "total_contacts")
+
+_DEVICE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+_DECAY_PER_SECOND = math.log(2) / (AFFINITY_HALF_LIFE_DAYS * 86400)
+
+
+def decay_factor(since: int, now: int) -> float:
+    """Multiplier that ages an affinity recorded at `since` to `now`"""
+    if now <= since:
+        return 1.0
+    return math.exp(-_DECAY_PER_SECOND * (now - since))
+
+
+def _new_profile(device_id: str, now: int) -> Dict[str, Any]:
+    return {
+        "device_id": device_id,
+        "created_at": now,
+        "last_active": now,
+        **{name: 0 for name in COUNTERS},
+        "duration_sum": 0.0,
+        "duration_count": 0,
+        "affinity": array("f"),
+        "affinity_at": now,
+        "recent": [],
+    }
+
+
+class ProfileStore:
+    """
+    Buffered device profiles with decaying category affinities.
+
+    Usage:
+        store = get_profile_store()
+        store.record(device_id, ad_id, "like", category="vehicles")
+        preferences = store.preferences(device_id)
+    """
+
+    def __init__(
+        self,
+        db_path: Path = PROFILES_DB,
+        legacy_path: Optional[Path] = PROFILES_PATH,
+        flush_size: int = 500,
+        flush_interval: float = 1.0
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        # device_id -> interactions not yet written
+        self._pending: Dict[str, List[tuple]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._local = threading.local()
+        self._closed = False
+
+        # category <-> vector slot
+        self._slots: Dict[str, int] = {}
+        self._categories: List[str] = []
+        self._slot_lock = threading.Lock()
+
+        self._init_db()
+        self._load_slots()
+
+        self._flusher = threading.Thread(target=self._flush_loop, name="profile-flush", daemon=True)
+        self._flusher.start()
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS profiles (
+                device_id TEXT PRIMARY KEY,
+                created_at INTEGER NOT NULL,
+                last_active INTEGER NOT NULL,
+                {", ".join(f"{name} INTEGER NOT NULL DEFAULT 0" for name in COUNTERS)},
+                duration_sum REAL NOT NULL DEFAULT 0,
+                duration_count INTEGER NOT NULL DEFAULT 0,
+                affinity BLOB,
+                affinity_at INTEGER NOT NULL,
+                recent TEXT
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_profiles_last_active ON profiles(last_active);
+
+            CREATE TABLE IF NOT EXISTS categories (
+                slot INTEGER PRIMARY KEY,
+                category TEXT NOT NULL UNIQUE
+            );
+        """)
+        conn.commit()
+
+    def _load_slots(self):
+        rows = self._conn().execute("SELECT slot, category FROM categories ORDER BY slot").fetchall()
+        categories = [""] * (rows[-1]["slot"] + 1 if rows else 0)
+        for row in rows:
+            categories[row["slot"]] = row["category"]
+        with self._slot_lock:
+            self._categories = categories
+            self._slots = {row["category"]: row["slot"] for row in rows}
+
+    def _slot(self, conn: sqlite3.Connection, category: str) -> int:
+        """Vector slot for a category, allocating one on first sight"""
+        slot = self._slots.get(category)
+        if slot is not None:
+            return slot
+        conn.execute(
+            "INSERT OR IGNORE INTO categories (slot, category) "
+            "VALUES ((SELECT COALESCE(MAX(slot) + 1, 0) FROM categories), ?)",
+            (category,)
+        )
+        # Another process may have allocated slots too; take the table's view
+        self._load_slots()
+        return self._slots[category]
+
+    @property
+    def categories(self) -> List[str]:
+        """Category for each affinity vector slot"""
+        with self._slot_lock:
+            return list(self._categories)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        device_id: str,
+        ad_id: str,
+        action: str,
+        category: str = "",
+        duration: float = 0,
+        timestamp: Optional[int] = None
+    ):
+        """Buffer one interaction (no disk I/O)"""
+        event = (ad_id, action, category, duration or 0, int(timestamp or time.time()))
+        with self._lock:
+            self._pending.setdefault(device_id, []).append(event)
+            self._pending_count += 1
+            full = self._pending_count >= self.flush_size
+
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Fold buffered interactions into their profile rows in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_count = 0
+
+            if not pending:
+                return
+
+            conn = self._conn()
+            try:
+                with conn:
+                    # Take the write lock before reading, so rows merged here
+                    # can't be overwritten by another process's flush
+                    conn.execute("BEGIN IMMEDIATE")
+                    stored = self._fetch(conn, list(pending))
+                    rows = []
+                    for device_id, events in pending.items():
+                        profile = stored.get(device_id) or self._import_legacy(device_id)
+                        if profile is None:
+                            profile = _new_profile(device_id, events[0][4])
+                        for event in events:
+                            self._apply(conn, profile, event)
+                        rows.append(self._to_row(profile))
+
+                    conn.executemany(
+                        f"""
+                        INSERT OR REPLACE INTO profiles (
+                            device_id, created_at, last_active, {", ".join(COUNTERS)},
+                            duration_sum, duration_count, affinity, affinity_at, recent
+                        ) VALUES ({", ".join("?" for _ in range(len(COUNTERS) + 8))})
+                        """,
+                        rows
+                    )
+            except sqlite3.Error:
+                # Slots allocated in the rolled-back transaction don't exist
+                self._load_slots()
+                # Put the interactions back (ahead of newer ones) and retry later
+                with self._lock:
+                    for device_id, events in pending.items():
+                        self._pending[device_id] = events + self._pending.get(device_id, [])
+                        self._pending_count += len(events)
+                raise
+
+            # Legacy files are removed only once their data is committed
+            for device_id in pending:
+                self._remove_legacy(device_id)
+
+    def _apply(self, conn: Optional[sqlite3.Connection], profile: Dict[str, Any], event: tuple):
+        """Fold one interaction into a profile dict"""
+        ad_id, action, category, duration, timestamp = event
+
+        counter = ACTION_COUNTERS.get(action)
+        if counter:
+            profile[counter] += 1
+
+        weight = ACTION_WEIGHTS.get(action)
+        if weight and category:
+            # Age the whole vector to this event, then add its weight
+            vector = profile["affinity"]
+            factor = decay_factor(profile["affinity_at"], timestamp)
+            if factor != 1.0:
+                for i in range(len(vector)):
+                    vector[i] *= factor
+                for name in profile.get("unslotted", {}):
+                    profile["unslotted"][name] *= factor
+            profile["affinity_at"] = max(profile["affinity_at"], timestamp)
+
+            slot = self._slot(conn, category) if conn is not None else self._slots.get(category)
+            if slot is not None:
+                if slot >= len(vector):
+                    vector.extend([0.0] * (slot + 1 - len(vector)))
+                vector[slot] += weight
+            else:
+                # Read path: category not allocated yet; keep it aside
+                profile.setdefault("unslotted", {})
+                profile["unslotted"][category] = profile["unslotted"].get(category, 0) + weight
+
+        if duration > 0:
+            profile["duration_sum"] += duration
+            profile["duration_count"] += 1
+
+        recent = profile["recent"]
+        recent.append({
+            "ad_id": ad_id,
+            "action": action,
+            "category": category,
+            "duration": duration,
+            "timestamp": timestamp
+        })
+        del recent[:-RECENT_SIZE]
+
+        profile["last_active"] = max(profile["last_active"], timestamp)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠ Profile flush failed: {e}")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    def delete(self, device_id: str) -> bool:
+        """Remove a profile everywhere (GDPR); True if one existed"""
+        # A flush in progress holds swapped-out events and would write the row back
+        with self._flush_lock:
+            with self._lock:
+                events = self._pending.pop(device_id, None)
+                if events:
+                    self._pending_count -= len(events)
+
+            with self._conn() as conn:
+                deleted = conn.execute("DELETE FROM profiles WHERE device_id = ?", (device_id,)).rowcount
+            legacy = self._remove_legacy(device_id)
+        return bool(events or deleted or legacy)
+
+    def prune(self, inactive_days: int = 365) -> int:
+        """Delete profiles idle for `inactive_days`; returns rows removed"""
+        cutoff = int(time.time()) - inactive_days * 86400
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM profiles WHERE last_active < ?", (cutoff,)).rowcount
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Profile dict for a device, or None if it has never interacted.
+
+        category_affinity is decayed to now; recent is oldest first.
+        """
+        row = self._conn().execute(
+            "SELECT * FROM profiles WHERE device_id = ?", (device_id,)
+        ).fetchone()
+        profile = self._from_row(row) if row is not None else None
+
+        with self._lock:
+            events = list(self._pending.get(device_id, ()))
+
+        if profile is None:
+            profile = self._peek_legacy(device_id)
+        if profile is None:
+            if not events:
+                return None
+            profile = _new_profile(device_id, events[0][4])
+        for event in events:
+            self._apply(None, profile, event)
+
+        return self._to_public(profile)
+
+    def affinities(self, device_id: str) -> Dict[str, float]:
+        """Decayed category -> affinity for a device ({} if unknown)"""
+        profile = self.get(device_id)
+        return profile["category_affinity"] if profile else {}
+
+    def preferences(self, device_id: str) -> Optional[Dict[str, float]]:
+        """Affinities normalized to sum to 1, or None without a profile"""
+        profile = self.get(device_id)
+        if profile is None:
+            return None
+        affinity = profile["category_affinity"]
+        total = sum(affinity.values()) or 1
+        return {category: round(score / total, 3) for category, score in affinity.items()}
+
+    # ------------------------------------------------------------------
+    # Row conversion
+    # ------------------------------------------------------------------
+
+    def _fetch(self, conn: sqlite3.Connection, device_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        profiles = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(device_ids), 500):
+            chunk = device_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT * FROM profiles WHERE device_id IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                profiles[row["device_id"]] = self._from_row(row)
+        return profiles
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        affinity = array("f")
+        if row["affinity"]:
+            affinity.frombytes(row["affinity"])
+        return {
+            "device_id": row["device_id"],
+            "created_at": row["created_at"],
+            "last_active": row["last_active"],
+            **{name: row[name] for name in COUNTERS},
+            "duration_sum": row["duration_sum"],
+            "duration_count": row["duration_count"],
+            "affinity": affinity,
+            "affinity_at": row["affinity_at"],
+            "recent": json.loads(row["recent"]) if row["recent"] else [],
+        }
+
+    @staticmethod
+    def _to_row(profile: Dict[str, Any]) -> tuple:
+        return (
+            profile["device_id"],
+            profile["created_at"],
+            profile["last_active"],
+            *[profile[name] for name in COUNTERS],
+            profile["duration_sum"],
+            profile["duration_count"],
+            profile["affinity"].tobytes(),
+            profile["affinity_at"],
+            json.dumps(profile["recent"], separators=(",", ":")),
+        )
+
+    def _to_public(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        now = int(time.time())
+        factor = decay_factor(profile["affinity_at"], now)
+        categories = self.categories
+        if len(profile["affinity"]) > len(categories):
+            # Slots allocated by another process since we last looked
+            self._load_slots()
+            categories = self.categories
+
+        affinity = {}
+        for slot, score in enumerate(profile["affinity"]):
+            if score > 0 and slot < len(categories) and categories[slot]:
+                affinity[categories[slot]] = round(score * factor, 3)
+        for category, score in profile.get("unslotted", {}).items():
+            affinity[category] = round(affinity.get(category, 0) + score * factor, 3)
+
+        count = profile["duration_count"]
+        return {
+            "device_id": profile["device_id"],
+            "created_at": datetime.fromtimestamp(profile["created_at"]).isoformat(),
+            "last_active": datetime.fromtimestamp(profile["last_active"]).isoformat(),
+            **{name: profile[name] for name in COUNTERS},
+            "avg_view_duration": round(profile["duration_sum"] / count, 2) if count else 0,
+            "category_affinity": affinity,
+            "recent": list(profile["recent"]),
+        }
+
+    # ------------------------------------------------------------------
+    # Legacy JSON profiles
+    # ------------------------------------------------------------------
+
+    def _legacy_file(self, device_id: str) -> Optional[Path]:
+        if self.legacy_path is None or not _DEVICE_ID_RE.match(device_id):
+            return None
+        return self.legacy_path / f"{device_id}.json"
+
+    def _read_legacy(self, device_id: str) -> Optional[Dict[str, Any]]:
+        legacy_file = self._legacy_file(device_id)
+        if legacy_file is None:
+            return None
+        try:
+            with open(legacy_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _convert_legacy(self, conn: Optional[sqlite3.Connection], legacy: Dict[str, Any]) -> Dict[str, Any]:
+        def to_ts(value, default):
+            try:
+                return int(datetime.fromisoformat(value).timestamp())
+            except (TypeError, ValueError):
+                return default
+
+        now = int(time.time())
+        profile = _new_profile(legacy.get("device_id", ""), to_ts(legacy.get("created_at"), now))
+        profile["last_active"] = to_ts(legacy.get("last_active"), profile["created_at"])
+        for name in COUNTERS:
+            profile[name] = int(legacy.get(name, 0) or 0)
+
+        history = legacy.get("interaction_history", [])
+        durations = [h["duration"] for h in history if h.get("duration")]
+        profile["duration_count"] = len(durations)
+        profile["duration_sum"] = float(sum(durations))
+        profile["recent"] = history[-RECENT_SIZE:]
+
+        # Raw sums become the vector as of the last update; decay applies from there
+        profile["affinity_at"] = to_ts(legacy.get("updated_at"), profile["last_active"])
+        for category, score in (legacy.get("category_affinity") or {}).items():
+            slot = self._slot(conn, category) if conn is not None else self._slots.get(category)
+            if slot is None:
+                profile.setdefault("unslotted", {})[category] = float(score)
+                continue
+            vector = profile["affinity"]
+            if slot >= len(vector):
+                vector.extend([0.0] * (slot + 1 - len(vector)))
+            vector[slot] += float(score)
+
+        return profile
+
+    def _import_legacy(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Legacy profile converted inside a flush (may allocate slots)"""
+        legacy = self._read_legacy(device_id)
+        if legacy is None:
+            return None
+        legacy["device_id"] = device_id
+        return self._convert_legacy(self._conn(), legacy)
+
+    def _peek_legacy(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Legacy profile for reads (no writes)"""
+        legacy = self._read_legacy(device_id)
+        if legacy is None:
+            return None
+        legacy["device_id"] = device_id
+        return self._convert_legacy(None, legacy)
+
+    def _remove_legacy(self, device_id: str) -> bool:
+        legacy_file = self._legacy_file(device_id)
+        if legacy_file is None:
+            return False
+        try:
+            legacy_file.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def import_legacy_profiles(self, batch_size: int = 1000) -> int:
+        """Import every legacy JSON profile; returns profiles imported"""
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return 0
+
+        imported = 0
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+
+        def write(batch):
+            with self._conn() as conn:
+                rows = []
+                for device_id, legacy in batch:
+                    legacy["device_id"] = device_id
+                    rows.append(self._to_row(self._convert_legacy(conn, legacy)))
+                conn.executemany(
+                    f"""
+                    INSERT OR IGNORE INTO profiles (
+                        device_id, created_at, last_active, {", ".join(COUNTERS)},
+                        duration_sum, duration_count, affinity, affinity_at, recent
+                    ) VALUES ({", ".join("?" for _ in range(len(COUNTERS) + 8))})
+                    """,
+                    rows
+                )
+            for device_id, _ in batch:
+                self._remove_legacy(device_id)
+
+        with os.scandir(self.legacy_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                device_id = entry.name[:-len(".json")]
+                legacy = self._read_legacy(device_id)
+                if legacy is None:
+                    continue
+                batch.append((device_id, legacy))
+                if len(batch) >= batch_size:
+                    write(batch)
+                    imported += len(batch)
+                    batch = []
+
+        if batch:
+            write(batch)
+            imported += len(batch)
+
+        return imported
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """Process-wide ProfileStore singleton"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore()
+                # No app lifespan owns the store; write out buffered events on exit
+                atexit.register(_store.close)
+    return _store
+
+
+if __name__ == "__main__":
+    # One-off migration: python profile_store.py --import
+    store = get_profile_store()
+    if "--import" in sys.argv:
+        print(f"✅ Imported {store.import_legacy_profiles()} legacy profiles")
+    if "--prune" in sys.argv:
+        print(f"✅ Pruned {store.prune()} inactive profiles")
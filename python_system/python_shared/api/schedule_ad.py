@@ -18,6 +18,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from models import Ad
 from database import get_db
 
+from .ad_index import get_ad_index
+
 router = APIRouter()
 
 DATA_PATH = Path(__file__).parent.parent / "companies" / "data"
@@ -103,47 +105,40 @@ async def schedule_ad(request: Request, db: Session = Depends(get_db)):
             }
 
         # Also try to update meta.json file (matching PHP file-based approach)
-        found = False
-        for category_dir in DATA_PATH.iterdir():
-            if not category_dir.is_dir():
-                continue
-            for company_dir in category_dir.iterdir():
-                if not company_dir.is_dir():
-                    continue
-                ad_path = company_dir / ad_id
-                if ad_path.is_dir():
-                    meta_file = ad_path / "meta.json"
-                    if meta_file.exists():
-                        with open(meta_file, "r") as f:
-                            meta = json.load(f)
-
-                        # Update scheduling (matching PHP logic)
-                        now = int(time.time())
-                        meta["schedule"] = {
-                            "start_date": start_timestamp,
-                            "end_date": end_timestamp,
-                            "auto_renew": auto_renew,
-                            "updated_at": int(time.time())
-                        }
-
-                        # Auto-set status based on dates
-                        if start_timestamp and start_timestamp > now:
-                            meta["status"] = "scheduled"
-                        elif end_timestamp and end_timestamp < now:
-                            meta["status"] = "expired"
-                        else:
-                            meta["status"] = "active"
-
-                        with open(meta_file, "w") as f:
-                            json.dump(meta, f, indent=2)
-
-                        return {
-                            "success": True,
-                            "message": "Schedule updated successfully",
-                            "ad_id": ad_id,
-                            "schedule": meta["schedule"],
-                            "status": meta["status"]
-                        }
+        ad_path = get_ad_index().ad_path(ad_id, DATA_PATH)
+        if ad_path is not None and ad_path.is_dir():
+            meta_file = ad_path / "meta.json"
+            if meta_file.exists():
+                with open(meta_file, "r") as f:
+                    meta = json.load(f)
+
+                # Update scheduling (matching PHP logic)
+                now = int(time.time())
+                meta["schedule"] = {
+                    "start_date": start_timestamp,
+                    "end_date": end_timestamp,
+                    "auto_renew": auto_renew,
+                    "updated_at": int(time.time())
+                }
+
+                # Auto-set status based on dates
+                if start_timestamp and start_timestamp > now:
+                    meta["status"] = "scheduled"
+                elif end_timestamp and end_timestamp < now:
+                    meta["status"] = "expired"
+                else:
+                    meta["status"] = "active"
+
+                with open(meta_file, "w") as f:
+                    json.dump(meta, f, indent=2)
+
+                return {
+                    "success": True,
+                    "message": "Schedule updated successfully",
+                    "ad_id": ad_id,
+                    "schedule": meta["schedule"],
+                    "status": meta["status"]
+                }
 
         return JSONResponse(
             status_code=404,
@@ -8,15 +8,18 @@ from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
-from pathlib import Path
-import json
-import time
+
+from .analytics_store import get_analytics_store, CONTACT_METHODS
 
 router = APIRouter()
 
-# Analytics storage path
-ANALYTICS_PATH = Path(__file__).parent.parent / "companies" / "analytics"
-ANALYTICS_PATH.mkdir(parents=True, exist_ok=True)
+INTERACTION_ACTIONS = {
+    "like": "liked",
+    "dislike": "not_interested",
+    "favorite": "favorited",
+    "unfavorite": "unfavorited",
+    "view": "viewed",
+}
 
 
 class InteractionData(BaseModel):
@@ -40,75 +43,27 @@ async def track_interaction(request: Request):
                 content={"success": False, "message": "Missing required parameters"}
             )
 
-        # Load or create analytics file
-        analytics_file = ANALYTICS_PATH / f"{ad_id}.json"
-
-        # Default analytics structure
-        analytics = {
-            "ad_id": ad_id,
-            "total_views": 0,
-            "total_clicks": 0,
-            "total_contacts": 0,
-            "total_likes": 0,
-            "total_dislikes": 0,
-            "total_favorites": 0,
-            "total_unfavorites": 0,
-            "current_favorites": 0,
-            "total_time_spent": 0,
-            "avg_time_spent": 0,
-            "events": []
-        }
+        action = INTERACTION_ACTIONS.get(interaction_type)
+        if interaction_type in CONTACT_METHODS:
+            action = f"contacted_via_{interaction_type}"
 
-        if analytics_file.exists():
-            with open(analytics_file, "r") as f:
-                stored = json.load(f)
-                analytics.update(stored)
-
-        # Create event
-        event = {
-            "type": interaction_type,
-            "timestamp": int(time.time()),
-            "ip": request.client.host if request.client else "unknown",
-            "user_agent": request.headers.get("user-agent", "unknown")
-        }
-
-        # Handle different interaction types
-        if interaction_type == "like":
-            analytics["total_likes"] += 1
-            event["action"] = "liked"
-        elif interaction_type == "dislike":
-            analytics["total_dislikes"] += 1
-            event["action"] = "not_interested"
-        elif interaction_type == "favorite":
-            analytics["total_favorites"] += 1
-            analytics["current_favorites"] += 1
-            event["action"] = "favorited"
-        elif interaction_type == "unfavorite":
-            analytics["total_unfavorites"] += 1
-            analytics["current_favorites"] = max(0, analytics["current_favorites"] - 1)
-            event["action"] = "unfavorited"
-        elif interaction_type == "time_spent":
+        duration = None
+        if interaction_type == "time_spent":
             if value and isinstance(value, (int, float)) and value > 0:
-                analytics["total_time_spent"] += value
-                event["duration"] = value
-
-                # Calculate average time spent
-                time_events = [e for e in analytics["events"] if e.get("type") == "time_spent"]
-                total_events = len(time_events) + 1
-                analytics["avg_time_spent"] = round(analytics["total_time_spent"] / total_events, 2)
-        elif interaction_type == "view":
-            analytics["total_views"] += 1
-            event["action"] = "viewed"
-        elif interaction_type in ["call", "sms", "email", "whatsapp"]:
-            analytics["total_contacts"] += 1
-            event["action"] = f"contacted_via_{interaction_type}"
-
-        analytics["events"].append(event)
-        analytics["updated_at"] = int(time.time())
-
-        # Save analytics
-        with open(analytics_file, "w") as f:
-            json.dump(analytics, f, indent=2)
+                duration = value
+
+        store = get_analytics_store()
+        store.record(
+            ad_id,
+            interaction_type,
+            ip=request.client.host if request.client else "unknown",
+            user_agent=request.headers.get("user-agent", "unknown"),
+            action=action,
+            duration=duration
+        )
+
+        # Summary includes still-buffered deltas, so it reflects this event
+        analytics = store.get_summary(ad_id)
 
         return {
             "success": True,
@@ -145,47 +100,11 @@ async def track_interaction_get(
                 content={"success": False, "message": "Missing ad_id or event_type"}
             )
 
-        # Reuse POST logic
-        fake_request_data = {"interaction_type": event_type, "ad_id": ad_id}
-
-        # Load analytics
-        analytics_file = ANALYTICS_PATH / f"{ad_id}.json"
-        analytics = {
-            "ad_id": ad_id,
-            "total_views": 0,
-            "total_contacts": 0,
-            "total_likes": 0,
-            "total_dislikes": 0,
-            "total_favorites": 0,
-            "events": []
-        }
-
-        if analytics_file.exists():
-            with open(analytics_file, "r") as f:
-                stored = json.load(f)
-                analytics.update(stored)
-
-        # Track based on event type
-        if event_type in ["call", "sms", "email", "whatsapp"]:
-            analytics["total_contacts"] += 1
-        elif event_type == "view":
-            analytics["total_views"] += 1
-        elif event_type == "like":
-            analytics["total_likes"] += 1
-        elif event_type == "dislike":
-            analytics["total_dislikes"] += 1
-
-        # Add event
-        analytics["events"].append({
-            "type": event_type,
-            "timestamp": int(time.time()),
-            "ip": request.client.host if request.client else "unknown"
-        })
-        analytics["updated_at"] = int(time.time())
-
-        # Save
-        with open(analytics_file, "w") as f:
-            json.dump(analytics, f, indent=2)
+        get_analytics_store().record(
+            ad_id,
+            event_type,
+            ip=request.client.host if request.client else "unknown"
+        )
 
         return {"success": True, "message": f"Tracked {event_type}"}
 
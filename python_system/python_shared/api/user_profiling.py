@@ -6,16 +6,11 @@ Converted from PHP to Python
 
 from fastapi import APIRouter, Request, Query
 from fastapi.responses import JSONResponse
-from pathlib import Path
-from datetime import datetime, timedelta
-import json
-import time
 import hashlib
 
-router = APIRouter()
+from .profile_store import get_profile_store
 
-PROFILES_PATH = Path(__file__).parent.parent / "data" / "user_profiles"
-PROFILES_PATH.mkdir(parents=True, exist_ok=True)
+router = APIRouter()
 
 
 def get_device_id(request: Request) -> str:
@@ -38,69 +33,10 @@ async def update_user_profile(request: Request):
         category = data.get("category", "")
         duration = data.get("duration", 0)
 
-        # Load or create profile
-        profile_file = PROFILES_PATH / f"{device_id}.json"
-        profile = {
-            "device_id": device_id,
-            "created_at": datetime.now().isoformat(),
-            "interests": {},
-            "category_affinity": {},
-            "interaction_history": [],
-            "total_views": 0,
-            "total_likes": 0,
-            "total_favorites": 0,
-            "total_contacts": 0,
-            "avg_view_duration": 0
-        }
-
-        if profile_file.exists():
-            with open(profile_file, "r") as f:
-                stored = json.load(f)
-                profile.update(stored)
-
-        # Update profile based on action
-        timestamp = int(time.time())
-
-        if action == "view":
-            profile["total_views"] += 1
-            if category:
-                profile["category_affinity"][category] = profile["category_affinity"].get(category, 0) + 1
-        elif action == "like":
-            profile["total_likes"] += 1
-            if category:
-                profile["category_affinity"][category] = profile["category_affinity"].get(category, 0) + 3
-        elif action == "favorite":
-            profile["total_favorites"] += 1
-            if category:
-                profile["category_affinity"][category] = profile["category_affinity"].get(category, 0) + 5
-        elif action == "contact":
-            profile["total_contacts"] += 1
-            if category:
-                profile["category_affinity"][category] = profile["category_affinity"].get(category, 0) + 10
-
-        # Track duration
-        if duration > 0:
-            durations = [h.get("duration", 0) for h in profile["interaction_history"] if h.get("duration")]
-            durations.append(duration)
-            profile["avg_view_duration"] = round(sum(durations) / len(durations), 2)
-
-        # Add to history (keep last 100)
-        profile["interaction_history"].append({
-            "ad_id": ad_id,
-            "action": action,
-            "category": category,
-            "duration": duration,
-            "timestamp": timestamp
-        })
-        profile["interaction_history"] = profile["interaction_history"][-100:]
-
-        # Update timestamps
-        profile["last_active"] = datetime.now().isoformat()
-        profile["updated_at"] = datetime.now().isoformat()
-
-        # Save profile
-        with open(profile_file, "w") as f:
-            json.dump(profile, f, indent=2)
+        # Buffered; folded into the device's profile row on the next flush
+        get_profile_store().record(
+            device_id, ad_id, action, category=category, duration=duration or 0
+        )
 
         return {
             "success": True,
@@ -122,18 +58,15 @@ async def get_user_profile(request: Request, device_id: str = None):
         if not device_id:
             device_id = get_device_id(request)
 
-        profile_file = PROFILES_PATH / f"{device_id}.json"
+        profile = get_profile_store().get(device_id)
 
-        if not profile_file.exists():
+        if profile is None:
             return {
                 "success": True,
                 "profile": None,
                 "message": "No profile found"
             }
 
-        with open(profile_file, "r") as f:
-            profile = json.load(f)
-
         # Generate category recommendations
         recommendations = []
         if profile.get("category_affinity"):
@@ -172,16 +105,13 @@ async def get_preferences(request: Request, device_id: str = None):
         if not device_id:
             device_id = get_device_id(request)
 
-        profile_file = PROFILES_PATH / f"{device_id}.json"
+        profile = get_profile_store().get(device_id)
 
-        if not profile_file.exists():
+        if profile is None:
             return {"success": True, "preferences": {}, "has_profile": False}
 
-        with open(profile_file, "r") as f:
-            profile = json.load(f)
-
-        # Calculate preferences
-        category_affinity = profile.get("category_affinity", {})
+        # Calculate preferences (decayed affinities, normalized)
+        category_affinity = profile["category_affinity"]
         total_affinity = sum(category_affinity.values()) or 1
 
         preferences = {
@@ -210,10 +140,7 @@ async def delete_user_profile(request: Request, device_id: str = None):
         if not device_id:
             device_id = get_device_id(request)
 
-        profile_file = PROFILES_PATH / f"{device_id}.json"
-
-        if profile_file.exists():
-            profile_file.unlink()
+        if get_profile_store().delete(device_id):
             return {"success": True, "message": "Profile deleted"}
         else:
             return {"success": True, "message": "No profile found"}
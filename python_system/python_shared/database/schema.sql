@@ -96,28 +96,65 @@ CREATE INDEX idx_ads_views ON ads(views_count DESC);
 CREATE INDEX idx_ads_likes ON ads(likes_count DESC);
 CREATE INDEX idx_ads_title ON ads(title);
 
--- Full-text search index
+-- Listing filters + keyset sort orders (see pagination.py)
+CREATE INDEX IF NOT EXISTS idx_ads_status_created ON ads(status, created_at DESC, ad_id DESC);
+CREATE INDEX IF NOT EXISTS idx_ads_status_category_created ON ads(status, category_slug, created_at DESC, ad_id DESC);
+-- Nullable counters sort as COALESCE(counter, 0), the same expression pagination.py compares
+CREATE INDEX IF NOT EXISTS idx_ads_keyset_views ON ads(status, coalesce(views_count, 0) DESC, created_at DESC, ad_id DESC);
+CREATE INDEX IF NOT EXISTS idx_ads_keyset_favs ON ads(status, coalesce(favorites_count, 0) DESC, created_at DESC, ad_id DESC);
+CREATE INDEX IF NOT EXISTS idx_ads_keyset_likes ON ads(status, coalesce(likes_count, 0) DESC, coalesce(views_count, 0) DESC, created_at DESC, ad_id DESC);
+CREATE INDEX IF NOT EXISTS idx_ads_company_status_created ON ads(company_slug, status, created_at DESC, ad_id DESC);
+
+-- Full-text search index (kept by ad_id; see search_index.py)
 CREATE VIRTUAL TABLE IF NOT EXISTS ads_fts USING fts5(
     ad_id UNINDEXED,
     title,
     description,
-    content='ads',
-    content_rowid='rowid'
+    category,
+    company,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
 );
 
 -- Triggers to keep FTS in sync
 CREATE TRIGGER IF NOT EXISTS ads_fts_insert AFTER INSERT ON ads BEGIN
-    INSERT INTO ads_fts(rowid, ad_id, title, description)
-    VALUES (new.rowid, new.ad_id, new.title, new.description);
+    INSERT INTO ads_fts (ad_id, title, description, category, company)
+    VALUES (
+        new.ad_id,
+        new.title,
+        COALESCE(new.description, ''),
+        COALESCE((SELECT category_name FROM categories WHERE category_slug = new.category_slug), new.category_slug),
+        COALESCE((SELECT company_name FROM companies WHERE company_slug = new.company_slug), new.company_slug)
+    );
 END;
 
-CREATE TRIGGER IF NOT EXISTS ads_fts_update AFTER UPDATE ON ads BEGIN
-    UPDATE ads_fts SET title = new.title, description = new.description
-    WHERE rowid = old.rowid;
+CREATE TRIGGER IF NOT EXISTS ads_fts_update
+AFTER UPDATE OF ad_id, title, description, category_slug, company_slug ON ads BEGIN
+    DELETE FROM ads_fts WHERE ad_id = old.ad_id;
+    INSERT INTO ads_fts (ad_id, title, description, category, company)
+    VALUES (
+        new.ad_id,
+        new.title,
+        COALESCE(new.description, ''),
+        COALESCE((SELECT category_name FROM categories WHERE category_slug = new.category_slug), new.category_slug),
+        COALESCE((SELECT company_name FROM companies WHERE company_slug = new.company_slug), new.company_slug)
+    );
 END;
 
 CREATE TRIGGER IF NOT EXISTS ads_fts_delete AFTER DELETE ON ads BEGIN
-    DELETE FROM ads_fts WHERE rowid = old.rowid;
+    DELETE FROM ads_fts WHERE ad_id = old.ad_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS ads_fts_category_rename
+AFTER UPDATE OF category_name ON categories BEGIN
+    UPDATE ads_fts SET category = new.category_name
+    WHERE ad_id IN (SELECT ad_id FROM ads WHERE category_slug = new.category_slug);
+END;
+
+CREATE TRIGGER IF NOT EXISTS ads_fts_company_rename
+AFTER UPDATE OF company_name ON companies BEGIN
+    UPDATE ads_fts SET company = new.company_name
+    WHERE ad_id IN (SELECT ad_id FROM ads WHERE company_slug = new.company_slug);
 END;
 
 -- ============================================
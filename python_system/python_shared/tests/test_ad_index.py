@@ -0,0 +1,103 @@
+"""
+Tests for ad_index.AdIndex refresh behaviour
+
+Run from python_system/:
+    python -m pytest python_shared/tests
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "api"))
+sys.path.insert(0, str(ROOT.parent))   # models / database
+
+from ad_index import AdIndex
+
+
+def entry(ad_id, company="acme", title=None):
+    return {"ad_id": ad_id, "title": title or ad_id, "company": company,
+            "category": "misc", "media_path": None, "status": "active", "timestamp": 0}
+
+
+class FakeLoad:
+    """Stands in for AdIndex._load; `gate` holds a load open mid-rebuild"""
+
+    def __init__(self, *entries):
+        self.entries = list(entries)
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.gate.wait(5)
+        ads = {e["ad_id"]: e for e in self.entries}
+        by_company = {}
+        for e in ads.values():
+            by_company.setdefault(e["company"], set()).add(e["ad_id"])
+        return ads, by_company
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    load = FakeLoad(entry("ad_1"))
+    index = AdIndex(data_path=tmp_path, refresh_interval=3600)
+    monkeypatch.setattr(index, "_load", load)
+    index.load = load
+    return index
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_first_build_is_synchronous(index):
+    assert set(index.company_ads("acme")) == {"ad_1"}
+    assert index.load.calls == 1
+
+
+def test_stale_index_refreshes_in_background(index):
+    index.company_ads("acme")
+    index.load.entries.append(entry("ad_2"))
+    index.load.gate.clear()
+    index.load.started.clear()
+    index._built_at -= 7200
+
+    # Lookups keep answering from the old maps while the reload is held open
+    assert set(index.company_ads("acme")) == {"ad_1"}
+    assert index.load.started.wait(5)
+    assert set(index.company_ads("acme")) == {"ad_1"}
+    assert index.load.calls == 2   # no second refresh thread
+
+    index.load.gate.set()
+    wait_until(lambda: "ad_2" in index.company_ads("acme"))
+
+
+def test_changes_during_rebuild_survive_swap(index):
+    index.company_ads("acme")
+    index.load.gate.clear()
+    index.load.started.clear()
+
+    rebuild = threading.Thread(target=index.rebuild)
+    rebuild.start()
+    assert index.load.started.wait(5)
+
+    # Committed while the snapshot was being read, so the snapshot misses them
+    index.put(entry("ad_new", title="New"))
+    index.remove("ad_1")
+
+    index.load.gate.set()
+    rebuild.join(5)
+
+    assert set(index.company_ads("acme")) == {"ad_new"}
+    assert index.get("ad_new")["title"] == "New"
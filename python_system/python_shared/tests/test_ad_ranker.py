@@ -0,0 +1,163 @@
+"""
+Tests for ad_ranker: matrix scoring and top-k paging
+
+Run from python_system/:
+    python -m pytest python_shared/tests
+"""
+
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "api"))
+sys.path.insert(0, str(ROOT.parent))   # models / database
+
+import ad_ranker
+from ad_ranker import CATEGORY_WEIGHT, GLOBAL_FEATURES, GLOBAL_WEIGHTS, AdRanker, build_snapshot
+
+NOW = 1_800_000_000
+
+
+def make_rows(n, seed=3, categories=("cars", "phones", "homes"), companies=("acme", "globex")):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        # Coarse values, so many ads tie
+        views = rng.choice([0, 0, 10, 100])
+        rows.append((
+            f"ad-{i:03d}", rng.choice(categories), rng.choice(companies),
+            NOW - rng.choice([0, 7, 30]) * 86400,
+            views, rng.choice([0, 1]), 0, rng.choice([0, 2]), 0,
+        ))
+    return rows
+
+
+def dense_ranking(snapshot, affinity, rows=None):
+    """Reference: explicit one-hot category columns, full stable sort"""
+    one_hot = np.zeros((len(snapshot), len(snapshot.categories)), dtype=np.float32)
+    one_hot[np.arange(len(snapshot)), snapshot.category_idx] = 1
+    matrix = np.hstack([snapshot.features, one_hot])
+    weights = np.concatenate([
+        np.array([GLOBAL_WEIGHTS[name] for name in GLOBAL_FEATURES], dtype=np.float32),
+        AdRanker.category_weights(snapshot, affinity),
+    ])
+    scores = matrix @ weights
+    rows = np.arange(len(snapshot)) if rows is None else np.asarray(rows)
+    ranked = rows[np.argsort(-scores[rows], kind="stable")]
+    return snapshot.ad_ids[ranked].tolist()
+
+
+def walk(ranker, snapshot, affinity, limit, **filters):
+    ad_ids, offset = [], 0
+    while True:
+        page, total = ranker.rank(affinity, limit, offset, snapshot=snapshot, **filters)
+        ad_ids.extend(page)
+        offset += limit
+        if offset >= total:
+            return ad_ids
+
+
+class TestSnapshot:
+    def test_features_are_normalized(self):
+        snapshot = build_snapshot(make_rows(50), now=NOW)
+
+        assert snapshot.features.shape == (50, len(GLOBAL_FEATURES))
+        assert snapshot.features.min() >= 0
+        assert np.allclose(snapshot.features.max(axis=0), 1)
+
+    def test_recency_halves_every_half_life(self):
+        rows = [
+            ("new", "cars", "acme", NOW, 0, 0, 0, 0, 0),
+            ("old", "cars", "acme", NOW - ad_ranker.RECENCY_HALF_LIFE_DAYS * 86400, 0, 0, 0, 0, 0),
+        ]
+        recency = build_snapshot(rows, now=NOW).features[:, GLOBAL_FEATURES.index("recency")]
+
+        assert recency.tolist() == pytest.approx([1.0, 0.5])
+
+    def test_one_like_does_not_beat_a_proven_ad(self):
+        rows = [
+            ("fresh", "cars", "acme", NOW, 1, 1, 0, 0, 0),
+            ("proven", "cars", "acme", NOW, 200, 60, 0, 0, 0),
+        ]
+        engagement = build_snapshot(rows, now=NOW).features[:, GLOBAL_FEATURES.index("engagement")]
+
+        assert engagement[1] > engagement[0]
+
+
+class TestRank:
+    @pytest.mark.parametrize("affinity", [{}, {"cars": 5.0}, {"phones": 1.0, "homes": 3.0, "unknown": 9.0}])
+    def test_matches_dense_scoring(self, affinity):
+        snapshot = build_snapshot(make_rows(120), now=NOW)
+
+        ad_ids, total = AdRanker().rank(affinity, 120, snapshot=snapshot)
+
+        assert total == 120
+        assert ad_ids == dense_ranking(snapshot, affinity)
+
+    @pytest.mark.parametrize("limit", [1, 5, 12, 50])
+    def test_pages_walk_the_full_ranking(self, limit):
+        snapshot = build_snapshot(make_rows(120), now=NOW)
+        affinity = {"cars": 1.0}
+
+        assert walk(AdRanker(), snapshot, affinity, limit) == dense_ranking(snapshot, affinity)
+
+    def test_affinity_lifts_a_category(self):
+        rows = [
+            ("car", "cars", "acme", NOW, 10, 0, 0, 0, 0),
+            ("phone", "phones", "acme", NOW, 10, 0, 0, 0, 0),
+        ]
+        snapshot = build_snapshot(rows, now=NOW)
+        ranker = AdRanker()
+
+        assert ranker.rank({"phones": 1.0}, 2, snapshot=snapshot)[0] == ["phone", "car"]
+        assert ranker.category_weights(snapshot, {"phones": 1.0, "cars": 3.0}).tolist() == [
+            0.75 * CATEGORY_WEIGHT, 0.25 * CATEGORY_WEIGHT
+        ]
+
+    def test_filters(self):
+        snapshot = build_snapshot(make_rows(120), now=NOW)
+        ranker = AdRanker()
+        affinity = {"homes": 1.0}
+
+        both = (snapshot.category_idx == snapshot.category_slot["cars"]) & \
+               (snapshot.company_idx == snapshot.company_slot["acme"])
+        expected = dense_ranking(snapshot, affinity, rows=np.flatnonzero(both))
+
+        assert walk(ranker, snapshot, affinity, 7, category="cars", company="acme") == expected
+        assert ranker.rank(affinity, 5, category="boats", snapshot=snapshot) == ([], 0)
+        assert ranker.rank(affinity, 5, company="initech", snapshot=snapshot) == ([], 0)
+        assert ranker.rank(affinity, 5, offset=500, snapshot=snapshot) == ([], 120)
+
+
+class TestRefresh:
+    def test_stale_snapshot_refreshes_in_background(self, monkeypatch):
+        ranker = AdRanker(refresh_interval=60)
+        built = []
+        rebuilt = threading.Event()
+
+        def rebuild():
+            snapshot = build_snapshot(make_rows(3), now=time.time() - (60 if not built else 0))
+            built.append(snapshot)
+            ranker._snapshot = snapshot
+            if len(built) > 1:
+                rebuilt.set()
+            return snapshot
+
+        monkeypatch.setattr(ranker, "rebuild", rebuild)
+
+        first = ranker.snapshot()
+        # Stale: served as-is while a refresh runs
+        assert ranker.snapshot() is first
+        assert rebuilt.wait(5)
+        deadline = time.time() + 5
+        while ranker._refreshing and time.time() < deadline:
+            time.sleep(0.01)
+        assert ranker.snapshot() is built[-1]
+        assert len(built) == 2
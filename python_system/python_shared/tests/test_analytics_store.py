@@ -0,0 +1,238 @@
+"""
+Tests for analytics_store.AnalyticsStore
+
+Run from python_system/:
+    python -m pytest python_shared/tests
+"""
+
+import json
+import multiprocessing
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+
+from analytics_store import AnalyticsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    # Long flush interval: tests flush explicitly
+    store = AnalyticsStore(db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0)
+    yield store
+    store.close()
+
+
+def stored_summary(store, ad_id):
+    store.flush()
+    return store.all_summaries([ad_id])[0]
+
+
+def test_unfavorite_in_later_flush_is_subtracted(store):
+    store.record("ad_1", "favorite")
+    store.flush()
+    assert stored_summary(store, "ad_1")["current_favorites"] == 1
+
+    store.record("ad_1", "unfavorite")
+    summary = stored_summary(store, "ad_1")
+    assert summary["current_favorites"] == 0
+    assert summary["total_favorites"] == 1
+    assert summary["total_unfavorites"] == 1
+
+
+def test_favorite_unfavorite_in_one_flush(store):
+    store.record("ad_1", "favorite")
+    store.record("ad_1", "unfavorite")
+    assert stored_summary(store, "ad_1")["current_favorites"] == 0
+
+
+def test_current_favorites_never_negative(store):
+    # Fresh row from an unfavorite alone
+    store.record("ad_1", "unfavorite")
+    assert stored_summary(store, "ad_1")["current_favorites"] == 0
+
+    # Existing row going below zero
+    store.record("ad_1", "unfavorite")
+    assert stored_summary(store, "ad_1")["current_favorites"] == 0
+
+    store.record("ad_1", "favorite")
+    assert stored_summary(store, "ad_1")["current_favorites"] == 1
+
+
+def test_close_writes_buffered_events(tmp_path):
+    store = AnalyticsStore(db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0)
+    store.record("ad_1", "view")
+    store.close()
+
+    reopened = AnalyticsStore(db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0)
+    try:
+        assert reopened.all_summaries(["ad_1"])[0]["total_views"] == 1
+    finally:
+        reopened.close()
+
+
+def test_singleton_closes_at_exit(tmp_path, monkeypatch):
+    import analytics_store
+
+    registered = []
+    monkeypatch.setattr(analytics_store, "_store", None)
+    monkeypatch.setattr(analytics_store.atexit, "register", registered.append)
+    monkeypatch.setattr(analytics_store, "AnalyticsStore", lambda: AnalyticsStore(
+        db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0))
+
+    store = analytics_store.get_analytics_store()
+    assert registered == [store.close]
+    store.close()
+
+
+def test_recent_events_newest_first_with_caps(store):
+    for i in range(10):
+        store.record("busy", "view", timestamp=1000 + i)
+    store.record("quiet", "like", timestamp=1005)
+    store.record("old", "view", timestamp=10)
+    store.flush()
+
+    events = store.recent_events(since=100, limit=5)
+    assert [e["timestamp"] for e in events] == [1009, 1008, 1007, 1006, 1005]
+
+    capped = store.recent_events(since=100, limit=10, per_ad_limit=3)
+    assert [(e["ad_id"], e["timestamp"]) for e in capped] == [
+        ("busy", 1009), ("busy", 1008), ("busy", 1007), ("quiet", 1005)
+    ]
+
+    assert [e["ad_id"] for e in store.recent_events(since=0, limit=10, ad_ids=["old", "quiet"])] == ["quiet", "old"]
+    assert store.recent_events(since=0, limit=10, ad_ids=[]) == []
+
+
+def test_count_by_type(store):
+    for event_type in ["view", "view", "call", "like"]:
+        store.record("ad_1", event_type, timestamp=1000)
+    store.record("ad_2", "view", timestamp=1000)
+    store.record("ad_1", "view", timestamp=10)
+    store.flush()
+
+    assert store.count_by_type(since=100) == {"view": 3, "call": 1, "like": 1}
+    assert store.count_by_type(since=100, ad_ids=["ad_2"]) == {"view": 1}
+
+
+def write_legacy(directory, ad_id, views):
+    (directory / f"{ad_id}.json").write_text(json.dumps({
+        "ad_id": ad_id,
+        "total_views": views,
+        "events": [{"type": "view", "timestamp": 1000 + i} for i in range(views)],
+    }))
+
+
+def open_store(db_path, results):
+    store = AnalyticsStore(db_path=db_path, flush_interval=3600, compact_interval=0)
+    results.put(store.all_summaries(["legacy_ad"])[0]["total_views"])
+    store.close()
+
+
+def test_legacy_import_runs_once_across_processes(tmp_path):
+    write_legacy(tmp_path, "legacy_ad", 5)
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    processes = [ctx.Process(target=open_store, args=(tmp_path / "events.db", results)) for _ in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(30)
+
+    assert [results.get(timeout=5) for _ in processes] == [5, 5, 5, 5]
+    assert not (tmp_path / "legacy_ad.json").exists()
+
+
+def test_legacy_file_left_after_commit_is_not_reimported(tmp_path):
+    write_legacy(tmp_path, "legacy_ad", 3)
+    store = AnalyticsStore(db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0)
+    store.close()
+
+    # Simulate a crash between the commit and the rename
+    (tmp_path / "legacy_ad.json.imported").rename(tmp_path / "legacy_ad.json")
+    store = AnalyticsStore(db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0)
+    try:
+        assert store.all_summaries(["legacy_ad"])[0]["total_views"] == 3
+        assert len(store.get_events(ad_id="legacy_ad")) == 3
+        assert not (tmp_path / "legacy_ad.json").exists()
+    finally:
+        store.close()
+
+
+def at(day, hour):
+    return int(datetime.strptime(f"{day} {hour}", "%Y-%m-%d %H").timestamp())
+
+
+def test_rollups_match_raw_event_counts(store):
+    events = [
+        ("ad_1", "view", at("2026-01-05", 9), "Mozilla (Android)"),
+        ("ad_1", "view", at("2026-01-05", 9), "Windows desktop"),
+        ("ad_1", "call", at("2026-01-05", 10), "Android"),
+        ("ad_1", "view", at("2026-01-06", 9), None),
+        ("ad_2", "view", at("2026-01-06", 12), None),
+    ]
+    for ad_id, event_type, timestamp, user_agent in events:
+        store.record(ad_id, event_type, user_agent=user_agent, timestamp=timestamp)
+
+    raw = {}
+    for ad_id, event_type, timestamp, _ in events:
+        key = (datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d"), event_type)
+        raw[key] = raw.get(key, 0) + 1
+    rolled = {(r["day"], r["type"]): r["count"] for r in store.get_rollups()}
+    assert rolled == raw
+
+    by_audience = store.get_rollups(ad_id="ad_1", types=["view"], group_by=("audience",))
+    assert sorted((r["audience"], r["count"]) for r in by_audience) == [
+        ("elderly", 1), ("unknown", 1), ("youth", 1)
+    ]
+    assert store.get_rollups(since_day="2026-01-06", group_by=()) == [{"count": 2}]
+
+
+def test_rollups_filter_by_company(store, monkeypatch):
+    import analytics_store
+
+    monkeypatch.setattr(analytics_store, "_resolve_company", lambda ad_id: "acme" if ad_id == "ad_1" else "")
+    store.record("ad_1", "view", timestamp=at("2026-01-05", 9))
+    store.record("ad_2", "view", timestamp=at("2026-01-05", 9))
+
+    assert store.get_rollups(company="acme", group_by=("ad_id",)) == [{"ad_id": "ad_1", "count": 1}]
+
+
+def test_existing_events_are_backfilled_once(tmp_path):
+    store = AnalyticsStore(db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0)
+    store.record("ad_1", "view", timestamp=at("2026-01-05", 9))
+    store.record("ad_1", "like", timestamp=at("2026-01-05", 9))
+    store.flush()
+    # Pretend the database predates rollups
+    with store._conn() as conn:
+        conn.execute("DELETE FROM event_rollup")
+    store._conn().execute("PRAGMA user_version = 0")
+    store.close()
+
+    for _ in range(2):
+        store = AnalyticsStore(db_path=tmp_path / "events.db", flush_interval=3600, compact_interval=0)
+        try:
+            assert store.get_rollups(group_by=("type",)) == [
+                {"type": "like", "count": 1}, {"type": "view", "count": 1}
+            ]
+        finally:
+            store.close()
+
+
+def test_compact_keeps_rollups_of_pruned_events(store):
+    old = int(time.time()) - 30 * 86400
+    store.record("ad_1", "view", timestamp=old)
+    store.record("ad_1", "view", timestamp=at("2000-01-01", 0))
+
+    result = store.compact(retention_days=7)
+
+    assert result["events_pruned"] == 2
+    assert result["rollups_pruned"] == 1
+    assert store.get_events(ad_id="ad_1") == []
+    assert store.get_rollups(ad_id="ad_1", group_by=()) == [{"count": 1}]
+    assert store.get_summary("ad_1")["total_views"] == 2
@@ -0,0 +1,118 @@
+"""
+Tests for get_ads: one joined page query and the cached total
+
+Run from python_system/:
+    python -m pytest python_shared/tests
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+pytest.importorskip("websockets")   # python_shared.api's __init__ imports every router
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Ad, Base, Category, Company
+from python_shared.api import get_ads as get_ads_module
+
+
+@pytest.fixture
+def selects():
+    return []
+
+
+@pytest.fixture
+def session(selects, monkeypatch):
+    # One shared connection: run_db executes queries on a worker thread
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    db.add(Company(company_slug="acme", company_name="Acme Motors", created_at=1, updated_at=1))
+    db.add(Category(category_slug="cars", category_name="Cars & Trucks", created_at=1))
+    for i in range(5):
+        db.add(Ad(ad_id=f"ad-{i}", company_slug="acme" if i < 4 else "unlisted",
+                  category_slug="cars", title=f"Ad {i}", media_filename="x.jpg", media_path="x.jpg",
+                  created_at=1000 + i, updated_at=1000, status="active"))
+    db.add(Ad(ad_id="ad-paused", company_slug="acme", category_slug="cars", title="Paused",
+              media_filename="x.jpg", media_path="x.jpg", created_at=1, updated_at=1, status="paused"))
+    db.commit()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    monkeypatch.setattr(get_ads_module, "_count_cache", {})
+    yield db
+    db.close()
+
+
+def fetch(db, **params):
+    args = dict(page=1, q="", category="", company="", sort="date", pageSize=12,
+                cursor=None, device_id=None)
+    args.update(params)
+    return asyncio.run(get_ads_module.get_ads(request=None, db=db, **args))
+
+
+def test_page_is_one_joined_query(session, selects):
+    response = fetch(session)
+
+    assert response["success"]
+    assert response["total"] == 5
+    assert [ad["ad_id"] for ad in response["ads"]] == ["ad-4", "ad-3", "ad-2", "ad-1", "ad-0"]
+    # COUNT + one page query, however many ads are on the page
+    assert len(selects) == 2
+
+
+def test_names_come_from_the_join(session):
+    ads = {ad["ad_id"]: ad for ad in fetch(session)["ads"]}
+
+    assert ads["ad-0"]["category_name"] == "Cars & Trucks"
+    assert ads["ad-0"]["company_name"] == "Acme Motors"
+    # No companies row: fall back to the slug
+    assert ads["ad-4"]["company_name"] == "Unlisted"
+
+
+def test_total_is_cached_per_filter(session, selects):
+    fetch(session)
+    fetch(session, page=2, pageSize=2, sort="views")
+    assert sum("count(" in s.lower() for s in selects) == 1
+
+    response = fetch(session, company="acme")
+    assert response["total"] == 4
+    assert sum("count(" in s.lower() for s in selects) == 2
+
+
+def test_cached_total_expires(session, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(get_ads_module.time, "time", lambda: now[0])
+    key = ("active", "", "", "")
+    query = session.query(Ad).filter(Ad.status == "active")
+
+    assert get_ads_module.cached_count(key, query) == 5
+    session.query(Ad).filter(Ad.ad_id == "ad-0").delete()
+    session.commit()
+    assert get_ads_module.cached_count(key, query) == 5
+
+    now[0] += get_ads_module.COUNT_CACHE_TTL
+    assert get_ads_module.cached_count(key, query) == 4
+
+
+def test_count_cache_is_bounded(session, monkeypatch):
+    monkeypatch.setattr(get_ads_module, "COUNT_CACHE_MAX_ENTRIES", 3)
+    query = session.query(Ad)
+
+    for i in range(10):
+        get_ads_module.cached_count(("active", f"q{i}", "", ""), query)
+
+    assert len(get_ads_module._count_cache) <= 3
@@ -0,0 +1,210 @@
+"""
+Tests for profile_store.ProfileStore
+
+Run from python_system/:
+    python -m pytest python_shared/tests
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+
+from profile_store import AFFINITY_HALF_LIFE_DAYS, RECENT_SIZE, ProfileStore
+
+
+def open_store(tmp_path):
+    # Long flush interval: tests flush explicitly
+    return ProfileStore(
+        db_path=tmp_path / "profiles.db", legacy_path=tmp_path / "legacy", flush_interval=3600
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / "legacy").mkdir()
+    store = open_store(tmp_path)
+    yield store
+    store.close()
+
+
+def write_legacy(tmp_path, device_id, **fields):
+    legacy = {
+        "device_id": device_id,
+        "created_at": "2026-01-01T00:00:00",
+        "last_active": "2026-01-02T00:00:00",
+        "updated_at": "2026-01-02T00:00:00",
+        "total_views": 7,
+        "category_affinity": {"vehicles": 4.0},
+        "interaction_history": [{"ad_id": "old", "action": "view", "duration": 12}],
+        **fields,
+    }
+    (tmp_path / "legacy" / f"{device_id}.json").write_text(json.dumps(legacy))
+
+
+def test_counters_and_recent_ring(store):
+    for i in range(RECENT_SIZE + 5):
+        store.record("dev", f"ad_{i}", "view", category="vehicles", duration=2)
+    store.record("dev", "ad_x", "contact", category="vehicles")
+    store.flush()
+
+    profile = store.get("dev")
+    assert profile["total_views"] == RECENT_SIZE + 5
+    assert profile["total_contacts"] == 1
+    assert profile["avg_view_duration"] == 2
+    assert len(profile["recent"]) == RECENT_SIZE
+    assert profile["recent"][-1]["ad_id"] == "ad_x"
+
+
+def test_pending_events_are_read_back_before_flush(store):
+    store.record("dev", "ad_1", "like", category="vehicles")
+    before = store.get("dev")
+    store.flush()
+
+    assert before == store.get("dev")
+    assert store.get("nobody") is None
+    assert store.affinities("nobody") == {}
+
+
+def test_affinity_halves_every_half_life(store):
+    now = int(time.time())
+    store.record("dev", "ad_1", "favorite", category="vehicles",
+                 timestamp=now - AFFINITY_HALF_LIFE_DAYS * 86400)
+    store.record("dev", "ad_2", "like", category="phones", timestamp=now)
+    store.flush()
+
+    affinity = store.affinities("dev")
+    assert affinity["vehicles"] == pytest.approx(2.5, abs=0.01)
+    assert affinity["phones"] == pytest.approx(3.0, abs=0.01)
+    assert store.preferences("dev") == pytest.approx({"vehicles": 0.455, "phones": 0.545}, abs=0.002)
+
+
+def test_category_slots_are_shared_and_persist(tmp_path, store):
+    store.record("a", "ad_1", "view", category="vehicles")
+    store.flush()
+
+    other = open_store(tmp_path)
+    try:
+        other.record("b", "ad_2", "view", category="phones")
+        other.record("b", "ad_3", "view", category="vehicles")
+        other.flush()
+        assert other.categories == ["vehicles", "phones"]
+    finally:
+        other.close()
+
+    # The first store learns about the new slot on read
+    assert store.affinities("b") == pytest.approx({"vehicles": 1.0, "phones": 1.0}, abs=0.01)
+
+
+def test_legacy_profile_is_imported_on_first_write(tmp_path, store):
+    write_legacy(tmp_path, "dev")
+
+    # Reads don't import or delete
+    assert store.get("dev")["total_views"] == 7
+    assert (tmp_path / "legacy" / "dev.json").exists()
+
+    store.record("dev", "ad_1", "view", category="vehicles")
+    store.flush()
+
+    profile = store.get("dev")
+    assert profile["total_views"] == 8
+    assert profile["recent"][0]["ad_id"] == "old"
+    assert profile["avg_view_duration"] == 12
+    assert "vehicles" in profile["category_affinity"]
+    assert not (tmp_path / "legacy" / "dev.json").exists()
+
+
+def test_unsafe_device_ids_never_touch_legacy_files(tmp_path, store):
+    (tmp_path / "secret.json").write_text(json.dumps({"total_views": 99}))
+
+    assert store.get("../secret") is None
+    assert store.delete("../secret") is False
+    assert (tmp_path / "secret.json").exists()
+
+
+def test_bulk_import(tmp_path, store):
+    for i in range(5):
+        write_legacy(tmp_path, f"dev{i}")
+
+    assert store.import_legacy_profiles(batch_size=2) == 5
+    assert [store.get(f"dev{i}")["total_views"] for i in range(5)] == [7] * 5
+    assert list((tmp_path / "legacy").iterdir()) == []
+
+
+def test_delete_removes_every_copy(tmp_path, store):
+    store.record("dev", "ad_1", "view")
+    store.flush()
+    store.record("dev", "ad_2", "view")
+    write_legacy(tmp_path, "dev")
+
+    assert store.delete("dev") is True
+    store.flush()
+    assert store.get("dev") is None
+    assert store.delete("dev") is False
+
+
+def test_prune_drops_idle_profiles(store):
+    store.record("idle", "ad_1", "view", timestamp=int(time.time()) - 400 * 86400)
+    store.record("busy", "ad_1", "view")
+    store.flush()
+
+    assert store.prune(inactive_days=365) == 1
+    assert store.get("idle") is None
+    assert store.get("busy") is not None
+
+
+def test_close_writes_buffered_events(tmp_path):
+    store = open_store(tmp_path)
+    store.record("dev", "ad_1", "like", category="vehicles")
+    store.close()
+
+    reopened = open_store(tmp_path)
+    try:
+        assert reopened.get("dev")["total_likes"] == 1
+    finally:
+        reopened.close()
+
+
+def test_singleton_closes_at_exit(tmp_path, monkeypatch):
+    import profile_store
+
+    registered = []
+    monkeypatch.setattr(profile_store, "_store", None)
+    monkeypatch.setattr(profile_store.atexit, "register", registered.append)
+    monkeypatch.setattr(profile_store, "ProfileStore", lambda: open_store(tmp_path))
+
+    store = profile_store.get_profile_store()
+    assert registered == [store.close]
+    store.close()
+
+
+def test_delete_waits_for_a_running_flush(store, monkeypatch):
+    store.record("dev", "ad_1", "view")
+    swapped, release = threading.Event(), threading.Event()
+    original = store._conn
+
+    def conn():
+        # Hold the flush after it took the buffer, before its transaction
+        if threading.current_thread().name == "flusher" and not swapped.is_set():
+            swapped.set()
+            release.wait(5)
+        return original()
+
+    monkeypatch.setattr(store, "_conn", conn)
+    flusher = threading.Thread(target=store.flush, name="flusher")
+    flusher.start()
+    swapped.wait(5)
+
+    deleter = threading.Thread(target=store.delete, args=("dev",))
+    deleter.start()
+    deleter.join(0.2)
+    release.set()
+    flusher.join(5)
+    deleter.join(5)
+
+    assert store.get("dev") is None
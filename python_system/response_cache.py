@@ -0,0 +1,362 @@
+"""
+Response cache for hot public read endpoints
+
+/api/categories, /api/dashboard_stats and the first pages of /api/ads are
+requested far more often than the rows behind them change. Responses are
+cached as serialized JSON bytes together with an ETag, keyed on the
+service namespace, the route and its normalized parameters. Both apps
+serve the same routes with different payloads, so the namespace keeps them
+from overwriting each other's entries in the shared Redis tier:
+
+- In-process LRU with per-entry TTL (always on)
+- Redis tier shared by every worker (when REDIS_URL is set and the redis
+  package is installed)
+
+Entries carry tags ("ads", "categories", "companies", "stats"). ORM commits
+that touch Ad / Category / Company rows invalidate the matching tags, so
+listings refresh on change instead of waiting for the TTL. Counter-only
+updates (views, likes, ...) don't invalidate; those figures refresh on TTL.
+
+Usage:
+    return await cached_json(
+        request, "categories", {}, lambda: run_db(load_categories, db),
+        ttl=300, tags=("categories",), namespace=CACHE_NAMESPACE
+    )
+"""
+
+from collections import OrderedDict
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session, object_session
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from models import Ad, Category, Company
+
+DEFAULT_TTL = 60
+MAX_ENTRIES = 1024
+REDIS_PREFIX = "adsphere:rc:"
+INVALIDATE_CHANNEL = REDIS_PREFIX + "invalidate"
+
+# Ad columns that change on every interaction; they don't invalidate listings
+COUNTER_COLUMNS = {
+    "views_count", "likes_count", "dislikes_count", "favorites_count",
+    "contacts_count", "updated_at",
+}
+
+# Model -> tags whose cached responses include that model's rows
+MODEL_TAGS = {
+    Ad: ("ads", "stats"),
+    Category: ("categories", "ads", "stats"),
+    Company: ("companies", "ads", "stats"),
+}
+
+# (expires_at, body, etag, tags)
+Entry = Tuple[float, bytes, str, Tuple[str, ...]]
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """LRU + TTL cache of serialized responses with tag invalidation"""
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        default_ttl: int = DEFAULT_TTL,
+        redis_url: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._by_tag: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+        self._redis = None
+        if redis_url and redis is not None:
+            try:
+                self._redis = redis.Redis.from_url(redis_url)
+                self._redis.ping()
+                self._start_subscriber()
+                print("✓ Response cache using Redis tier")
+            except Exception as e:
+                print(f"⚠ Redis unavailable, response cache is in-process only: {e}")
+                self._redis = None
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(namespace: str, route: str, params: Dict[str, Any]) -> str:
+        """namespace:route + sorted non-empty params, so ?a=1&b= and ?b=&a=1 share an entry"""
+        normalized = sorted(
+            (name, str(value)) for name, value in params.items()
+            if value is not None and value != ""
+        )
+        return f"{namespace}:{route}?" + "&".join(f"{name}={value}" for name, value in normalized)
+
+    # ------------------------------------------------------------------
+    # Get / set
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """(body, etag) if cached and fresh"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1], entry[2]
+                self._drop(key)
+
+        if self._redis is not None:
+            try:
+                cached = self._redis.hgetall(REDIS_PREFIX + key)
+                ttl = self._redis.ttl(REDIS_PREFIX + key)
+            except Exception:
+                cached = None
+            if cached and ttl and ttl > 0:
+                body, etag = cached[b"body"], cached[b"etag"].decode()
+                tags = tuple(filter(None, cached.get(b"tags", b"").decode().split(",")))
+                self._store_local(key, body, etag, ttl, tags)
+                with self._lock:
+                    self.stats["hits"] += 1
+                return body, etag
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, body: bytes, ttl: Optional[int] = None,
+            tags: Iterable[str] = ()) -> str:
+        """Store a serialized body; returns its ETag"""
+        ttl = ttl or self.default_ttl
+        tags = tuple(tags)
+        etag = make_etag(body)
+        self._store_local(key, body, etag, ttl, tags)
+
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                pipe.hset(REDIS_PREFIX + key, mapping={"body": body, "etag": etag, "tags": ",".join(tags)})
+                pipe.expire(REDIS_PREFIX + key, ttl)
+                for tag in tags:
+                    pipe.sadd(REDIS_PREFIX + "tag:" + tag, key)
+                pipe.execute()
+            except Exception as e:
+                print(f"⚠ Response cache Redis write failed: {e}")
+
+        return etag
+
+    def _store_local(self, key: str, body: bytes, etag: str, ttl: int, tags: Tuple[str, ...]):
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.time() + ttl, body, etag, tags)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        """Remove one local entry (caller holds the lock)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[3]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self, *tags: str):
+        """Drop every entry carrying any of `tags`, here and in Redis"""
+        self._invalidate_local(tags)
+
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                for tag in tags:
+                    tag_key = REDIS_PREFIX + "tag:" + tag
+                    keys = self._redis.smembers(tag_key)
+                    if keys:
+                        pipe.delete(*[REDIS_PREFIX + k.decode() for k in keys])
+                    pipe.delete(tag_key)
+                # Other workers drop their in-process copies
+                pipe.publish(INVALIDATE_CHANNEL, ",".join(tags))
+                pipe.execute()
+            except Exception as e:
+                print(f"⚠ Response cache Redis invalidation failed: {e}")
+
+    def _invalidate_local(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._drop(key)
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def _start_subscriber(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(INVALIDATE_CHANNEL)
+
+        def listen():
+            for message in pubsub.listen():
+                try:
+                    self._invalidate_local(message["data"].decode().split(","))
+                except Exception as e:
+                    print(f"⚠ Response cache invalidation message failed: {e}")
+
+        threading.Thread(target=listen, name="response-cache-sub", daemon=True).start()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide ResponseCache (Redis tier if REDIS_URL is set)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(redis_url=os.getenv("REDIS_URL"))
+    return _cache
+
+
+async def cached_json(
+    request: Request,
+    route: str,
+    params: Dict[str, Any],
+    build: Callable[[], Any],
+    ttl: Optional[int] = None,
+    tags: Iterable[str] = (),
+    *,
+    namespace: str
+) -> Response:
+    """
+    Serve a JSON endpoint from the response cache.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        route: Cache namespace, usually the endpoint path
+        params: The endpoint's effective parameters (defaults applied)
+        build: Returns the payload (or an awaitable of it) on a miss
+        ttl: Seconds to keep the entry
+        tags: Invalidation tags for the entry
+        namespace: Name of the serving app, so services sharing Redis and
+            route paths keep separate entries
+
+    Returns:
+        200 with the cached body, or 304 when the client's ETag matches.
+        Payloads returned as a Response, or carrying an "error" key, are
+        passed through uncached.
+    """
+    cache = get_response_cache()
+    key = cache.make_key(namespace, route, params)
+
+    cached = cache.get(key)
+    if cached is None:
+        payload = build()
+        if inspect.isawaitable(payload):
+            payload = await payload
+        if isinstance(payload, Response):
+            return payload
+
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+        if isinstance(payload, dict) and "error" in payload:
+            return Response(body, media_type="application/json")
+        etag = cache.set(key, body, ttl=ttl, tags=tags)
+    else:
+        body, etag = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# ----------------------------------------------------------------------
+# ORM invalidation: tags are staged per session and dropped on commit, so
+# a rolled-back write never evicts anything.
+# ----------------------------------------------------------------------
+
+def _stage_tags(session, tags: Iterable[str]):
+    if session is not None and _cache is not None:
+        session.info.setdefault("response_cache_tags", set()).update(tags)
+
+
+def _on_saved(mapper, connection, target):
+    if isinstance(target, Ad):
+        state = sa_inspect(target)
+        changed = {attr.key for attr in state.attrs if attr.history.has_changes()}
+        if changed and changed <= COUNTER_COLUMNS:
+            return
+    _stage_tags(object_session(target), MODEL_TAGS[type(target)])
+
+
+def _on_deleted(mapper, connection, target):
+    _stage_tags(object_session(target), MODEL_TAGS[type(target)])
+
+
+for _model in MODEL_TAGS:
+    event.listen(_model, "after_insert", _on_saved)
+    event.listen(_model, "after_update", _on_saved)
+    event.listen(_model, "after_delete", _on_deleted)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_bulk_write(orm_execute_state):
+    # query(...).update() / .delete() skip the per-object mapper events
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    tags = MODEL_TAGS.get(mapper.class_) if mapper is not None else None
+    if tags:
+        _stage_tags(orm_execute_state.session, tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session):
+    tags = session.info.pop("response_cache_tags", None)
+    if tags and _cache is not None:
+        _cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session):
+    session.info.pop("response_cache_tags", None)
@@ -0,0 +1,219 @@
+"""
+Full-text search index for ads (SQLite FTS5)
+
+ads_fts mirrors each ad's title, description, category name and company
+name. Triggers on ads / categories / companies keep it in sync, so every
+writer (Python ORM, PHP, raw SQL) is covered.
+
+The older ads_fts was an external-content table keyed by ads.rowid, which
+VACUUM may renumber, and its UPDATE trigger wrote to the external-content
+table directly, which corrupts the index. migrate() replaces it with a
+regular FTS5 table keyed by ad_id. The table name and ad_id column stay the
+same for the PHP searchAds() queries.
+
+Usage:
+    python search_index.py            # migrate + backfill
+    python search_index.py --rebuild  # drop and backfill again
+"""
+
+from sqlalchemy import Float, String, text
+from sqlalchemy.engine import Engine
+import re
+import sys
+import threading
+
+from database import engine as default_engine
+
+# bm25() column weights: ad_id (unindexed), title, description, category, company
+BM25_WEIGHTS = (0.0, 10.0, 4.0, 2.0, 2.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_ready = False
+_ready_lock = threading.Lock()
+fts_available = True
+
+_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ads_fts USING fts5(
+        ad_id UNINDEXED,
+        title,
+        description,
+        category,
+        company,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_fts_insert AFTER INSERT ON ads BEGIN
+        INSERT INTO ads_fts (ad_id, title, description, category, company)
+        VALUES (
+            new.ad_id,
+            new.title,
+            COALESCE(new.description, ''),
+            COALESCE((SELECT category_name FROM categories WHERE category_slug = new.category_slug), new.category_slug),
+            COALESCE((SELECT company_name FROM companies WHERE company_slug = new.company_slug), new.company_slug)
+        );
+    END
+    """,
+    # Only searchable columns: counter bumps (views, likes) don't touch the index
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_fts_update
+    AFTER UPDATE OF ad_id, title, description, category_slug, company_slug ON ads BEGIN
+        DELETE FROM ads_fts WHERE ad_id = old.ad_id;
+        INSERT INTO ads_fts (ad_id, title, description, category, company)
+        VALUES (
+            new.ad_id,
+            new.title,
+            COALESCE(new.description, ''),
+            COALESCE((SELECT category_name FROM categories WHERE category_slug = new.category_slug), new.category_slug),
+            COALESCE((SELECT company_name FROM companies WHERE company_slug = new.company_slug), new.company_slug)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_fts_delete AFTER DELETE ON ads BEGIN
+        DELETE FROM ads_fts WHERE ad_id = old.ad_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_fts_category_rename
+    AFTER UPDATE OF category_name ON categories BEGIN
+        UPDATE ads_fts SET category = new.category_name
+        WHERE ad_id IN (SELECT ad_id FROM ads WHERE category_slug = new.category_slug);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ads_fts_company_rename
+    AFTER UPDATE OF company_name ON companies BEGIN
+        UPDATE ads_fts SET company = new.company_name
+        WHERE ad_id IN (SELECT ad_id FROM ads WHERE company_slug = new.company_slug);
+    END
+    """,
+]
+
+_DROP = [
+    "DROP TRIGGER IF EXISTS ads_fts_insert",
+    "DROP TRIGGER IF EXISTS ads_fts_update",
+    "DROP TRIGGER IF EXISTS ads_fts_delete",
+    "DROP TRIGGER IF EXISTS ads_fts_category_rename",
+    "DROP TRIGGER IF EXISTS ads_fts_company_rename",
+    "DROP TABLE IF EXISTS ads_fts",
+]
+
+_BACKFILL = """
+    INSERT INTO ads_fts (ad_id, title, description, category, company)
+    SELECT
+        a.ad_id,
+        a.title,
+        COALESCE(a.description, ''),
+        COALESCE(c.category_name, a.category_slug),
+        COALESCE(co.company_name, a.company_slug)
+    FROM ads a
+    LEFT JOIN categories c ON c.category_slug = a.category_slug
+    LEFT JOIN companies co ON co.company_slug = a.company_slug
+"""
+
+
+def migrate(engine: Engine = default_engine, rebuild: bool = False) -> int:
+    """
+    Create (or replace the legacy) ads_fts index and backfill it.
+
+    Args:
+        engine: SQLAlchemy engine for the ads database
+        rebuild: Drop and repopulate even if the index is current
+
+    Returns:
+        Number of ads indexed by this call (0 if already current)
+    """
+    with engine.begin() as conn:
+        row = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'ads_fts'"
+        )).fetchone()
+
+        legacy = row is not None and "content='ads'" in row[0].replace('"', "'")
+        if row is not None and not legacy and not rebuild:
+            return 0
+
+        for statement in _DROP:
+            conn.execute(text(statement))
+        for statement in _SCHEMA:
+            conn.execute(text(statement))
+
+        conn.execute(text(_BACKFILL))
+        indexed = conn.execute(text("SELECT COUNT(*) FROM ads_fts")).scalar() or 0
+        conn.execute(text("INSERT INTO ads_fts (ads_fts) VALUES ('optimize')"))
+
+    return indexed
+
+
+def ensure_search_index(engine: Engine = default_engine) -> bool:
+    """Run migrate() once per process; False if FTS5 is unavailable"""
+    global _ready, fts_available
+    if _ready:
+        return fts_available
+
+    with _ready_lock:
+        if not _ready:
+            try:
+                indexed = migrate(engine)
+                if indexed:
+                    print(f"✓ Search index built ({indexed} ads)")
+            except Exception as e:
+                print(f"⚠ Full-text search unavailable, falling back to LIKE: {e}")
+                fts_available = False
+            _ready = True
+
+    return fts_available
+
+
+def build_match_query(q: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word must match, and the last word is a prefix (search-as-you-type).
+    Words are quoted, so FTS5 operators in user input are treated as plain text.
+    """
+    tokens = _TOKEN_RE.findall(q.lower())
+    if not tokens:
+        return ""
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_subquery(match: str):
+    """(ad_id, rank) rows matching `match`; lower rank is more relevant"""
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    return (
+        text(f"SELECT ad_id, bm25(ads_fts, {weights}) AS rank FROM ads_fts WHERE ads_fts MATCH :fts_match")
+        .bindparams(fts_match=match)
+        .columns(ad_id=String, rank=Float)
+        .subquery("fts")
+    )
+
+
+def apply_search(query, ad_model, q: str, engine: Engine = default_engine):
+    """
+    Filter an Ad query by full-text search.
+
+    Returns:
+        (query, rank_column): rank_column orders by relevance
+        (ascending), or is None when the LIKE fallback was used.
+    """
+    if not ensure_search_index(engine):
+        term = f"%{q}%"
+        return query.filter(ad_model.title.ilike(term) | ad_model.description.ilike(term)), None
+
+    match = build_match_query(q)
+    if not match:
+        return query, None
+
+    fts = search_subquery(match)
+    return query.join(fts, fts.c.ad_id == ad_model.ad_id), fts.c.rank
+
+
+if __name__ == "__main__":
+    count = migrate(rebuild="--rebuild" in sys.argv)
+    print(f"✅ ads_fts up to date ({count} ads indexed)")
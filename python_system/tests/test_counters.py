@@ -0,0 +1,137 @@
+"""CounterAggregator: increments are summed in memory and written in one batch"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from counters import COUNTER_COLUMNS, CounterAggregator
+from models import Ad, Base
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ads.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for i in range(3):
+            conn.execute(Ad.__table__.insert().values(
+                ad_id=f"ad-{i}", company_slug="acme", category_slug="cars", title=f"Ad {i}",
+                media_filename="x.jpg", media_path="x.jpg", created_at=1, updated_at=1,
+                status="active", views_count=None if i == 0 else 10
+            ))
+    return engine
+
+
+def stored(engine, ad_id, column="views_count"):
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT {column} FROM ads WHERE ad_id = :id"), {"id": ad_id}).scalar()
+
+
+def test_increments_are_written_in_one_transaction(engine):
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    counters = CounterAggregator(engine)
+
+    for _ in range(5):
+        counters.increment("ad-0", "views_count")
+        counters.increment("ad-1", "views_count")
+    counters.increment("ad-1", "likes_count", 2)
+
+    assert counters.flush() == 2
+    assert len(commits) == 1
+    # NULL counters count from zero
+    assert stored(engine, "ad-0") == 5
+    assert stored(engine, "ad-1") == 15
+    assert stored(engine, "ad-1", "likes_count") == 2
+    assert counters.flush() == 0
+
+
+def test_pending_is_added_to_stored_values(engine):
+    counters = CounterAggregator(engine)
+    counters.increment("ad-1", "views_count", 3)
+
+    assert counters.pending("ad-1")["views_count"] == 3
+    assert counters.pending("ad-2") == dict.fromkeys(COUNTER_COLUMNS, 0)
+
+    class Row:
+        ad_id = "ad-1"
+        views_count = 10
+        likes_count = dislikes_count = favorites_count = contacts_count = None
+
+    assert counters.current(Row())["views_count"] == 13
+
+
+def test_deltas_stay_visible_while_the_flush_commits(engine):
+    counters = CounterAggregator(engine)
+    counters.increment("ad-1", "views_count", 4)
+    seen = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def during_flush(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE ads"):
+            seen.append(counters.pending("ad-1")["views_count"])
+
+    counters.flush()
+
+    assert seen == [4]
+    assert counters.pending("ad-1")["views_count"] == 0
+
+
+def test_failed_flush_keeps_deltas(engine):
+    counters = CounterAggregator(engine)
+    counters.increment("ad-1", "views_count", 2)
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE ads RENAME TO ads_moved"))
+
+    with pytest.raises(Exception):
+        counters.flush()
+    counters.increment("ad-1", "views_count")
+    assert counters.pending("ad-1")["views_count"] == 3
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE ads_moved RENAME TO ads"))
+    counters.flush()
+    assert stored(engine, "ad-1") == 13
+
+
+def test_unknown_column_is_rejected(engine):
+    with pytest.raises(ValueError):
+        CounterAggregator(engine).increment("ad-1", "title")
+
+
+def test_full_buffer_wakes_the_flusher(engine):
+    counters = CounterAggregator(engine, flush_interval_ms=60_000, flush_every=3)
+    counters.start()
+    try:
+        for _ in range(3):
+            counters.increment("ad-2", "views_count")
+        deadline = time.time() + 5
+        while stored(engine, "ad-2") != 13 and time.time() < deadline:
+            time.sleep(0.01)
+        assert stored(engine, "ad-2") == 13
+    finally:
+        counters.stop()
+
+
+def test_concurrent_increments_are_not_lost(engine):
+    counters = CounterAggregator(engine, flush_interval_ms=1, flush_every=50)
+    counters.start()
+
+    def hit():
+        for _ in range(200):
+            counters.increment("ad-0", "views_count")
+
+    threads = [threading.Thread(target=hit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counters.stop()
+
+    assert stored(engine, "ad-0") == 800
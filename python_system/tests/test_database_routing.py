@@ -0,0 +1,63 @@
+"""RoutingSession: writes go to the single writer, plain reads to the reader pool"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from sqlalchemy import delete, select, text, update
+
+from database import RoutingSession, engine, is_write, mark_write, read_engine
+from models import Ad
+
+
+@pytest.mark.parametrize("sql", [
+    "INSERT INTO ads (ad_id) VALUES ('x')",
+    "  update ads set views_count = 1",
+    "DELETE FROM ads",
+    "REPLACE INTO ads (ad_id) VALUES ('x')",
+    "CREATE INDEX IF NOT EXISTS i ON ads(title)",
+    "WITH old AS (SELECT ad_id FROM ads) DELETE FROM ads WHERE ad_id IN old",
+])
+def test_text_dml_is_a_write(sql):
+    assert is_write(text(sql))
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM ads",
+    "select * from updates_log",
+    "WITH recent AS (SELECT 1) SELECT * FROM recent",
+    "PRAGMA table_info(ads)",
+])
+def test_text_reads_are_not_writes(sql):
+    assert not is_write(text(sql))
+
+
+def test_get_bind_routes_by_statement():
+    session = RoutingSession()
+    try:
+        assert session.get_bind(clause=select(Ad)) is read_engine
+        assert session.get_bind(clause=text("SELECT 1")) is read_engine
+        assert session.get_bind(clause=update(Ad).values(title="x")) is engine
+    finally:
+        session.close()
+
+
+def test_reads_after_a_write_stay_on_writer():
+    session = RoutingSession()
+    try:
+        assert session.get_bind(clause=text("UPDATE ads SET title = 'x'")) is engine
+        assert session.get_bind(clause=select(Ad)) is engine
+    finally:
+        session.close()
+
+
+def test_mark_write_routes_reads_to_writer():
+    session = RoutingSession()
+    try:
+        mark_write(session)
+        assert session.get_bind(clause=select(Ad)) is engine
+        assert session.get_bind(clause=delete(Ad)) is engine
+    finally:
+        session.close()
@@ -0,0 +1,67 @@
+"""Keyset pagination: a cursor walk must visit every row exactly once"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Ad, Base, Category, Company
+from pagination import InvalidCursor, encode_cursor, order_by_keys, paginate, sort_keys
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    db.add(Company(company_slug="acme", company_name="Acme", created_at=1, updated_at=1))
+    db.add(Category(category_slug="misc", category_name="Misc", created_at=1))
+    for i in range(23):
+        # Every third row has NULL counters, as rows written outside the ORM do
+        counter = None if i % 3 == 0 else i % 5
+        db.add(Ad(ad_id=f"ad-{i:02d}", company_slug="acme", category_slug="misc",
+                  title=f"Ad {i}", media_filename="x.jpg", media_path="x.jpg",
+                  created_at=1000 + i % 4, updated_at=1000, status="active"))
+        db.flush()
+        db.execute(Ad.__table__.update().where(Ad.ad_id == f"ad-{i:02d}").values(
+            views_count=counter, favorites_count=counter, likes_count=counter))
+    db.commit()
+    yield db
+    db.close()
+
+
+def walk(db, sort, limit):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = paginate(db.query(Ad), sort, limit, cursor=cursor)
+        ids.extend(ad.ad_id for ad in rows)
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort", ["date", "views", "favs", "ai"])
+@pytest.mark.parametrize("limit", [1, 4, 7, 50])
+def test_cursor_walk_matches_full_ordering(session, sort, limit):
+    expected = [ad.ad_id for ad in order_by_keys(session.query(Ad), sort_keys(sort)).all()]
+
+    assert len(expected) == 23
+    assert walk(session, sort, limit) == expected
+
+
+def test_null_counters_sort_as_zero(session):
+    ordered = order_by_keys(session.query(Ad), sort_keys("views")).all()
+    counters = [ad.views_count or 0 for ad in ordered]
+
+    assert counters == sorted(counters, reverse=True)
+
+
+def test_cursor_from_other_sort_is_rejected(session):
+    cursor = encode_cursor("date", [1000, "ad-00"])
+
+    with pytest.raises(InvalidCursor):
+        paginate(session.query(Ad), "views", 5, cursor=cursor)
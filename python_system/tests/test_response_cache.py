@@ -0,0 +1,116 @@
+"""Response cache: ETag revalidation, namespacing and ORM invalidation"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import response_cache
+from models import Base, Category
+from response_cache import ResponseCache, cached_json
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(response_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def client(cache):
+    app = FastAPI()
+    app.state.builds = 0
+    app.state.payload = {"status": "success", "value": 1}
+
+    def build():
+        app.state.builds += 1
+        return dict(app.state.payload)
+
+    @app.get("/one")
+    async def one(request: Request, q: str = ""):
+        return await cached_json(request, "/api/x", {"q": q}, build,
+                                 tags=("categories",), namespace="one")
+
+    @app.get("/two")
+    async def two(request: Request, q: str = ""):
+        return await cached_json(request, "/api/x", {"q": q}, lambda: {"served_by": "two"},
+                                 tags=("categories",), namespace="two")
+
+    return TestClient(app)
+
+
+def test_miss_then_hit(client):
+    first = client.get("/one")
+    second = client.get("/one")
+
+    assert first.json() == second.json() == {"status": "success", "value": 1}
+    assert first.headers["etag"] == second.headers["etag"]
+    assert client.app.state.builds == 1
+
+
+def test_matching_etag_returns_304(client):
+    etag = client.get("/one").headers["etag"]
+
+    assert client.get("/one", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/one", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get("/one", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_params_are_normalized():
+    assert ResponseCache.make_key("a", "/r", {"x": 1, "y": ""}) == ResponseCache.make_key("a", "/r", {"x": "1"})
+    assert ResponseCache.make_key("a", "/r", {"x": 1}) != ResponseCache.make_key("a", "/r", {"x": 2})
+
+
+def test_namespaces_do_not_share_entries(client):
+    assert client.get("/one").json()["value"] == 1
+    assert client.get("/two").json() == {"served_by": "two"}
+    assert client.get("/one").json()["value"] == 1
+
+
+def test_error_payload_is_not_cached(client):
+    client.app.state.payload = {"status": "success", "value": 0, "error": "db locked"}
+    response = client.get("/one")
+    assert "etag" not in response.headers
+
+    client.app.state.payload = {"status": "success", "value": 1}
+    assert client.get("/one").json()["value"] == 1
+    assert client.app.state.builds == 2
+
+
+def test_commit_invalidates_tagged_entries(client, cache):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    client.get("/one")
+    session.add(Category(category_slug="new", category_name="New", created_at=1))
+    session.flush()
+    client.get("/one")
+    assert client.app.state.builds == 1     # not committed yet
+
+    session.commit()
+    client.get("/one")
+    assert client.app.state.builds == 2
+    session.close()
+
+
+def test_rollback_keeps_entries(client, cache):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    client.get("/one")
+    session.add(Category(category_slug="new", category_name="New", created_at=1))
+    session.flush()
+    session.rollback()
+
+    client.get("/one")
+    assert client.app.state.builds == 1
+    session.close()
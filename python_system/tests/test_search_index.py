@@ -0,0 +1,151 @@
+"""ads_fts: triggers keep the index in sync, BM25 ranks title hits first"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import search_index
+from models import Ad, Base, Category, Company
+from pagination import paginate
+from search_index import apply_search, build_match_query, migrate
+
+
+def add_ad(db, ad_id, title, description="", category="cars", company="acme", created_at=1000):
+    db.add(Ad(ad_id=ad_id, company_slug=company, category_slug=category, title=title,
+              description=description, media_filename="x.jpg", media_path="x.jpg",
+              created_at=created_at, updated_at=created_at, status="active"))
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ads.db'}")
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(search_index, "_ready", False)
+    monkeypatch.setattr(search_index, "fts_available", True)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    db = sessionmaker(bind=engine)()
+    db.add(Company(company_slug="acme", company_name="Acme Motors", created_at=1, updated_at=1))
+    db.add(Category(category_slug="cars", category_name="Used Cars", created_at=1))
+    db.commit()
+    yield db
+    db.close()
+
+
+def indexed(engine, match):
+    with engine.connect() as conn:
+        return sorted(row[0] for row in conn.execute(
+            text("SELECT ad_id FROM ads_fts WHERE ads_fts MATCH :m"), {"m": match}
+        ))
+
+
+def search(db, engine, q):
+    query, rank = apply_search(db.query(Ad), Ad, q, engine=engine)
+    return [ad.ad_id for ad in query.order_by(rank).all()]
+
+
+def test_migrate_backfills_once(engine, db):
+    add_ad(db, "ad-1", "Toyota Corolla")
+    db.commit()
+
+    assert migrate(engine) == 1
+    assert migrate(engine) == 0
+    # Category and company names are searchable
+    assert indexed(engine, '"acme" "used"') == ["ad-1"]
+
+
+def test_triggers_keep_index_in_sync(engine, db):
+    migrate(engine)
+    add_ad(db, "ad-1", "Toyota Corolla")
+    add_ad(db, "ad-2", "Honda Civic")
+    db.commit()
+    assert indexed(engine, "toyota") == ["ad-1"]
+
+    db.query(Ad).filter(Ad.ad_id == "ad-1").update({"title": "Mazda 3"})
+    db.query(Ad).filter(Ad.ad_id == "ad-2").delete()
+    db.commit()
+    assert indexed(engine, "toyota") == []
+    assert indexed(engine, "mazda") == ["ad-1"]
+    assert indexed(engine, "honda") == []
+
+    db.query(Category).filter(Category.category_slug == "cars").update({"category_name": "Vehicles"})
+    db.commit()
+    assert indexed(engine, "vehicles") == ["ad-1"]
+
+
+def test_counter_updates_leave_index_alone(engine, db):
+    migrate(engine)
+    add_ad(db, "ad-1", "Toyota Corolla")
+    db.commit()
+
+    with engine.begin() as conn:
+        before = conn.execute(text("SELECT rowid FROM ads_fts WHERE ad_id = 'ad-1'")).scalar()
+        conn.execute(text("UPDATE ads SET views_count = 5 WHERE ad_id = 'ad-1'"))
+        after = conn.execute(text("SELECT rowid FROM ads_fts WHERE ad_id = 'ad-1'")).scalar()
+
+    assert before == after
+
+
+def test_legacy_external_content_index_is_replaced(engine, db):
+    add_ad(db, "ad-1", "Toyota Corolla")
+    db.commit()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE ads_fts USING fts5(ad_id, title, description, content='ads')"
+        ))
+
+    assert migrate(engine) == 1
+    with engine.connect() as conn:
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'ads_fts'")).scalar()
+    assert "content=" not in sql
+    assert indexed(engine, "corolla") == ["ad-1"]
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("Toyota corolla", '"toyota" "corolla"*'),
+    ('title:x OR "y', '"title" "x" "or" "y"*'),
+    ("NEAR(a b)", '"near" "a" "b"*'),
+    ("  -- !! ", ""),
+])
+def test_match_query_quotes_user_input(q, expected):
+    assert build_match_query(q) == expected
+
+
+def test_title_hits_rank_above_description_hits(engine, db):
+    add_ad(db, "desc", "Family hatchback", description="Similar to a corolla, runs well")
+    add_ad(db, "title", "Corolla 2015")
+    add_ad(db, "other", "Honda Civic")
+    db.commit()
+
+    assert search(db, engine, "corolla") == ["title", "desc"]
+    # Last word is a prefix
+    assert search(db, engine, "coro") == ["title", "desc"]
+    # Nothing to match: no filter, no rank
+    query, rank = apply_search(db.query(Ad), Ad, "  ", engine=engine)
+    assert rank is None and query.count() == 3
+
+
+def test_relevance_walk_visits_every_match_once(engine, db):
+    for i in range(9):
+        add_ad(db, f"ad-{i}", "Corolla " * (1 + i % 3), description="corolla", created_at=1000 + i % 2)
+    db.commit()
+
+    query, rank = apply_search(db.query(Ad), Ad, "corolla", engine=engine)
+    expected = [ad.ad_id for ad in query.order_by(rank, Ad.created_at.desc(), Ad.ad_id.desc()).all()]
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = paginate(query, "relevance", 2, cursor=cursor, rank=rank)
+        seen.extend(ad.ad_id for ad in rows)
+        if cursor is None:
+            break
+    assert seen == expected
+    assert len(seen) == 9